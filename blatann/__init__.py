@@ -1,4 +1,2 @@
-from pc_ble_driver_py import config
-config.__conn_ic_id__ = "NRF52"
-
 from blatann.device import BleDevice
+from blatann.async_device import AsyncBleDevice
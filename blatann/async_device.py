@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import AsyncIterator, Iterable, Optional, Tuple, Union
+
+from blatann.device import BleDevice
+from blatann.event_args import (DatabaseDiscoveryCompleteEventArgs, DisconnectionEventArgs, ReadCompleteEventArgs,
+                                WriteCompleteEventArgs, SubscriptionWriteCompleteEventArgs,
+                                NotificationCompleteEventArgs, NotificationReceivedEventArgs,
+                                ReadManyCompleteEventArgs, WriteManyCompleteEventArgs)
+from blatann.gap.advertise_data import ScanReport, ScanReportCollection
+from blatann.gap.gap_types import ConnectionParameters, PeerAddress, Phy
+from blatann.gap.scanning import ScanParameters
+from blatann.gatt import OperationPriority
+from blatann.gatt.gattc import GattcCharacteristic
+from blatann.gatt.gattc_attribute import GattcAttribute
+from blatann.gatt.gatts import GattsCharacteristic
+from blatann.peer import Peer, Peripheral
+from blatann.uuid import Uuid
+from blatann.utils.loop_dispatcher import LoopDispatcher
+from blatann.waitables.event_queue import AsyncEventQueue, QueueOverflowPolicy
+
+logger = logging.getLogger(__name__)
+
+_scan_finished_sentinel = object()
+
+
+class AsyncBleDevice(object):
+    """
+    asyncio facade for a :class:`~blatann.device.BleDevice`, providing coroutine versions of the common operations.
+
+    The BLE device's state is still managed on the driver's event thread. Completed operations and received events
+    are delivered into the event loop through a single :class:`~blatann.utils.loop_dispatcher.LoopDispatcher`,
+    which wakes the loop once per batch of results rather than once per result.
+    This allows a single asyncio thread to manage many concurrent connections.
+
+    :Example:
+
+    >>> device = AsyncBleDevice(BleDevice("COM3"))
+    >>> await device.open()
+    >>> peer = await device.connect(peer_address)
+    >>> await device.discover_services(peer)
+    >>> read_result = await device.read(peer.database.find_characteristic(char_uuid))
+    """
+    def __init__(self, ble_device: BleDevice, loop: asyncio.AbstractEventLoop = None):
+        """
+        :param ble_device: The BLE device to wrap. Configuration (``configure()``) must be done before opening
+        :param loop: The event loop to deliver results into. Defaults to the running event loop,
+                     it must be provided if the device is not created from within the event loop
+        """
+        if loop is None:
+            loop = asyncio.get_running_loop()
+        self._ble_device = ble_device
+        self._loop = loop
+        self._dispatcher = LoopDispatcher.for_loop(loop)
+
+    @property
+    def ble_device(self) -> BleDevice:
+        """
+        **Read Only**
+
+        The wrapped BLE device, used to access the synchronous API and events
+        """
+        return self._ble_device
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """
+        **Read Only**
+
+        The event loop results are delivered into
+        """
+        return self._loop
+
+    @property
+    def dispatcher(self) -> LoopDispatcher:
+        """
+        **Read Only**
+
+        The dispatcher delivering results into the event loop, exposes how many results were delivered in how many batches
+        """
+        return self._dispatcher
+
+    async def open(self, clear_bonding_data=False):
+        """
+        Opens the BLE device. Opening resets and configures the hardware, so it is run in the loop's default executor
+
+        :param clear_bonding_data: Flag that the bonding data should be cleared prior to opening the device
+        """
+        await self._loop.run_in_executor(None, self._ble_device.open, clear_bonding_data)
+
+    async def close(self):
+        """
+        Closes the BLE device, run in the loop's default executor
+        """
+        await self._loop.run_in_executor(None, self._ble_device.close)
+
+    async def scan(self, scan_parameters: ScanParameters = None, clear_scan_reports=True) -> ScanReportCollection:
+        """
+        Scans for advertising devices until the scan times out
+
+        :param scan_parameters: Optional scan parameters. Uses the scanner's default if not specified
+        :param clear_scan_reports: Flag to clear out previous scan reports
+        :return: The scan reports collected during the scan
+        """
+        waitable = self._ble_device.scanner.start_scan(scan_parameters, clear_scan_reports)
+        return await waitable.as_future(self._loop)
+
+    async def scan_reports(self, scan_parameters: ScanParameters = None,
+                           clear_scan_reports=True) -> AsyncIterator[ScanReport]:
+        """
+        Starts a scan and yields the scan reports as they are received. The iterator exits when the scan times out.
+        If the iteration is stopped early, scanning is stopped
+
+        :param scan_parameters: Optional scan parameters. Uses the scanner's default if not specified
+        :param clear_scan_reports: Flag to clear out previous scan reports
+        """
+        scanner = self._ble_device.scanner
+        reports = asyncio.Queue()
+
+        def on_scan_received(_, scan_report):
+            self._dispatcher.call_soon(reports.put_nowait, scan_report)
+
+        with scanner.on_scan_received.register(on_scan_received):
+            waitable = scanner.start_scan(scan_parameters, clear_scan_reports)
+            waitable.then(lambda _: self._dispatcher.call_soon(reports.put_nowait, _scan_finished_sentinel))
+            try:
+                report = await reports.get()
+                while report is not _scan_finished_sentinel:
+                    yield report
+                    report = await reports.get()
+            finally:
+                if scanner.is_scanning:
+                    scanner.stop()
+
+    async def connect(self, peer_address: PeerAddress, connection_params: ConnectionParameters = None,
+                      preferred_mtu_size: int = None, preferred_phy: Phy = None,
+                      timeout: float = None) -> Optional[Peripheral]:
+        """
+        Connects to a peripheral. See :meth:`BleDevice.connect() <blatann.device.BleDevice.connect>` for the parameters
+
+        :param timeout: Optional time to wait for the connection, in seconds
+        :return: The connected peripheral, or None if the connection timed out in the stack
+        :raises: blatann.exceptions.TimeoutError if the timeout is reached
+        """
+        waitable = self._ble_device.connect(peer_address, connection_params, preferred_mtu_size, preferred_phy)
+        return await waitable.as_async(timeout, loop=self._loop)
+
+    async def disconnect(self, peer: Peer, timeout: float = None) -> DisconnectionEventArgs:
+        """
+        Disconnects from the peer
+
+        :param peer: The peer to disconnect from
+        :param timeout: Optional time to wait for the disconnection, in seconds
+        :return: The disconnection event args
+        :raises: blatann.exceptions.TimeoutError if the timeout is reached
+        """
+        _, event_args = await peer.disconnect().as_async(timeout, loop=self._loop)
+        return event_args
+
+    async def discover_services(self, peer: Peer, timeout: float = None, use_cache=False, uuids: Iterable[Uuid] = None,
+                                discover_descriptors=True) -> DatabaseDiscoveryCompleteEventArgs:
+        """
+        Discovers the services, characteristics and descriptors of the peer's GATT database
+
+        :param peer: The peer to discover
+        :param timeout: Optional time to wait for discovery to complete, in seconds
+        :param use_cache: True to use the discovery cache for bonded peers,
+                          see :meth:`Peer.discover_services() <blatann.peer.Peer.discover_services>`
+        :param uuids: Optional UUIDs of the services to discover. If not provided, all services are discovered
+        :param discover_descriptors: False to discover the descriptors on demand instead of during discovery
+        :return: The discovery event args, the discovered database is available through ``peer.database``
+        :raises: blatann.exceptions.TimeoutError if the timeout is reached
+        """
+        waitable = peer.discover_services(use_cache, uuids, discover_descriptors)
+        _, event_args = await waitable.as_async(timeout, loop=self._loop)
+        return event_args
+
+    async def read(self, characteristic: GattcCharacteristic, timeout: float = None,
+                   priority=OperationPriority.NORMAL) -> ReadCompleteEventArgs:
+        """
+        Reads the characteristic's value from the peripheral
+
+        :param characteristic: The characteristic to read
+        :param timeout: Optional time to wait for the read to complete, in seconds
+        :param priority: The priority of the read relative to the other queued operations with the peer
+        :return: The read event args, containing the status and value read
+        :raises: blatann.exceptions.TimeoutError if the timeout is reached
+        """
+        _, event_args = await characteristic.read(priority).as_async(timeout, loop=self._loop)
+        return event_args
+
+    async def write(self, characteristic: GattcCharacteristic, data, with_response=True,
+                    timeout: float = None, priority=OperationPriority.NORMAL) -> WriteCompleteEventArgs:
+        """
+        Writes the data to the characteristic on the peripheral
+
+        :param characteristic: The characteristic to write to
+        :param data: The data to write. Can be a string, bytes, or anything that can be converted to bytes
+        :param with_response: True to send a write request, False to send a write command (write without response)
+        :param timeout: Optional time to wait for the write to complete, in seconds
+        :param priority: The priority of the write relative to the other queued operations with the peer
+        :return: The write event args, containing the status of the write
+        :raises: blatann.exceptions.TimeoutError if the timeout is reached
+        """
+        if with_response:
+            waitable = characteristic.write(data, priority)
+        else:
+            waitable = characteristic.write_without_response(data, priority)
+        _, event_args = await waitable.as_async(timeout, loop=self._loop)
+        return event_args
+
+    async def read_many(self, peer: Peer, attributes: Iterable[Union[GattcCharacteristic, GattcAttribute]],
+                        use_read_multiple=True, timeout: float = None) -> ReadManyCompleteEventArgs:
+        """
+        Reads a batch of characteristics and/or attributes from the peer.
+        See :meth:`GattcDatabase.read_many() <blatann.gatt.gattc.GattcDatabase.read_many>` for the parameters
+
+        :param peer: The peer to read from
+        :param timeout: Optional time to wait for all of the reads to complete, in seconds
+        :return: The batch event args, containing the result of each read keyed by attribute handle
+        :raises: blatann.exceptions.TimeoutError if the timeout is reached
+        """
+        waitable = peer.database.read_many(attributes, use_read_multiple)
+        _, event_args = await waitable.as_async(timeout, loop=self._loop)
+        return event_args
+
+    async def write_many(self, peer: Peer, writes: Iterable[Tuple[Union[GattcCharacteristic, GattcAttribute], bytes]],
+                         timeout: float = None) -> WriteManyCompleteEventArgs:
+        """
+        Writes a batch of characteristics and/or attributes on the peer.
+        See :meth:`GattcDatabase.write_many() <blatann.gatt.gattc.GattcDatabase.write_many>` for the parameters
+
+        :param peer: The peer to write to
+        :param timeout: Optional time to wait for all of the writes to complete, in seconds
+        :return: The batch event args, containing the result of each write keyed by attribute handle
+        :raises: blatann.exceptions.TimeoutError if the timeout is reached
+        """
+        _, event_args = await peer.database.write_many(writes).as_async(timeout, loop=self._loop)
+        return event_args
+
+    async def subscribe(self, characteristic: GattcCharacteristic, prefer_indications=False,
+                        timeout: float = None) -> SubscriptionWriteCompleteEventArgs:
+        """
+        Subscribes to the characteristic's notifications or indications.
+        Use :meth:`notifications` to receive the values the peripheral sends
+
+        :param characteristic: The characteristic to subscribe to
+        :param prefer_indications: If the peripheral supports both, subscribe to indications instead of notifications
+        :param timeout: Optional time to wait for the subscription to complete, in seconds
+        :return: The subscription event args
+        :raises: blatann.exceptions.TimeoutError if the timeout is reached
+        """
+        waitable = characteristic.subscribe(prefer_indications=prefer_indications)
+        _, event_args = await waitable.as_async(timeout, loop=self._loop)
+        return event_args
+
+    def notifications(self, characteristic: GattcCharacteristic, max_size=0,
+                      overflow_policy=QueueOverflowPolicy.drop_oldest) -> AsyncEventQueue[GattcCharacteristic, NotificationReceivedEventArgs]:
+        """
+        Gets an async iterable of the notifications/indications received for the characteristic.
+        The iterable exits when the peer disconnects
+
+        :param characteristic: The characteristic to receive the notifications of
+        :param max_size: The number of notifications which can be queued before the overflow policy is applied,
+                         or 0 for an unbounded queue
+        :param overflow_policy: What to do when a notification is received and the queue is full
+        """
+        return characteristic.notification_queue_async(self._loop, max_size, overflow_policy)
+
+    async def notify(self, characteristic: GattsCharacteristic, data, timeout: float = None,
+                     priority=OperationPriority.NORMAL) -> NotificationCompleteEventArgs:
+        """
+        Sends a notification or indication of the data to the client subscribed to the local characteristic
+
+        :param characteristic: The local characteristic to notify
+        :param data: The data to send, or None to send the characteristic's current value
+        :param timeout: Optional time to wait for the notification to be sent, in seconds
+        :param priority: The priority of the notification relative to the other queued notifications to the client
+        :return: The notification complete event args
+        :raises: blatann.exceptions.TimeoutError if the timeout is reached
+        """
+        _, event_args = await characteristic.notify(data, priority).as_async(timeout, loop=self._loop)
+        return event_args
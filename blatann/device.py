@@ -1,6 +1,8 @@
+from __future__ import annotations
+
 import logging
-from threading import Lock
-from typing import Union
+from threading import Lock, Thread, Event as ThreadEvent
+from typing import Optional, Union
 
 from blatann import peer, exceptions
 from blatann.gap import advertising, scanning, default_bond_db, IoCapabilities, SecurityParameters, PairingPolicy
@@ -9,6 +11,9 @@ from blatann.gap.generic_access_service import GenericAccessService
 from blatann.gatt import gatts, MTU_SIZE_FOR_MAX_DLE, MTU_SIZE_MINIMUM, MTU_SIZE_DEFAULT
 from blatann.nrf import nrf_events, nrf_types
 from blatann.nrf.nrf_driver import NrfDriver, NrfDriverObserver
+from blatann.nrf.nrf_event_queue import DriverEventQueue, OverflowPolicy
+from blatann.nrf.nrf_driver_metrics import DriverMetricsSnapshot
+from blatann.event_type import Event, EventSource
 from blatann.uuid import Uuid, Uuid16, Uuid128
 from blatann.waitables.connection_waitable import PeripheralConnectionWaitable
 from blatann.bt_sig.uuids import UUID_DESCRIPTION_MAP
@@ -19,20 +24,27 @@ logger = logging.getLogger(__name__)
 
 class _EventLogger(NrfDriverObserver):
     def __init__(self, ble_driver):
+        self._ble_driver = ble_driver
         ble_driver.observer_register(self)
-        self._suppressed_events = []
+        # Replaced rather than modified so the event thread can check it without locking
+        self._suppressed_events = frozenset()
         self._lock = Lock()
 
     def suppress(self, *nrf_event_types):
         with self._lock:
-            for e in nrf_event_types:
-                if e not in self._suppressed_events:
-                    self._suppressed_events.append(e)
+            self._suppressed_events = self._suppressed_events.union(nrf_event_types)
+        self._ble_driver.observer_filter_changed()
 
     def on_driver_event(self, nrf_driver, event):
-        with self._lock:
-            if type(event) not in self._suppressed_events:
-                logger.debug("Got NRF Driver event: %s", event)
+        if type(event) not in self._suppressed_events:
+            logger.debug("Got NRF Driver event: %s", event)
+
+    def observes_event(self, event_type):
+        return logger.isEnabledFor(logging.DEBUG) and event_type not in self._suppressed_events
+
+    def observer_filter_key(self):
+        # Events are only logged at debug level, have the driver check again when the level changes
+        return logger.isEnabledFor(logging.DEBUG)
 
 
 class _UuidManager(object):
@@ -112,11 +124,19 @@ class BleDevice(NrfDriverObserver):
                              - ``"system"`` - saves the database within this library's directory structure, wherever it is installed or imported from.
                                Useful if you want the bonding database to be constrained to just that python/virtualenv installation
                              - ``":memory:"`` - database exists only in memory and will not be written out to disk. Bond data is lost when device is closed/opened
+    :param event_queue_size: The number of events from the nRF52 which can be buffered before they are processed.
+                             Once full, the oldest advertising reports are dropped first
+    :param event_queue_overflow_policy: What to do with non-advertising events when the event queue is full:
+                                        queue them past the configured size (default) or block until there is room
+    :param enable_metrics: Whether or not to collect driver performance metrics (see :attr:`metrics`).
+                           Off by default, metrics can also be enabled later through :attr:`metrics_enabled`
     """
     def __init__(self, comport="COM1", baud=1000000, log_driver_comms=False,
                  notification_hw_queue_size=16, write_command_hw_queue_size=16,
-                 bond_db_filename="user"):
-        self.ble_driver = NrfDriver(comport, baud, log_driver_comms)
+                 bond_db_filename="user", event_queue_size=DriverEventQueue.DEFAULT_MAX_SIZE,
+                 event_queue_overflow_policy=OverflowPolicy.drop_adv_reports, enable_metrics=False):
+        self.ble_driver = NrfDriver(comport, baud, log_driver_comms, event_queue_size, event_queue_overflow_policy)
+        self.ble_driver.metrics.enabled = enable_metrics
         self.event_logger = _EventLogger(self.ble_driver)
         self.ble_driver.observer_register(self)
         self.ble_driver.event_subscribe(self._on_user_mem_request, nrf_events.EvtUserMemoryRequest)
@@ -141,6 +161,9 @@ class BleDevice(NrfDriverObserver):
         self._default_security_params = peer.DEFAULT_SECURITY_PARAMS
         self._default_preferred_mtu_size = MTU_SIZE_DEFAULT
         self._default_preferred_phy = Phy.auto
+        self._on_metrics_report = EventSource("On Metrics Report", logger)
+        self._metrics_report_stop = None
+        self._metrics_enabled_before_reporting = False
 
     def _setup_bond_db(self, bond_db_filename):
         self.bond_db_loader = default_bond_db.DefaultBondDatabaseLoader(bond_db_filename)
@@ -205,6 +228,7 @@ class BleDevice(NrfDriverObserver):
         """
         Closes the connection to the BLE device. The connection to the device must be opened again to perform BLE operations.
         """
+        self.stop_metrics_reporting()
         if self.ble_driver.is_open:
             self.ble_driver.close()
             self.bond_db_loader.save(self.bond_db)
@@ -266,6 +290,92 @@ class BleDevice(NrfDriverObserver):
         """
         return self._default_conn_config.max_att_mtu
 
+    @property
+    def metrics(self) -> DriverMetricsSnapshot:
+        """
+        **Read Only**
+
+        Gets a snapshot of the driver's performance metrics: call counts, errors and latencies for each driver API,
+        event counts by type, how long events wait in the event queue, and how long each event handler takes to run.
+
+        .. note:: Metrics are only collected while :attr:`metrics_enabled` is True
+        """
+        return self.ble_driver.metrics.snapshot(self.ble_driver.event_queue)
+
+    @property
+    def metrics_enabled(self) -> bool:
+        """
+        Gets/Sets whether or not driver performance metrics are being collected.
+        Disabled by default unless the device was created with ``enable_metrics=True``
+        or :meth:`start_metrics_reporting` was called
+        """
+        return self.ble_driver.metrics.enabled
+
+    @metrics_enabled.setter
+    def metrics_enabled(self, value: bool):
+        self.ble_driver.metrics.enabled = value
+
+    @property
+    def on_metrics_report(self) -> Event[BleDevice, DriverMetricsSnapshot]:
+        """
+        Event that is triggered periodically with a snapshot of the metrics once :meth:`start_metrics_reporting` is called.
+        The handlers are called from a dedicated reporting thread, not the driver's event thread
+        """
+        return self._on_metrics_report
+
+    def start_metrics_reporting(self, interval_seconds: float):
+        """
+        Starts periodically triggering :attr:`on_metrics_report` with a snapshot of the metrics.
+        If reporting is already running it is restarted with the new interval.
+        This enables metrics collection if not already enabled,
+        :meth:`stop_metrics_reporting` restores the previous :attr:`metrics_enabled` state
+
+        :param interval_seconds: How often to report the metrics
+        """
+        if interval_seconds <= 0:
+            raise ValueError("Metrics reporting interval must be positive")
+        self.stop_metrics_reporting()
+        self._metrics_enabled_before_reporting = self.metrics_enabled
+        self.metrics_enabled = True
+        stop = ThreadEvent()
+        self._metrics_report_stop = stop
+
+        def report_loop():
+            while not stop.wait(interval_seconds):
+                self._on_metrics_report.notify(self, self.metrics)
+
+        thread = Thread(target=report_loop, name="{}_Metrics".format(self.ble_driver.serial_port))
+        thread.daemon = True
+        thread.start()
+
+    def stop_metrics_reporting(self):
+        """
+        Stops the periodic metrics reporting, if running, and restores the :attr:`metrics_enabled` state
+        from before :meth:`start_metrics_reporting` was called
+        """
+        if self._metrics_report_stop:
+            self._metrics_report_stop.set()
+            self._metrics_report_stop = None
+            self.metrics_enabled = self._metrics_enabled_before_reporting
+
+    @property
+    def slow_handler_threshold(self) -> Optional[float]:
+        """
+        How long an event handler can block the driver's event thread, in seconds, before a warning is logged
+        with the event type and the event thread's stack. None (the default) disables the check.
+
+        Handlers which can take a long time should be moved off the event thread,
+        see :func:`blatann.event_type.set_user_handler_executor`
+
+        :getter: Gets the slow handler threshold
+        :setter: Sets the slow handler threshold, or None to disable it
+        """
+        return self.ble_driver.handler_watchdog.threshold
+
+    @slow_handler_threshold.setter
+    def slow_handler_threshold(self, value: Optional[float]):
+        self.ble_driver.handler_watchdog.threshold = value
+
     def set_tx_power(self, tx_power):
         """
         Sets the radio transmit power. This is used for all connections, advertising, active scanning, etc.
@@ -403,6 +513,12 @@ class BleDevice(NrfDriverObserver):
         # TODO: Save/load system attributes from a database
         self.ble_driver.ble_gatts_sys_attr_set(event.conn_handle, None)
 
+    def observes_event(self, event_type):
+        """
+        :meta private:
+        """
+        return issubclass(event_type, (nrf_events.GapEvtConnected, nrf_events.GapEvtTimeout, nrf_events.GapEvtDisconnected))
+
     def on_driver_event(self, nrf_driver, event):
         """
         :meta private:
@@ -1,4 +1,4 @@
-from typing import TypeVar, Generic, Callable, Union
+from typing import TypeVar, Generic, Callable, Union, Dict
 from enum import Enum, auto
 
 from blatann.gap.gap_types import ActiveConnectionParameters
@@ -28,6 +28,8 @@ class GattOperationCompleteReason(Enum):
     FAILED = 5
     # The peer failed to respond to the ATT operation
     TIMED_OUT = 6
+    # The operation was cancelled before it was sent
+    CANCELLED = 7
 
 
 class EventArgs(object):
@@ -362,15 +364,71 @@ class NotificationReceivedEventArgs(EventArgs):
         self.is_indication = is_indication
 
 
+class ReadManyCompleteEventArgs(EventArgs):
+    """
+    Event arguments for when a batch of reads started with
+    :meth:`GattcDatabase.read_many() <blatann.gatt.gattc.GattcDatabase.read_many>` has completed
+    """
+    def __init__(self, results: Dict[int, ReadCompleteEventArgs]):
+        """
+        :param results: The result of each read, keyed by the handle of the attribute read
+        """
+        self.results = results
+
+    @property
+    def all_succeeded(self) -> bool:
+        """
+        True if every read in the batch completed successfully
+        """
+        return all(r.status == GattStatusCode.success for r in self.results.values())
+
+
+class WriteManyCompleteEventArgs(EventArgs):
+    """
+    Event arguments for when a batch of writes started with
+    :meth:`GattcDatabase.write_many() <blatann.gatt.gattc.GattcDatabase.write_many>` has completed
+    """
+    def __init__(self, results: Dict[int, WriteCompleteEventArgs]):
+        """
+        :param results: The result of each write, keyed by the handle of the attribute written to
+        """
+        self.results = results
+
+    @property
+    def all_succeeded(self) -> bool:
+        """
+        True if every write in the batch completed successfully
+        """
+        return all(r.status == GattStatusCode.success for r in self.results.values())
+
+
 class DatabaseDiscoveryCompleteEventArgs(EventArgs):
     """
     Event Arguments for when database discovery completes
     """
-    def __init__(self, status: GattStatusCode):
+    def __init__(self, status: GattStatusCode, from_cache=False):
         """
         :param status: The discovery status
+        :param from_cache: True if the database was restored from the discovery cache of a bonded peer
+                           instead of being discovered
         """
         self.status = status
+        self.from_cache = from_cache
+
+
+class DescriptorDiscoveryCompleteEventArgs(EventArgs):
+    """
+    Event Arguments for when the descriptors of a characteristic have been discovered
+    """
+    def __init__(self, discovery_id: int, status: GattStatusCode, reason: GattOperationCompleteReason):
+        """
+        :param discovery_id: The ID of the discovery that completed
+        :param status: The discovery status
+        :param reason: The reason the discovery completed
+        """
+        self.id = discovery_id
+        self.status = status
+        self.reason = reason
 
 
 class DecodedReadCompleteEventArgs(ReadCompleteEventArgs, Generic[TDecodedValue]):
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import types
-from typing import TypeVar, Generic, Callable
+from concurrent.futures import Executor
+from typing import TypeVar, Generic, Callable, Optional
 from threading import Lock
 import weakref
 
@@ -9,6 +10,56 @@ import weakref
 TSender = TypeVar("TSender")
 TEvent = TypeVar("TEvent")
 
+_user_handler_executor: Optional[Executor] = None
+
+
+def set_user_handler_executor(executor: Optional[Executor]):
+    """
+    Configures an executor to run user-level event handlers on instead of the thread which emits the event,
+    which for most events is the driver's single event thread. While a slow handler is running inline, no other
+    events are processed for any connection; offloading handlers keeps the event thread free.
+
+    Handlers which are part of blatann (internal state machines, waitables, services) always run inline
+    so the library's state is updated in the order the events occur. Offloaded handlers are called asynchronously,
+    use a single-worker executor (e.g. ``ThreadPoolExecutor(max_workers=1)``) to keep the handlers
+    called in the order the events were emitted.
+
+    :param executor: The executor to run user handlers on, or None to run all handlers inline (default)
+    """
+    global _user_handler_executor
+    _user_handler_executor = executor
+
+
+def get_user_handler_executor() -> Optional[Executor]:
+    """
+    Gets the executor user-level event handlers are run on, or None if handlers are run inline
+    """
+    return _user_handler_executor
+
+
+def _is_internal_handler(handler) -> bool:
+    module = getattr(handler, "__module__", None) or type(handler).__module__
+    return module.startswith("blatann.") and not module.startswith("blatann.examples")
+
+
+def _submit_user_handler(handler, func, *args) -> bool:
+    """
+    Submits a call to the user handler executor if one is configured and the handler is not internal to blatann
+
+    :param handler: The handler being called
+    :param func: The function to submit which calls the handler with the given args
+    :return: True if the call was submitted, False if it should be made inline
+    """
+    executor = _user_handler_executor
+    if executor is None or _is_internal_handler(handler):
+        return False
+    try:
+        executor.submit(func, *args)
+    except RuntimeError:
+        # Executor was shut down, fall back to running inline
+        return False
+    return True
+
 
 class Event(Generic[TSender, TEvent]):
     """
@@ -21,8 +72,9 @@ class Event(Generic[TSender, TEvent]):
     def __init__(self, name):
         self.name = name
         self._handler_lock = Lock()
-        self._handlers = []
-        self._handlers_set = weakref.WeakSet()
+        # (handler entries, whether any entry is a weakref). Replaced as a whole under the lock whenever a handler
+        # is registered/deregistered (copy-on-write) so emitting an event can iterate it without locking or copying
+        self._handlers = ((), False)
 
     def register(self, handler: Callable[[TSender, TEvent], None], weak=False) -> EventSubscriptionContext[TSender, TEvent]:
         """
@@ -50,9 +102,9 @@ class Event(Generic[TSender, TEvent]):
         else:
             entry = handler
         with self._handler_lock:
-            if handler not in self._handlers_set:
-                self._handlers.append(handler)
-                self._handlers_set.add(handler)
+            entries, has_weak = self._handlers
+            if self._index_of(entries, has_weak, handler) < 0:
+                self._handlers = (entries + (entry,), has_weak or weak)
         return EventSubscriptionContext(self, handler)
 
     def deregister(self, handler: Callable[[TSender, TEvent], None]):
@@ -63,23 +115,25 @@ class Event(Generic[TSender, TEvent]):
         :param handler: The handler to deregister
         """
         with self._handler_lock:
-            if handler in self._handlers_set:
-                self._handlers_set.remove(handler)
-                # In the case of weakrefs, the caller must have a strong reference to the handler
-                # in order to pass it into this function. Thus, it must exist in both the handler set and handler list
-                if handler in self._handlers:
-                    self._handlers.remove(handler)
-                else:
-                    # weakref, need to iterate to find the handler
-                    item_to_remove = None
-                    for entry in self._handlers:
-                        if isinstance(entry, weakref.ref):
-                            item = entry()
-                            if item == handler:
-                                item_to_remove = entry
-                                break
-                    if item_to_remove:
-                        self._handlers.remove(item_to_remove)
+            entries, has_weak = self._handlers
+            # In the case of weakrefs, the caller must have a strong reference to the handler
+            # in order to pass it into this function, so the weakref will still resolve to it
+            index = self._index_of(entries, has_weak, handler)
+            if index >= 0:
+                self._set_entries(entries[:index] + entries[index+1:])
+
+    @staticmethod
+    def _index_of(entries, has_weak, handler):
+        for i, entry in enumerate(entries):
+            if has_weak and isinstance(entry, weakref.ref):
+                entry = entry()
+            if entry == handler:
+                return i
+        return -1
+
+    def _set_entries(self, entries):
+        # Must be called with the lock held
+        self._handlers = (entries, any(isinstance(e, weakref.ref) for e in entries))
 
 
 class EventSource(Event):
@@ -96,48 +150,51 @@ class EventSource(Event):
         """
         Gets if the event has any handlers subscribed to the event
         """
-        with self._handler_lock:
-            return bool(self._handlers_set)
+        return bool(self._handlers[0])
 
     def clear_handlers(self):
         """
         Clears all handlers from the event
         """
         with self._handler_lock:
-            self._handlers = []
-            self._handlers_set = weakref.WeakSet()
+            self._handlers = ((), False)
 
     def notify(self, sender: TSender, event_args: TEvent = None):
         """
         Notifies all subscribers with the given sender and event arguments
         """
-        with self._handler_lock:
-            handlers = self._handlers[:]
-
-        dead_weakrefs = []
+        handlers, has_weak = self._handlers
+        dead_weakrefs = None
         for h in handlers:
-            if isinstance(h, weakref.ref):
+            if has_weak and isinstance(h, weakref.ref):
                 h_ref = h
                 h = h_ref()
                 if h is None:
+                    if dead_weakrefs is None:
+                        dead_weakrefs = []
                     dead_weakrefs.append(h_ref)
+                    continue
 
-            try:
-                h(sender, event_args)
-            except Exception as e:
-                if self._logger:
-                    self._logger.error(f"Error occurred while handling event '{self.name}'. Sender: {sender}, Event Args: {event_args}")
-                    self._logger.exception(e)
+            if _user_handler_executor is not None and _submit_user_handler(h, self._call_handler, h, sender, event_args):
+                continue
+            self._call_handler(h, sender, event_args)
 
         if dead_weakrefs:
             self._prune_dead_weakrefs(dead_weakrefs)
 
+    def _call_handler(self, handler, sender, event_args):
+        try:
+            handler(sender, event_args)
+        except Exception as e:
+            if self._logger:
+                self._logger.error(f"Error occurred while handling event '{self.name}'. Sender: {sender}, Event Args: {event_args}")
+                self._logger.exception(e)
+
     def _prune_dead_weakrefs(self, dead_weakrefs):
         with self._handler_lock:
-            for dead_weakref in dead_weakrefs:
-                # Double-check now that we're locked that the weakref still is in the handler list
-                if dead_weakref in self._handlers:
-                    self._handlers.remove(dead_weakref)
+            entries = self._handlers[0]
+            # Double-check now that we're locked that the weakrefs are still in the handler list
+            self._set_entries(tuple(e for e in entries if e not in dead_weakrefs))
 
 
 class EventSubscriptionContext(Generic[TSender, TEvent]):
@@ -9,6 +9,7 @@ from blatann.nrf.nrf_types import (
 
 if typing.TYPE_CHECKING:
     from blatann.gap.gap_types import PeerAddress
+    from blatann.gatt.discovery_cache import DiscoveryCache
 
 
 logger = logging.getLogger(__name__)
@@ -56,6 +57,7 @@ class BondDbEntry(object):
         self.peer_is_client: bool = False
         self.bonding_data: BondingData = None
         self.name = ""
+        self.gatt_cache: DiscoveryCache = None
 
     def resolved_peer_address(self) -> PeerAddress:
         return self.bonding_data.peer_id.peer_addr
@@ -99,7 +101,7 @@ class BondDbEntry(object):
             if self.peer_addr == peer_address:
                 return True
         elif smp_crypto.private_address_resolves(peer_address, self.bonding_data.peer_id.irk):
-            logger.debug("Resolved Peer address to {}".format(self.peer_addr))
+            logger.debug("Resolved Peer address to %s", self.peer_addr)
             return True
         return False
 
@@ -111,6 +113,7 @@ class BondDbEntry(object):
             "peer_addr": str(self.peer_addr),
             "peer_is_client": self.peer_is_client,
             "bonding_data": self.bonding_data.to_dict(),
+            "gatt_cache": self.gatt_cache.to_dict() if self.gatt_cache else None,
         }
 
     @classmethod
@@ -121,6 +124,11 @@ class BondDbEntry(object):
         entry.peer_addr = BLEGapAddr.from_string(data["peer_addr"])
         entry.peer_is_client = data["peer_is_client"]
         entry.bonding_data = BondingData.from_dict(data["bonding_data"])
+        gatt_cache = data.get("gatt_cache")
+        if gatt_cache:
+            # Imported here, the gatt package depends on the gap package
+            from blatann.gatt.discovery_cache import DiscoveryCache
+            entry.gatt_cache = DiscoveryCache.from_dict(gatt_cache)
         return entry
 
 
@@ -3,6 +3,7 @@ import os
 import logging
 import pickle
 import json
+import threading
 import typing
 from typing import List, Optional
 
@@ -84,6 +85,8 @@ class PickleDatabaseStrategy(DatabaseStrategy):
                 if not hasattr(record, "own_addr"):
                     print("Adding own_addr")
                     record.own_addr = None
+                if not hasattr(record, "gatt_cache"):
+                    record.gatt_cache = None
             return db
 
     def save(self, filename: str, db: DefaultBondDatabase):
@@ -145,6 +148,8 @@ class DefaultBondDatabaseLoader(BondDatabaseLoader):
         else:
             self.filename = filename
         self.strategy = None
+        # Saves can happen from a background thread while the user saves or closes the device
+        self._save_lock = threading.Lock()
 
     def _get_strategy(self):
         if self.strategy is None:
@@ -199,9 +204,10 @@ class DefaultBondDatabaseLoader(BondDatabaseLoader):
             return DefaultBondDatabase()
 
     def save(self, db: DefaultBondDatabase):
-        strategy = self._get_strategy()
-        self._create_dirs()
-        strategy.save(self.filename, db)
+        with self._save_lock:
+            strategy = self._get_strategy()
+            self._create_dirs()
+            strategy.save(self.filename, db)
 
 
 class DefaultBondDatabase(BondDatabase):
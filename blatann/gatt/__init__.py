@@ -77,6 +77,20 @@ class SubscriptionState(enum.IntEnum):
         return cls(struct.unpack("<H", buf)[0])
 
 
+class OperationPriority(enum.IntEnum):
+    """
+    Defines the priority of a queued GATT operation (read, write, notification or indication).
+    Queued operations are sent highest priority first, operations with the same priority are sent in the order they were queued.
+    Lower priority operations are still sent periodically while higher priority operations are queued
+    """
+    # Time-sensitive operations, such as writes to a control point
+    CONTROL = 0
+    # The default priority
+    NORMAL = 1
+    # Large transfers which should not hold up other operations, such as firmware image chunks
+    BULK = 2
+
+
 class CharacteristicProperties(object):
     def __init__(self, read=True, write=False, notify=False, indicate=False, broadcast=False,
                  write_no_response=False, signed_write=False):
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import binascii
+import logging
+import typing
+from typing import List, Optional
+
+from blatann.nrf import nrf_types
+from blatann.uuid import Uuid, Uuid16, Uuid128
+
+if typing.TYPE_CHECKING:
+    from blatann.device import _UuidManager
+
+
+logger = logging.getLogger(__name__)
+
+_CHARACTERISTIC_PROPERTIES = ["broadcast", "read", "write_wo_resp", "write", "notify", "indicate", "auth_signed_wr"]
+
+
+class DiscoveryCache(object):
+    """
+    The discovered layout of a peer's GATT database (services, characteristics, descriptors and their handles),
+    stored in the peer's bond database entry so discovery can be skipped when reconnecting to the peer.
+
+    The layout is stored in a serializable form, UUIDs are stored as strings so 128-bit UUIDs
+    can be registered with the device again when the cache is restored.
+    """
+    VERSION = 1
+
+    def __init__(self, services: List[dict], database_hash: Optional[bytes] = None):
+        """
+        :param services: The serialized services
+        :param database_hash: The value of the peer's Database Hash characteristic when the database was discovered,
+                              or None if the peer does not have one
+        """
+        self.services = services
+        self.database_hash = database_hash
+
+    @classmethod
+    def from_services(cls, uuid_manager: _UuidManager, nrf_services: List[nrf_types.BLEGattService],
+                      database_hash: Optional[bytes] = None) -> DiscoveryCache:
+        """
+        Creates a cache entry from the services found during discovery
+
+        :param uuid_manager: The device's UUID manager, used to resolve the discovered UUIDs
+        :param nrf_services: The discovered services
+        :param database_hash: The value of the peer's Database Hash characteristic, if any
+        """
+        services = []
+        for nrf_service in nrf_services:
+            characteristics = []
+            for nrf_char in nrf_service.chars:
+                props = nrf_char.char_props
+                characteristics.append({
+                    "uuid": _uuid_to_str(uuid_manager, nrf_char.uuid),
+                    "handle_decl": nrf_char.handle_decl,
+                    "handle_value": nrf_char.handle_value,
+                    "properties": [p for p in _CHARACTERISTIC_PROPERTIES if getattr(props, p)],
+                    "descriptors": [[_uuid_to_str(uuid_manager, d.uuid), d.handle] for d in nrf_char.descs]
+                })
+            services.append({
+                "uuid": _uuid_to_str(uuid_manager, nrf_service.uuid),
+                "start_handle": nrf_service.start_handle,
+                "end_handle": nrf_service.end_handle,
+                "characteristics": characteristics
+            })
+        return cls(services, database_hash)
+
+    def to_services(self, uuid_manager: _UuidManager) -> List[nrf_types.BLEGattService]:
+        """
+        Recreates the discovered services from the cache, registering any 128-bit UUIDs with the device
+
+        :param uuid_manager: The device's UUID manager
+        :return: The services, in the same form as returned by discovery
+        """
+        nrf_services = []
+        for service in self.services:
+            nrf_service = nrf_types.BLEGattService(_str_to_nrf_uuid(uuid_manager, service["uuid"]),
+                                                   service["start_handle"], service["end_handle"])
+            for char in service["characteristics"]:
+                props = nrf_types.BLEGattCharacteristicProperties(**{p: True for p in char["properties"]})
+                nrf_char = nrf_types.BLEGattCharacteristic(_str_to_nrf_uuid(uuid_manager, char["uuid"]),
+                                                           char["handle_decl"], char["handle_value"],
+                                                           char_props=props)
+                nrf_service.char_add(nrf_char)
+                for uuid, handle in char["descriptors"]:
+                    nrf_char.descs.append(nrf_types.BLEGattcDescriptor(_str_to_nrf_uuid(uuid_manager, uuid), handle))
+            nrf_services.append(nrf_service)
+        return nrf_services
+
+    def to_dict(self):
+        return {
+            "version": self.VERSION,
+            "database_hash": binascii.hexlify(self.database_hash).decode("ascii") if self.database_hash else None,
+            "services": self.services
+        }
+
+    @classmethod
+    def from_dict(cls, data) -> Optional[DiscoveryCache]:
+        if data.get("version") != cls.VERSION:
+            logger.info("Discarding GATT discovery cache with unsupported version {}".format(data.get("version")))
+            return None
+        database_hash = data["database_hash"]
+        database_hash = binascii.unhexlify(database_hash) if database_hash else None
+        return cls(data["services"], database_hash)
+
+
+def _uuid_to_str(uuid_manager: _UuidManager, nrf_uuid: nrf_types.BLEUUID) -> str:
+    return str(uuid_manager.nrf_uuid_to_uuid(nrf_uuid))
+
+
+def _str_to_nrf_uuid(uuid_manager: _UuidManager, uuid_str: str) -> nrf_types.BLEUUID:
+    if "-" in uuid_str:
+        uuid: Uuid = Uuid128(uuid_str)
+        uuid_manager.register_uuid(uuid)
+    else:
+        uuid = Uuid16(uuid_str)
+    return uuid.nrf_uuid
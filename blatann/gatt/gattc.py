@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
-from typing import List, Optional, Iterable
+import threading
+from typing import List, Optional, Iterable, Tuple, Union
 
 from blatann import gatt
 from blatann.gatt.gattc_attribute import GattcAttribute
@@ -12,15 +14,40 @@ from blatann.event_type import EventSource, Event
 from blatann.gatt.reader import GattcReader
 from blatann.gatt.writer import GattcWriter
 from blatann.nrf import nrf_types, nrf_events
-from blatann.waitables.event_queue import AsyncEventQueue, EventQueue
+from blatann.waitables.event_queue import AsyncEventQueue, EventQueue, QueueOverflowPolicy
 from blatann.waitables.event_waitable import EventWaitable, IdBasedEventWaitable
-from blatann.exceptions import InvalidOperationException
+from blatann.waitables.waitable import EmptyWaitable, GenericWaitable, Waitable
+from blatann.exceptions import InvalidOperationException, InvalidStateException
 from blatann.event_args import *
 
 
 logger = logging.getLogger(__name__)
 
 
+def _index_by_uuid(items):
+    """
+    Builds the UUID -> item lookup of services, characteristics or attributes.
+    Only the first item is kept if multiple have the same UUID, matching the find_* methods' linear search
+    """
+    index = {}
+    for item in items:
+        index.setdefault(item.uuid, item)
+    return index
+
+
+def _find_by_uuid(index, items, uuid):
+    """
+    Finds the first item with the given UUID using the lookup built by _index_by_uuid.
+    UUIDs given in another form, e.g. strings like "2a37", are compared against each item instead
+    """
+    if isinstance(uuid, Uuid):
+        return index.get(uuid)
+    for item in items:
+        if item.uuid == uuid:
+            return item
+    return None
+
+
 class GattcCharacteristic(gatt.Characteristic):
     """
     Represents a characteristic that lives within a service in the server's GATT database.
@@ -33,14 +60,27 @@ class GattcCharacteristic(gatt.Characteristic):
                  decl_attr: GattcAttribute,
                  value_attr: GattcAttribute,
                  cccd_attr: GattcAttribute = None,
-                 attributes: List[GattcAttribute] = None):
+                 attributes: List[GattcAttribute] = None,
+                 read_write_manager: GattcOperationManager = None,
+                 end_handle: int = None):
+        """
+        :param read_write_manager: The manager used to discover the descriptors on demand
+        :param end_handle: The last handle of the characteristic if its descriptors have not been discovered yet,
+                           otherwise None
+        """
         super(GattcCharacteristic, self).__init__(ble_device, peer, uuid, properties)
         self._decl_attr = decl_attr
         self._value_attr = value_attr
         self._cccd_attr = cccd_attr
         self._on_notification_event = EventSource("On Notification", logger)
         self._attributes = tuple(sorted(attributes, key=lambda d: d.handle)) or ()
+        self._attributes_by_uuid = _index_by_uuid(self._attributes)
         self.peer = peer
+        self._manager = read_write_manager
+        # The last handle of the range still to be searched for descriptors, None once they're known
+        self._undiscovered_end_handle = end_handle if end_handle and end_handle > value_attr.handle else None
+        self._descriptor_discovery_lock = threading.Lock()
+        self._descriptor_discovery_callbacks = []
 
         self._on_read_complete_event = EventSource("On Read Complete", logger)
         self._on_write_complete_event = EventSource("Write Complete", logger)
@@ -51,8 +91,6 @@ class GattcCharacteristic(gatt.Characteristic):
         if self._cccd_attr:
             self._cccd_attr.on_write_complete.register(self._cccd_write_complete)
 
-        self.peer.driver_event_subscribe(self._on_indication_notification, nrf_events.GattcEvtHvx)
-
     """
     Properties
     """
@@ -147,6 +185,16 @@ class GattcCharacteristic(gatt.Characteristic):
         """
         return self.cccd_state != gatt.SubscriptionState.NOT_SUBSCRIBED
 
+    @property
+    def descriptors_discovered(self) -> bool:
+        """
+        **Read Only**
+
+        Gets if the characteristic's descriptors are known. This is only False if the database was discovered
+        without descriptors and they have not been discovered on demand yet, see :meth:`discover_descriptors`
+        """
+        return self._undiscovered_end_handle is None
+
     @property
     def attributes(self) -> Iterable[GattcAttribute]:
         """
@@ -154,7 +202,11 @@ class GattcCharacteristic(gatt.Characteristic):
 
         Returns the list of all attributes/descriptors that reside in the characteristic.
         This includes the declaration attribute, value attribute, and descriptors (CCCD, Name, etc.)
+
+        :raises: InvalidStateException if the database was discovered without descriptors and they have not been
+                 discovered yet, see :meth:`discover_descriptors`
         """
+        self._check_descriptors_discovered()
         return self._attributes
 
     @property
@@ -200,7 +252,8 @@ class GattcCharacteristic(gatt.Characteristic):
     Queues
     """
 
-    def notification_queue_async(self, event_loop: asyncio.AbstractEventLoop = None) -> AsyncEventQueue[GattcCharacteristic, NotificationReceivedEventArgs]:
+    def notification_queue_async(self, event_loop: asyncio.AbstractEventLoop = None, max_size=0,
+                                 overflow_policy=QueueOverflowPolicy.drop_oldest) -> AsyncEventQueue[GattcCharacteristic, NotificationReceivedEventArgs]:
         """
         .. warning:: This API is experimental!
 
@@ -219,12 +272,16 @@ class GattcCharacteristic(gatt.Characteristic):
                 print(f"Got notification: {event_args}")
             print("Peer disconnected")
 
-        :param event_loop: Optional event loop the async queue will be consumed on
+        :param event_loop: Optional event loop the async queue will be consumed on.
+                           Defaults to the running event loop, it must be provided if not called from within the event loop
+        :param max_size: The number of notifications which can be queued before the overflow policy is applied,
+                         or 0 for an unbounded queue
+        :param overflow_policy: What to do when a notification is received and the queue is full
         :return: The async event queue object
         """
-        return AsyncEventQueue(self._on_notification_event, self.peer.on_disconnect, event_loop)
+        return AsyncEventQueue(self._on_notification_event, self.peer.on_disconnect, event_loop, max_size, overflow_policy)
 
-    def notification_queue(self) -> EventQueue[GattcCharacteristic, NotificationReceivedEventArgs]:
+    def notification_queue(self, max_size=0, overflow_policy=QueueOverflowPolicy.drop_oldest) -> EventQueue[GattcCharacteristic, NotificationReceivedEventArgs]:
         """
         .. warning:: This API is experimental!
 
@@ -243,9 +300,12 @@ class GattcCharacteristic(gatt.Characteristic):
                 print(f"Got notification: {event_args}")
             print("Peer disconnected")
 
+        :param max_size: The number of notifications which can be queued before the overflow policy is applied,
+                         or 0 for an unbounded queue
+        :param overflow_policy: What to do when a notification is received and the queue is full
         :return: The event queue object
         """
-        return EventQueue(self._on_notification_event, self.peer.on_disconnect)
+        return EventQueue(self._on_notification_event, self.peer.on_disconnect, max_size, overflow_policy)
 
     """
     Public Methods
@@ -275,8 +335,7 @@ class GattcCharacteristic(gatt.Characteristic):
         if on_notification_handler:
             self._on_notification_event.register(on_notification_handler)
 
-        waitable = self._cccd_attr.write(gatt.SubscriptionState.to_buffer(value))
-        return IdBasedEventWaitable(self._on_cccd_write_complete_event, waitable.id)
+        return self._write_cccd(value)
 
     def unsubscribe(self) -> EventWaitable[GattcCharacteristic, SubscriptionWriteCompleteEventArgs]:
         """
@@ -291,31 +350,33 @@ class GattcCharacteristic(gatt.Characteristic):
         if not self.subscribable:
             raise InvalidOperationException("Cannot subscribe to Characteristic {}".format(self.uuid))
         value = gatt.SubscriptionState.NOT_SUBSCRIBED
-        waitable = self._cccd_attr.write(gatt.SubscriptionState.to_buffer(value))
+        waitable = self._write_cccd(value)
         self._on_notification_event.clear_handlers()
 
-        return IdBasedEventWaitable(self._on_cccd_write_complete_event, waitable.id)
+        return waitable
 
-    def read(self) -> EventWaitable[GattcCharacteristic, ReadCompleteEventArgs]:
+    def read(self, priority=gatt.OperationPriority.NORMAL) -> EventWaitable[GattcCharacteristic, ReadCompleteEventArgs]:
         """
         Initiates a read of the characteristic and returns a Waitable that triggers when the read finishes with
         the data read.
 
+        :param priority: The priority of the read relative to the other queued operations with the peer
         :return: A waitable that will trigger when the read finishes
         :raises: InvalidOperationException if characteristic not readable
         """
         if not self.readable:
             raise InvalidOperationException("Characteristic {} is not readable".format(self.uuid))
-        waitable = self._value_attr.read()
-        return IdBasedEventWaitable(self._on_read_complete_event, waitable.id)
+        read_id = self._value_attr.read_nowait(priority)
+        return IdBasedEventWaitable(self._on_read_complete_event, read_id, self._value_attr.cancel)
 
-    def write(self, data) -> EventWaitable[GattcCharacteristic, WriteCompleteEventArgs]:
+    def write(self, data, priority=gatt.OperationPriority.NORMAL) -> EventWaitable[GattcCharacteristic, WriteCompleteEventArgs]:
         """
         Performs a write request of the data provided to the characteristic and returns a Waitable that triggers
         when the write completes and the confirmation response is received from the other device.
 
         :param data: The data to write. Can be a string, bytes, or anything that can be converted to bytes
         :type data: str or bytes or bytearray
+        :param priority: The priority of the write relative to the other queued operations with the peer
         :return: A waitable that returns when the write finishes
         :raises: InvalidOperationException if characteristic is not writable
         """
@@ -323,10 +384,11 @@ class GattcCharacteristic(gatt.Characteristic):
             raise InvalidOperationException("Characteristic {} is not writable".format(self.uuid))
         if isinstance(data, str):
             data = data.encode(self.string_encoding)
-        waitable = self._value_attr.write(bytes(data), True)
-        return IdBasedEventWaitable(self._on_write_complete_event, waitable.id)
+        write_id = self._value_attr.write_nowait(bytes(data), True, priority)
+        return IdBasedEventWaitable(self._on_write_complete_event, write_id, self._value_attr.cancel)
 
-    def write_without_response(self, data) -> EventWaitable[GattcCharacteristic, WriteCompleteEventArgs]:
+    def write_without_response(self, data,
+                               priority=gatt.OperationPriority.NORMAL) -> EventWaitable[GattcCharacteristic, WriteCompleteEventArgs]:
         """
         Performs a write command, which does not require the peripheral to send a confirmation response packet.
         This is a faster but lossy operation in the case that the packet is dropped/never received by the peer.
@@ -336,16 +398,48 @@ class GattcCharacteristic(gatt.Characteristic):
 
         :param data: The data to write. Can be a string, bytes, or anything that can be converted to bytes
         :type data: str or bytes or bytearray
+        :param priority: The priority of the write relative to the other queued operations with the peer
         :return: A waitable that returns when the write finishes
         :raises: InvalidOperationException if characteristic is not writable without responses
         """
+        write_id = self.write_without_response_nowait(data, priority)
+        return IdBasedEventWaitable(self._on_write_complete_event, write_id, self._value_attr.cancel)
+
+    def write_without_response_nowait(self, data, priority=gatt.OperationPriority.NORMAL) -> int:
+        """
+        Same as :meth:`write_without_response`, but does not create a waitable for the write.
+        Use this when streaming a large number of writes that don't need to be waited on individually,
+        the :attr:`on_write_complete` event is still triggered when each write is transmitted.
+
+        :param data: The data to write. Can be a string, bytes, or anything that can be converted to bytes
+        :type data: str or bytes or bytearray
+        :param priority: The priority of the write relative to the other queued operations with the peer
+        :return: The ID of the write operation, which is used in the on_write_complete event
+        :raises: InvalidOperationException if characteristic is not writable without responses
+        """
         if not self.writable_without_response:
             raise InvalidOperationException("Characteristic {} does not accept "
                                             "writes without responses".format(self.uuid))
         if isinstance(data, str):
             data = data.encode(self.string_encoding)
-        waitable = self._value_attr.write(bytes(data), False)
-        return IdBasedEventWaitable(self._on_write_complete_event, waitable.id)
+        return self._value_attr.write_nowait(bytes(data), False, priority)
+
+    def discover_descriptors(self, priority=gatt.OperationPriority.NORMAL) -> Waitable[Tuple[GattcCharacteristic, DescriptorDiscoveryCompleteEventArgs]]:
+        """
+        Discovers the characteristic's descriptors if the database was discovered without them.
+        :meth:`subscribe` and :meth:`unsubscribe` discover them automatically. This is the only way to discover them
+        for :meth:`find_descriptor` and :attr:`attributes`, which raise an exception until the descriptors are discovered.
+
+        :param priority: The priority of the discovery relative to the other queued operations with the peer
+        :return: A waitable that triggers when the descriptors are discovered.
+                 Triggers immediately if the descriptors are already known
+        """
+        if self.descriptors_discovered:
+            return EmptyWaitable(self, DescriptorDiscoveryCompleteEventArgs(0, gatt.GattStatusCode.success,
+                                                                            GattOperationCompleteReason.SUCCESS))
+        waitable = GenericWaitable(n_args=2)
+        self._discover_descriptors(waitable.notify, priority)
+        return waitable
 
     def find_descriptor(self, uuid: Uuid) -> Optional[GattcAttribute]:
         """
@@ -355,10 +449,77 @@ class GattcCharacteristic(gatt.Characteristic):
 
         :param uuid: The UUID to search for
         :return: THe descriptor attribute, if found
+        :raises: InvalidStateException if the database was discovered without descriptors and they have not been
+                 discovered yet, see :meth:`discover_descriptors`
         """
-        for attr in self._attributes:
-            if attr.uuid == uuid:
-                return attr
+        self._check_descriptors_discovered()
+        return _find_by_uuid(self._attributes_by_uuid, self._attributes, uuid)
+
+    """
+    Private Methods
+    """
+
+    def _discover_descriptors(self, callback, priority=gatt.OperationPriority.NORMAL):
+        """
+        Discovers the descriptors, calling the callback when done. Callers waiting on the same discovery
+        share a single request to the peer
+        """
+        with self._descriptor_discovery_lock:
+            discovered = self.descriptors_discovered
+            if not discovered:
+                self._descriptor_discovery_callbacks.append(callback)
+                start_discovery = len(self._descriptor_discovery_callbacks) == 1
+        if discovered:
+            # Completed since the caller checked
+            callback(self, DescriptorDiscoveryCompleteEventArgs(0, gatt.GattStatusCode.success,
+                                                                GattOperationCompleteReason.SUCCESS))
+        elif start_discovery:
+            self._manager.discover_descriptors(self._value_attr.handle + 1, self._undiscovered_end_handle,
+                                               self._descriptor_discovery_complete, priority)
+
+    def _check_descriptors_discovered(self):
+        if not self.descriptors_discovered:
+            raise InvalidStateException("Descriptors of characteristic {} have not been discovered yet. "
+                                        "Use discover_descriptors() first".format(self.uuid))
+
+    def _write_cccd(self, value):
+        if self._cccd_attr is None and not self.descriptors_discovered:
+            # The CCCD's handle is not known yet, write it once the descriptors are discovered
+            waitable = GenericWaitable(n_args=2)
+            self._discover_descriptors(functools.partial(self._write_cccd_after_discovery, value, waitable))
+            return waitable
+        write_id = self._cccd_attr.write_nowait(gatt.SubscriptionState.to_buffer(value))
+        return IdBasedEventWaitable(self._on_cccd_write_complete_event, write_id, self._cccd_attr.cancel)
+
+    def _write_cccd_after_discovery(self, value, waitable: GenericWaitable, sender,
+                                    event_args: DescriptorDiscoveryCompleteEventArgs):
+        if self._cccd_attr is None:
+            if event_args.status == gatt.GattStatusCode.success:
+                logger.error("Characteristic {} does not have a CCCD".format(self.uuid))
+                status, reason = gatt.GattStatusCode.attribute_not_found, GattOperationCompleteReason.FAILED
+            else:
+                status, reason = event_args.status, event_args.reason
+            waitable.notify(self, SubscriptionWriteCompleteEventArgs(event_args.id, self.cccd_state, status, reason))
+            return
+        write_id = self._cccd_attr.write_nowait(gatt.SubscriptionState.to_buffer(value))
+        IdBasedEventWaitable(self._on_cccd_write_complete_event, write_id).then(waitable.notify)
+
+    def _add_descriptors(self, nrf_descriptors):
+        attributes = list(self._attributes)
+        for nrf_desc in nrf_descriptors:
+            # Already added the handle and value attributes, skip them here
+            if nrf_desc.handle in [self._decl_attr.handle, self._value_attr.handle]:
+                continue
+
+            attr_uuid = self.ble_device.uuid_manager.nrf_uuid_to_uuid(nrf_desc.uuid)
+            attr = GattcAttribute(attr_uuid, nrf_desc.handle, self._manager)
+
+            if attr_uuid == DescriptorUuid.cccd:
+                self._cccd_attr = attr
+                attr.on_write_complete.register(self._cccd_write_complete)
+            attributes.append(attr)
+        self._attributes = tuple(sorted(attributes, key=lambda d: d.handle))
+        self._attributes_by_uuid = _index_by_uuid(self._attributes)
 
     """
     Event Handlers
@@ -387,23 +548,34 @@ class GattcCharacteristic(gatt.Characteristic):
                                                   event_args.status, event_args.reason)
         self._on_cccd_write_complete_event.notify(self, args)
 
-    def _on_indication_notification(self, driver, event):
+    def _descriptor_discovery_complete(self, sender, task):
         """
-        Handler for GattcEvtHvx. Dispatches the on_notification_event to listeners
+        Handler for the completion of the descriptor discovery queued with the read/write manager
+        """
+        with self._descriptor_discovery_lock:
+            if task.status == gatt.GattStatusCode.success:
+                self._add_descriptors(task.descriptors)
+                self._undiscovered_end_handle = None
+            callbacks = self._descriptor_discovery_callbacks
+            self._descriptor_discovery_callbacks = []
+        event_args = DescriptorDiscoveryCompleteEventArgs(task.id, task.status, task.reason)
+        for callback in callbacks:
+            callback(self, event_args)
 
-        :type event: nrf_events.GattcEvtHvx
+    def _on_indication_notification(self, event):
         """
-        if (event.conn_handle != self.peer.conn_handle or
-                event.attr_handle != self._value_attr.handle):
-            return
+        Handler for GattcEvtHvx, called by the database once the event is matched to this characteristic.
+        Dispatches the on_notification_event to listeners
 
+        :type event: nrf_events.GattcEvtHvx
+        """
         is_indication = False
         if event.hvx_type == nrf_events.BLEGattHVXType.indication:
             is_indication = True
             self.ble_device.ble_driver.ble_gattc_hv_confirm(event.conn_handle, event.attr_handle)
 
         # Update the value attribute with the data that was provided
-        self._value_attr.update(bytearray(event.data))
+        self._value_attr.update(event.data)
         self._on_notification_event.notify(self, NotificationReceivedEventArgs(self.value, is_indication))
 
     """
@@ -411,7 +583,8 @@ class GattcCharacteristic(gatt.Characteristic):
     """
 
     @classmethod
-    def from_discovered_characteristic(cls, ble_device, peer, read_write_manager, nrf_characteristic):
+    def from_discovered_characteristic(cls, ble_device, peer, read_write_manager, nrf_characteristic,
+                                       descriptors_discovered=True):
         """
         Internal factory method used to create a new characteristic from a discovered nRF Characteristic
 
@@ -420,6 +593,8 @@ class GattcCharacteristic(gatt.Characteristic):
         :type peer: blatann.peer.Peer
         :type read_write_manager: GattcOperationManager
         :type nrf_characteristic: nrf_types.BLEGattCharacteristic
+        :param descriptors_discovered: False if the characteristic's descriptors were not discovered
+                                       and should be discovered on demand
         """
         char_uuid = ble_device.uuid_manager.nrf_uuid_to_uuid(nrf_characteristic.uuid)
         properties = gatt.CharacteristicProperties.from_nrf_properties(nrf_characteristic.char_props)
@@ -429,24 +604,13 @@ class GattcCharacteristic(gatt.Characteristic):
                                    read_write_manager, nrf_characteristic.data_decl)
         value_attr = GattcAttribute(char_uuid, nrf_characteristic.handle_value,
                                     read_write_manager, nrf_characteristic.data_value)
-        cccd_attr = None
-
-        attributes = [decl_attr, value_attr]
+        end_handle = None if descriptors_discovered else nrf_characteristic.end_handle
 
-        for nrf_desc in nrf_characteristic.descs:
-            # Already added the handle and value attributes, skip them here
-            if nrf_desc.handle in [nrf_characteristic.handle_decl, nrf_characteristic.handle_value]:
-                continue
-
-            attr_uuid = ble_device.uuid_manager.nrf_uuid_to_uuid(nrf_desc.uuid)
-            attr = GattcAttribute(attr_uuid, nrf_desc.handle, read_write_manager)
-
-            if attr_uuid == DescriptorUuid.cccd:
-                cccd_attr = attr
-            attributes.append(attr)
-
-        return GattcCharacteristic(ble_device, peer, char_uuid, properties,
-                                   decl_attr, value_attr, cccd_attr, attributes)
+        char = GattcCharacteristic(ble_device, peer, char_uuid, properties, decl_attr, value_attr,
+                                   attributes=[decl_attr, value_attr], read_write_manager=read_write_manager,
+                                   end_handle=end_handle)
+        char._add_descriptors(nrf_characteristic.descs)
+        return char
 
 
 class GattcService(gatt.Service):
@@ -456,6 +620,11 @@ class GattcService(gatt.Service):
     This class is normally not instantiated directly and instead created when the database is discovered
     via :meth:`Peer.discover_services() <blatann.peer.Peer.discover_services>`
     """
+    def __init__(self, ble_device, peer, uuid, service_type,
+                 start_handle=gatt.BLE_GATT_HANDLE_INVALID, end_handle=gatt.BLE_GATT_HANDLE_INVALID):
+        super(GattcService, self).__init__(ble_device, peer, uuid, service_type, start_handle, end_handle)
+        self._characteristics_by_uuid = {}
+
     @property
     def characteristics(self) -> List[GattcCharacteristic]:
         """
@@ -471,12 +640,10 @@ class GattcService(gatt.Service):
         :param characteristic_uuid: The UUID of the characteristic to find
         :return: The characteristic if found, otherwise None
         """
-        for c in self.characteristics:
-            if c.uuid == characteristic_uuid:
-                return c
+        return _find_by_uuid(self._characteristics_by_uuid, self._characteristics, characteristic_uuid)
 
     @classmethod
-    def from_discovered_service(cls, ble_device, peer, read_write_manager, nrf_service):
+    def from_discovered_service(cls, ble_device, peer, read_write_manager, nrf_service, descriptors_discovered=True):
         """
         Internal factory method used to create a new service from a discovered nRF Service.
         Also takes care of creating and adding all characteristics within the service
@@ -486,16 +653,154 @@ class GattcService(gatt.Service):
         :type peer: blatann.peer.Peer
         :type read_write_manager: GattcOperationManager
         :type nrf_service: nrf_types.BLEGattService
+        :param descriptors_discovered: False if the descriptors of the characteristics were not discovered
         """
         service_uuid = ble_device.uuid_manager.nrf_uuid_to_uuid(nrf_service.uuid)
         service = GattcService(ble_device, peer, service_uuid, gatt.ServiceType.PRIMARY,
                                nrf_service.start_handle, nrf_service.end_handle)
         for c in nrf_service.chars:
-            char = GattcCharacteristic.from_discovered_characteristic(ble_device, peer, read_write_manager, c)
+            char = GattcCharacteristic.from_discovered_characteristic(ble_device, peer, read_write_manager, c,
+                                                                      descriptors_discovered)
             service.characteristics.append(char)
+        service._characteristics_by_uuid = _index_by_uuid(service.characteristics)
         return service
 
 
+class _BatchOperation(object):
+    """
+    Base class for a batch of operations started together which complete a single waitable once all of them finish
+    """
+    def __init__(self, database: GattcDatabase, manager: GattcOperationManager, count: int, event_args_type,
+                 priority: gatt.OperationPriority):
+        self._database = database
+        self._manager = manager
+        self._priority = priority
+        self._event_args_type = event_args_type
+        self._results = {}
+        self._remaining = count
+        self._lock = threading.Lock()
+        self.waitable = GenericWaitable(n_args=2)
+
+    def _add_result(self, handle, event_args):
+        with self._lock:
+            self._results[handle] = event_args
+            self._remaining -= 1
+            complete = self._remaining == 0
+        if complete:
+            self._complete()
+
+    def _complete(self):
+        self.waitable.notify(self._database, self._event_args_type(self._results))
+
+
+class _ReadManyOperation(_BatchOperation):
+    """
+    Reads a batch of attributes. Attributes with fixed-length values are grouped into Read Multiple requests,
+    the rest are read individually
+    """
+    _READ_OVERHEAD = 1  # Opcode of the Read Multiple request/response
+    _HANDLE_SIZE = 2
+
+    def __init__(self, database, manager, attributes: List[GattcAttribute], priority):
+        super(_ReadManyOperation, self).__init__(database, manager, len(attributes), ReadManyCompleteEventArgs, priority)
+        self._attributes = attributes
+
+    def start(self, use_read_multiple: bool, mtu_size: int):
+        if not self._attributes:
+            self._complete()
+            return
+        if use_read_multiple:
+            groups, singles = self._group(mtu_size)
+        else:
+            groups, singles = [], self._attributes
+        for group in groups:
+            handles = [attr.handle for attr, _ in group]
+            self._manager.read_multiple(handles, functools.partial(self._on_read_multiple_complete, group), self._priority)
+        for attr in singles:
+            self._read(attr)
+
+    def _group(self, mtu_size):
+        max_data_len = mtu_size - self._READ_OVERHEAD
+        groups = []
+        singles = []
+        group = []
+        group_len = 0
+
+        def flush():
+            # Read Multiple requires at least two handles
+            if len(group) > 1:
+                groups.append(list(group))
+            else:
+                singles.extend(attr for attr, _ in group)
+
+        for attr in self._attributes:
+            # A Read Multiple response is split using the lengths of the values, only fixed lengths can be trusted.
+            # Values which could have been truncated cannot be split back out of the response either
+            length = attr.fixed_length
+            if not length or length >= max_data_len:
+                singles.append(attr)
+                continue
+            request_len = self._READ_OVERHEAD + self._HANDLE_SIZE * (len(group) + 1)
+            if group and (group_len + length > max_data_len or request_len > mtu_size):
+                flush()
+                group = []
+                group_len = 0
+            group.append((attr, length))
+            group_len += length
+        flush()
+        return groups, singles
+
+    def _read(self, attr: GattcAttribute):
+        self._manager.read(attr.handle, functools.partial(self._on_read_complete, attr), self._priority)
+
+    def _on_read_complete(self, attr: GattcAttribute, sender, task):
+        self._add_result(attr.handle, attr._complete_read(task.id, task.data, task.status, task.reason))
+
+    def _on_read_multiple_complete(self, group, sender, task):
+        if task.status == gatt.GattStatusCode.unknown:
+            # Never completed with the peer (disconnected, queue cleared, etc.), no point retrying
+            for attr, _ in group:
+                self._add_result(attr.handle, attr._complete_read(task.id, b"", task.status, task.reason))
+            return
+
+        expected_len = sum(length for _, length in group)
+        if task.status == gatt.GattStatusCode.success and len(task.data) == expected_len:
+            offset = 0
+            for attr, length in group:
+                value = task.data[offset:offset + length]
+                offset += length
+                self._add_result(attr.handle, attr._complete_read(task.id, value, task.status, task.reason))
+            return
+
+        # The values weren't the fixed lengths expected or one of the attributes can't be read.
+        # Fall back to reading each individually so every attribute gets its own value and status
+        if task.status == gatt.GattStatusCode.request_not_supported:
+            self._database._read_multiple_supported = False
+        logger.debug("Read multiple of handles %s did not succeed (status: %s, %d/%d bytes), reading individually",
+                     [attr.handle for attr, _ in group], task.status, len(task.data), expected_len)
+        for attr, _ in group:
+            self._read(attr)
+
+
+class _WriteManyOperation(_BatchOperation):
+    """
+    Writes a batch of attributes, all writes are queued at once
+    """
+    def __init__(self, database, manager, writes: List[Tuple[GattcAttribute, bytes]], priority):
+        super(_WriteManyOperation, self).__init__(database, manager, len(writes), WriteManyCompleteEventArgs, priority)
+        self._writes = writes
+
+    def start(self):
+        if not self._writes:
+            self._complete()
+            return
+        for attr, data in self._writes:
+            self._manager.write(attr.handle, data, functools.partial(self._on_write_complete, attr), priority=self._priority)
+
+    def _on_write_complete(self, attr: GattcAttribute, sender, task):
+        self._add_result(attr.handle, attr._complete_write(task.id, task.data, task.status, task.reason))
+
+
 class GattcDatabase(gatt.GattDatabase):
     """
     Represents a remote GATT Database which lives on a connected peripheral. Contains all discovered services,
@@ -506,6 +811,10 @@ class GattcDatabase(gatt.GattDatabase):
         self._writer = GattcWriter(ble_device, peer)
         self._reader = GattcReader(ble_device, peer)
         self._read_write_manager = GattcOperationManager(ble_device, peer, self._reader, self._writer, write_no_resp_queue_size)
+        self._services_by_uuid = {}
+        self._characteristics_by_uuid = {}
+        self._characteristics_by_value_handle = {}
+        self._read_multiple_supported = True
 
     @property
     def services(self) -> List[GattcService]:
@@ -522,9 +831,7 @@ class GattcDatabase(gatt.GattDatabase):
         :param service_uuid: The UUID of the service to find
         :return: The service if found, otherwise None
         """
-        for s in self.services:
-            if s.uuid == service_uuid:
-                return s
+        return _find_by_uuid(self._services_by_uuid, self._services, service_uuid)
 
     def find_characteristic(self, characteristic_uuid) -> Optional[GattcCharacteristic]:
         """
@@ -536,9 +843,16 @@ class GattcDatabase(gatt.GattDatabase):
         :return: The characteristic if found, otherwise None
         :rtype: GattcCharacteristic
         """
-        for c in self.iter_characteristics():
-            if c.uuid == characteristic_uuid:
-                return c
+        return _find_by_uuid(self._characteristics_by_uuid, self.iter_characteristics(), characteristic_uuid)
+
+    def find_characteristic_by_handle(self, value_handle: int) -> Optional[GattcCharacteristic]:
+        """
+        Finds the characteristic whose value attribute has the given handle. If not found, returns None.
+
+        :param value_handle: The handle of the characteristic's value attribute
+        :return: The characteristic if found, otherwise None
+        """
+        return self._characteristics_by_value_handle.get(value_handle)
 
     def iter_characteristics(self) -> Iterable[GattcCharacteristic]:
         """
@@ -550,7 +864,73 @@ class GattcDatabase(gatt.GattDatabase):
             for c in s.characteristics:
                 yield c
 
-    def add_discovered_services(self, nrf_services):
+    def read_many(self, attributes: Iterable[Union[GattcCharacteristic, GattcAttribute]], use_read_multiple=True,
+                  priority=gatt.OperationPriority.NORMAL) -> Waitable[Tuple[GattcDatabase, ReadManyCompleteEventArgs]]:
+        """
+        Reads a batch of characteristics and/or attributes, queuing all the reads at once.
+        Returns a single waitable which completes once every read has finished, with the result of each read.
+        The on_read_complete events of the characteristics and attributes are triggered as each read completes.
+
+        Attributes with a :attr:`~blatann.gatt.gattc_attribute.GattcAttribute.fixed_length` set are read together
+        using Read Multiple requests to reduce the number of round trips with the peer.
+        A Read Multiple response is a concatenation of the values which can only be split back up using
+        lengths that are known not to change, so attributes with variable-length values are always read individually.
+        If the response is not the expected length, or the request fails, the attributes are read individually instead.
+
+        :param attributes: The characteristics and/or attributes to read. Characteristics read their value attribute
+        :param use_read_multiple: False to read every attribute individually, even those with fixed lengths
+        :param priority: The priority of the reads relative to the other queued operations with the peer
+        :return: A waitable that triggers when all of the reads finish, with the results keyed by attribute handle
+        :raises: InvalidOperationException if a characteristic is not readable
+        """
+        attrs = []
+        handles = set()
+        for item in attributes:
+            if isinstance(item, GattcCharacteristic):
+                if not item.readable:
+                    raise InvalidOperationException("Characteristic {} is not readable".format(item.uuid))
+                item = item.value_attribute
+            if item.handle not in handles:
+                handles.add(item.handle)
+                attrs.append(item)
+
+        operation = _ReadManyOperation(self, self._read_write_manager, attrs, priority)
+        operation.start(use_read_multiple and self._read_multiple_supported, self.peer.mtu_size)
+        return operation.waitable
+
+    def write_many(self, writes: Iterable[Tuple[Union[GattcCharacteristic, GattcAttribute], bytes]],
+                   priority=gatt.OperationPriority.NORMAL) -> Waitable[Tuple[GattcDatabase, WriteManyCompleteEventArgs]]:
+        """
+        Writes a batch of characteristics and/or attributes with write requests, queuing all the writes at once.
+        Returns a single waitable which completes once every write has finished, with the result of each write.
+        The on_write_complete events of the characteristics and attributes are triggered as each write completes.
+
+        :param writes: The (characteristic or attribute, data) pairs to write, e.g. ``dict.items()``.
+                       The data can be a string, bytes, or anything that can be converted to bytes
+        :param priority: The priority of the writes relative to the other queued operations with the peer
+        :return: A waitable that triggers when all of the writes finish, with the results keyed by attribute handle
+        :raises: InvalidOperationException if a characteristic is not writable
+        :raises: ValueError if an attribute is written to more than once
+        """
+        pairs = []
+        handles = set()
+        for item, data in writes:
+            if isinstance(data, str):
+                data = data.encode(item.string_encoding)
+            if isinstance(item, GattcCharacteristic):
+                if not item.writable:
+                    raise InvalidOperationException("Characteristic {} is not writable".format(item.uuid))
+                item = item.value_attribute
+            if item.handle in handles:
+                raise ValueError("Attribute handle {} is written to more than once".format(item.handle))
+            handles.add(item.handle)
+            pairs.append((item, bytes(data)))
+
+        operation = _WriteManyOperation(self, self._read_write_manager, pairs, priority)
+        operation.start()
+        return operation.waitable
+
+    def add_discovered_services(self, nrf_services, descriptors_discovered=True):
         """
         Adds the discovered NRF services from the service_discovery module.
         Used for internal purposes.
@@ -558,7 +938,37 @@ class GattcDatabase(gatt.GattDatabase):
         :meta private:
         :param nrf_services: The discovered services with all the characteristics and descriptors
         :type nrf_services: List[nrf_types.BLEGattService]
+        :param descriptors_discovered: False if the descriptors were not discovered, they are discovered on demand
+        """
+        for nrf_service in nrf_services:
+            service = GattcService.from_discovered_service(self.ble_device, self.peer, self._read_write_manager,
+                                                           nrf_service, descriptors_discovered)
+            self.services.append(service)
+            self._services_by_uuid.setdefault(service.uuid, service)
+            for c in service.characteristics:
+                self._characteristics_by_uuid.setdefault(c.uuid, c)
+                self._characteristics_by_value_handle[c.value_attribute.handle] = c
+        # Single handler for all notifications/indications on the connection, no-op if already subscribed
+        self.peer.driver_event_subscribe(self._on_indication_notification, nrf_events.GattcEvtHvx)
+
+    def clear_discovered_services(self):
+        """
+        Removes all of the discovered services from the database, used when the peer's database is rediscovered.
+        Used for internal purposes.
+
+        :meta private:
+        """
+        self._services = []
+        self._services_by_uuid = {}
+        self._characteristics_by_uuid = {}
+        self._characteristics_by_value_handle = {}
+
+    def _on_indication_notification(self, driver, event):
+        """
+        Handler for GattcEvtHvx. Dispatches the event to the characteristic which owns the attribute handle
+
+        :type event: nrf_events.GattcEvtHvx
         """
-        for service in nrf_services:
-            self.services.append(GattcService.from_discovered_service(self.ble_device, self.peer,
-                                                                      self._read_write_manager, service))
+        characteristic = self._characteristics_by_value_handle.get(event.attr_handle)
+        if characteristic:
+            characteristic._on_indication_notification(event)
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import logging
+from typing import Optional
 
-from blatann.gatt import Attribute
+from blatann.gatt import Attribute, OperationPriority
 from blatann.gatt.managers import GattcOperationManager
 from blatann.nrf import nrf_types
 from blatann.waitables.event_waitable import EventWaitable, IdBasedEventWaitable
@@ -22,6 +23,7 @@ class GattcAttribute(Attribute):
                  initial_value=b"", string_encoding="utf8"):
         super(GattcAttribute, self).__init__(uuid, handle, initial_value, string_encoding)
         self._manager = read_write_manager
+        self._fixed_length = None
 
         self._on_read_complete_event = EventSource(f"[{handle}/{uuid}] On Read Complete", logger)
         self._on_write_complete_event = EventSource(f"[{handle}/{uuid}] On Write Complete", logger)
@@ -44,21 +46,57 @@ class GattcAttribute(Attribute):
         """
         return self._on_write_complete_event
 
+    """
+    Properties
+    """
+
+    @property
+    def fixed_length(self) -> Optional[int]:
+        """
+        Gets/Sets the length of the attribute's value if it always has the same length, or None if it is unknown
+        or the value's length can vary (default).
+
+        The peer does not report this. Set it for attributes known to have fixed-length values
+        so they can be read together using Read Multiple requests, see
+        :meth:`GattcDatabase.read_many() <blatann.gatt.gattc.GattcDatabase.read_many>`.
+
+        Read Multiple responses do not include the length of each value, only the total length is checked.
+        Setting an incorrect length can result in values being split at the wrong place
+        """
+        return self._fixed_length
+
+    @fixed_length.setter
+    def fixed_length(self, value: Optional[int]):
+        if value is not None and value <= 0:
+            raise ValueError("Fixed length must be a positive number of bytes")
+        self._fixed_length = value
+
     """
     Public Methods
     """
 
-    def read(self) -> IdBasedEventWaitable[GattcAttribute, ReadCompleteEventArgs]:
+    def read(self, priority=OperationPriority.NORMAL) -> IdBasedEventWaitable[GattcAttribute, ReadCompleteEventArgs]:
         """
         Performs a read of the attribute and returns a Waitable that executes when the read finishes
         with the data read.
 
+        :param priority: The priority of the read relative to the other queued operations with the peer
         :return: A waitable that will trigger when the read finishes
         """
-        read_id = self._manager.read(self._handle, self._read_complete)
-        return IdBasedEventWaitable(self._on_read_complete_event, read_id)
+        return IdBasedEventWaitable(self._on_read_complete_event, self.read_nowait(priority), self.cancel)
+
+    def read_nowait(self, priority=OperationPriority.NORMAL) -> int:
+        """
+        Same as :meth:`read`, but does not create a waitable for the read.
+        The :attr:`on_read_complete` event is triggered with the returned ID when the read finishes
 
-    def write(self, data, with_response=True) -> IdBasedEventWaitable[GattcAttribute, WriteCompleteEventArgs]:
+        :param priority: The priority of the read relative to the other queued operations with the peer
+        :return: The ID of the read operation
+        """
+        return self._manager.read(self._handle, self._read_complete, priority)
+
+    def write(self, data, with_response=True,
+              priority=OperationPriority.NORMAL) -> IdBasedEventWaitable[GattcAttribute, WriteCompleteEventArgs]:
         """
         Initiates a write of the data provided to the attribute and returns a Waitable that executes
         when the write completes and the confirmation response is received from the other device.
@@ -67,12 +105,37 @@ class GattcAttribute(Attribute):
         :type data: str or bytes or bytearray
         :param with_response: Used internally for characteristics that support write without responses.
                               Should always be true for any other case (descriptors, etc.).
+        :param priority: The priority of the write relative to the other queued operations with the peer
         :return: A waitable that returns when the write finishes
         """
+        write_id = self.write_nowait(data, with_response, priority)
+        return IdBasedEventWaitable(self._on_write_complete_event, write_id, self.cancel)
+
+    def write_nowait(self, data, with_response=True, priority=OperationPriority.NORMAL) -> int:
+        """
+        Same as :meth:`write`, but does not create a waitable for the write.
+        The :attr:`on_write_complete` event is triggered with the returned ID when the write finishes
+
+        :param data: The data to write. Can be a string, bytes, or anything that can be converted to bytes
+        :type data: str or bytes or bytearray
+        :param with_response: Used internally for characteristics that support write without responses.
+                              Should always be true for any other case (descriptors, etc.).
+        :param priority: The priority of the write relative to the other queued operations with the peer
+        :return: The ID of the write operation
+        """
         if isinstance(data, str):
             data = data.encode(self._string_encoding)
-        write_id = self._manager.write(self._handle, bytes(data), self._write_complete, with_response)
-        return IdBasedEventWaitable(self._on_write_complete_event, write_id)
+        return self._manager.write(self._handle, bytes(data), self._write_complete, with_response, priority)
+
+    def cancel(self, operation_id: int) -> bool:
+        """
+        Cancels a read or write which is queued and has not been sent to the peer yet.
+        The read or write completes with reason ``CANCELLED``
+
+        :param operation_id: The ID of the read or write, as returned by :meth:`read_nowait` or :meth:`write_nowait`
+        :return: True if the operation was cancelled, False if it was already sent or has completed
+        """
+        return self._manager.cancel(operation_id)
 
     def update(self, value):
         """
@@ -83,15 +146,23 @@ class GattcAttribute(Attribute):
 
     def _read_complete(self, sender, event_args):
         if event_args.handle == self._handle:
-            if event_args.status == nrf_types.BLEGattStatusCode.success:
-                self._value = event_args.data
-            args = ReadCompleteEventArgs(event_args.id, self._value, event_args.status, event_args.reason)
-            self._on_read_complete_event.notify(self, args)
+            self._complete_read(event_args.id, event_args.data, event_args.status, event_args.reason)
+
+    def _complete_read(self, read_id, data, status, reason) -> ReadCompleteEventArgs:
+        if status == nrf_types.BLEGattStatusCode.success:
+            self._value = data
+        args = ReadCompleteEventArgs(read_id, self._value, status, reason)
+        self._on_read_complete_event.notify(self, args)
+        return args
 
     def _write_complete(self, sender, event_args):
-        # Success, update the local value
         if event_args.handle == self._handle:
-            if event_args.status == nrf_types.BLEGattStatusCode.success:
-                self._value = event_args.data
-            args = WriteCompleteEventArgs(event_args.id, self._value, event_args.status, event_args.reason)
-            self._on_write_complete_event.notify(self, args)
+            self._complete_write(event_args.id, event_args.data, event_args.status, event_args.reason)
+
+    def _complete_write(self, write_id, data, status, reason) -> WriteCompleteEventArgs:
+        # Success, update the local value
+        if status == nrf_types.BLEGattStatusCode.success:
+            self._value = data
+        args = WriteCompleteEventArgs(write_id, self._value, status, reason)
+        self._on_write_complete_event.notify(self, args)
+        return args
@@ -13,7 +13,7 @@ from blatann.nrf import nrf_types, nrf_events
 from blatann import gatt
 from blatann.bt_sig.uuids import DescriptorUuid
 from blatann.uuid import Uuid
-from blatann.waitables.event_queue import AsyncEventQueue, EventQueue
+from blatann.waitables.event_queue import AsyncEventQueue, EventQueue, QueueOverflowPolicy
 from blatann.waitables.event_waitable import IdBasedEventWaitable, EventWaitable
 from blatann.exceptions import InvalidOperationException, InvalidStateException
 from blatann.event_type import EventSource, Event
@@ -172,7 +172,8 @@ class GattsCharacteristic(gatt.Characteristic):
         if notify_client and self.client_subscribed and not self._value_attr.read_in_process:
             return self.notify(None)
 
-    def notify(self, data) -> IdBasedEventWaitable[GattsCharacteristic, NotificationCompleteEventArgs]:
+    def notify(self, data,
+               priority=gatt.OperationPriority.NORMAL) -> IdBasedEventWaitable[GattsCharacteristic, NotificationCompleteEventArgs]:
         """
         Notifies the client with the data provided without setting the data into the characteristic value.
         If data is not provided (None), will notify with the currently-set value of the characteristic
@@ -181,11 +182,27 @@ class GattsCharacteristic(gatt.Characteristic):
                      str, bytes, or list of uint8 values, or a BleDataStream object.
                      Length must be less than or equal to the characteristic's max length.
                      If a string is given, it will be encoded using the string_encoding property of the characteristic.
+        :param priority: The priority of the notification relative to the other queued notifications to the client
         :raises: InvalidStateException if the client is not subscribed to the characteristic
         :raises: InvalidOperationException if the characteristic is not configured for notifications/indications
         :return: An EventWaitable that will trigger when the notification is successfully sent to the client. The waitable
                  also contains the ID of the sent notification which is used in the on_notify_complete event
         """
+        notification_id = self.notify_nowait(data, priority)
+        return IdBasedEventWaitable(self._on_notify_complete, notification_id, self._notification_manager.cancel)
+
+    def notify_nowait(self, data, priority=gatt.OperationPriority.NORMAL) -> int:
+        """
+        Same as :meth:`notify`, but does not create a waitable for the notification.
+        Use this when sending a large number of notifications that don't need to be waited on individually,
+        the :attr:`on_notify_complete` event is still triggered when each notification is sent.
+
+        :param data: Optional data to notify the client with, see :meth:`notify`
+        :param priority: The priority of the notification relative to the other queued notifications to the client
+        :raises: InvalidStateException if the client is not subscribed to the characteristic
+        :raises: InvalidOperationException if the characteristic is not configured for notifications/indications
+        :return: The ID of the notification, which is used in the on_notify_complete event
+        """
         if isinstance(data, BleDataStream):
             value = data.value
         if isinstance(data, str):
@@ -196,9 +213,7 @@ class GattsCharacteristic(gatt.Characteristic):
         if not self.client_subscribed:
             raise InvalidStateException("Client is not subscribed, cannot notify client")
 
-        notification_id = self._notification_manager.notify(self, self._value_attr.handle,
-                                                            self._on_notify_complete, data)
-        return IdBasedEventWaitable(self._on_notify_complete, notification_id)
+        return self._notification_manager.notify(self, self._value_attr.handle, self._on_notify_complete, data, priority)
 
     def add_descriptor(self, uuid: Uuid, properties: GattsAttributeProperties,
                        initial_value=b"", string_encoding="utf8") -> GattsAttribute:
@@ -396,7 +411,8 @@ class GattsCharacteristic(gatt.Characteristic):
     Queues
     """
 
-    def write_queue_async(self, event_loop: asyncio.AbstractEventLoop = None) -> AsyncEventQueue[GattsCharacteristic, WriteEventArgs]:
+    def write_queue_async(self, event_loop: asyncio.AbstractEventLoop = None, max_size=0,
+                          overflow_policy=QueueOverflowPolicy.drop_oldest) -> AsyncEventQueue[GattsCharacteristic, WriteEventArgs]:
         """
         .. warning:: This API is experimental!
 
@@ -415,12 +431,16 @@ class GattsCharacteristic(gatt.Characteristic):
                 print(f"Got write event: {event_args}")
             print("Peer disconnected")
 
-        :param event_loop: Optional event loop the async queue will be consumed on
+        :param event_loop: Optional event loop the async queue will be consumed on.
+                           Defaults to the running event loop, it must be provided if not called from within the event loop
+        :param max_size: The number of writes which can be queued before the overflow policy is applied,
+                         or 0 for an unbounded queue
+        :param overflow_policy: What to do when a write is received and the queue is full
         :return: The async event queue object
         """
-        return AsyncEventQueue(self.on_write, self.peer.on_disconnect, event_loop)
+        return AsyncEventQueue(self.on_write, self.peer.on_disconnect, event_loop, max_size, overflow_policy)
 
-    def write_queue(self) -> EventQueue[GattsCharacteristic, WriteEventArgs]:
+    def write_queue(self, max_size=0, overflow_policy=QueueOverflowPolicy.drop_oldest) -> EventQueue[GattsCharacteristic, WriteEventArgs]:
         """
         .. warning:: This API is experimental!
 
@@ -439,9 +459,12 @@ class GattsCharacteristic(gatt.Characteristic):
                 print(f"Got write event: {event_args}")
             print("Peer disconnected")
 
+        :param max_size: The number of writes which can be queued before the overflow policy is applied,
+                         or 0 for an unbounded queue
+        :param overflow_policy: What to do when a write is received and the queue is full
         :return: The event queue object
         """
-        return EventQueue(self.on_write, self.peer.on_disconnect)
+        return EventQueue(self.on_write, self.peer.on_disconnect, max_size, overflow_policy)
 
     """
     Event Handling
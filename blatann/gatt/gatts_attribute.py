@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import typing
-import binascii
 import logging
 from collections import namedtuple
 
@@ -53,7 +52,8 @@ class GattsAttribute(Attribute):
         self._on_read = EventSource("Read Event", logger)
         # Subscribed events
         if properties.write:
-            self._ble_device.ble_driver.event_subscribe(self._on_gatts_write, nrf_events.GattsEvtWrite)
+            self._ble_device.ble_driver.event_subscribe(self._on_gatts_write, nrf_events.GattsEvtWrite,
+                                                        attr_handle=self._handle)
         if properties.read_auth or properties.write_auth:
             self._ble_device.ble_driver.event_subscribe(self._on_rw_auth_request,
                                                         nrf_events.GattsEvtReadWriteAuthorizeRequest)
@@ -163,9 +163,7 @@ class GattsAttribute(Attribute):
         """
         :type event: nrf_events.GattsEvtWrite
         """
-        if event.attribute_handle != self._handle:
-            return
-        self._value = bytes(bytearray(event.data))
+        self._value = bytes(event.data)
         self._on_write.notify(self, WriteEventArgs(self._value))
 
     def _on_write_auth_request(self, write_event):
@@ -251,7 +249,7 @@ class GattsAttribute(Attribute):
             new_value = bytearray()
             for chunk in self._queued_write_chunks:
                 new_value += bytearray(chunk.data)
-            logger.debug("New value: 0x{}".format(binascii.hexlify(new_value)))
+            logger.debug("New value: 0x%s", new_value.hex())
             self._ble_device.ble_driver.ble_gatts_value_set(self._peer.conn_handle, self._handle,
                                                             nrf_types.BLEGattsValue(new_value))
             self._value = bytes(new_value)
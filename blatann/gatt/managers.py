@@ -13,12 +13,16 @@ from blatann.event_args import GattOperationCompleteReason, NotificationComplete
 
 logger = logging.getLogger(__name__)
 
+# Reads and writes share their IDs so operations can be identified (and cancelled) by ID alone
+_gattc_operation_id_generator = SynchronousMonotonicCounter(1)
+
 
 class _ReadTask(object):
-    _id_generator = SynchronousMonotonicCounter(1)
+    _id_generator = _gattc_operation_id_generator
 
-    def __init__(self, handle, callback):
+    def __init__(self, handle, callback, priority=gatt.OperationPriority.NORMAL):
         self.id = _ReadTask._id_generator.next()
+        self.priority = priority
         self.handle = handle
         self.data = b""
         self.status = gatt.GattStatusCode.unknown
@@ -29,11 +33,26 @@ class _ReadTask(object):
         self.callback(sender, self)
 
 
+class _ReadMultipleTask(_ReadTask):
+    def __init__(self, handles, callback, priority=gatt.OperationPriority.NORMAL):
+        super(_ReadMultipleTask, self).__init__(handles[0], callback, priority)
+        self.handles = tuple(handles)
+        self.error_handle = 0
+
+
+class _DescriptorDiscoveryTask(_ReadTask):
+    def __init__(self, start_handle, end_handle, callback, priority=gatt.OperationPriority.NORMAL):
+        super(_DescriptorDiscoveryTask, self).__init__(start_handle, callback, priority)
+        self.end_handle = end_handle
+        self.descriptors = []
+
+
 class _WriteTask(object):
-    _id_generator = SynchronousMonotonicCounter(1)
+    _id_generator = _gattc_operation_id_generator
 
-    def __init__(self, handle, data, callback, with_response=True):
+    def __init__(self, handle, data, callback, with_response=True, priority=gatt.OperationPriority.NORMAL):
         self.id = _WriteTask._id_generator.next()
+        self.priority = priority
         self.handle = handle
         self.data = data
         self.with_response = with_response
@@ -47,7 +66,7 @@ class _WriteTask(object):
 
 class _ReadWriteManager(QueuedTasksManagerBase[Union[_ReadTask, _WriteTask]]):
     def __init__(self, reader: GattcReader, writer: GattcWriter):
-        super(_ReadWriteManager, self).__init__()
+        super(_ReadWriteManager, self).__init__(priority_levels=len(gatt.OperationPriority))
         self._reader = reader
         self._writer = writer
         self._reader.peer.on_disconnect.register(self._on_disconnect)
@@ -57,23 +76,44 @@ class _ReadWriteManager(QueuedTasksManagerBase[Union[_ReadTask, _WriteTask]]):
         self.on_write_complete = EventSource("Gattc Write Complete", logger)
         self._reader.on_read_complete.register(self._read_complete)
         self._writer.on_write_complete.register(self._write_complete)
+        self._reader.on_read_multiple_complete.register(self._read_multiple_complete)
+        self._reader.on_descriptor_discovery_complete.register(self._descriptor_discovery_complete)
         self._reader.peer.driver_event_subscribe(self._on_timeout, nrf_events.GattcEvtTimeout)
 
-    def read(self, handle, callback):
-        read_task = _ReadTask(handle, callback)
+    def read(self, handle, callback, priority=gatt.OperationPriority.NORMAL):
+        read_task = _ReadTask(handle, callback, priority)
         self._add_task(read_task)
         return read_task.id
 
-    def write(self, handle, value, callback):
-        write_task = _WriteTask(handle, value, callback, True)
+    def read_multiple(self, handles, callback, priority=gatt.OperationPriority.NORMAL):
+        read_task = _ReadMultipleTask(handles, callback, priority)
+        self._add_task(read_task)
+        return read_task.id
+
+    def discover_descriptors(self, start_handle, end_handle, callback, priority=gatt.OperationPriority.NORMAL):
+        discovery_task = _DescriptorDiscoveryTask(start_handle, end_handle, callback, priority)
+        self._add_task(discovery_task)
+        return discovery_task.id
+
+    def write(self, handle, value, callback, priority=gatt.OperationPriority.NORMAL):
+        write_task = _WriteTask(handle, value, callback, True, priority)
         self._add_task(write_task)
         return write_task.id
 
     def clear_all(self):
         self._clear_all(GattOperationCompleteReason.QUEUE_CLEARED)
 
+    def cancel(self, task_id) -> bool:
+        return self._cancel_task(task_id, GattOperationCompleteReason.CANCELLED)
+
     def _handle_task(self, task):
-        if isinstance(task, _ReadTask):
+        if isinstance(task, _DescriptorDiscoveryTask):
+            self._reader.discover_descriptors(task.handle, task.end_handle)
+            self._cur_read_task = task
+        elif isinstance(task, _ReadMultipleTask):
+            self._reader.read_multiple(task.handles)
+            self._cur_read_task = task
+        elif isinstance(task, _ReadTask):
             self._reader.read(task.handle)
             self._cur_read_task = task
         elif isinstance(task, _WriteTask):
@@ -128,6 +168,44 @@ class _ReadWriteManager(QueuedTasksManagerBase[Union[_ReadTask, _WriteTask]]):
 
         task.data = event_args.data
         task.status = event_args.status
+        task.reason = GattOperationCompleteReason.SUCCESS
+        task.notify_complete(self)
+
+    def _read_multiple_complete(self, sender, event_args):
+        """
+        Handler for GattcReader.on_read_multiple_complete
+
+        :param sender: The reader that the read completed on
+        :type sender: blatann.gatt.reader.GattcReader
+        :param event_args: The event arguments
+        :type event_args: blatann.gatt.reader.GattcReadMultipleCompleteEventArgs
+        """
+        task = self._cur_read_task
+        self._pop_task_in_process()
+        self._task_completed(task)
+
+        task.data = event_args.data
+        task.status = event_args.status
+        task.reason = GattOperationCompleteReason.SUCCESS
+        task.error_handle = event_args.error_handle
+        task.notify_complete(self)
+
+    def _descriptor_discovery_complete(self, sender, event_args):
+        """
+        Handler for GattcReader.on_descriptor_discovery_complete
+
+        :param sender: The reader that the discovery completed on
+        :type sender: blatann.gatt.reader.GattcReader
+        :param event_args: The event arguments
+        :type event_args: blatann.gatt.reader.GattcDescriptorDiscoveryCompleteEventArgs
+        """
+        task = self._cur_read_task
+        self._pop_task_in_process()
+        self._task_completed(task)
+
+        task.descriptors = event_args.descriptors
+        task.status = event_args.status
+        task.reason = GattOperationCompleteReason.SUCCESS
         task.notify_complete(self)
 
     def _write_complete(self, sender, event_args):
@@ -145,6 +223,7 @@ class _ReadWriteManager(QueuedTasksManagerBase[Union[_ReadTask, _WriteTask]]):
         self._task_completed(self._cur_write_task)
 
         task.status = event_args.status
+        task.reason = GattOperationCompleteReason.SUCCESS
         task.notify_complete(self)
 
 
@@ -156,13 +235,13 @@ class _WriteWithoutResponseManager(QueuedTasksManagerBase[_WriteTask]):
         :type ble_device: blatann.device.BleDevice
         :type peer: blatann.peer.Peer
         """
-        super(_WriteWithoutResponseManager, self).__init__(hardware_queue_size)
+        super(_WriteWithoutResponseManager, self).__init__(hardware_queue_size, len(gatt.OperationPriority))
         self.ble_device = ble_device
         self.peer = peer
 
         self.peer.driver_event_subscribe(self._on_write_tx_complete, nrf_events.GattcEvtWriteCmdTxComplete)
 
-    def write(self, handle, value, callback):
+    def write(self, handle, value, callback, priority=gatt.OperationPriority.NORMAL):
         data_len = len(value)
         if data_len == 0:
             raise ValueError("Data must be at least one byte")
@@ -171,13 +250,16 @@ class _WriteWithoutResponseManager(QueuedTasksManagerBase[_WriteTask]):
                                             f"single MTU minus the write overhead ({self._WRITE_OVERHEAD} bytes). "
                                             f"MTU: {self.peer.mtu_size}bytes, data: {data_len}bytes")
 
-        write_task = _WriteTask(handle, value, callback, False)
+        write_task = _WriteTask(handle, value, callback, False, priority)
         self._add_task(write_task)
         return write_task.id
 
     def clear_all(self):
         self._clear_all(GattOperationCompleteReason.QUEUE_CLEARED)
 
+    def cancel(self, task_id) -> bool:
+        return self._cancel_task(task_id, GattOperationCompleteReason.CANCELLED)
+
     def _handle_task(self, task: _WriteTask):
         write_operation = nrf_types.BLEGattWriteOperation.write_cmd
         flags = nrf_types.BLEGattExecWriteFlag.unused
@@ -205,6 +287,7 @@ class _WriteWithoutResponseManager(QueuedTasksManagerBase[_WriteTask]):
             task = self._pop_task_in_process()
             if task:
                 task.status = gatt.GattStatusCode.success
+                task.reason = GattOperationCompleteReason.SUCCESS
                 task.notify_complete(self)
                 self._task_completed(task)
 
@@ -214,14 +297,30 @@ class GattcOperationManager:
         self._read_write_manager = _ReadWriteManager(reader, writer)
         self._write_no_response_manager = _WriteWithoutResponseManager(ble_device, peer, write_no_response_queue_size)
 
-    def read(self, handle, callback):
-        return self._read_write_manager.read(handle, callback)
+    def read(self, handle, callback, priority=gatt.OperationPriority.NORMAL):
+        return self._read_write_manager.read(handle, callback, priority)
+
+    def read_multiple(self, handles, callback, priority=gatt.OperationPriority.NORMAL):
+        return self._read_write_manager.read_multiple(handles, callback, priority)
+
+    def discover_descriptors(self, start_handle, end_handle, callback, priority=gatt.OperationPriority.NORMAL):
+        return self._read_write_manager.discover_descriptors(start_handle, end_handle, callback, priority)
 
-    def write(self, handle, value, callback, with_response=True):
+    def write(self, handle, value, callback, with_response=True, priority=gatt.OperationPriority.NORMAL):
         if with_response:
-            return self._read_write_manager.write(handle, value, callback)
+            return self._read_write_manager.write(handle, value, callback, priority)
         else:
-            return self._write_no_response_manager.write(handle, value, callback)
+            return self._write_no_response_manager.write(handle, value, callback, priority)
+
+    def cancel(self, operation_id) -> bool:
+        """
+        Cancels a read or write which is queued and has not been sent to the peer yet.
+        The operation completes with reason ``CANCELLED``
+
+        :param operation_id: The ID of the read or write
+        :return: True if the operation was cancelled, False if it was already sent or has completed
+        """
+        return self._read_write_manager.cancel(operation_id) or self._write_no_response_manager.cancel(operation_id)
 
     def clear_all(self):
         self._read_write_manager.clear_all()
@@ -231,8 +330,9 @@ class GattcOperationManager:
 class _Notification(object):
     _id_generator = SynchronousMonotonicCounter(1)
 
-    def __init__(self, characteristic, handle, on_complete, data):
+    def __init__(self, characteristic, handle, on_complete, data, priority=gatt.OperationPriority.NORMAL):
         self.id = _Notification._id_generator.next()
+        self.priority = priority
         self.char = characteristic
         self.handle = handle
         self.on_complete = on_complete
@@ -257,7 +357,7 @@ class _NotificationManager(QueuedTasksManagerBase[_Notification]):
     """
 
     def __init__(self, ble_device, peer, hardware_queue_size=1, for_indications=False):
-        super(_NotificationManager, self).__init__(hardware_queue_size)
+        super(_NotificationManager, self).__init__(hardware_queue_size, len(gatt.OperationPriority))
         self.ble_device = ble_device
         self.peer = peer
         self._cur_notification = None
@@ -271,14 +371,17 @@ class _NotificationManager(QueuedTasksManagerBase[_Notification]):
             self.ble_device.ble_driver.event_subscribe(self._on_notify_complete, nrf_events.GattsEvtNotificationTxComplete)
             self.hvx_type = nrf_types.BLEGattHVXType.notification
 
-    def notify(self, characteristic, handle, event_on_complete, data=None):
-        notification = _Notification(characteristic, handle, event_on_complete, data)
+    def notify(self, characteristic, handle, event_on_complete, data=None, priority=gatt.OperationPriority.NORMAL):
+        notification = _Notification(characteristic, handle, event_on_complete, data, priority)
         self._add_task(notification)
         return notification.id
 
     def clear_all(self):
         self._clear_all(NotificationCompleteEventArgs.Reason.QUEUE_CLEARED)
 
+    def cancel(self, task_id) -> bool:
+        return self._cancel_task(task_id, NotificationCompleteEventArgs.Reason.CANCELLED)
+
     def _handle_task(self, notification: _Notification):
         if not notification.char.client_subscribed:
             notification.notify_complete(NotificationCompleteEventArgs.Reason.CLIENT_UNSUBSCRIBED)
@@ -329,14 +432,24 @@ class GattsOperationManager:
         self._notification_manager = _NotificationManager(ble_device, peer, notification_queue_size)
         self._indication_manager = _NotificationManager(ble_device, peer, hardware_queue_size=1, for_indications=True)
 
-    def notify(self, characteristic, handle, event_on_complete, data=None):
+    def notify(self, characteristic, handle, event_on_complete, data=None, priority=gatt.OperationPriority.NORMAL):
         if characteristic.cccd_state == gatt.SubscriptionState.INDICATION:
             manager = self._indication_manager
         elif characteristic.cccd_state == gatt.SubscriptionState.NOTIFY:
             manager = self._notification_manager
         else:
             raise InvalidStateException("Client not subscribed")
-        return manager.notify(characteristic, handle, event_on_complete, data)
+        return manager.notify(characteristic, handle, event_on_complete, data, priority)
+
+    def cancel(self, notification_id) -> bool:
+        """
+        Cancels a notification or indication which is queued and has not been sent to the client yet.
+        The notification completes with reason ``CANCELLED``
+
+        :param notification_id: The ID of the notification
+        :return: True if the notification was cancelled, False if it was already sent or has completed
+        """
+        return self._notification_manager.cancel(notification_id) or self._indication_manager.cancel(notification_id)
 
     def clear_all(self):
         self._notification_manager.clear_all()
@@ -15,6 +15,22 @@ class GattcReadCompleteEventArgs(EventArgs):
         self.data = data
 
 
+class GattcReadMultipleCompleteEventArgs(EventArgs):
+    def __init__(self, handles, status, error_handle, data):
+        self.handles = handles
+        self.status = status
+        self.error_handle = error_handle
+        self.data = data
+
+
+class GattcDescriptorDiscoveryCompleteEventArgs(EventArgs):
+    def __init__(self, start_handle, end_handle, status, descriptors):
+        self.start_handle = start_handle
+        self.end_handle = end_handle
+        self.status = status
+        self.descriptors = descriptors
+
+
 class GattcReader(object):
     """
     Class which implements the state machine for completely reading a peripheral's attribute
@@ -29,11 +45,19 @@ class GattcReader(object):
         self.ble_device = ble_device
         self.peer = peer
         self._on_read_complete_event = EventSource("On Read Complete", logger)
+        self._on_read_multiple_complete_event = EventSource("On Read Multiple Complete", logger)
+        self._on_descriptor_discovery_complete_event = EventSource("On Descriptor Discovery Complete", logger)
         self._busy = False
         self._data = bytearray()
         self._handle = 0x0000
         self._offset = 0
+        self._handles = ()
+        self._descriptor_range = None
+        self._descriptors = []
         self.peer.driver_event_subscribe(self._on_read_response, nrf_events.GattcEvtReadResponse)
+        self.peer.driver_event_subscribe(self._on_read_multiple_response, nrf_events.GattcEvtCharValuesReadResponse)
+        self.peer.driver_event_subscribe(self._on_descriptor_discovery_response,
+                                         nrf_events.GattcEvtDescriptorDiscoveryResponse)
 
     @property
     def on_read_complete(self):
@@ -47,6 +71,30 @@ class GattcReader(object):
         """
         return self._on_read_complete_event
 
+    @property
+    def on_read_multiple_complete(self):
+        """
+        Event that is emitted when a read of multiple attributes completes.
+
+        Handler args: (GattcReader, GattcReadMultipleCompleteEventArgs)
+
+        :return: an Event which can have handlers registered to and deregistered from
+        :rtype: Event
+        """
+        return self._on_read_multiple_complete_event
+
+    @property
+    def on_descriptor_discovery_complete(self):
+        """
+        Event that is emitted when the descriptors in a handle range have been discovered.
+
+        Handler args: (GattcReader, GattcDescriptorDiscoveryCompleteEventArgs)
+
+        :return: an Event which can have handlers registered to and deregistered from
+        :rtype: Event
+        """
+        return self._on_descriptor_discovery_complete_event
+
     def read(self, handle):
         """
         Reads the attribute value from the handle provided. Can only read from a single attribute at a time. If a
@@ -62,11 +110,50 @@ class GattcReader(object):
         self._handle = handle
         self._offset = 0
         self._data = bytearray()
-        logger.debug("Starting read from handle {}".format(handle))
+        logger.debug("Starting read from handle %s", handle)
         self._read_next_chunk()
         self._busy = True
         return EventWaitable(self.on_read_complete)
 
+    def read_multiple(self, handles):
+        """
+        Reads the values of multiple attributes in a single Read Multiple request.
+        The values are returned concatenated together and are truncated to fit within a single MTU, so this is only
+        useful for attributes whose value lengths are known. If a read is in progress, raises an InvalidStateException
+
+        :param handles: the attribute handles to read, at least two
+        :return: A waitable that will fire when the read finishes.
+                 See on_read_multiple_complete for the values returned from the waitable
+        :rtype: EventWaitable
+        """
+        if self._busy:
+            raise InvalidStateException("Gattc Reader is busy")
+        self._handles = tuple(handles)
+        logger.debug("Starting read multiple from handles %s", self._handles)
+        self.ble_device.ble_driver.ble_gattc_char_values_read(self.peer.conn_handle, self._handles)
+        self._busy = True
+        return EventWaitable(self.on_read_multiple_complete)
+
+    def discover_descriptors(self, start_handle, end_handle):
+        """
+        Discovers the handles and UUIDs of the attributes in the handle range, repeating the discovery request
+        until the whole range is covered. If a read is in progress, raises an InvalidStateException
+
+        :param start_handle: The first handle of the range to discover
+        :param end_handle: The last handle of the range to discover
+        :return: A waitable that will fire when the discovery finishes.
+                 See on_descriptor_discovery_complete for the values returned from the waitable
+        :rtype: EventWaitable
+        """
+        if self._busy:
+            raise InvalidStateException("Gattc Reader is busy")
+        self._descriptor_range = (start_handle, end_handle)
+        self._descriptors = []
+        logger.debug("Starting descriptor discovery of handles %s-%s", start_handle, end_handle)
+        self.ble_device.ble_driver.ble_gattc_desc_disc(self.peer.conn_handle, start_handle, end_handle)
+        self._busy = True
+        return EventWaitable(self.on_descriptor_discovery_complete)
+
     def _read_next_chunk(self):
         self.ble_device.ble_driver.ble_gattc_read(self.peer.conn_handle, self._handle, self._offset)
 
@@ -76,14 +163,14 @@ class GattcReader(object):
 
         :type event: nrf_events.GattcEvtReadResponse
         """
-        if event.conn_handle != self.peer.conn_handle or event.attr_handle != self._handle:
+        if event.attr_handle != self._handle:
             return
         if event.status != nrf_events.BLEGattStatusCode.success:
             self._complete(event.status)
             return
 
         bytes_read = len(event.data)
-        self._data += bytearray(event.data)
+        self._data += event.data
         self._offset += bytes_read
 
         if bytes_read == (self.peer.mtu_size - self._READ_OVERHEAD):
@@ -91,6 +178,47 @@ class GattcReader(object):
         else:
             self._complete()
 
+    def _on_read_multiple_response(self, driver, event):
+        """
+        Handler for GattcEvtCharValuesReadResponse
+
+        :type event: nrf_events.GattcEvtCharValuesReadResponse
+        """
+        if not self._busy or not self._handles:
+            return
+        handles = self._handles
+        self._handles = ()
+        self._busy = False
+        event_args = GattcReadMultipleCompleteEventArgs(handles, event.status, event.error_handle, bytes(event.data))
+        self._on_read_multiple_complete_event.notify(self, event_args)
+
+    def _on_descriptor_discovery_response(self, driver, event):
+        """
+        Handler for GattcEvtDescriptorDiscoveryResponse
+
+        :type event: nrf_events.GattcEvtDescriptorDiscoveryResponse
+        """
+        if not self._busy or not self._descriptor_range:
+            return
+        start_handle, end_handle = self._descriptor_range
+        if event.status == nrf_events.BLEGattStatusCode.success:
+            self._descriptors.extend(d for d in event.descriptions if start_handle <= d.handle <= end_handle)
+            last_handle = event.descriptions[-1].handle if event.descriptions else end_handle
+            if last_handle < end_handle:
+                self.ble_device.ble_driver.ble_gattc_desc_disc(self.peer.conn_handle, last_handle + 1, end_handle)
+                return
+            status = event.status
+        elif event.status == nrf_events.BLEGattStatusCode.attribute_not_found:
+            # No more attributes in the range
+            status = nrf_events.BLEGattStatusCode.success
+        else:
+            status = event.status
+
+        self._descriptor_range = None
+        self._busy = False
+        event_args = GattcDescriptorDiscoveryCompleteEventArgs(start_handle, end_handle, status, self._descriptors)
+        self._on_descriptor_discovery_complete_event.notify(self, event_args)
+
     def _complete(self, status=nrf_events.BLEGattStatusCode.success):
         self._busy = False
         event_args = GattcReadCompleteEventArgs(self._handle, status, bytes(self._data))
@@ -1,7 +1,10 @@
 import logging
+from threading import Thread
 
+from blatann.bt_sig.uuids import CharacteristicUuid
 from blatann.event_type import EventSource, Event
 from blatann.gatt import gattc
+from blatann.gatt.discovery_cache import DiscoveryCache
 from blatann.nrf import nrf_events
 from blatann.waitables.event_waitable import EventWaitable
 from blatann.event_args import EventArgs, DatabaseDiscoveryCompleteEventArgs
@@ -81,10 +84,36 @@ class _Discoverer(object):
         self.peer = peer
         self._state = _DiscoveryState()
         self._on_complete_event = EventSource("{} Complete".format(name), logger)
+        # Entries from the current discovery response whose 128-bit UUIDs still need to be read, in handle order
+        self._unresolved = []
+        self._read_bases = set()
 
     def start(self, services):
         raise NotImplementedError
 
+    def _reset_unresolved(self):
+        self._unresolved = []
+        self._read_bases = set()
+
+    def _find_unresolved(self, entries):
+        self._unresolved = [entry for entry in entries if entry.uuid.base.type == 0]
+
+    def _on_uuid_read(self, nrf_uuid):
+        """
+        Records the base of a UUID which was read and registered.
+
+        Once a UUID is read whose base was already read, the peer's UUIDs share bases and the stack
+        resolves the ones on registered bases itself, so the entries from the next unknown UUID on
+        are discovered again instead of each being read.
+        While each UUID read is on a new base, discovering again would not resolve any, so the rest are read.
+
+        :return: True if the entries from the next unknown UUID on should be discovered again
+        """
+        base = tuple(nrf_uuid.base.base)
+        shared_base = base in self._read_bases
+        self._read_bases.add(base)
+        return shared_base and bool(self._unresolved)
+
     @property
     def on_complete(self):
         """
@@ -96,17 +125,61 @@ class _Discoverer(object):
 class _ServiceDiscoverer(_Discoverer):
     def __init__(self, ble_device, peer):
         super(_ServiceDiscoverer, self).__init__("Service Discovery", ble_device, peer)
+        self._service_uuids = []
+        self._service_uuid_index = 0
 
-    def start(self, services=None):
+    def start(self, services=None, service_uuids=None):
+        """
+        :param service_uuids: Optional UUIDs of the services to discover. If not provided, all services are discovered
+        :type service_uuids: list[blatann.uuid.Uuid]
+        """
         self._state.reset()
-
-        self.ble_device.ble_driver.ble_gattc_prim_srvc_disc(self.peer.conn_handle, None,
-                                                            self._state.current_handle)
+        self._reset_unresolved()
+        self._service_uuids = list(service_uuids or [])
+        self._service_uuid_index = 0
+        for uuid in self._service_uuids:
+            # 128-bit UUIDs need to be registered to search for them
+            if uuid.nrf_uuid is None:
+                self.ble_device.uuid_manager.register_uuid(uuid)
 
         self.peer.driver_event_subscribe(self._on_primary_service_discovery, nrf_events.GattcEvtPrimaryServiceDiscoveryResponse)
         self.peer.driver_event_subscribe(self._on_service_uuid_read, nrf_events.GattcEvtReadResponse)
+        self._discover_services(self._state.current_handle)
         return EventWaitable(self.on_complete)
 
+    @property
+    def _current_service_uuid(self):
+        if not self._service_uuids:
+            return None
+        return self._service_uuids[self._service_uuid_index]
+
+    def _discover_services(self, start_handle):
+        current_uuid = self._current_service_uuid
+        nrf_uuid = current_uuid.nrf_uuid if current_uuid else None
+        self.ble_device.ble_driver.ble_gattc_prim_srvc_disc(self.peer.conn_handle, nrf_uuid, start_handle)
+
+    def _discover_services_after(self, service):
+        if service.end_handle != 0xFFFF:
+            # Continue service discovery
+            self._discover_services(service.end_handle+1)
+        else:
+            # Reached the end of the handle range
+            self._on_end_of_services()
+
+    def _on_end_of_services(self):
+        """
+        Called when the end of the handle range is reached while discovering services.
+        Moves on to the next service UUID to search for, if any, otherwise service discovery is complete
+        """
+        self._service_uuid_index += 1
+        if self._service_uuid_index < len(self._service_uuids):
+            self._discover_services(0x0001)
+            return
+        if self._service_uuids:
+            # Each UUID was searched separately, put the services back in the order they are in the database
+            self._state.services.sort(key=lambda s: s.start_handle)
+        self._on_complete()
+
     def _on_complete(self, status=nrf_events.BLEGattStatusCode.success):
         self.peer.driver_event_unsubscribe(self._on_primary_service_discovery)
         self.peer.driver_event_unsubscribe(self._on_service_uuid_read)
@@ -118,47 +191,38 @@ class _ServiceDiscoverer(_Discoverer):
         """
         if not self.peer.connected:
             logger.warning("Primary service discovery for a disconnected peer")
-        if event.conn_handle != self.peer.conn_handle:
-            return
-
         if event.status == nrf_events.BLEGattStatusCode.success:
-            # Add the services discovered and check to see if there's more
+            current_uuid = self._current_service_uuid
+            if current_uuid:
+                # Searching by UUID, the services found are the one searched for
+                for service in event.services:
+                    service.uuid = current_uuid.nrf_uuid
+            # Add the services discovered, resolve their unknown UUIDs and check to see if there's more
             self._state.services.extend(event.services)
-            end_handle = event.services[-1].end_handle
-            if end_handle != 0xFFFF:
-                # Continue service discovery
-                self.ble_device.ble_driver.ble_gattc_prim_srvc_disc(self.peer.conn_handle, None, end_handle+1)
-            else:
-                # Reached the end of the handle range, now discover their UUIDs
-                self._discover_uuids()
+            self._find_unresolved(event.services)
+            self._read_next_service_uuid()
         elif event.status == nrf_events.BLEGattStatusCode.attribute_not_found:
-            # No other attributes/services are found, continue on to discover UUIDs
-            self._discover_uuids()
+            # No other attributes/services are found
+            self._on_end_of_services()
         else:
             # Other non-successful error codes should terminate service discovery
             self._on_complete(event.status)
 
-    def _discover_uuids(self):
-        while not self._state.end_of_services:
-            service = self._state.current_service
-            if service.uuid.base.type == 0:  # Unknown base, register
-                self.ble_device.ble_driver.ble_gattc_read(self.peer.conn_handle, service.start_handle)
-                return
-            self._state.service_index += 1
-        self._on_complete()
+    def _read_next_service_uuid(self):
+        if self._unresolved:
+            # Read the service's UUID before continuing, the services after it may use the same base
+            self.ble_device.ble_driver.ble_gattc_read(self.peer.conn_handle, self._unresolved[0].start_handle)
+        else:
+            self._discover_services_after(self._state.services[-1])
 
     def _on_service_uuid_read(self, driver, event):
         """
         :type event: nrf_events.GattcEvtReadResponse
         """
-        if self.peer.conn_handle != event.conn_handle:
-            return
-
-        logger.debug(("Got gattc read: {}".format(event)))
-        service = self._state.current_service
-
-        if event.attr_handle != service.start_handle:
+        logger.debug("Got gattc read: %s", event)
+        if not self._unresolved or event.attr_handle != self._unresolved[0].start_handle:
             return
+        service = self._unresolved.pop(0)
 
         # Length should be 16 for 128-bit uuids
         if len(event.data) != 16:
@@ -167,10 +231,14 @@ class _ServiceDiscoverer(_Discoverer):
             nrf_uuid = nrf_events.BLEUUID.from_array(event.data)
             self.ble_device.uuid_manager.register_uuid(nrf_uuid)
             logger.info("Discovered UUID: {}".format(nrf_uuid))
-            self._state.current_service.uuid = nrf_uuid
+            service.uuid = nrf_uuid
+            if self._on_uuid_read(nrf_uuid):
+                # Discover the services from the next unknown UUID on again
+                services = self._state.services
+                del services[services.index(self._unresolved[0]):]
+                self._unresolved = []
 
-        self._state.service_index += 1
-        self._discover_uuids()
+        self._read_next_service_uuid()
 
 
 class _CharacteristicDiscoverer(_Discoverer):
@@ -184,12 +252,17 @@ class _CharacteristicDiscoverer(_Discoverer):
     def start(self, services):
         self._state.reset()
         self._state.services = services
+        self._reset_unresolved()
 
         self.peer.driver_event_subscribe(self._on_characteristic_discovery, nrf_events.GattcEvtCharacteristicDiscoveryResponse)
         self.peer.driver_event_subscribe(self._on_char_uuid_read, nrf_events.GattcEvtReadResponse)
 
-        self._discover_characteristics()
-        return EventWaitable(self.on_complete)
+        on_complete_waitable = EventWaitable(self.on_complete)
+        if not self._state.services:
+            self._on_complete()
+        else:
+            self._discover_characteristics()
+        return on_complete_waitable
 
     def _on_complete(self, status=nrf_events.BLEGattStatusCode.success):
         self.peer.driver_event_unsubscribe(self._on_characteristic_discovery)
@@ -206,18 +279,9 @@ class _CharacteristicDiscoverer(_Discoverer):
         """
         if not self.peer.connected:
             logger.warning("Primary service discovery for a disconnected peer")
-        if event.conn_handle != self.peer.conn_handle:
-            return
-
         if event.status == nrf_events.BLEGattStatusCode.attribute_not_found:
-            # Done discovering characteristics in this service, discover next service or unknown UUIDs
-            self._state.service_index += 1
-            self._state.char_index = 0
-            if self._state.end_of_services:
-                self._state.service_index = 0
-                self._discover_uuids()
-            else:
-                self._discover_characteristics()
+            # Done discovering characteristics in this service
+            self._discover_next_service()
             return
         elif event.status != nrf_events.BLEGattStatusCode.success:
             self._on_complete(event.status)
@@ -226,44 +290,39 @@ class _CharacteristicDiscoverer(_Discoverer):
         service = self._state.current_service
         for c in event.characteristics:
             service.char_add(c)
-        last_char = event.characteristics[-1]
+        self._find_unresolved(event.characteristics)
+        self._read_next_char_uuid()
+
+    def _read_next_char_uuid(self):
+        if self._unresolved:
+            # Read the characteristic's UUID before continuing, the characteristics after it may use the same base
+            self.ble_device.ble_driver.ble_gattc_read(self.peer.conn_handle, self._unresolved[0].handle_decl)
+        else:
+            self._discover_characteristics_after(self._state.current_service.chars[-1])
+
+    def _discover_characteristics_after(self, last_char):
+        service = self._state.current_service
         if last_char.handle_value == service.end_handle:
-            self._state.service_index += 1
-            self._state.char_index = 0
-            if self._state.end_of_services:
-                self._state.service_index = 0
-                self._discover_uuids()
-            else:
-                self._discover_characteristics()
-            return
+            self._discover_next_service()
         else:
             self.ble_device.ble_driver.ble_gattc_char_disc(self.peer.conn_handle, last_char.handle_decl + 1, service.end_handle)
 
-    def _discover_uuids(self):
-        while not self._state.end_of_services:
-            while not self._state.end_of_characteristics:
-                # Check uuid
-                char = self._state.current_characteristic
-                if char.uuid.base.type == 0:
-                    self.ble_device.ble_driver.ble_gattc_read(self.peer.conn_handle, char.handle_decl)
-                    return
-                self._state.char_index += 1
-            self._state.char_index = 0
-            self._state.service_index += 1
-        self._on_complete()
+    def _discover_next_service(self):
+        self._state.service_index += 1
+        self._state.char_index = 0
+        if self._state.end_of_services:
+            self._on_complete()
+        else:
+            self._discover_characteristics()
 
     def _on_char_uuid_read(self, driver, event):
         """
         :type event: nrf_events.GattcEvtReadResponse
         """
-        if self.peer.conn_handle != event.conn_handle:
-            return
-
-        logger.debug(("Got gattc read: {}".format(event)))
-        char = self._state.current_characteristic
-
-        if event.attr_handle != char.handle_decl:
+        logger.debug("Got gattc read: %s", event)
+        if not self._unresolved or event.attr_handle != self._unresolved[0].handle_decl:
             return
+        char = self._unresolved.pop(0)
 
         # First 3 bytes are [permissions (1 byte), value handle (2 bytes)]
         uuid_bytes = event.data[3:]
@@ -275,12 +334,14 @@ class _CharacteristicDiscoverer(_Discoverer):
             self.ble_device.uuid_manager.register_uuid(nrf_uuid)
             logger.info("Discovered UUID: {}".format(nrf_uuid))
             char.uuid = nrf_uuid
+            if self._on_uuid_read(nrf_uuid):
+                # Discover the characteristics from the next unknown UUID on again
+                service = self._state.current_service
+                del service.chars[service.chars.index(self._unresolved[0]):]
+                service.chars[-1].end_handle = service.end_handle
+                self._unresolved = []
 
-        self._state.char_index += 1
-        if self._state.end_of_characteristics:
-            self._state.service_index += 1
-            self._state.char_index = 0
-        self._discover_uuids()
+        self._read_next_char_uuid()
 
 
 class _DescriptorDiscoverer(_Discoverer):
@@ -306,9 +367,9 @@ class _DescriptorDiscoverer(_Discoverer):
         self.peer.driver_event_unsubscribe(self._on_descriptor_discovery)
         self._on_complete_event.notify(self, _DiscoveryEventArgs(self._state.services, status))
 
-    def _discover_descriptors(self):
+    def _discover_descriptors(self, service):
         starting_handle = self._state.current_handle
-        ending_handle = self._state.services[-1].end_handle
+        ending_handle = self._contiguous_end_handle(service)
         self.peer.driver_event_subscribe(self._on_descriptor_discovery, nrf_events.GattcEvtDescriptorDiscoveryResponse)
         self.ble_device.ble_driver.ble_gattc_desc_disc(self.peer.conn_handle, starting_handle, ending_handle)
 
@@ -317,11 +378,25 @@ class _DescriptorDiscoverer(_Discoverer):
             missing_handles = characteristic.missing_handles()
             if missing_handles:
                 self._state.current_handle = missing_handles[0]
-                self._discover_descriptors()
+                self._discover_descriptors(service)
                 return
         logger.info("No more handles left to discover!")
         self._on_complete()
 
+    def _contiguous_end_handle(self, service):
+        """
+        Gets the end handle of the run of services with no gaps between them starting at the given service.
+        Only some of the services are discovered when discovering by UUID, descriptors are not searched for
+        in the handles of services which weren't discovered
+        """
+        services = self._state.services
+        end_handle = service.end_handle
+        for next_service in services[services.index(service)+1:]:
+            if next_service.start_handle != end_handle + 1:
+                break
+            end_handle = next_service.end_handle
+        return end_handle
+
     def _find_descriptor_owner(self, desc):
         if self._state.end_of_services:
             return
@@ -349,9 +424,6 @@ class _DescriptorDiscoverer(_Discoverer):
         """
         if not self.peer.connected:
             logger.warning("Primary service discovery for a disconnected peer")
-        if event.conn_handle != self.peer.conn_handle:
-            return
-
         if event.status == nrf_events.BLEGattStatusCode.attribute_not_found:
             self._on_complete()
             return
@@ -372,6 +444,7 @@ class _DescriptorDiscoverer(_Discoverer):
 
         if last_handle >= self._state.services[-1].end_handle:
             self._on_complete()
+            return
 
         self._discover_next_handle_range()
 
@@ -390,6 +463,14 @@ class DatabaseDiscoverer(object):
         self._service_discoverer = _ServiceDiscoverer(ble_device, peer)
         self._characteristic_discoverer = _CharacteristicDiscoverer(ble_device, peer)
         self._descriptor_discoverer = _DescriptorDiscoverer(ble_device, peer)
+        # Subscribe to the discoverers up front, a stage may complete synchronously when there is nothing to discover
+        self._service_discoverer.on_complete.register(self._on_service_discovery_complete)
+        self._characteristic_discoverer.on_complete.register(self._on_characteristic_discovery_complete)
+        self._descriptor_discoverer.on_complete.register(self._on_descriptor_discovery_complete)
+        self._use_cache = False
+        self._service_uuids = None
+        self._discover_descriptors = True
+        self._pending_cache = None
 
     @property
     def on_discovery_complete(self):
@@ -408,7 +489,7 @@ class DatabaseDiscoverer(object):
             logger.error("Error discovering services: {}".format(event_args.status))
             self._on_complete([], event_args.status)
         else:
-            self._characteristic_discoverer.start(event_args.services).then(self._on_characteristic_discovery_complete)
+            self._characteristic_discoverer.start(event_args.services)
 
     def _on_characteristic_discovery_complete(self, sender, event_args):
         """
@@ -419,8 +500,11 @@ class DatabaseDiscoverer(object):
         if event_args.status != nrf_events.BLEGattStatusCode.success:
             logger.error("Error discovering characteristics: {}".format(event_args.status))
             self._on_complete([], event_args.status)
+        elif not self._discover_descriptors:
+            # Descriptors are discovered on demand by the characteristics
+            self._on_complete(event_args.services, event_args.status)
         else:
-            self._descriptor_discoverer.start(event_args.services).then(self._on_descriptor_discovery_complete)
+            self._descriptor_discoverer.start(event_args.services)
 
     def _on_descriptor_discovery_complete(self, sender, event_args):
         """
@@ -431,10 +515,149 @@ class DatabaseDiscoverer(object):
         self._on_complete(event_args.services, event_args.status)
 
     def _on_complete(self, services, status):
-        self.peer.database.add_discovered_services(services)
+        self.peer.database.add_discovered_services(services, self._discover_descriptors)
+        # Only cache the full database, not the subset of services discovered by UUID or without descriptors
+        if (self._use_cache and not self._service_uuids and self._discover_descriptors
+                and status == nrf_events.BLEGattStatusCode.success):
+            # Queue up the operations needed for the cache ahead of any the user starts once discovery completes
+            self._subscribe_to_service_changed()
+            self._pending_cache = DiscoveryCache.from_services(self.ble_device.uuid_manager, services)
+            hash_char = self.peer.database.find_characteristic(CharacteristicUuid.database_hash)
+            if hash_char and hash_char.readable:
+                hash_char.read().then(self._on_database_hash_read_for_cache)
+            else:
+                self._save_cache()
         self._on_discovery_complete.notify(self.peer, DatabaseDiscoveryCompleteEventArgs(status))
         logger.info("Database Discovery complete")
 
-    def start(self):
+    def _restore_from_cache(self):
+        """
+        Restores the database from the discovery cache in the peer's bond entry, if there is one
+
+        :return: True if the database is being restored from the cache, False if it needs to be discovered
+        """
+        bond_entry = self.peer.security.bond_db_entry
+        cache = bond_entry.gatt_cache if bond_entry else None
+        if not cache:
+            return False
+        try:
+            services = cache.to_services(self.ble_device.uuid_manager)
+        except Exception:
+            logger.exception("Failed to restore the database from the discovery cache, discarding it")
+            self._invalidate_cache()
+            return False
+
+        logger.info("Restoring database from the discovery cache")
+        self.peer.database.add_discovered_services(services)
+        hash_char = self.peer.database.find_characteristic(CharacteristicUuid.database_hash)
+        if cache.database_hash is not None and hash_char and hash_char.readable:
+            # Confirm the database hasn't changed since it was cached before using it
+            hash_char.read().then(self._on_database_hash_read_for_restore)
+        else:
+            self._on_restored_from_cache()
+        return True
+
+    def _on_restored_from_cache(self):
+        self._subscribe_to_service_changed()
+        self._on_discovery_complete.notify(self.peer,
+                                           DatabaseDiscoveryCompleteEventArgs(nrf_events.BLEGattStatusCode.success,
+                                                                              from_cache=True))
+        logger.info("Database restored from the discovery cache")
+
+    def _on_database_hash_read_for_restore(self, characteristic, event_args):
+        """
+        :type characteristic: gattc.GattcCharacteristic
+        :type event_args: blatann.event_args.ReadCompleteEventArgs
+        """
+        if not self.peer.connected:
+            return
+        bond_entry = self.peer.security.bond_db_entry
+        cache = bond_entry.gatt_cache if bond_entry else None
+        if (event_args.status == nrf_events.BLEGattStatusCode.success and cache
+                and bytes(event_args.value) == cache.database_hash):
+            self._on_restored_from_cache()
+            return
+        logger.info("Peer's database hash does not match the discovery cache, rediscovering")
+        self._invalidate_cache()
+        self.peer.database.clear_discovered_services()
+        self._service_discoverer.start(service_uuids=self._service_uuids)
+
+    def _on_database_hash_read_for_cache(self, characteristic, event_args):
+        """
+        :type characteristic: gattc.GattcCharacteristic
+        :type event_args: blatann.event_args.ReadCompleteEventArgs
+        """
+        if not self._pending_cache or not self.peer.connected:
+            return
+        if event_args.status != nrf_events.BLEGattStatusCode.success:
+            # Without the hash there's no way to know if the database changed while disconnected
+            logger.warning("Failed to read the peer's database hash ({}), not caching the database"
+                           .format(event_args.status))
+            self._pending_cache = None
+            return
+        self._pending_cache.database_hash = bytes(event_args.value)
+        self._save_cache()
+
+    def _save_cache(self):
+        bond_entry = self.peer.security.bond_db_entry
+        if not bond_entry:
+            # Not bonded (yet), try again once the peer disconnects in case it bonds during the connection
+            self.peer.on_disconnect.register(self._on_disconnect)
+            return
+        bond_entry.gatt_cache = self._pending_cache
+        self._pending_cache = None
+        self._save_bond_db()
+        logger.info("Stored the database in the discovery cache")
+
+    def _invalidate_cache(self):
+        self._pending_cache = None
+        bond_entry = self.peer.security.bond_db_entry
+        if bond_entry and bond_entry.gatt_cache:
+            bond_entry.gatt_cache = None
+            self._save_bond_db()
+            logger.info("Discovery cache invalidated")
+
+    def _save_bond_db(self):
+        # Writing the file can take a while, keep it off of the driver's event thread
+        thread = Thread(target=self.ble_device.bond_db_loader.save, args=(self.ble_device.bond_db,),
+                        name="{}_BondDbSave".format(self.ble_device.ble_driver.serial_port))
+        thread.start()
+
+    def _on_disconnect(self, peer, event_args):
+        self.peer.on_disconnect.deregister(self._on_disconnect)
+        if self._pending_cache and self.peer.security.bond_db_entry:
+            self._save_cache()
+        self._pending_cache = None
+
+    def _subscribe_to_service_changed(self):
+        service_changed_char = self.peer.database.find_characteristic(CharacteristicUuid.service_changed)
+        if service_changed_char and service_changed_char.subscribable_indications:
+            service_changed_char.subscribe(self._on_service_changed, prefer_indications=True)
+
+    def _on_service_changed(self, characteristic, event_args):
+        """
+        :type characteristic: gattc.GattcCharacteristic
+        :type event_args: blatann.event_args.NotificationReceivedEventArgs
+        """
+        logger.info("Received Service Changed indication from the peer, rediscovering the database")
+        self._invalidate_cache()
+        self.peer.database.clear_discovered_services()
+        self._service_discoverer.start(service_uuids=self._service_uuids)
+
+    def start(self, use_cache=False, service_uuids=None, discover_descriptors=True):
+        """
+        Starts discovering the peer's database
+
+        :param use_cache: True to restore the database from the discovery cache if the peer is bonded and was
+                          discovered before, and to store the discovered database in the cache for the next connection
+        :param service_uuids: Optional UUIDs of the services to discover. If not provided, all services are discovered
+        :param discover_descriptors: False to complete once the characteristics are discovered,
+                                     leaving the characteristics to discover their descriptors on demand
+        """
+        self._use_cache = use_cache
+        self._service_uuids = list(service_uuids) if service_uuids else None
+        self._discover_descriptors = discover_descriptors
+        if use_cache and self._restore_from_cache():
+            return
         logger.info("Starting discovery..")
-        self._service_discoverer.start().then(self._on_service_discovery_complete)
+        self._service_discoverer.start(service_uuids=self._service_uuids)
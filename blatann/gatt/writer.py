@@ -67,7 +67,7 @@ class GattcWriter(object):
         self._offset = 0
         self._handle = handle
         self._data = data
-        logger.debug("Starting write to handle {}, len: {}".format(self._handle, len(self._data)))
+        logger.debug("Starting write to handle %s, len: %s", self._handle, len(self._data))
         try:
             self._busy = True
             self._write_next_chunk()
@@ -93,13 +93,11 @@ class GattcWriter(object):
         data_to_write = self._data[self._offset:self._offset+self._len_bytes_written]
         write_params = nrf_types.BLEGattcWriteParams(write_operation, flags,
                                                      self._handle, data_to_write, self._offset)
-        logger.debug("Writing chunk: handle: {}, offset: {}, len: {}, op: {}".format(self._handle, self._offset,
-                                                                                     len(data_to_write), write_operation))
+        logger.debug("Writing chunk: handle: %s, offset: %s, len: %s, op: %s", self._handle, self._offset,
+                     len(data_to_write), write_operation)
         self.ble_device.ble_driver.ble_gattc_write(self.peer.conn_handle, write_params)
 
     def _on_write_response(self, driver, event: nrf_events.GattcEvtWriteResponse):
-        if event.conn_handle != self.peer.conn_handle:
-            return
         if event.attr_handle != self._handle and event.write_op != nrf_types.BLEGattWriteOperation.execute_write_req:
             return
         if event.status != nrf_events.BLEGattStatusCode.success:
@@ -1 +1,11 @@
-import pc_ble_driver_py.lib.nrf_ble_driver_sd_api_v5 as driver
+import os
+
+if os.environ.get("BLATANN_DRIVER", "").lower() == "sim":
+    # Simulated connectivity boards, no hardware or native driver required
+    from blatann.nrf import nrf_sim as driver
+    from blatann.nrf.nrf_sim import NordicSemiException
+else:
+    from pc_ble_driver_py import config
+    config.__conn_ic_id__ = "NRF52"
+    import pc_ble_driver_py.lib.nrf_ble_driver_sd_api_v5 as driver
+    from pc_ble_driver_py.exceptions import NordicSemiException
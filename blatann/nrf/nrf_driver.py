@@ -37,15 +37,21 @@
 
 import atexit
 import functools
+import itertools
+import operator
+import time
 import wrapt
-import queue
 import traceback
+import weakref
 from threading import Thread, Lock, Event
 
 from blatann.nrf.nrf_events import *
 from blatann.nrf.nrf_types import *
 from blatann.nrf.nrf_dll_load import driver
-from pc_ble_driver_py.exceptions import NordicSemiException
+from blatann.nrf.nrf_dll_load import NordicSemiException
+from blatann.nrf.nrf_event_queue import DriverEventQueue, OverflowPolicy
+from blatann.nrf.nrf_driver_metrics import DriverMetrics, handler_name
+from blatann.nrf.nrf_driver_watchdog import HandlerWatchdog
 import blatann.nrf.nrf_driver_types as util
 from blatann.nrf.nrf_types.config import BleEnableConfig, BleConnConfig
 
@@ -53,6 +59,9 @@ logger = logging.getLogger(__name__)
 
 NoneType = type(None)
 
+# Sort key for the (subscription sequence number, handler) entries in the dispatch table
+_subscription_order = operator.itemgetter(0)
+
 
 # TODO: Do we really want to raise exceptions all the time?
 def NordicSemiErrorCheck(wrapped=None, expected=driver.NRF_SUCCESS):
@@ -62,7 +71,14 @@ def NordicSemiErrorCheck(wrapped=None, expected=driver.NRF_SUCCESS):
     @wrapt.decorator
     def wrapper(wrapped, instance, args, kwargs):
         logger.debug("[%s] %s%s", instance.serial_port, wrapped.__name__, args)
-        result = wrapped(*args, **kwargs)
+        metrics = instance.metrics
+        if metrics.enabled:
+            start = time.perf_counter()
+            result = wrapped(*args, **kwargs)
+            latency = time.perf_counter() - start
+        else:
+            result = wrapped(*args, **kwargs)
+            latency = None
         if isinstance(result, (list, tuple)):
             err_code = result[0]
             result = result[1:]
@@ -74,10 +90,16 @@ def NordicSemiErrorCheck(wrapped=None, expected=driver.NRF_SUCCESS):
 
         if err_code != expected:
             try:
+                err_name = NrfError(err_code).name
                 err_string = 'Error code: {}'.format(NrfError(err_code))
             except ValueError:
+                err_name = '0x{:04x}'.format(err_code)
                 err_string = 'Error code: 0x{:04x}, {}'.format(err_code, err_code)
+            if latency is not None:
+                metrics.record_call(wrapped.__name__, latency, err_name)
             raise NordicSemiException('Failed to {}. {}'.format(wrapped.__name__, err_string), err_code)
+        if latency is not None:
+            metrics.record_call(wrapped.__name__, latency)
         return result
 
     return wrapper(wrapped)
@@ -87,23 +109,62 @@ class NrfDriverObserver(object):
     def on_driver_event(self, nrf_driver, event):
         pass
 
+    def observes_event(self, event_type):
+        """
+        Checks if the observer wants to be notified about events of the given type.
+        Events which no observers or handlers want are not decoded.
+
+        The result is cached per event type until the driver's observers change.
+        Observers whose filter changes afterwards must call NrfDriver.observer_filter_changed(),
+        or override observer_filter_key() if it changes on its own
+
+        :param event_type: The BLEEvent subclass of the received event
+        :return: True to receive the event through on_driver_event
+        """
+        return True
+
+    def observer_filter_key(self):
+        """
+        Gets a value which changes whenever the results of observes_event() change on their own,
+        e.g. the level of a logger the observer checks. The driver compares it on each event
+        and checks observes_event() again when it changes
+
+        :return: A hashable value, or None if the results only change through NrfDriver.observer_filter_changed()
+        """
+        return None
+
 
 class NrfDriver(object):
     default_baud_rate = 1000000
     ATT_MTU_DEFAULT = driver.BLE_GATT_ATT_MTU_DEFAULT
 
-    def __init__(self, serial_port, baud_rate=None, log_driver_comms=False):
+    def __init__(self, serial_port, baud_rate=None, log_driver_comms=False,
+                 event_queue_size=DriverEventQueue.DEFAULT_MAX_SIZE,
+                 event_queue_overflow_policy=OverflowPolicy.drop_adv_reports):
         if baud_rate is None:
             baud_rate = self.default_baud_rate
 
-        self._events = queue.Queue()
+        self._events = DriverEventQueue(event_queue_size, event_queue_overflow_policy)
+        self.metrics = DriverMetrics()
+        self.handler_watchdog = HandlerWatchdog(serial_port)
+        # Keyed weakly by the handler's function (rather than the bound method) so it doesn't keep peers alive
+        self._handler_names = weakref.WeakKeyDictionary()
         self._event_thread = None
         self._event_loop = False
         self._event_stopped = Event()
         self.observers = []
         self.ble_enable_params = None
+        # (event type, conn handle, attr handle) -> {handler: subscription sequence number}.
+        # The sequence numbers keep handlers called in the order they subscribed, whether routed or not
         self._event_observers = {}
+        self._subscription_sequence = itertools.count()
         self._event_observer_lock = Lock()
+        # Snapshot read by the event thread. Replaced (never mutated in place) whenever a subscription
+        # or observer changes so dispatching an event doesn't need to copy or lock anything
+        self._dispatch_table = {}
+        # Observers which override observer_filter_key(), and the keys the dispatch table was built with
+        self._keyed_observers = ()
+        self._observer_filter_keys = ()
         self._log_driver_comms = log_driver_comms
         self._serial_port = serial_port
 
@@ -119,6 +180,13 @@ class NrfDriver(object):
     def serial_port(self):
         return self._serial_port
 
+    @property
+    def event_queue(self) -> DriverEventQueue:
+        """
+        The queue buffering events between the driver and the event thread, exposes the queue depth/drop counters
+        """
+        return self._events
+
     @NordicSemiErrorCheck
     @wrapt.synchronized
     def open(self):
@@ -126,6 +194,7 @@ class NrfDriver(object):
             logger.warning("Trying to open already opened driver")
             return driver.NRF_SUCCESS
 
+        self._events.open()
         err_code = driver.sd_rpc_open(self.rpc_adapter,
                                       self._status_handler,
                                       self.ble_evt_handler,
@@ -141,12 +210,15 @@ class NrfDriver(object):
             atexit.register(self._event_thread_join)
             self._event_thread.daemon = True
             self._event_thread.start()
+            self.handler_watchdog.start()
         return err_code
 
     def _event_thread_join(self):
         if self._event_thread is None:
             return
         self._event_loop = False
+        self._events.close()
+        self.handler_watchdog.stop()
         self._event_stopped.wait(1)
         self._event_thread = None
 
@@ -165,45 +237,140 @@ class NrfDriver(object):
         self._event_thread_join()
         return retval
 
-    def event_subscribe(self, handler, *event_types):
+    def event_subscribe(self, handler, *event_types, conn_handle=None, attr_handle=None):
+        """
+        Subscribes a handler to the given event types.
+
+        By default the handler receives every event of the types provided. Providing a connection and/or attribute
+        handle routes only the events directed at that connection/attribute to the handler,
+        which is much cheaper than having each handler inspect and discard events not meant for it.
+
+        Handlers are called in the order they subscribed, whether or not they are routed.
+
+        :param handler: The handler to subscribe, called with (driver, event)
+        :param event_types: The BLEEvent types to subscribe to
+        :param conn_handle: Optional connection handle to filter events on
+        :param attr_handle: Optional attribute handle to filter events on
+        """
         for event_type in event_types:
             if not issubclass(event_type, BLEEvent):
                 raise ValueError("Event type must be a valid BLEEvent class type. Got {}".format(event_type))
         with self._event_observer_lock:
             for event_type in event_types:
-                # If event type not already in dict, create an empty list
-                if event_type not in self._event_observers.keys():
-                    self._event_observers[event_type] = []
-                handlers = self._event_observers[event_type]
+                key = (event_type, conn_handle, attr_handle)
+                # If event type not already in dict, create an empty dict
+                if key not in self._event_observers.keys():
+                    self._event_observers[key] = {}
+                handlers = self._event_observers[key]
                 if handler not in handlers:
-                    handlers.append(handler)
+                    handlers[handler] = next(self._subscription_sequence)
+            self._invalidate_dispatch_table()
 
-    def event_unsubscribe(self, handler, *event_types):
+    def event_unsubscribe(self, handler, *event_types, conn_handle=None, attr_handle=None):
         if not event_types:
             self.event_unsubscribe_all(handler)
             return
 
         with self._event_observer_lock:
             for event_type in event_types:
-                handlers = self._event_observers.get(event_type, [])
-                if handler in handlers:
-                    handlers.remove(handler)
+                handlers = self._event_observers.get((event_type, conn_handle, attr_handle), {})
+                handlers.pop(handler, None)
+            self._invalidate_dispatch_table()
 
     def event_unsubscribe_all(self, handler):
         with self._event_observer_lock:
-            for event_type, handlers in self._event_observers.items():
-                if handler in handlers:
-                    handlers.remove(handler)
+            for key, handlers in self._event_observers.items():
+                handlers.pop(handler, None)
+            self._invalidate_dispatch_table()
 
     def observer_register(self, observer):
         with self._event_observer_lock:
             if observer not in self.observers:
                 self.observers.append(observer)
+                self._update_keyed_observers()
 
     def observer_unregister(self, observer):
         with self._event_observer_lock:
             if observer in self.observers:
                 self.observers.remove(observer)
+                self._update_keyed_observers()
+
+    def observer_filter_changed(self):
+        """
+        Notifies the driver that an observer's observes_event() results changed,
+        so the cached per-event observer lists are rebuilt
+        """
+        with self._event_observer_lock:
+            self._invalidate_dispatch_table()
+
+    def _update_keyed_observers(self):
+        # Must be called with the observer lock held
+        default_key = NrfDriverObserver.observer_filter_key
+        self._keyed_observers = tuple(obs for obs in self.observers
+                                      if getattr(type(obs), "observer_filter_key", default_key) is not default_key)
+        self._observer_filter_keys = tuple(obs.observer_filter_key() for obs in self._keyed_observers)
+        self._invalidate_dispatch_table()
+
+    def _check_observer_filter_keys(self):
+        keys = tuple(obs.observer_filter_key() for obs in self._keyed_observers)
+        if keys != self._observer_filter_keys:
+            with self._event_observer_lock:
+                self._observer_filter_keys = tuple(obs.observer_filter_key() for obs in self._keyed_observers)
+                self._invalidate_dispatch_table()
+
+    def _invalidate_dispatch_table(self):
+        # Must be called with the observer lock held.
+        # The table is swapped out rather than cleared so the event thread never sees a partially-built entry
+        self._dispatch_table = {}
+
+    def _get_event_handlers(self, event_class):
+        """
+        Gets the handlers and observers to invoke for an event of the given concrete type.
+
+        The handlers subscribed to the class and any of its base classes, along with the observers
+        which observe the class, are resolved once per concrete event class and cached until the next
+        subscription or observer change, so dispatch cost does not grow with the number of subscribed event types.
+
+        :param event_class: The concrete class of the event being dispatched
+        :return: tuple of the unfiltered handlers,
+                 a dict of (conn_handle, attr_handle) -> tuple of routed handlers,
+                 and a tuple of the observers which observe the event.
+                 Handlers are (subscription sequence number, handler) tuples in subscription order
+        """
+        dispatch_table = self._dispatch_table
+        entry = dispatch_table.get(event_class)
+        if entry is not None:
+            return entry
+
+        with self._event_observer_lock:
+            handlers = []
+            routes = {}
+            for (event_type, conn_handle, attr_handle), event_type_handlers in self._event_observers.items():
+                if not event_type_handlers or not issubclass(event_class, event_type):
+                    continue
+                entries = [(sequence, handler) for handler, sequence in event_type_handlers.items()]
+                if conn_handle is None and attr_handle is None:
+                    handlers.extend(entries)
+                else:
+                    route = (conn_handle, attr_handle)
+                    routes[route] = tuple(sorted(routes.get(route, ()) + tuple(entries), key=_subscription_order))
+            handlers.sort(key=_subscription_order)
+            observers = tuple(obs for obs in self.observers if obs.observes_event(event_class))
+            entry = tuple(handlers), routes, observers
+            self._dispatch_table[event_class] = entry
+        return entry
+
+    @staticmethod
+    def _get_routed_handlers(routes, event):
+        conn_handle = getattr(event, "conn_handle", None)
+        attr_handle = getattr(event, "attr_handle", None)
+        if attr_handle is None:
+            attr_handle = getattr(event, "attribute_handle", None)
+
+        handlers = routes.get((conn_handle, None), ())
+        if attr_handle is not None:
+            handlers += routes.get((conn_handle, attr_handle), ()) + routes.get((None, attr_handle), ())
+        return handlers
 
     def ble_enable_params_setup(self):
         return BleEnableConfig()
@@ -673,6 +840,13 @@ class NrfDriver(object):
     def ble_gattc_read(self, conn_handle, read_handle, offset=0):
         return driver.sd_ble_gattc_read(self.rpc_adapter, conn_handle, read_handle, offset)
 
+    @NordicSemiErrorCheck
+    @wrapt.synchronized
+    def ble_gattc_char_values_read(self, conn_handle, read_handles):
+        handle_array = util.list_to_uint16_array(read_handles)
+        return driver.sd_ble_gattc_char_values_read(self.rpc_adapter, conn_handle, handle_array.cast(),
+                                                    len(read_handles))
+
     @NordicSemiErrorCheck
     @wrapt.synchronized
     def ble_gattc_exchange_mtu_req(self, conn_handle, att_mtu_size):
@@ -702,44 +876,86 @@ class NrfDriver(object):
     """
 
     def ble_evt_handler(self, adapter, ble_event):
-        self._events.put(ble_event)
+        # Only timestamp events when the dwell time will be recorded
+        enqueue_time = time.perf_counter() if self.metrics.enabled else None
+        self._events.put(ble_event, enqueue_time)
 
     def _event_handler(self):
         self._event_loop = True
         self._event_stopped.clear()
         while self._event_loop:
-            try:
-                ble_event = self._events.get(timeout=0.1)
-            except queue.Empty:
-                continue
+            # Process everything that queued up since the last wakeup in one go
+            for enqueue_time, ble_event in self._events.get_all(timeout=0.1):
+                self._dispatch_event(ble_event, enqueue_time)
 
-            if len(self.observers) == 0:
-                continue
+        self._event_stopped.set()
 
-            event = event_decode(ble_event)
-            if event is None:
-                logger.warning('unknown ble_event %r (discarded)', ble_event.header.evt_id)
-                continue
+    def _dispatch_event(self, ble_event, enqueue_time):
+        if len(self.observers) == 0:
+            return
 
-            # Get a copy of the observers and event observers in case its modified during this execution
-            with self._event_observer_lock:
-                observers = self.observers[:]
-                event_handlers = {k: v[:] for k, v in self._event_observers.items()}
-
-            # Call all the observers
-            for obs in observers:
-                try:
-                    obs.on_driver_event(self, event)
-                except:
-                    traceback.print_exc()
-
-            # Call all the handlers for the event type provided
-            for event_type, handlers in event_handlers.items():
-                if issubclass(type(event), event_type):
-                    for handler in handlers:
-                        try:
-                            handler(self, event)
-                        except:
-                            traceback.print_exc()
+        event_cls = event_class_for_id(ble_event.header.evt_id)
+        if event_cls is None:
+            logger.warning('unknown ble_event %r (discarded)', ble_event.header.evt_id)
+            return
 
-        self._event_stopped.set()
+        if self.metrics.enabled:
+            dwell_time = None if enqueue_time is None else time.perf_counter() - enqueue_time
+            self.metrics.record_event(event_cls.__name__, dwell_time)
+
+        if self._keyed_observers:
+            self._check_observer_filter_keys()
+        handlers, routes, observers = self._get_event_handlers(event_cls)
+        # Nobody is interested in the event, don't bother decoding it
+        if not handlers and not routes and not observers:
+            return
+
+        event = event_cls.from_c(ble_event)
+
+        # Call all the observers
+        for obs in observers:
+            self._call_handler(obs.on_driver_event, event)
+
+        # Call all the handlers for the event type provided
+        if routes:
+            routed_handlers = self._get_routed_handlers(routes, event)
+            if routed_handlers:
+                handlers = sorted(handlers + routed_handlers, key=_subscription_order)
+        for _, handler in handlers:
+            self._call_handler(handler, event)
+
+    def _call_handler(self, handler, event):
+        metrics_enabled = self.metrics.enabled
+        watchdog = self.handler_watchdog if self.handler_watchdog.enabled else None
+        if not metrics_enabled and watchdog is None:
+            try:
+                handler(self, event)
+            except:
+                traceback.print_exc()
+            return
+
+        start = time.perf_counter()
+        if watchdog:
+            watchdog.handler_started(handler, event, start)
+        try:
+            handler(self, event)
+        except:
+            traceback.print_exc()
+        duration = time.perf_counter() - start
+        if watchdog:
+            watchdog.handler_finished(duration)
+        if not metrics_enabled:
+            return
+
+        self.metrics.record_handler(self._get_handler_name(handler), duration)
+
+    def _get_handler_name(self, handler):
+        key = getattr(handler, "__func__", handler)
+        try:
+            name = self._handler_names.get(key)
+            if name is None:
+                name = self._handler_names[key] = handler_name(handler)
+        except TypeError:
+            # Not weak-referenceable, don't cache it
+            name = handler_name(handler)
+        return name
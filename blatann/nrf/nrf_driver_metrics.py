@@ -0,0 +1,197 @@
+import collections
+import threading
+import time
+import typing
+
+from blatann.utils import repr_format
+
+
+class LatencyStats(object):
+    """
+    Summary of a set of timing samples. All times are in seconds.
+
+    The percentiles are computed over the most recent samples only (see :attr:`DriverMetrics.sample_window`),
+    the count, total, min and max cover every sample since the metrics were last reset
+    """
+    def __init__(self, count=0, total=0.0, minimum=0.0, maximum=0.0, p50=0.0, p99=0.0):
+        self.count = count
+        self.total = total
+        self.min = minimum
+        self.max = maximum
+        self.p50 = p50
+        self.p99 = p99
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def __repr__(self):
+        return repr_format(self, count=self.count, mean=self.mean, p50=self.p50, p99=self.p99, max=self.max)
+
+
+class ApiCallMetrics(object):
+    """
+    Metrics for a single driver API, e.g. ``ble_gattc_write``
+    """
+    def __init__(self, call_count: int, error_counts: typing.Dict[str, int], latency: LatencyStats):
+        # Number of times the API was called, including calls that returned errors
+        self.call_count = call_count
+        # Number of calls which failed, keyed by the name of the error returned
+        self.error_counts = error_counts
+        # How long the calls took to return
+        self.latency = latency
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.error_counts.values())
+
+    def __repr__(self):
+        return repr_format(self, call_count=self.call_count, errors=self.error_counts, latency=self.latency)
+
+
+class DriverMetricsSnapshot(object):
+    """
+    Point-in-time copy of the metrics collected by the driver
+    """
+    def __init__(self, timestamp: float, api_calls: typing.Dict[str, ApiCallMetrics],
+                 event_counts: typing.Dict[str, int], event_queue_dwell: LatencyStats,
+                 handlers: typing.Dict[str, LatencyStats],
+                 event_queue_depth: int, event_queue_high_water_mark: int, events_dropped: int):
+        # time.time() when the snapshot was taken
+        self.timestamp = timestamp
+        # Per-API call metrics, keyed by the driver function name
+        self.api_calls = api_calls
+        # Number of events received, keyed by the event class name
+        self.event_counts = event_counts
+        # Time events spent in the event queue before being processed. Doesn't include events queued before metrics were enabled
+        self.event_queue_dwell = event_queue_dwell
+        # Execution time of each event handler/observer on the event thread, keyed by the handler's qualified name
+        self.handlers = handlers
+        self.event_queue_depth = event_queue_depth
+        self.event_queue_high_water_mark = event_queue_high_water_mark
+        self.events_dropped = events_dropped
+
+    def slowest_handlers(self, count=5) -> typing.List[typing.Tuple[str, LatencyStats]]:
+        """
+        Gets the handlers with the highest total execution time, useful to find what is stalling the event thread
+
+        :param count: The number of handlers to return
+        :return: List of (handler name, stats) tuples, slowest first
+        """
+        return sorted(self.handlers.items(), key=lambda kv: kv[1].total, reverse=True)[:count]
+
+    def __repr__(self):
+        return repr_format(self, api_calls=self.api_calls, event_counts=self.event_counts,
+                           event_queue_dwell=self.event_queue_dwell, event_queue_depth=self.event_queue_depth,
+                           event_queue_high_water_mark=self.event_queue_high_water_mark,
+                           events_dropped=self.events_dropped)
+
+
+class _Samples(object):
+    __slots__ = ["count", "total", "min", "max", "recent"]
+
+    def __init__(self, window):
+        self.count = 0
+        self.total = 0.0
+        self.min = 0.0
+        self.max = 0.0
+        self.recent = collections.deque(maxlen=window)
+
+    def add(self, value):
+        if not self.count or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+        self.recent.append(value)
+
+    def stats(self):
+        recent = sorted(self.recent)
+        if recent:
+            p50 = recent[int(round(0.50 * (len(recent) - 1)))]
+            p99 = recent[int(round(0.99 * (len(recent) - 1)))]
+        else:
+            p50 = p99 = 0.0
+        return LatencyStats(self.count, self.total, self.min, self.max, p50, p99)
+
+
+class DriverMetrics(object):
+    """
+    Collects call, event and handler timing metrics for a driver instance
+    """
+    def __init__(self, sample_window=1024, enabled=False):
+        """
+        :param sample_window: The number of most recent samples to keep for computing percentiles
+        :param enabled: Whether or not to start collecting metrics immediately.
+                        Metrics add timing overhead to every driver call and event, so they are off by default
+        """
+        self.enabled = enabled
+        self.sample_window = sample_window
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._call_latencies = {}
+            self._call_errors = {}
+            self._event_counts = {}
+            self._dwell_times = _Samples(self.sample_window)
+            self._handler_times = {}
+
+    def record_call(self, api_name, latency, error_name=None):
+        with self._lock:
+            samples = self._call_latencies.get(api_name)
+            if samples is None:
+                samples = self._call_latencies[api_name] = _Samples(self.sample_window)
+            samples.add(latency)
+            if error_name is not None:
+                errors = self._call_errors.setdefault(api_name, {})
+                errors[error_name] = errors.get(error_name, 0) + 1
+
+    def record_event(self, event_name, dwell_time=None):
+        with self._lock:
+            self._event_counts[event_name] = self._event_counts.get(event_name, 0) + 1
+            # Events queued before metrics were enabled weren't timestamped
+            if dwell_time is not None:
+                self._dwell_times.add(dwell_time)
+
+    def record_handler(self, handler_name, duration):
+        with self._lock:
+            samples = self._handler_times.get(handler_name)
+            if samples is None:
+                samples = self._handler_times[handler_name] = _Samples(self.sample_window)
+            samples.add(duration)
+
+    def snapshot(self, event_queue=None) -> DriverMetricsSnapshot:
+        """
+        Creates a copy of the metrics collected so far
+
+        :param event_queue: Optional event queue to include the depth/drop counters of
+        :type event_queue: blatann.nrf.nrf_event_queue.DriverEventQueue
+        """
+        with self._lock:
+            api_calls = {name: ApiCallMetrics(samples.count, dict(self._call_errors.get(name, {})), samples.stats())
+                         for name, samples in self._call_latencies.items()}
+            event_counts = dict(self._event_counts)
+            dwell = self._dwell_times.stats()
+            handlers = {name: samples.stats() for name, samples in self._handler_times.items()}
+        if event_queue is not None:
+            depth, high_water_mark, dropped = event_queue.depth, event_queue.high_water_mark, event_queue.dropped_count
+        else:
+            depth = high_water_mark = dropped = 0
+        return DriverMetricsSnapshot(time.time(), api_calls, event_counts, dwell, handlers,
+                                     depth, high_water_mark, dropped)
+
+
+def handler_name(handler) -> str:
+    """
+    Gets a readable name for an event handler or observer, e.g. ``Scanner._on_adv_report``
+    """
+    name = getattr(handler, "__qualname__", None)
+    if name is None:
+        name = type(handler).__qualname__
+    module = getattr(handler, "__module__", None)
+    if module:
+        name = "{}.{}".format(module, name)
+    return name
@@ -35,6 +35,7 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 #
 
+import ctypes
 import importlib
 
 from blatann.nrf.nrf_dll_load import driver
@@ -65,9 +66,21 @@ def char_array_to_list(array_pointer, length):
 
 def uint8_array_to_list(array_pointer, length):
     """Convert uint8_array to python list."""
-    data_array = driver.uint8_array.frompointer(array_pointer)
-    data_list = _populate_list(data_array, length)
-    return data_list
+    return list(uint8_array_to_bytes(array_pointer, length))
+
+
+def uint8_array_to_bytes(array_pointer, length):
+    """
+    Convert uint8_array to bytes, copying the data out of the C array in a single operation.
+
+    Falls back to copying element by element if the pointer does not expose its address as an integer.
+    """
+    if length <= 0:
+        return b""
+    address = _pointer_address(array_pointer)
+    if address is None:
+        return bytes(_populate_list(driver.uint8_array.frompointer(array_pointer), length))
+    return ctypes.string_at(address, length)
 
 
 def uint16_array_to_list(array_pointer, length):
@@ -154,6 +167,14 @@ def serial_port_desc_array_to_list(array_pointer, length):
     return data_list
 
 
+def _pointer_address(pointer):
+    """Get the address of a SWIG pointer, or None if the wrapped pointer doesn't support int()."""
+    try:
+        return int(pointer)
+    except (TypeError, ValueError):
+        return None
+
+
 def _populate_list(data_array, length):
     data_list = []
     for i in range(0, length):
@@ -174,6 +195,22 @@ def list_to_uint8_array(data_list):
     return data_array
 
 
+def bytes_to_uint8_array(data):
+    """Convert a bytes-like object to uint8_array, copying the data into the C array in a single operation."""
+    data = bytes(data)
+    length = len(data)
+    data_array = driver.uint8_array(length)
+    if length:
+        address = _pointer_address(data_array.cast())
+        if address is None:
+            # Fill in the array already allocated rather than creating another one
+            for i, value in enumerate(data):
+                data_array[i] = value
+        else:
+            ctypes.memmove(address, data, length)
+    return data_array
+
+
 def list_to_uint16_array(data_list):
     """Convert python list to uint16_array."""
     data_array = _populate_array(data_list, driver.uint16_array)
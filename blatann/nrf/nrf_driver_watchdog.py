@@ -0,0 +1,135 @@
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from blatann.nrf.nrf_driver_metrics import handler_name
+
+logger = logging.getLogger(__name__)
+
+
+class HandlerWatchdog(object):
+    """
+    Detects event handlers which stall the driver's event thread.
+
+    Every event handler and observer is run on a single event thread, so a handler which blocks delays
+    the processing of every other event on every connection. While enabled, a monitor thread checks on the handler
+    which is currently running and logs a warning with the event type and the event thread's stack
+    once the handler has been running for longer than the threshold.
+    """
+    def __init__(self, name, threshold=None):
+        """
+        :param name: Name used for the monitor thread
+        :param threshold: How long a handler can run, in seconds, before it's reported. None to disable the watchdog
+        """
+        self._name = name
+        self._threshold = None
+        self._lock = threading.Lock()
+        self._running = False
+        self._stop = None
+        # (handler, event, start time, thread id) of the handler currently running, replaced as a whole
+        # so the monitor thread can read it without locking
+        self._current = None
+        self._reported = None
+        self.threshold = threshold
+
+    @property
+    def enabled(self) -> bool:
+        return self._threshold is not None
+
+    @property
+    def threshold(self) -> float:
+        """
+        How long a handler can run, in seconds, before it is reported as slow. None if the watchdog is disabled
+
+        :getter: Gets the threshold
+        :setter: Sets the threshold, or None to disable the watchdog
+        """
+        return self._threshold
+
+    @threshold.setter
+    def threshold(self, value):
+        if value is not None and value <= 0:
+            raise ValueError("Slow handler threshold must be positive")
+        with self._lock:
+            self._threshold = value
+            if self._running:
+                self._start_monitor()
+
+    def start(self):
+        """
+        Starts monitoring handlers. The monitor thread only runs while a threshold is set
+        """
+        with self._lock:
+            self._running = True
+            self._start_monitor()
+
+    def stop(self):
+        """
+        Stops the monitor thread. The threshold is kept so monitoring resumes when started again
+        """
+        with self._lock:
+            self._running = False
+            self._stop_monitor()
+
+    def _start_monitor(self):
+        # Must be called with the lock held
+        self._stop_monitor()
+        if self._threshold is None:
+            return
+        self._stop = threading.Event()
+        thread = threading.Thread(target=self._monitor, args=(self._stop, self._threshold),
+                                  name="{}_Watchdog".format(self._name))
+        thread.daemon = True
+        thread.start()
+
+    def _stop_monitor(self):
+        # Must be called with the lock held
+        if self._stop:
+            self._stop.set()
+            self._stop = None
+
+    def handler_started(self, handler, event, start_time):
+        """
+        Marks that the handler has started handling the event on the calling thread
+
+        :param start_time: The time.perf_counter() timestamp when the handler was called
+        """
+        self._current = (handler, event, start_time, threading.get_ident())
+
+    def handler_finished(self, duration):
+        """
+        Marks that the handler which was started has finished
+
+        :param duration: How long the handler took to run, in seconds
+        """
+        current = self._current
+        self._current = None
+        threshold = self._threshold
+        if current is None or threshold is None or duration < threshold:
+            return
+        handler, event = current[0], current[1]
+        if self._reported is current:
+            logger.warning("Slow handler %s finished handling %s after %.3fs",
+                           handler_name(handler), type(event).__name__, duration)
+        else:
+            logger.warning("Slow handler %s took %.3fs to handle %s (threshold: %.3fs)",
+                           handler_name(handler), duration, type(event).__name__, threshold)
+
+    def _monitor(self, stop, threshold):
+        poll_interval = max(threshold / 4, 0.005)
+        while not stop.wait(poll_interval):
+            current = self._current
+            if current is None or current is self._reported:
+                continue
+            handler, event, start_time, thread_id = current
+            elapsed = time.perf_counter() - start_time
+            if elapsed < threshold:
+                continue
+            self._reported = current
+            frame = sys._current_frames().get(thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "<unavailable>\n"
+            logger.warning("Slow handler %s has been handling %s for %.3fs (threshold: %.3fs), "
+                           "blocking the event thread. Event thread stack:\n%s",
+                           handler_name(handler), type(event).__name__, elapsed, threshold, stack)
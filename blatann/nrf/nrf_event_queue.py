@@ -0,0 +1,173 @@
+import collections
+import enum
+import heapq
+import logging
+import threading
+
+from blatann.nrf.nrf_dll_load import driver
+
+logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy(enum.Enum):
+    """
+    Determines what happens when an event arrives from the driver and the event queue is full.
+
+    In either case the oldest queued advertising report is discarded first to make room.
+    Connection, GATT and other events are never dropped.
+    """
+    # If there are no advertising reports to drop, the incoming advertising report is dropped.
+    # Any other event is queued past the configured size
+    drop_adv_reports = 0
+    # If there are no advertising reports to drop, the incoming advertising report is dropped.
+    # Any other event blocks the driver's thread until the queue has room
+    block = 1
+
+
+class DriverEventQueue(object):
+    """
+    Bounded queue which buffers raw events between the driver's callback thread and the event processing thread.
+
+    Events are drained in batches, every event pending at the time of the call is returned together.
+    """
+    DEFAULT_MAX_SIZE = 1024
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, overflow_policy=OverflowPolicy.drop_adv_reports):
+        """
+        :param max_size: The number of events which can be queued before the overflow policy is applied
+        :param overflow_policy: What to do when the queue is full
+        :type overflow_policy: OverflowPolicy
+        """
+        if max_size < 1:
+            raise ValueError("Event queue size must be at least 1")
+        self._max_size = max_size
+        self._overflow_policy = overflow_policy
+        # Advertising reports are kept separately so the oldest can be dropped without searching for it.
+        # Entries are (sequence number, enqueue time, event), the sequence numbers restore the order when drained
+        self._events = collections.deque()
+        self._adv_reports = collections.deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._closed = False
+        self._high_water_mark = 0
+        self._received_count = 0
+        self._dropped_count = 0
+
+    @property
+    def max_size(self) -> int:
+        """
+        The number of events which can be queued before the overflow policy is applied
+        """
+        return self._max_size
+
+    @property
+    def overflow_policy(self) -> OverflowPolicy:
+        """
+        The policy applied when an event arrives and the queue is full
+        """
+        return self._overflow_policy
+
+    @property
+    def depth(self) -> int:
+        """
+        The number of events currently waiting to be processed
+        """
+        return len(self._events) + len(self._adv_reports)
+
+    @property
+    def high_water_mark(self) -> int:
+        """
+        The largest number of events that have been waiting to be processed at once
+        """
+        return self._high_water_mark
+
+    @property
+    def received_count(self) -> int:
+        """
+        The total number of events received from the driver, including ones that were dropped
+        """
+        return self._received_count
+
+    @property
+    def dropped_count(self) -> int:
+        """
+        The number of advertising reports that were dropped because the queue was full
+        """
+        return self._dropped_count
+
+    def reset_high_water_mark(self):
+        with self._lock:
+            self._high_water_mark = len(self._events) + len(self._adv_reports)
+
+    def open(self):
+        with self._lock:
+            self._closed = False
+
+    def close(self):
+        """
+        Releases the driver's thread if it is blocked waiting for room in the queue. Events are not cleared
+        """
+        with self._lock:
+            self._closed = True
+            self._not_full.notify_all()
+
+    def put(self, ble_event, enqueue_time=None) -> bool:
+        """
+        Queues an event received from the driver, applying the overflow policy if the queue is full
+
+        :param ble_event: The raw event received from the driver
+        :param enqueue_time: Optional time.perf_counter() timestamp of when the event was received,
+                             used to measure how long the event waited to be processed
+        :return: True if the event was queued, False if it was dropped
+        """
+        is_adv_report = ble_event.header.evt_id == driver.BLE_GAP_EVT_ADV_REPORT
+        with self._lock:
+            self._received_count += 1
+            while len(self._events) + len(self._adv_reports) >= self._max_size:
+                if self._adv_reports:
+                    # Make room by dropping the oldest advertising report
+                    self._adv_reports.popleft()
+                    self._dropped_count += 1
+                    break
+                if is_adv_report:
+                    self._dropped_count += 1
+                    return False
+                if self._overflow_policy != OverflowPolicy.block or self._closed:
+                    break
+                self._not_full.wait(0.1)
+
+            entry = (self._received_count, enqueue_time, ble_event)
+            if is_adv_report:
+                self._adv_reports.append(entry)
+            else:
+                self._events.append(entry)
+            depth = len(self._events) + len(self._adv_reports)
+            if depth > self._high_water_mark:
+                self._high_water_mark = depth
+            self._not_empty.notify()
+        return True
+
+    def get_all(self, timeout=None) -> list:
+        """
+        Waits for events to be queued and removes all of the pending events from the queue
+
+        :param timeout: Optional time to wait for an event, in seconds
+        :return: The list of pending (enqueue time or None, event) tuples
+                 in the order they were received. Empty if the timeout was reached
+        """
+        with self._lock:
+            if not self._events and not self._adv_reports:
+                self._not_empty.wait(timeout)
+                if not self._events and not self._adv_reports:
+                    return []
+            events, adv_reports = self._events, self._adv_reports
+            self._events = collections.deque()
+            self._adv_reports = collections.deque()
+            self._not_full.notify_all()
+        if not adv_reports:
+            return [(enqueue_time, ble_event) for _, enqueue_time, ble_event in events]
+        if not events:
+            return [(enqueue_time, ble_event) for _, enqueue_time, ble_event in adv_reports]
+        # Both queues are already in order, merge them back into the order the events were received
+        return [(enqueue_time, ble_event) for _, enqueue_time, ble_event in heapq.merge(events, adv_reports)]
@@ -35,6 +35,7 @@ _event_classes = [
     GattcEvtCharacteristicDiscoveryResponse,
     GattcEvtDescriptorDiscoveryResponse,
     GattcEvtReadResponse,
+    GattcEvtCharValuesReadResponse,
     GattcEvtWriteResponse,
     GattcEvtHvx,
     GattcEvtAttrInfoDiscoveryResponse,
@@ -44,7 +45,6 @@ _event_classes = [
     # TODO:
     # driver.BLE_GATTC_EVT_REL_DISC_RSP
     # driver.BLE_GATTC_EVT_CHAR_VAL_BY_UUID_READ_RSP
-    # driver.BLE_GATTC_EVT_CHAR_VALS_READ_RSP
 
     # Gatts
     GattsEvtWrite,
@@ -61,6 +61,16 @@ _event_classes = [
 _events_by_id = {e.evt_id: e for e in _event_classes}
 
 
+def event_class_for_id(evt_id):
+    """
+    Gets the event class which decodes the given event ID, without decoding the event
+
+    :param evt_id: The ID of the event received from the driver
+    :return: The BLEEvent subclass, or None if the event is not supported
+    """
+    return _events_by_id.get(evt_id, None)
+
+
 def event_decode(ble_event):
     event_cls = _events_by_id.get(ble_event.header.evt_id, None)
     if event_cls:
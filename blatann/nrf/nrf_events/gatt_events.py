@@ -50,7 +50,7 @@ class GattcEvtReadResponse(GattcEvt):
                    error_handle=event.evt.gattc_evt.error_handle,
                    attr_handle=read_rsp.handle,
                    offset=read_rsp.offset,
-                   data=util.uint8_array_to_list(read_rsp.data, read_rsp.len))
+                   data=util.uint8_array_to_bytes(read_rsp.data, read_rsp.len))
 
     def __repr__(self):
         data = None
@@ -60,6 +60,28 @@ class GattcEvtReadResponse(GattcEvt):
                                  offset=self.offset, data=data)
 
 
+class GattcEvtCharValuesReadResponse(GattcEvt):
+    evt_id = driver.BLE_GATTC_EVT_CHAR_VALS_READ_RSP
+
+    def __init__(self, conn_handle, status, error_handle, data):
+        super(GattcEvtCharValuesReadResponse, self).__init__(conn_handle)
+        self.status = status
+        self.error_handle = error_handle
+        # The values of the handles read, concatenated in the order the handles were requested
+        self.data = data
+
+    @classmethod
+    def from_c(cls, event):
+        read_rsp = event.evt.gattc_evt.params.char_vals_read_rsp
+        return cls(conn_handle=event.evt.gattc_evt.conn_handle,
+                   status=BLEGattStatusCode(event.evt.gattc_evt.gatt_status),
+                   error_handle=event.evt.gattc_evt.error_handle,
+                   data=util.uint8_array_to_bytes(read_rsp.values, read_rsp.len))
+
+    def __repr__(self):
+        return self._repr_format(status=self.status, error_handle=self.error_handle, data=self.data)
+
+
 class GattcEvtHvx(GattcEvt):
     evt_id = driver.BLE_GATTC_EVT_HVX
 
@@ -82,7 +104,7 @@ class GattcEvtHvx(GattcEvt):
                    error_handle=event.evt.gattc_evt.error_handle,
                    attr_handle=hvx_evt.handle,
                    hvx_type=BLEGattHVXType(hvx_evt.type),
-                   data=util.uint8_array_to_list(hvx_evt.data, hvx_evt.len))
+                   data=util.uint8_array_to_bytes(hvx_evt.data, hvx_evt.len))
 
     def __repr__(self):
         data = ''.join(map(chr, self.data))
@@ -132,7 +154,7 @@ class GattcEvtWriteResponse(GattcEvt):
                    attr_handle=write_rsp_evt.handle,
                    write_op=BLEGattWriteOperation(write_rsp_evt.write_op),
                    offset=write_rsp_evt.offset,
-                   data=util.uint8_array_to_list(write_rsp_evt.data, write_rsp_evt.len))
+                   data=util.uint8_array_to_bytes(write_rsp_evt.data, write_rsp_evt.len))
 
     def __repr__(self):
         data = ''.join(map(chr, self.data))
@@ -325,7 +347,7 @@ class GattsEvtWrite(GattsEvt):
         write_operand = BLEGattsWriteOperation(write_event.op)
         auth_required = bool(write_event.auth_required)
         offset = write_event.offset
-        data = util.uint8_array_to_list(write_event.data, write_event.len)
+        data = util.uint8_array_to_bytes(write_event.data, write_event.len)
 
         return cls(conn_handle, attr_handle, uuid, write_operand, auth_required, offset, data)
 
@@ -0,0 +1,22 @@
+"""
+A simulated nRF52 connectivity board, usable as a drop-in replacement for the pc-ble-driver ``driver`` module.
+
+Selected by setting the ``BLATANN_DRIVER`` environment variable to ``sim`` before importing blatann. Every port name
+opened through :class:`blatann.nrf.nrf_driver.NrfDriver` creates an independent simulated SoftDevice and all of them
+share the same air, so two ``BleDevice`` objects within the same process can advertise, scan, connect, pair and
+exchange GATT traffic with each other without any hardware. Timing of the simulated radio can be tuned through
+:func:`configure`.
+"""
+from blatann.nrf.nrf_sim.constants import *
+from blatann.nrf.nrf_sim.structs import *
+from blatann.nrf.nrf_sim.api import *
+from blatann.nrf.nrf_sim.radio import SimulationParameters, configure, parameters
+
+
+class NordicSemiException(Exception):
+    """
+    Raised when a driver API returns an error, mirrors ``pc_ble_driver_py.exceptions.NordicSemiException``
+    """
+    def __init__(self, message, error_code=None):
+        super(NordicSemiException, self).__init__(message)
+        self.error_code = error_code
@@ -0,0 +1,571 @@
+"""
+The simulated SoftDevice adapter: configuration, addressing, advertising, scanning and connection establishment.
+
+All open and enabled adapters in the process share the same (perfect) air, so any adapter which is scanning
+receives the advertising packets of every other adapter and any initiator can connect to any connectable advertiser.
+"""
+import hashlib
+import logging
+import os
+import random
+import struct
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from blatann.nrf.nrf_sim import constants as c
+from blatann.nrf.nrf_sim import events
+from blatann.nrf.nrf_sim import gatt_server
+from blatann.nrf.nrf_sim.gatt_server import GattServer
+from blatann.nrf.nrf_sim.link import Link, LinkEnd
+from blatann.nrf.nrf_sim.radio import scheduler, parameters
+
+logger = logging.getLogger(__name__)
+
+ADV_DELAY_MAX_S = 0.010
+UNIT_0_625_MS = 0.000625
+DEFAULT_DEVICE_NAME = b"nRF5x"
+
+# Adapters which are currently enabled and able to send/receive on the air
+_air = []
+# Ports which are currently opened, only one adapter may open a port at a time
+_open_ports = set()
+
+
+def _ah(irk, prand):
+    """
+    The random address hash function, Core spec Vol 3 Part H 2.2.2
+
+    :param irk: The identity resolving key, little-endian as stored in the key distribution structures
+    :param prand: The 3 random bytes of the address, MSB first
+    :return: the 3 byte hash, MSB first
+    """
+    encryptor = Cipher(algorithms.AES(bytes(irk)[::-1]), modes.ECB(), default_backend()).encryptor()
+    return (encryptor.update(b"\x00" * 13 + bytes(prand)) + encryptor.finalize())[-3:]
+
+
+class ConnConfig(object):
+    """
+    The per-connection configuration registered for a connection configuration tag
+    """
+    def __init__(self):
+        self.conn_count = c.BLE_GAP_CONN_COUNT_DEFAULT
+        self.event_length = c.BLE_GAP_EVENT_LENGTH_DEFAULT
+        self.att_mtu = c.BLE_GATT_ATT_MTU_DEFAULT
+        self.write_cmd_tx_queue_size = c.BLE_GATTC_WRITE_CMD_TX_QUEUE_SIZE_DEFAULT
+        self.hvn_tx_queue_size = c.BLE_GATTS_HVN_TX_QUEUE_SIZE_DEFAULT
+
+
+class _Advertiser(object):
+    def __init__(self, adv_type, interval, timeout, conn_cfg_tag):
+        self.adv_type = adv_type
+        self.interval = interval
+        self.conn_cfg_tag = conn_cfg_tag
+        self.task = None
+        self.timeout_task = None
+
+    @property
+    def connectable(self):
+        return self.adv_type in (c.BLE_GAP_ADV_TYPE_ADV_IND, c.BLE_GAP_ADV_TYPE_ADV_DIRECT_IND)
+
+    @property
+    def scannable(self):
+        return self.adv_type in (c.BLE_GAP_ADV_TYPE_ADV_IND, c.BLE_GAP_ADV_TYPE_ADV_SCAN_IND)
+
+    def cancel(self):
+        for task in (self.task, self.timeout_task):
+            if task is not None:
+                task.cancel()
+
+
+class _Scanner(object):
+    def __init__(self, active, interval, window):
+        self.active = active
+        self.interval = interval
+        self.window = window
+        self.start_time = scheduler.now()
+        self.timeout_task = None
+
+    def in_window(self, now):
+        if self.window >= self.interval:
+            return True
+        return (now - self.start_time) % self.interval < self.window
+
+    def cancel(self):
+        if self.timeout_task is not None:
+            self.timeout_task.cancel()
+
+
+class _Initiator(object):
+    def __init__(self, peer_addr, conn_params, conn_cfg_tag):
+        self.peer_addr = peer_addr
+        self.conn_params = conn_params
+        self.conn_cfg_tag = conn_cfg_tag
+        self.timeout_task = None
+
+    def cancel(self):
+        if self.timeout_task is not None:
+            self.timeout_task.cancel()
+
+
+class SimAdapter(object):
+    """
+    A simulated connectivity board running the SoftDevice, addressed by an arbitrary port name.
+    The identity address and IRK of the adapter are derived from the port name so they are stable across runs
+    """
+    def __init__(self, port):
+        self.port = port
+        self.is_open = False
+        self.enabled = False
+        self._evt_handler = None
+        self._status_handler = None
+        self._log_handler = None
+
+        seed = hashlib.sha256(port.encode("utf-8")).digest()
+        self.identity_addr_type = c.BLE_GAP_ADDR_TYPE_RANDOM_STATIC
+        self.identity_addr = bytes([seed[0] | 0xC0]) + seed[1:6]
+        self.irk = seed[16:32]
+        self._reset_state()
+
+    def _reset_state(self):
+        self.enabled = False
+        self.gatt_server = None
+        self.vs_uuid_count = c.BLE_UUID_VS_COUNT_DEFAULT
+        self.vs_uuids = []
+        self.periph_role_count = c.BLE_GAP_ROLE_COUNT_PERIPH_DEFAULT
+        self.central_role_count = c.BLE_GAP_ROLE_COUNT_CENTRAL_DEFAULT
+        self.device_name_max_len = c.BLE_GAP_DEVNAME_DEFAULT_LEN
+        self.device_name_write_perm = (0, 0)
+        self.service_changed = c.BLE_GATTS_SERVICE_CHANGED_DEFAULT
+        self.attr_tab_size = c.BLE_GATTS_ATTR_TAB_SIZE_DEFAULT
+        self.conn_cfgs = {c.BLE_CONN_CFG_TAG_DEFAULT: ConnConfig()}
+
+        self.ppcp = (0, 0, 0, 0)
+        self.tx_power = 0
+        self.privacy_mode = c.BLE_GAP_PRIVACY_MODE_OFF
+        self.private_addr_type = c.BLE_GAP_ADDR_TYPE_RANDOM_PRIVATE_RESOLVABLE
+        self.private_addr_cycle_s = c.BLE_GAP_DEFAULT_PRIVATE_ADDR_CYCLE_INTERVAL_S
+        self._private_addr = None
+        self._private_addr_expiry = 0
+
+        self.adv_data = b""
+        self.scan_rsp_data = b""
+        self._advertiser = None  # type: _Advertiser
+        self._scanner = None  # type: _Scanner
+        self._initiator = None  # type: _Initiator
+        self.connections = {}
+
+    """
+    Driver transport
+    """
+
+    def open(self, status_handler, evt_handler, log_handler):
+        if self.is_open or self.port in _open_ports:
+            return c.NRF_ERROR_SD_RPC_SERIAL_PORT_ALREADY_OPEN
+        _open_ports.add(self.port)
+        self.is_open = True
+        self._status_handler = status_handler
+        self._evt_handler = evt_handler
+        self._log_handler = log_handler
+        return c.NRF_SUCCESS
+
+    def close(self):
+        if not self.is_open:
+            return c.NRF_ERROR_SD_RPC_SERIAL_PORT_ALREADY_CLOSED
+        self.reset()
+        self.is_open = False
+        _open_ports.discard(self.port)
+        self._evt_handler = None
+        return c.NRF_SUCCESS
+
+    def reset(self):
+        """
+        Resets the SoftDevice, dropping all connections and configuration
+        """
+        for task_owner in (self._advertiser, self._scanner, self._initiator):
+            if task_owner is not None:
+                task_owner.cancel()
+        for end in list(self.connections.values()):
+            end.link.drop(end)
+        if self in _air:
+            _air.remove(self)
+        self._reset_state()
+
+    def post(self, event):
+        scheduler.post(self, event)
+
+    def deliver(self, event):
+        handler = self._evt_handler
+        if handler is not None:
+            handler(self, event)
+
+    """
+    Configuration and enable
+    """
+
+    def conn_cfg(self, tag):
+        return self.conn_cfgs.get(tag)
+
+    def cfg_set(self, cfg_id, cfg):
+        if self.enabled:
+            return c.NRF_ERROR_INVALID_STATE
+        if cfg_id == c.BLE_COMMON_CFG_VS_UUID:
+            self.vs_uuid_count = cfg.common_cfg.vs_uuid_cfg.vs_uuid_count
+        elif cfg_id == c.BLE_GAP_CFG_ROLE_COUNT:
+            role_count = cfg.gap_cfg.role_count_cfg
+            self.periph_role_count = role_count.periph_role_count
+            self.central_role_count = role_count.central_role_count
+        elif cfg_id == c.BLE_GAP_CFG_DEVICE_NAME:
+            name_cfg = cfg.gap_cfg.device_name_cfg
+            self.device_name_max_len = name_cfg.max_len
+            self.device_name_write_perm = (name_cfg.write_perm.sm, name_cfg.write_perm.lv)
+        elif cfg_id == c.BLE_GATTS_CFG_SERVICE_CHANGED:
+            self.service_changed = cfg.gatts_cfg.service_changed.service_changed
+        elif cfg_id == c.BLE_GATTS_CFG_ATTR_TAB_SIZE:
+            self.attr_tab_size = cfg.gatts_cfg.attr_tab_size.attr_tab_size
+        elif cfg_id in (c.BLE_CONN_CFG_GAP, c.BLE_CONN_CFG_GATT, c.BLE_CONN_CFG_GATTC, c.BLE_CONN_CFG_GATTS):
+            conn_cfg = cfg.conn_cfg
+            if conn_cfg.conn_cfg_tag == c.BLE_CONN_CFG_TAG_DEFAULT:
+                return c.NRF_ERROR_INVALID_PARAM
+            tag_cfg = self.conn_cfgs.setdefault(conn_cfg.conn_cfg_tag, ConnConfig())
+            params = conn_cfg.params
+            if cfg_id == c.BLE_CONN_CFG_GAP:
+                tag_cfg.conn_count = params.gap_conn_cfg.conn_count
+                tag_cfg.event_length = params.gap_conn_cfg.event_length
+            elif cfg_id == c.BLE_CONN_CFG_GATT:
+                if params.gatt_conn_cfg.att_mtu < c.BLE_GATT_ATT_MTU_DEFAULT:
+                    return c.NRF_ERROR_INVALID_PARAM
+                tag_cfg.att_mtu = params.gatt_conn_cfg.att_mtu
+            elif cfg_id == c.BLE_CONN_CFG_GATTC:
+                tag_cfg.write_cmd_tx_queue_size = params.gattc_conn_cfg.write_cmd_tx_queue_size
+            else:
+                tag_cfg.hvn_tx_queue_size = params.gatts_conn_cfg.hvn_tx_queue_size
+        else:
+            return c.NRF_ERROR_NOT_SUPPORTED
+        return c.NRF_SUCCESS
+
+    def enable(self):
+        if self.enabled:
+            return c.NRF_ERROR_INVALID_STATE
+        self.enabled = True
+        self.gatt_server = GattServer(self)
+        self.gatt_server.attr_table_size = self.attr_tab_size
+        self.gatt_server.populate_builtin(self.service_changed, DEFAULT_DEVICE_NAME, self.device_name_max_len,
+                                          self.device_name_write_perm)
+        _air.append(self)
+        return c.NRF_SUCCESS
+
+    """
+    Vendor specific UUIDs
+    """
+
+    def uuid_vs_add(self, uuid128):
+        """
+        :param uuid128: The 16-byte base UUID, little-endian
+        :return: (err_code, uuid type)
+        """
+        base = bytearray(uuid128)
+        base[12:14] = b"\x00\x00"
+        base = bytes(base)
+        if base in self.vs_uuids:
+            return c.NRF_SUCCESS, c.BLE_UUID_TYPE_VENDOR_BEGIN + self.vs_uuids.index(base)
+        if len(self.vs_uuids) >= self.vs_uuid_count:
+            return c.NRF_ERROR_NO_MEM, 0
+        self.vs_uuids.append(base)
+        return c.NRF_SUCCESS, c.BLE_UUID_TYPE_VENDOR_BEGIN + len(self.vs_uuids) - 1
+
+    def uuid_to_128(self, uuid, uuid_type):
+        """
+        :return: The 16 little-endian bytes of the full UUID, or None if it is a Bluetooth SIG UUID or unknown type
+        """
+        index = uuid_type - c.BLE_UUID_TYPE_VENDOR_BEGIN
+        if index < 0 or index >= len(self.vs_uuids):
+            return None
+        base = bytearray(self.vs_uuids[index])
+        base[12] = uuid & 0xFF
+        base[13] = (uuid >> 8) & 0xFF
+        return bytes(base)
+
+    def uuid_from_128(self, uuid128):
+        """
+        :return: (16-bit uuid, uuid type). Bases which have not been registered are reported with an unknown type
+        """
+        uuid = uuid128[12] | (uuid128[13] << 8)
+        base = bytearray(uuid128)
+        base[12:14] = b"\x00\x00"
+        base = bytes(base)
+        if base in self.vs_uuids:
+            return uuid, c.BLE_UUID_TYPE_VENDOR_BEGIN + self.vs_uuids.index(base)
+        return 0, c.BLE_UUID_TYPE_UNKNOWN
+
+    """
+    Addressing
+    """
+
+    def addr_set(self, addr_type, addr):
+        """
+        :param addr: The address bytes, MSB first
+        """
+        if self._advertiser is not None or self._scanner is not None or self._initiator is not None:
+            return c.NRF_ERROR_INVALID_STATE
+        if addr_type == c.BLE_GAP_ADDR_TYPE_RANDOM_STATIC:
+            if addr[0] & 0xC0 != 0xC0:
+                return c.BLE_ERROR_GAP_INVALID_BLE_ADDR
+        elif addr_type != c.BLE_GAP_ADDR_TYPE_PUBLIC:
+            return c.BLE_ERROR_GAP_INVALID_BLE_ADDR
+        self.identity_addr_type = addr_type
+        self.identity_addr = bytes(addr)
+        return c.NRF_SUCCESS
+
+    def privacy_set(self, privacy_mode, private_addr_type, private_addr_cycle_s):
+        if private_addr_type not in (c.BLE_GAP_ADDR_TYPE_RANDOM_PRIVATE_RESOLVABLE,
+                                     c.BLE_GAP_ADDR_TYPE_RANDOM_PRIVATE_NON_RESOLVABLE):
+            return c.NRF_ERROR_INVALID_PARAM
+        self.privacy_mode = privacy_mode
+        self.private_addr_type = private_addr_type
+        self.private_addr_cycle_s = private_addr_cycle_s or c.BLE_GAP_DEFAULT_PRIVATE_ADDR_CYCLE_INTERVAL_S
+        self._private_addr = None
+        return c.NRF_SUCCESS
+
+    def _generate_private_addr(self):
+        if self.private_addr_type == c.BLE_GAP_ADDR_TYPE_RANDOM_PRIVATE_RESOLVABLE:
+            prand = bytearray(os.urandom(3))
+            prand[0] = (prand[0] & 0x3F) | 0x40
+            return bytes(prand) + _ah(self.irk, prand)
+        addr = bytearray(os.urandom(6))
+        addr[0] &= 0x3F
+        return bytes(addr)
+
+    def current_addr(self):
+        """
+        :return: (address type, address bytes MSB first) of the address currently used on the air
+        """
+        if self.privacy_mode == c.BLE_GAP_PRIVACY_MODE_OFF:
+            return self.identity_addr_type, self.identity_addr
+        now = scheduler.now()
+        if self._private_addr is None or now >= self._private_addr_expiry:
+            self._private_addr = self._generate_private_addr()
+            self._private_addr_expiry = now + self.private_addr_cycle_s
+        return self.private_addr_type, self._private_addr
+
+    def current_addr_struct(self):
+        return events.addr_struct(*self.current_addr())
+
+    def _matches_addr(self, addr_type, addr):
+        if addr == self.identity_addr:
+            return True
+        return self.privacy_mode != c.BLE_GAP_PRIVACY_MODE_OFF and addr == self.current_addr()[1]
+
+    """
+    GAP settings
+    """
+
+    def device_name_set(self, write_perm, name):
+        if len(name) > self.device_name_max_len:
+            return c.NRF_ERROR_DATA_SIZE
+        self.device_name_write_perm = (write_perm.sm, write_perm.lv)
+        self.gatt_server.builtin_value_set(gatt_server.UUID_DEVICE_NAME, name, self.device_name_write_perm)
+        return c.NRF_SUCCESS
+
+    def appearance_set(self, appearance):
+        self.gatt_server.builtin_value_set(gatt_server.UUID_APPEARANCE, struct.pack("<H", appearance))
+        return c.NRF_SUCCESS
+
+    def ppcp_set(self, conn_params):
+        self.ppcp = conn_params
+        self.gatt_server.builtin_value_set(gatt_server.UUID_PPCP, struct.pack("<4H", *conn_params))
+        return c.NRF_SUCCESS
+
+    def tx_power_set(self, tx_power):
+        self.tx_power = tx_power
+        for end in self.connections.values():
+            if end.peer.rssi_monitor is not None:
+                end.link.kick()
+        return c.NRF_SUCCESS
+
+    """
+    Advertising
+    """
+
+    def adv_data_set(self, adv_data, scan_rsp_data):
+        if len(adv_data) > c.BLE_GAP_ADV_SET_DATA_SIZE_MAX or len(scan_rsp_data) > c.BLE_GAP_ADV_SET_DATA_SIZE_MAX:
+            return c.NRF_ERROR_INVALID_LENGTH
+        self.adv_data = bytes(adv_data)
+        self.scan_rsp_data = bytes(scan_rsp_data)
+        return c.NRF_SUCCESS
+
+    def _conn_count(self, role):
+        return len([e for e in self.connections.values() if e.role == role])
+
+    def adv_start(self, adv_type, interval, timeout_s, conn_cfg_tag):
+        if self._advertiser is not None:
+            return c.NRF_ERROR_INVALID_STATE
+        if not c.BLE_GAP_ADV_INTERVAL_MIN <= interval <= c.BLE_GAP_ADV_INTERVAL_MAX:
+            return c.NRF_ERROR_INVALID_PARAM
+        advertiser = _Advertiser(adv_type, interval * UNIT_0_625_MS, timeout_s, conn_cfg_tag)
+        if advertiser.connectable:
+            if self.conn_cfg(conn_cfg_tag) is None:
+                return c.NRF_ERROR_NOT_FOUND
+            if self._conn_count(c.BLE_GAP_ROLE_PERIPH) >= self.periph_role_count:
+                return c.NRF_ERROR_CONN_COUNT
+        self._advertiser = advertiser
+        advertiser.task = scheduler.call_later(random.uniform(0, ADV_DELAY_MAX_S), self._adv_event)
+        if timeout_s:
+            advertiser.timeout_task = scheduler.call_later(timeout_s, self._adv_timeout)
+        return c.NRF_SUCCESS
+
+    def adv_stop(self):
+        if self._advertiser is None:
+            return c.NRF_ERROR_INVALID_STATE
+        self._advertiser.cancel()
+        self._advertiser = None
+        return c.NRF_SUCCESS
+
+    def _adv_timeout(self):
+        if self._advertiser is None:
+            return
+        self._advertiser.cancel()
+        self._advertiser = None
+        self.post(events.gap_event(c.BLE_GAP_EVT_TIMEOUT, c.BLE_CONN_HANDLE_INVALID, "timeout",
+                                   src=c.BLE_GAP_TIMEOUT_SRC_ADVERTISING))
+
+    def _adv_event(self):
+        advertiser = self._advertiser
+        if advertiser is None:
+            return
+        now = scheduler.now()
+        addr = self.current_addr()
+        for other in list(_air):
+            if other is self:
+                continue
+            if advertiser.connectable and other._initiator is not None and self._matches_addr(
+                    *other._initiator.peer_addr):
+                self._accept_connection(other, addr)
+                return
+            scanner = other._scanner
+            if scanner is not None and scanner.in_window(now):
+                other._on_adv_packet(self, addr, advertiser)
+        advertiser.task = scheduler.call_later(advertiser.interval + random.uniform(0, ADV_DELAY_MAX_S),
+                                               self._adv_event)
+
+    """
+    Scanning
+    """
+
+    def scan_start(self, active, interval, window, timeout_s):
+        if self._scanner is not None or self._initiator is not None:
+            return c.NRF_ERROR_INVALID_STATE
+        if window > interval or not window:
+            return c.NRF_ERROR_INVALID_PARAM
+        self._scanner = _Scanner(active, interval * UNIT_0_625_MS, window * UNIT_0_625_MS)
+        if timeout_s:
+            self._scanner.timeout_task = scheduler.call_later(timeout_s, self._scan_timeout)
+        return c.NRF_SUCCESS
+
+    def scan_stop(self):
+        if self._scanner is None:
+            return c.NRF_ERROR_INVALID_STATE
+        self._scanner.cancel()
+        self._scanner = None
+        return c.NRF_SUCCESS
+
+    def _scan_timeout(self):
+        if self._scanner is None:
+            return
+        self._scanner = None
+        self.post(events.gap_event(c.BLE_GAP_EVT_TIMEOUT, c.BLE_CONN_HANDLE_INVALID, "timeout",
+                                   src=c.BLE_GAP_TIMEOUT_SRC_SCAN))
+
+    def _adv_report(self, advertiser_adapter, addr, adv_type, scan_rsp, data):
+        adv_data, dlen = events.data_array(data)
+        rssi = max(-127, advertiser_adapter.tx_power - parameters.path_loss_db)
+        self.post(events.gap_event(c.BLE_GAP_EVT_ADV_REPORT, c.BLE_CONN_HANDLE_INVALID, "adv_report",
+                                   peer_addr=events.addr_struct(*addr), direct_addr=events.addr_struct(0, b"\x00" * 6),
+                                   rssi=rssi, scan_rsp=scan_rsp, type=adv_type, dlen=dlen, data=adv_data))
+
+    def _on_adv_packet(self, advertiser_adapter, addr, advertiser):
+        self._adv_report(advertiser_adapter, addr, advertiser.adv_type, 0, advertiser_adapter.adv_data)
+        if self._scanner.active and advertiser.scannable:
+            self._adv_report(advertiser_adapter, addr, advertiser.adv_type, 1, advertiser_adapter.scan_rsp_data)
+
+    """
+    Connection establishment
+    """
+
+    def _free_conn_handle(self):
+        conn_handle = 0
+        while conn_handle in self.connections:
+            conn_handle += 1
+        return conn_handle
+
+    def connect(self, addr_type, addr, timeout_s, conn_params, conn_cfg_tag):
+        if self._initiator is not None:
+            return c.NRF_ERROR_INVALID_STATE
+        if self.conn_cfg(conn_cfg_tag) is None:
+            return c.NRF_ERROR_NOT_FOUND
+        if self._conn_count(c.BLE_GAP_ROLE_CENTRAL) >= self.central_role_count:
+            return c.NRF_ERROR_CONN_COUNT
+        if self._scanner is not None:
+            # Scanning is stopped automatically when initiating a connection
+            self._scanner.cancel()
+            self._scanner = None
+        self._initiator = _Initiator((addr_type, bytes(addr)), conn_params, conn_cfg_tag)
+        if timeout_s:
+            self._initiator.timeout_task = scheduler.call_later(timeout_s, self._connect_timeout)
+        return c.NRF_SUCCESS
+
+    def connect_cancel(self):
+        if self._initiator is None:
+            return c.NRF_ERROR_INVALID_STATE
+        self._initiator.cancel()
+        self._initiator = None
+        return c.NRF_SUCCESS
+
+    def _connect_timeout(self):
+        if self._initiator is None:
+            return
+        self._initiator = None
+        self.post(events.gap_event(c.BLE_GAP_EVT_TIMEOUT, c.BLE_CONN_HANDLE_INVALID, "timeout",
+                                   src=c.BLE_GAP_TIMEOUT_SRC_CONN))
+
+    def _accept_connection(self, central, periph_addr):
+        """
+        Called on the advertising (peripheral) adapter when a connection request is received from the central
+        """
+        initiator = central._initiator
+        central._initiator = None
+        initiator.cancel()
+        advertiser = self._advertiser
+        self._advertiser = None
+        advertiser.cancel()
+
+        link = Link(initiator.conn_params)
+        central_addr = central.current_addr()
+        central_end = LinkEnd(link, central, central._free_conn_handle(), c.BLE_GAP_ROLE_CENTRAL,
+                              periph_addr, central.conn_cfg(initiator.conn_cfg_tag))
+        periph_end = LinkEnd(link, self, self._free_conn_handle(), c.BLE_GAP_ROLE_PERIPH,
+                             central_addr, self.conn_cfg(advertiser.conn_cfg_tag))
+        link.attach(central_end, periph_end)
+        central.connections[central_end.conn_handle] = central_end
+        self.connections[periph_end.conn_handle] = periph_end
+        for end, peer_addr in ((central_end, periph_addr), (periph_end, central_addr)):
+            end.post(events.gap_event(c.BLE_GAP_EVT_CONNECTED, end.conn_handle, "connected",
+                                      peer_addr=events.addr_struct(*peer_addr), role=end.role,
+                                      conn_params=events.conn_params_struct(link.conn_params)))
+
+    def on_disconnected(self, end, reason):
+        """
+        :param reason: The disconnect reason, or None if the link was dropped locally and no event is reported
+        """
+        if self.connections.get(end.conn_handle) is not end:
+            return
+        del self.connections[end.conn_handle]
+        self.gatt_server.on_disconnected(end.conn_handle)
+        if reason is not None:
+            end.post(events.gap_event(c.BLE_GAP_EVT_DISCONNECTED, end.conn_handle, "disconnected", reason=reason))
+
+    def connection(self, conn_handle):
+        """
+        :rtype: LinkEnd
+        """
+        return self.connections.get(conn_handle)
@@ -0,0 +1,461 @@
+"""
+The ``sd_rpc_*`` and ``sd_ble_*`` functions of the driver module, implemented against the simulated adapters.
+
+Signatures and return values follow the SWIG bindings of pc-ble-driver so :class:`blatann.nrf.nrf_driver.NrfDriver`
+can use this module in place of the native driver. Output parameters are filled in through the pointer helpers and
+structs in :mod:`blatann.nrf.nrf_sim.structs`.
+"""
+import functools
+
+from blatann.nrf.nrf_sim import constants as c
+from blatann.nrf.nrf_sim.adapter import SimAdapter
+from blatann.nrf.nrf_sim.radio import lock
+from blatann.nrf.nrf_sim.structs import _Record, uint8_array
+
+
+def _locked(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with lock:
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def _enabled(func):
+    """
+    Decorator for the SoftDevice APIs which require the BLE stack to be enabled
+    """
+    @functools.wraps(func)
+    def wrapper(adapter, *args, **kwargs):
+        with lock:
+            if not adapter.enabled:
+                return c.BLE_ERROR_NOT_ENABLED
+            return func(adapter, *args, **kwargs)
+    return wrapper
+
+
+def _connection(func):
+    """
+    Decorator for the SoftDevice APIs operating on a connection, the connection's link end is passed
+    instead of the adapter and connection handle
+    """
+    @functools.wraps(func)
+    def wrapper(adapter, conn_handle, *args, **kwargs):
+        with lock:
+            if not adapter.enabled:
+                return c.BLE_ERROR_NOT_ENABLED
+            end = adapter.connection(conn_handle)
+            if end is None or not end.connected:
+                return c.BLE_ERROR_INVALID_CONN_HANDLE
+            return func(end, *args, **kwargs)
+    return wrapper
+
+
+def _bytes(array, length):
+    if array is None or not length:
+        return b""
+    return array.to_bytes(length)
+
+
+def _addr_bytes(addr):
+    """
+    :return: the address of a ble_gap_addr_t, MSB first
+    """
+    return bytes(reversed(addr.addr[:c.BLE_GAP_ADDR_LEN]))
+
+
+def _conn_params(params):
+    return params.min_conn_interval, params.max_conn_interval, params.slave_latency, params.conn_sup_timeout
+
+
+"""
+Transport
+"""
+
+
+def sd_rpc_physical_layer_create_uart(port_name, baud_rate, flow_control, parity):
+    return _Record(port_name=port_name, baud_rate=baud_rate)
+
+
+def sd_rpc_data_link_layer_create_bt_three_wire(physical_layer, retransmission_interval):
+    return _Record(physical_layer=physical_layer)
+
+
+def sd_rpc_transport_layer_create(data_link_layer, response_timeout):
+    return _Record(data_link_layer=data_link_layer)
+
+
+def sd_rpc_adapter_create(transport_layer):
+    return SimAdapter(transport_layer.data_link_layer.physical_layer.port_name)
+
+
+def sd_rpc_adapter_delete(adapter):
+    pass
+
+
+@_locked
+def sd_rpc_open(adapter, status_handler, evt_handler, log_handler):
+    return adapter.open(status_handler, evt_handler, log_handler)
+
+
+@_locked
+def sd_rpc_close(adapter):
+    return adapter.close()
+
+
+@_locked
+def sd_rpc_conn_reset(adapter, reset_mode):
+    if not adapter.is_open:
+        return c.NRF_ERROR_SD_RPC_SERIALIZATION_TRANSPORT_INVALID_STATE
+    adapter.reset()
+    return c.NRF_SUCCESS
+
+
+def sd_rpc_log_handler_severity_filter_set(adapter, severity_filter):
+    return c.NRF_SUCCESS
+
+
+"""
+Common
+"""
+
+
+@_locked
+def sd_ble_cfg_set(adapter, cfg_id, cfg, app_ram_base):
+    if not adapter.is_open:
+        return c.NRF_ERROR_SD_RPC_SERIALIZATION_TRANSPORT_INVALID_STATE
+    return adapter.cfg_set(cfg_id, cfg)
+
+
+@_locked
+def sd_ble_enable(adapter, app_ram_base):
+    if not adapter.is_open:
+        return c.NRF_ERROR_SD_RPC_SERIALIZATION_TRANSPORT_INVALID_STATE
+    return adapter.enable()
+
+
+@_enabled
+def sd_ble_opt_set(adapter, opt_id, opt):
+    # Options only tune radio behavior which is not modeled by the simulation
+    return c.NRF_SUCCESS
+
+
+@_connection
+def sd_ble_user_mem_reply(end, block):
+    return end.gatts.user_mem_reply()
+
+
+@_enabled
+def sd_ble_uuid_vs_add(adapter, uuid128, p_uuid_type):
+    err, uuid_type = adapter.uuid_vs_add(_bytes(uuid128.uuid128, 16))
+    if err == c.NRF_SUCCESS:
+        p_uuid_type.value = uuid_type
+    return err
+
+
+"""
+GAP
+"""
+
+
+@_enabled
+def sd_ble_gap_addr_get(adapter, addr):
+    addr.addr_type = adapter.identity_addr_type
+    addr.addr = uint8_array.from_bytes(bytes(reversed(adapter.identity_addr)))
+    return c.NRF_SUCCESS
+
+
+@_enabled
+def sd_ble_gap_addr_set(adapter, addr):
+    return adapter.addr_set(addr.addr_type, _addr_bytes(addr))
+
+
+@_enabled
+def sd_ble_gap_privacy_set(adapter, params):
+    return adapter.privacy_set(params.privacy_mode, params.private_addr_type, params.private_addr_cycle_s)
+
+
+@_enabled
+def sd_ble_gap_device_name_set(adapter, write_perm, dev_name, length):
+    return adapter.device_name_set(write_perm, _bytes(dev_name, length))
+
+
+@_enabled
+def sd_ble_gap_appearance_set(adapter, appearance):
+    return adapter.appearance_set(appearance)
+
+
+@_enabled
+def sd_ble_gap_ppcp_set(adapter, conn_params):
+    return adapter.ppcp_set(_conn_params(conn_params))
+
+
+@_enabled
+def sd_ble_gap_tx_power_set(adapter, tx_power):
+    return adapter.tx_power_set(tx_power)
+
+
+@_enabled
+def sd_ble_gap_adv_data_set(adapter, p_data, dlen, p_sr_data, srdlen):
+    return adapter.adv_data_set(_bytes(p_data, dlen), _bytes(p_sr_data, srdlen))
+
+
+@_enabled
+def sd_ble_gap_adv_start(adapter, adv_params, conn_cfg_tag):
+    return adapter.adv_start(adv_params.type, adv_params.interval, adv_params.timeout, conn_cfg_tag)
+
+
+@_enabled
+def sd_ble_gap_adv_stop(adapter):
+    return adapter.adv_stop()
+
+
+@_enabled
+def sd_ble_gap_scan_start(adapter, scan_params):
+    return adapter.scan_start(scan_params.active, scan_params.interval, scan_params.window, scan_params.timeout)
+
+
+@_enabled
+def sd_ble_gap_scan_stop(adapter):
+    return adapter.scan_stop()
+
+
+@_enabled
+def sd_ble_gap_connect(adapter, peer_addr, scan_params, conn_params, conn_cfg_tag):
+    if peer_addr is None or scan_params is None or conn_params is None:
+        return c.NRF_ERROR_INVALID_ADDR
+    return adapter.connect(peer_addr.addr_type, _addr_bytes(peer_addr), scan_params.timeout,
+                           _conn_params(conn_params), conn_cfg_tag)
+
+
+@_enabled
+def sd_ble_gap_connect_cancel(adapter):
+    return adapter.connect_cancel()
+
+
+@_connection
+def sd_ble_gap_disconnect(end, hci_status_code):
+    return end.disconnect(hci_status_code)
+
+
+@_connection
+def sd_ble_gap_conn_param_update(end, conn_params):
+    return end.conn_param_update(_conn_params(conn_params) if conn_params is not None else None)
+
+
+@_connection
+def sd_ble_gap_data_length_update(end, dl_params, dl_limitation):
+    return end.data_length_update(dl_params)
+
+
+@_connection
+def sd_ble_gap_phy_update(end, gap_phys):
+    return end.phy_update(gap_phys.tx_phys, gap_phys.rx_phys)
+
+
+@_connection
+def sd_ble_gap_rssi_start(end, threshold_dbm, skip_count):
+    end.rssi_start(threshold_dbm, skip_count)
+    return c.NRF_SUCCESS
+
+
+@_connection
+def sd_ble_gap_rssi_stop(end):
+    if end.rssi_monitor is None:
+        return c.NRF_ERROR_INVALID_STATE
+    end.rssi_stop()
+    return c.NRF_SUCCESS
+
+
+@_connection
+def sd_ble_gap_rssi_get(end, p_rssi):
+    if end.rssi_monitor is None:
+        return c.NRF_ERROR_INVALID_STATE
+    p_rssi.value = end.rssi()
+    return c.NRF_SUCCESS
+
+
+"""
+GAP security
+"""
+
+
+@_connection
+def sd_ble_gap_authenticate(end, sec_params):
+    return end.smp.authenticate(sec_params)
+
+
+@_connection
+def sd_ble_gap_sec_params_reply(end, sec_status, sec_params, sec_keyset):
+    return end.smp.sec_params_reply(sec_status, sec_params, sec_keyset)
+
+
+@_connection
+def sd_ble_gap_auth_key_reply(end, key_type, key):
+    return end.smp.auth_key_reply(key_type, key)
+
+
+@_connection
+def sd_ble_gap_lesc_dhkey_reply(end, dhkey):
+    return end.smp.lesc_dhkey_reply(dhkey)
+
+
+@_connection
+def sd_ble_gap_encrypt(end, master_id, enc_info):
+    return end.smp.encrypt(master_id, enc_info)
+
+
+@_connection
+def sd_ble_gap_sec_info_reply(end, enc_info, id_info, sign_info):
+    return end.smp.sec_info_reply(enc_info, id_info, sign_info)
+
+
+"""
+GATT Server
+"""
+
+
+@_enabled
+def sd_ble_gatts_service_add(adapter, service_type, uuid, p_handle):
+    err, handle = adapter.gatt_server.service_add(service_type, uuid.uuid, uuid.type)
+    if err == c.NRF_SUCCESS:
+        p_handle.value = handle
+    return err
+
+
+@_enabled
+def sd_ble_gatts_characteristic_add(adapter, service_handle, char_md, attr_char_value, handles):
+    err, char_handles = adapter.gatt_server.characteristic_add(service_handle, char_md, attr_char_value)
+    if err == c.NRF_SUCCESS:
+        handles.value_handle, handles.user_desc_handle, handles.cccd_handle, handles.sccd_handle = char_handles
+    return err
+
+
+@_enabled
+def sd_ble_gatts_descriptor_add(adapter, char_handle, attr, p_handle):
+    err, handle = adapter.gatt_server.descriptor_add(char_handle, attr)
+    if err == c.NRF_SUCCESS:
+        p_handle.value = handle
+    return err
+
+
+def _gatts_connection_check(adapter, conn_handle):
+    if conn_handle != c.BLE_CONN_HANDLE_INVALID and adapter.connection(conn_handle) is None:
+        return c.BLE_ERROR_INVALID_CONN_HANDLE
+    return c.NRF_SUCCESS
+
+
+@_enabled
+def sd_ble_gatts_value_get(adapter, conn_handle, handle, value):
+    err = _gatts_connection_check(adapter, conn_handle)
+    if err != c.NRF_SUCCESS:
+        return err
+    err, full_len, data = adapter.gatt_server.value_get(conn_handle, handle, value.offset, value.len)
+    if err == c.NRF_SUCCESS:
+        value.p_value = uint8_array.from_bytes(data)
+        value.len = len(data)
+    return err
+
+
+@_enabled
+def sd_ble_gatts_value_set(adapter, conn_handle, handle, value):
+    err = _gatts_connection_check(adapter, conn_handle)
+    if err != c.NRF_SUCCESS:
+        return err
+    return adapter.gatt_server.value_set(conn_handle, handle, value.offset, _bytes(value.p_value, value.len))
+
+
+@_connection
+def sd_ble_gatts_hvx(end, hvx_params):
+    data = None
+    if hvx_params.p_data is not None and hvx_params.p_len is not None:
+        data = _bytes(hvx_params.p_data, hvx_params.p_len.value)
+    err, sent = end.gatts.hvx(hvx_params.handle, hvx_params.type, hvx_params.offset, data)
+    if err == c.NRF_SUCCESS and hvx_params.p_len is not None:
+        hvx_params.p_len.value = sent
+    return err
+
+
+@_connection
+def sd_ble_gatts_service_changed(end, start_handle, end_handle):
+    server = end.adapter.gatt_server
+    if not server.service_changed_handle:
+        return c.NRF_ERROR_NOT_SUPPORTED
+    data = bytes([start_handle & 0xFF, start_handle >> 8, end_handle & 0xFF, end_handle >> 8])
+    err, _ = end.gatts.hvx(server.service_changed_handle, c.BLE_GATT_HVX_INDICATION, 0, data)
+    return err
+
+
+@_connection
+def sd_ble_gatts_rw_authorize_reply(end, rw_authorize_reply_params):
+    return end.gatts.rw_authorize_reply(rw_authorize_reply_params)
+
+
+@_connection
+def sd_ble_gatts_exchange_mtu_reply(end, server_rx_mtu):
+    return end.gatts.exchange_mtu_reply(server_rx_mtu)
+
+
+@_connection
+def sd_ble_gatts_sys_attr_set(end, sys_attr_data, length, flags):
+    # System attributes (CCCD values) are kept per connection and start out cleared
+    return c.NRF_SUCCESS
+
+
+"""
+GATT Client
+"""
+
+
+@_connection
+def sd_ble_gattc_primary_services_discover(end, start_handle, srvc_uuid):
+    uuid_bytes = None
+    if srvc_uuid is not None:
+        if srvc_uuid.type == c.BLE_UUID_TYPE_BLE:
+            uuid_bytes = bytes([srvc_uuid.uuid & 0xFF, srvc_uuid.uuid >> 8])
+        else:
+            uuid_bytes = end.adapter.uuid_to_128(srvc_uuid.uuid, srvc_uuid.type)
+            if uuid_bytes is None:
+                return c.NRF_ERROR_INVALID_PARAM
+    return end.gattc.primary_services_discover(start_handle, uuid_bytes)
+
+
+@_connection
+def sd_ble_gattc_characteristics_discover(end, handle_range):
+    return end.gattc.characteristics_discover(handle_range.start_handle, handle_range.end_handle)
+
+
+@_connection
+def sd_ble_gattc_descriptors_discover(end, handle_range):
+    return end.gattc.descriptors_discover(handle_range.start_handle, handle_range.end_handle)
+
+
+@_connection
+def sd_ble_gattc_attr_info_discover(end, handle_range):
+    return end.gattc.attr_info_discover(handle_range.start_handle, handle_range.end_handle)
+
+
+@_connection
+def sd_ble_gattc_read(end, handle, offset):
+    return end.gattc.read(handle, offset)
+
+
+@_connection
+def sd_ble_gattc_char_values_read(end, handles, handle_count):
+    return end.gattc.read_multiple([handles[i] for i in range(handle_count)])
+
+
+@_connection
+def sd_ble_gattc_write(end, write_params):
+    return end.gattc.write(write_params.write_op, write_params.flags, write_params.handle, write_params.offset,
+                           _bytes(write_params.p_value, write_params.len))
+
+
+@_connection
+def sd_ble_gattc_exchange_mtu_request(end, client_rx_mtu):
+    return end.gattc.exchange_mtu_request(client_rx_mtu)
+
+
+@_connection
+def sd_ble_gattc_hv_confirm(end, handle):
+    return end.gattc.hv_confirm(handle)
@@ -0,0 +1,735 @@
+"""
+Simulated Attribute Protocol: the GATT client and the per-connection GATT server session of a link end.
+
+ATT requests and responses are PDUs sent over the link, so their timing follows the connection interval and the
+per-event packet budget. The server processes requests strictly in order; requests which need the application to
+respond (authorization, user memory, MTU exchange) stall the server until the reply API is called, like the SoftDevice.
+"""
+import collections
+import logging
+import struct
+
+from blatann.nrf.nrf_sim import constants as c
+from blatann.nrf.nrf_sim import events
+from blatann.nrf.nrf_sim import gatt_server
+from blatann.nrf.nrf_sim.structs import (_Record, ble_uuid128_t, ble_gattc_service_t, ble_gattc_char_t,
+                                         ble_gattc_desc_t, ble_gattc_attr_info16_t, ble_gattc_attr_info128_t,
+                                         uint8_array)
+
+logger = logging.getLogger(__name__)
+
+ATT_HEADER_LEN = 1
+ATT_HANDLE_LEN = 2
+WRITE_HEADER_LEN = ATT_HEADER_LEN + ATT_HANDLE_LEN
+PREP_WRITE_HEADER_LEN = WRITE_HEADER_LEN + 2
+
+
+def _to_server(end, name, *args):
+    end.gatts.enqueue(name, args)
+
+
+def _confirm_to_server(end):
+    end.gatts.on_handle_value_confirm()
+
+
+def _to_client(end, name, *args):
+    getattr(end.gattc, name)(*args)
+
+
+class GattClient(object):
+    """
+    The GATT client of a link end. Only one ATT request may be outstanding at a time,
+    write commands and handle value confirmations are not requests and bypass this restriction
+    """
+    def __init__(self, end):
+        self.end = end
+        self.busy = False
+        self._requested_mtu = c.BLE_GATT_ATT_MTU_DEFAULT
+
+    @property
+    def _mtu(self):
+        return self.end.att_mtu
+
+    def _request(self, length, name, *args):
+        if self.busy:
+            return c.NRF_ERROR_BUSY
+        self.busy = True
+        self.end.send(length, _to_server, name, *args)
+        return c.NRF_SUCCESS
+
+    def _post(self, evt_id, name, gatt_status=c.BLE_GATT_STATUS_SUCCESS, error_handle=0, **params):
+        self.busy = False
+        self.end.post(events.gattc_event(evt_id, self.end.conn_handle, name, gatt_status, error_handle, **params))
+
+    def _uuid_struct(self, uuid_bytes):
+        if len(uuid_bytes) == 2:
+            return events.uuid_struct(struct.unpack("<H", uuid_bytes)[0], c.BLE_UUID_TYPE_BLE)
+        uuid, uuid_type = self.end.adapter.uuid_from_128(uuid_bytes)
+        return events.uuid_struct(uuid, uuid_type)
+
+    def on_disconnected(self):
+        self.busy = False
+
+    """
+    Requests
+    """
+
+    def primary_services_discover(self, start_handle, uuid_bytes):
+        if start_handle == 0:
+            return c.NRF_ERROR_INVALID_PARAM
+        length = 7 if uuid_bytes is None else 7 + len(uuid_bytes)
+        return self._request(length, "primary_services_discover", start_handle, uuid_bytes)
+
+    def characteristics_discover(self, start_handle, end_handle):
+        if start_handle == 0 or start_handle > end_handle:
+            return c.NRF_ERROR_INVALID_PARAM
+        return self._request(7, "characteristics_discover", start_handle, end_handle)
+
+    def descriptors_discover(self, start_handle, end_handle):
+        if start_handle == 0 or start_handle > end_handle:
+            return c.NRF_ERROR_INVALID_PARAM
+        return self._request(5, "information_discover", start_handle, end_handle, False)
+
+    def attr_info_discover(self, start_handle, end_handle):
+        if start_handle == 0 or start_handle > end_handle:
+            return c.NRF_ERROR_INVALID_PARAM
+        return self._request(5, "information_discover", start_handle, end_handle, True)
+
+    def read(self, handle, offset):
+        if handle == 0:
+            return c.NRF_ERROR_INVALID_PARAM
+        return self._request(5, "read", handle, offset)
+
+    def read_multiple(self, handles):
+        if len(handles) < 2 or 0 in handles:
+            return c.NRF_ERROR_INVALID_PARAM
+        length = ATT_HEADER_LEN + ATT_HANDLE_LEN * len(handles)
+        if length > self._mtu:
+            return c.NRF_ERROR_DATA_SIZE
+        return self._request(length, "read_multiple", tuple(handles))
+
+    def write(self, write_op, flags, handle, offset, data):
+        if write_op in (c.BLE_GATT_OP_WRITE_REQ, c.BLE_GATT_OP_WRITE_CMD):
+            if len(data) > self._mtu - WRITE_HEADER_LEN:
+                return c.NRF_ERROR_DATA_SIZE
+        elif write_op == c.BLE_GATT_OP_PREP_WRITE_REQ:
+            if len(data) > self._mtu - PREP_WRITE_HEADER_LEN:
+                return c.NRF_ERROR_DATA_SIZE
+        elif write_op != c.BLE_GATT_OP_EXEC_WRITE_REQ:
+            return c.NRF_ERROR_INVALID_PARAM
+
+        if write_op == c.BLE_GATT_OP_WRITE_CMD:
+            end = self.end
+            if end.write_cmd_pending >= end.write_cmd_queue_size:
+                return c.NRF_ERROR_RESOURCES
+            end.write_cmd_pending += 1
+            end.send(WRITE_HEADER_LEN + len(data), _to_server, "write_command", handle, data,
+                     on_sent=end.write_cmd_sent)
+            return c.NRF_SUCCESS
+        if write_op == c.BLE_GATT_OP_EXEC_WRITE_REQ:
+            return self._request(2, "execute_write", flags == c.BLE_GATT_EXEC_WRITE_FLAG_PREPARED_WRITE)
+        if write_op == c.BLE_GATT_OP_PREP_WRITE_REQ:
+            return self._request(PREP_WRITE_HEADER_LEN + len(data), "prepare_write", handle, offset, data)
+        return self._request(WRITE_HEADER_LEN + len(data), "write_request", handle, data)
+
+    def exchange_mtu_request(self, client_rx_mtu):
+        if client_rx_mtu < c.BLE_GATT_ATT_MTU_DEFAULT or client_rx_mtu > self.end.max_att_mtu:
+            return c.NRF_ERROR_INVALID_PARAM
+        self._requested_mtu = client_rx_mtu
+        return self._request(3, "exchange_mtu_request", client_rx_mtu)
+
+    def hv_confirm(self, handle):
+        session = self.end.peer.gatts
+        if not session.indication_pending or session.indication_handle != handle:
+            return c.NRF_ERROR_INVALID_STATE
+        self.end.send(1, _confirm_to_server)
+        return c.NRF_SUCCESS
+
+    """
+    Responses from the server
+    """
+
+    def on_error(self, evt_id, name, request_handle, gatt_status, params):
+        self._post(evt_id, name, gatt_status, request_handle, **params)
+
+    def on_primary_services(self, services):
+        """
+        :param services: list of (start_handle, end_handle, uuid_bytes)
+        """
+        structs = []
+        for start, end, uuid_bytes in services:
+            s = ble_gattc_service_t()
+            s.uuid = self._uuid_struct(uuid_bytes)
+            s.handle_range.start_handle = start
+            s.handle_range.end_handle = end
+            structs.append(s)
+        self._post(c.BLE_GATTC_EVT_PRIM_SRVC_DISC_RSP, "prim_srvc_disc_rsp", services=structs, count=len(structs))
+
+    def on_characteristics(self, declarations):
+        """
+        :param declarations: list of (declaration handle, declaration value)
+        """
+        structs = []
+        for handle, value in declarations:
+            props, value_handle = struct.unpack("<BH", value[:3])
+            ch = ble_gattc_char_t()
+            ch.uuid = self._uuid_struct(value[3:])
+            ch.char_props.broadcast = props & 0x01
+            ch.char_props.read = (props >> 1) & 0x01
+            ch.char_props.write_wo_resp = (props >> 2) & 0x01
+            ch.char_props.write = (props >> 3) & 0x01
+            ch.char_props.notify = (props >> 4) & 0x01
+            ch.char_props.indicate = (props >> 5) & 0x01
+            ch.char_props.auth_signed_wr = (props >> 6) & 0x01
+            ch.char_ext_props = (props >> 7) & 0x01
+            ch.handle_decl = handle
+            ch.handle_value = value_handle
+            structs.append(ch)
+        self._post(c.BLE_GATTC_EVT_CHAR_DISC_RSP, "char_disc_rsp", chars=structs, count=len(structs))
+
+    def on_information(self, info, attr_info):
+        """
+        :param info: list of (handle, uuid_bytes), all of the same UUID length
+        :param attr_info: True if the request came from attr_info_discover
+        """
+        if not attr_info:
+            structs = []
+            for handle, uuid_bytes in info:
+                d = ble_gattc_desc_t()
+                d.handle = handle
+                d.uuid = self._uuid_struct(uuid_bytes)
+                structs.append(d)
+            self._post(c.BLE_GATTC_EVT_DESC_DISC_RSP, "desc_disc_rsp", descs=structs, count=len(structs))
+            return
+
+        if len(info[0][1]) == 2:
+            fmt = c.BLE_GATTC_ATTR_INFO_FORMAT_16BIT
+            structs = []
+            for handle, uuid_bytes in info:
+                a = ble_gattc_attr_info16_t()
+                a.handle = handle
+                a.uuid = events.uuid_struct(struct.unpack("<H", uuid_bytes)[0], c.BLE_UUID_TYPE_BLE)
+                structs.append(a)
+            attr_info_union = _Record(attr_info16=structs)
+        else:
+            fmt = c.BLE_GATTC_ATTR_INFO_FORMAT_128BIT
+            structs = []
+            for handle, uuid_bytes in info:
+                a = ble_gattc_attr_info128_t()
+                a.handle = handle
+                a.uuid = ble_uuid128_t()
+                a.uuid.uuid128 = uint8_array.from_bytes(uuid_bytes)
+                structs.append(a)
+            attr_info_union = _Record(attr_info128=structs)
+        self._post(c.BLE_GATTC_EVT_ATTR_INFO_DISC_RSP, "attr_info_disc_rsp", format=fmt, count=len(structs),
+                   info=attr_info_union)
+
+    def on_read_response(self, handle, offset, value):
+        data, length = events.data_array(value)
+        self._post(c.BLE_GATTC_EVT_READ_RSP, "read_rsp", handle=handle, offset=offset, data=data, len=length)
+
+    def on_read_multiple_response(self, value):
+        values, length = events.data_array(value)
+        self._post(c.BLE_GATTC_EVT_CHAR_VALS_READ_RSP, "char_vals_read_rsp", values=values, len=length)
+
+    def on_write_response(self, handle, write_op, offset, value):
+        data, length = events.data_array(value)
+        self._post(c.BLE_GATTC_EVT_WRITE_RSP, "write_rsp", handle=handle, write_op=write_op, offset=offset,
+                   data=data, len=length)
+
+    def on_exchange_mtu_response(self, server_rx_mtu):
+        self.end.att_mtu = max(c.BLE_GATT_ATT_MTU_DEFAULT, min(self._requested_mtu, server_rx_mtu))
+        self._post(c.BLE_GATTC_EVT_EXCHANGE_MTU_RSP, "exchange_mtu_rsp", server_rx_mtu=server_rx_mtu)
+
+    def on_handle_value(self, handle, hvx_type, value):
+        data, length = events.data_array(value)
+        self.end.post(events.gattc_event(c.BLE_GATTC_EVT_HVX, self.end.conn_handle, "hvx", handle=handle,
+                                         type=hvx_type, data=data, len=length))
+
+
+class _Request(object):
+    """
+    An incoming ATT request waiting to be processed by the server
+    """
+    __slots__ = ("name", "args")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+
+class GattServerSession(object):
+    """
+    The GATT server of a link end, serving the adapter's attribute table to the peer's client
+    """
+    def __init__(self, end):
+        self.end = end
+        self._requests = collections.deque()
+        self._pending = None  # type: _Request
+        self._pending_authorize = None
+        self._user_mem_requested = False
+        self._prepared_writes = False
+        self._read_multiple_values = []
+        self._client_rx_mtu = None
+        self.indication_pending = False
+        self.indication_handle = 0
+
+    @property
+    def server(self):
+        return self.end.adapter.gatt_server
+
+    @property
+    def _mtu(self):
+        return self.end.att_mtu
+
+    @property
+    def _conn_handle(self):
+        return self.end.conn_handle
+
+    def on_disconnected(self):
+        self._requests.clear()
+        self._pending = None
+        self._pending_authorize = None
+        self.indication_pending = False
+        self.server.on_disconnected(self._conn_handle)
+
+    def _post(self, evt_id, name, **params):
+        self.end.post(events.gatts_event(evt_id, self._conn_handle, name, **params))
+
+    def _respond(self, length, name, *args):
+        self.end.send(length, _to_client, name, *args)
+
+    def _error(self, evt_id, name, handle, gatt_status, **params):
+        self._respond(5, "on_error", evt_id, name, handle, gatt_status, params)
+
+    def _check_permission(self, perm, for_write):
+        """
+        :return: The gatt status for accessing an attribute with the (sec_mode, level) permission on this link
+        """
+        sm, lv = perm
+        if sm == 0 or lv == 0:
+            if for_write:
+                return c.BLE_GATT_STATUS_ATTERR_WRITE_NOT_PERMITTED
+            return c.BLE_GATT_STATUS_ATTERR_READ_NOT_PERMITTED
+        if self.end.link.security_level < lv:
+            return c.BLE_GATT_STATUS_ATTERR_INSUF_AUTHENTICATION
+        return c.BLE_GATT_STATUS_SUCCESS
+
+    """
+    Request sequencing
+    """
+
+    def enqueue(self, name, args):
+        """
+        Queues a request received from the peer's client, processed in order by ``_handle_<name>``
+        """
+        self._requests.append(_Request(name, args))
+        self._process()
+
+    def _process(self):
+        while self._pending is None and self._requests and self.end.connected:
+            request = self._requests.popleft()
+            self._pending = request
+            done = getattr(self, "_handle_" + request.name)(*request.args)
+            if done:
+                self._pending = None
+
+    def _complete(self):
+        self._pending = None
+        self._process()
+
+    def _authorize(self, auth_type, request):
+        self._pending_authorize = auth_type
+        self._post(c.BLE_GATTS_EVT_RW_AUTHORIZE_REQUEST, "authorize_request", type=auth_type,
+                   request=request)
+
+    """
+    Discovery
+    """
+
+    def _handle_primary_services_discover(self, start_handle, uuid_bytes):
+        services = []
+        entry_len = None
+        for service in self.server.services:
+            if not service.primary or service.start_handle < start_handle:
+                continue
+            service_uuid = bytes(self.server.get(service.start_handle).value)
+            if uuid_bytes is not None:
+                if service_uuid != uuid_bytes:
+                    continue
+                # Find By Type Value responses don't include the UUID
+                entry_len = 4
+            elif entry_len is None:
+                entry_len = 4 + len(service_uuid)
+            elif 4 + len(service_uuid) != entry_len:
+                break
+            if (len(services) + 1) * entry_len > self._mtu - 2:
+                break
+            services.append((service.start_handle, service.end_handle, service_uuid))
+        if not services:
+            self._error(c.BLE_GATTC_EVT_PRIM_SRVC_DISC_RSP, "prim_srvc_disc_rsp", start_handle,
+                        c.BLE_GATT_STATUS_ATTERR_ATTRIBUTE_NOT_FOUND, services=[], count=0)
+        else:
+            self._respond(2 + len(services) * entry_len, "on_primary_services", services)
+        return True
+
+    def _handle_characteristics_discover(self, start_handle, end_handle):
+        declarations = []
+        entry_len = None
+        for handle in range(start_handle, min(end_handle, self.server.last_handle) + 1):
+            attr = self.server.get(handle)
+            if attr.uuid != gatt_server.UUID_CHARACTERISTIC or attr.uuid_type != c.BLE_UUID_TYPE_BLE:
+                continue
+            length = 2 + len(attr.value)
+            if entry_len is None:
+                entry_len = length
+            elif length != entry_len:
+                break
+            if (len(declarations) + 1) * entry_len > self._mtu - 2:
+                break
+            declarations.append((handle, bytes(attr.value)))
+        if not declarations:
+            self._error(c.BLE_GATTC_EVT_CHAR_DISC_RSP, "char_disc_rsp", start_handle,
+                        c.BLE_GATT_STATUS_ATTERR_ATTRIBUTE_NOT_FOUND, chars=[], count=0)
+        else:
+            self._respond(2 + len(declarations) * entry_len, "on_characteristics", declarations)
+        return True
+
+    def _handle_information_discover(self, start_handle, end_handle, attr_info):
+        info = []
+        entry_len = None
+        for handle in range(start_handle, min(end_handle, self.server.last_handle) + 1):
+            attr = self.server.get(handle)
+            uuid_bytes = self.server.uuid_bytes(attr.uuid, attr.uuid_type)
+            length = 2 + len(uuid_bytes)
+            if entry_len is None:
+                entry_len = length
+            elif length != entry_len:
+                break
+            if (len(info) + 1) * entry_len > self._mtu - 2:
+                break
+            info.append((handle, uuid_bytes))
+        if not info:
+            if attr_info:
+                self._error(c.BLE_GATTC_EVT_ATTR_INFO_DISC_RSP, "attr_info_disc_rsp", start_handle,
+                            c.BLE_GATT_STATUS_ATTERR_ATTRIBUTE_NOT_FOUND, format=c.BLE_GATTC_ATTR_INFO_FORMAT_16BIT,
+                            count=0, info=_Record(attr_info16=[]))
+            else:
+                self._error(c.BLE_GATTC_EVT_DESC_DISC_RSP, "desc_disc_rsp", start_handle,
+                            c.BLE_GATT_STATUS_ATTERR_ATTRIBUTE_NOT_FOUND, descs=[], count=0)
+        else:
+            self._respond(2 + len(info) * entry_len, "on_information", info, attr_info)
+        return True
+
+    """
+    Reads
+    """
+
+    def _read_error(self, handle, offset, status):
+        self._error(c.BLE_GATTC_EVT_READ_RSP, "read_rsp", handle, status, handle=handle, offset=offset,
+                    data=uint8_array(0), len=0)
+
+    def _handle_read(self, handle, offset):
+        attr = self.server.get(handle)
+        if attr is None:
+            self._read_error(handle, offset, c.BLE_GATT_STATUS_ATTERR_INVALID_HANDLE)
+            return True
+        status = self._check_permission(attr.read_perm, False)
+        if status != c.BLE_GATT_STATUS_SUCCESS:
+            self._read_error(handle, offset, status)
+            return True
+        if attr.rd_auth:
+            request = _Record(read=_Record(handle=handle, uuid=events.uuid_struct(attr.uuid, attr.uuid_type),
+                                           offset=offset))
+            self._authorize(c.BLE_GATTS_AUTHORIZE_TYPE_READ, request)
+            return False
+        self._send_read_response(attr, offset)
+        return True
+
+    def _send_read_response(self, attr, offset):
+        value = self.server.read_value(attr, self._conn_handle)
+        if offset > len(value):
+            self._read_error(attr.handle, offset, c.BLE_GATT_STATUS_ATTERR_INVALID_OFFSET)
+            return
+        data = value[offset:offset + self._mtu - ATT_HEADER_LEN]
+        self._respond(ATT_HEADER_LEN + len(data), "on_read_response", attr.handle, offset, data)
+
+    def _read_multiple_error(self, handle, status):
+        self._error(c.BLE_GATTC_EVT_CHAR_VALS_READ_RSP, "char_vals_read_rsp", handle, status,
+                    values=uint8_array(0), len=0)
+
+    def _handle_read_multiple(self, handles):
+        self._read_multiple_values = []
+        return self._read_next_of_multiple(handles)
+
+    def _read_next_of_multiple(self, handles):
+        # The values are collected in order. Attributes which require authorization stall the request
+        # until the application replies, then reading continues with the next handle
+        for handle in handles[len(self._read_multiple_values):]:
+            attr = self.server.get(handle)
+            if attr is None:
+                self._read_multiple_error(handle, c.BLE_GATT_STATUS_ATTERR_INVALID_HANDLE)
+                return True
+            status = self._check_permission(attr.read_perm, False)
+            if status != c.BLE_GATT_STATUS_SUCCESS:
+                self._read_multiple_error(handle, status)
+                return True
+            if attr.rd_auth:
+                request = _Record(read=_Record(handle=handle, uuid=events.uuid_struct(attr.uuid, attr.uuid_type),
+                                               offset=0))
+                self._authorize(c.BLE_GATTS_AUTHORIZE_TYPE_READ, request)
+                return False
+            self._read_multiple_values.append(self.server.read_value(attr, self._conn_handle))
+        data = b"".join(self._read_multiple_values)[:self._mtu - ATT_HEADER_LEN]
+        self._respond(ATT_HEADER_LEN + len(data), "on_read_multiple_response", data)
+        return True
+
+    """
+    Writes
+    """
+
+    def _write_error(self, handle, write_op, offset, status):
+        self._error(c.BLE_GATTC_EVT_WRITE_RSP, "write_rsp", handle, status, handle=handle, write_op=write_op,
+                    offset=offset, data=uint8_array(0), len=0)
+
+    def _write_request(self, handle, op, offset, data):
+        attr = self.server.get(handle)
+        return _Record(handle=handle, uuid=events.uuid_struct(attr.uuid, attr.uuid_type) if attr else None,
+                       op=op, auth_required=0, offset=offset, data=uint8_array.from_bytes(data), len=len(data))
+
+    def _check_write(self, handle):
+        attr = self.server.get(handle)
+        if attr is None:
+            return None, c.BLE_GATT_STATUS_ATTERR_INVALID_HANDLE
+        return attr, self._check_permission(attr.write_perm, True)
+
+    def _handle_write_request(self, handle, data):
+        attr, status = self._check_write(handle)
+        if status == c.BLE_GATT_STATUS_SUCCESS and len(data) > attr.max_len:
+            status = c.BLE_GATT_STATUS_ATTERR_INVALID_ATT_VAL_LENGTH
+        if status != c.BLE_GATT_STATUS_SUCCESS:
+            self._write_error(handle, c.BLE_GATT_OP_WRITE_REQ, 0, status)
+            return True
+        if attr.wr_auth:
+            self._authorize(c.BLE_GATTS_AUTHORIZE_TYPE_WRITE,
+                            _Record(write=self._write_request(handle, c.BLE_GATTS_OP_WRITE_REQ, 0, data)))
+            return False
+        status = self._apply_write(attr, c.BLE_GATTS_OP_WRITE_REQ, 0, data)
+        if status != c.BLE_GATT_STATUS_SUCCESS:
+            self._write_error(handle, c.BLE_GATT_OP_WRITE_REQ, 0, status)
+        else:
+            self._respond(1, "on_write_response", handle, c.BLE_GATT_OP_WRITE_REQ, 0, b"")
+        return True
+
+    def _handle_write_command(self, handle, data):
+        attr, status = self._check_write(handle)
+        if status != c.BLE_GATT_STATUS_SUCCESS or len(data) > attr.max_len:
+            # Commands have no response, invalid writes are silently dropped
+            return True
+        if attr.wr_auth:
+            self._authorize(c.BLE_GATTS_AUTHORIZE_TYPE_WRITE,
+                            _Record(write=self._write_request(handle, c.BLE_GATTS_OP_WRITE_CMD, 0, data)))
+            return False
+        self._apply_write(attr, c.BLE_GATTS_OP_WRITE_CMD, 0, data)
+        return True
+
+    def _apply_write(self, attr, op, offset, data, notify=True):
+        status = self.server.write_value(attr, self._conn_handle, offset, data)
+        if status == c.BLE_GATT_STATUS_SUCCESS and notify:
+            self._post(c.BLE_GATTS_EVT_WRITE, "write", **self._write_request(attr.handle, op, offset, data).__dict__)
+        return status
+
+    def _handle_prepare_write(self, handle, offset, data):
+        attr, status = self._check_write(handle)
+        if status != c.BLE_GATT_STATUS_SUCCESS:
+            self._write_error(handle, c.BLE_GATT_OP_PREP_WRITE_REQ, offset, status)
+            return True
+        if not self._user_mem_requested:
+            # The first prepared write asks the application for memory to queue the writes in.
+            # The request is resumed once the application replies
+            self._user_mem_requested = True
+            self._requests.appendleft(_Request("prepare_write", (handle, offset, data)))
+            self._pending = _Request("user_mem", ())
+            self.end.post(events.common_event(c.BLE_EVT_USER_MEM_REQUEST, self._conn_handle, "user_mem_request",
+                                              type=c.BLE_USER_MEM_TYPE_GATTS_QUEUED_WRITES))
+            return False
+        # No user memory block is provided by the application, every prepared write is authorized individually
+        self._prepared_writes = True
+        self._authorize(c.BLE_GATTS_AUTHORIZE_TYPE_WRITE,
+                        _Record(write=self._write_request(handle, c.BLE_GATTS_OP_PREP_WRITE_REQ, offset, data)))
+        return False
+
+    def _handle_execute_write(self, execute):
+        if not self._prepared_writes:
+            self._user_mem_requested = False
+            self._respond(1, "on_write_response", 0, c.BLE_GATT_OP_EXEC_WRITE_REQ, 0, b"")
+            return True
+        op = c.BLE_GATTS_OP_EXEC_WRITE_REQ_NOW if execute else c.BLE_GATTS_OP_EXEC_WRITE_REQ_CANCEL
+        self._authorize(c.BLE_GATTS_AUTHORIZE_TYPE_WRITE, _Record(write=_Record(
+            handle=0, uuid=events.uuid_struct(0, c.BLE_UUID_TYPE_UNKNOWN), op=op, auth_required=0, offset=0,
+            data=uint8_array(0), len=0)))
+        return False
+
+    """
+    MTU exchange
+    """
+
+    def _handle_exchange_mtu_request(self, client_rx_mtu):
+        self._client_rx_mtu = client_rx_mtu
+        self._post(c.BLE_GATTS_EVT_EXCHANGE_MTU_REQUEST, "exchange_mtu_request", client_rx_mtu=client_rx_mtu)
+        return False
+
+    """
+    Handle value confirmations
+    """
+
+    def on_handle_value_confirm(self):
+        # Confirmations are not requests and are not queued behind them
+        if not self.indication_pending:
+            return
+        self.indication_pending = False
+        self._post(c.BLE_GATTS_EVT_HVC, "hvc", handle=self.indication_handle)
+
+    """
+    Application API
+    """
+
+    def user_mem_reply(self):
+        if self._pending is None or self._pending.name != "user_mem":
+            return c.NRF_ERROR_INVALID_STATE
+        self._complete()
+        return c.NRF_SUCCESS
+
+    def exchange_mtu_reply(self, server_rx_mtu):
+        if self._pending is None or self._pending.name != "exchange_mtu_request":
+            return c.NRF_ERROR_INVALID_STATE
+        if server_rx_mtu < c.BLE_GATT_ATT_MTU_DEFAULT or server_rx_mtu > self.end.max_att_mtu:
+            return c.NRF_ERROR_INVALID_PARAM
+        self.end.att_mtu = max(c.BLE_GATT_ATT_MTU_DEFAULT, min(self._client_rx_mtu, server_rx_mtu))
+        self._respond(3, "on_exchange_mtu_response", server_rx_mtu)
+        self._complete()
+        return c.NRF_SUCCESS
+
+    def rw_authorize_reply(self, reply):
+        request = self._pending
+        if request is None or self._pending_authorize is None:
+            return c.NRF_ERROR_INVALID_STATE
+        if reply.type != self._pending_authorize:
+            return c.NRF_ERROR_INVALID_PARAM
+        self._pending_authorize = None
+
+        if reply.type == c.BLE_GATTS_AUTHORIZE_TYPE_READ:
+            if request.name == "read_multiple":
+                if not self._reply_read_multiple(request, reply.params.read):
+                    # Waiting on the application to authorize the next handle
+                    return c.NRF_SUCCESS
+            else:
+                self._reply_read(request, reply.params.read)
+        else:
+            self._reply_write(request, reply.params.write)
+        self._complete()
+        return c.NRF_SUCCESS
+
+    @staticmethod
+    def _reply_data(params):
+        if params.p_data is None or not params.len:
+            return None
+        return params.p_data.to_bytes(params.len)
+
+    def _reply_read(self, request, params):
+        handle, offset = request.args
+        if params.gatt_status != c.BLE_GATT_STATUS_SUCCESS:
+            self._read_error(handle, offset, params.gatt_status)
+            return
+        attr = self.server.get(handle)
+        if params.update:
+            self.server.write_value(attr, self._conn_handle, params.offset, self._reply_data(params) or b"")
+        self._send_read_response(attr, offset)
+
+    def _reply_read_multiple(self, request, params):
+        handles = request.args[0]
+        handle = handles[len(self._read_multiple_values)]
+        if params.gatt_status != c.BLE_GATT_STATUS_SUCCESS:
+            self._read_multiple_error(handle, params.gatt_status)
+            return True
+        attr = self.server.get(handle)
+        if params.update:
+            self.server.write_value(attr, self._conn_handle, params.offset, self._reply_data(params) or b"")
+        self._read_multiple_values.append(self.server.read_value(attr, self._conn_handle))
+        return self._read_next_of_multiple(handles)
+
+    def _reply_write(self, request, params):
+        status = params.gatt_status
+        if request.name == "execute_write":
+            self._prepared_writes = False
+            self._user_mem_requested = False
+            if status != c.BLE_GATT_STATUS_SUCCESS:
+                self._write_error(0, c.BLE_GATT_OP_EXEC_WRITE_REQ, 0, status)
+            else:
+                self._respond(1, "on_write_response", 0, c.BLE_GATT_OP_EXEC_WRITE_REQ, 0, b"")
+            return
+
+        if request.name == "prepare_write":
+            handle, offset, data = request.args
+            if status != c.BLE_GATT_STATUS_SUCCESS:
+                self._write_error(handle, c.BLE_GATT_OP_PREP_WRITE_REQ, offset, status)
+            else:
+                self._respond(PREP_WRITE_HEADER_LEN + len(data), "on_write_response", handle,
+                              c.BLE_GATT_OP_PREP_WRITE_REQ, offset, data)
+            return
+
+        handle, data = request.args
+        attr = self.server.get(handle)
+        if status == c.BLE_GATT_STATUS_SUCCESS and params.update:
+            reply_data = self._reply_data(params)
+            status = self.server.write_value(attr, self._conn_handle, params.offset,
+                                             data if reply_data is None else reply_data)
+        if request.name == "write_command":
+            return
+        if status != c.BLE_GATT_STATUS_SUCCESS:
+            self._write_error(handle, c.BLE_GATT_OP_WRITE_REQ, 0, status)
+        else:
+            self._respond(1, "on_write_response", handle, c.BLE_GATT_OP_WRITE_REQ, 0, b"")
+
+    def hvx(self, handle, hvx_type, offset, data):
+        """
+        :param data: The data to send, or None to send the current attribute value
+        :return: (err_code, number of bytes sent)
+        """
+        attr = self.server.get(handle)
+        if attr is None:
+            return c.BLE_ERROR_INVALID_ATTR_HANDLE, 0
+        char = self.server.characteristic_for_value(handle)
+        if char is None:
+            return c.NRF_ERROR_INVALID_PARAM, 0
+        if hvx_type == c.BLE_GATT_HVX_NOTIFICATION:
+            cccd_bit = gatt_server.CCCD_NOTIFY
+        elif hvx_type == c.BLE_GATT_HVX_INDICATION:
+            cccd_bit = gatt_server.CCCD_INDICATE
+        else:
+            return c.NRF_ERROR_INVALID_PARAM, 0
+        if not self.server.cccd_value(char, self._conn_handle) & cccd_bit:
+            return c.NRF_ERROR_INVALID_STATE, 0
+
+        end = self.end
+        if hvx_type == c.BLE_GATT_HVX_NOTIFICATION:
+            if end.hvn_pending >= end.hvn_queue_size:
+                return c.NRF_ERROR_RESOURCES, 0
+        elif self.indication_pending:
+            return c.NRF_ERROR_BUSY, 0
+
+        if data is not None:
+            status = self.server.write_value(attr, self._conn_handle, offset, data)
+            if status != c.BLE_GATT_STATUS_SUCCESS:
+                return c.NRF_ERROR_INVALID_PARAM, 0
+        value = self.server.read_value(attr, self._conn_handle)[:self._mtu - WRITE_HEADER_LEN]
+
+        if hvx_type == c.BLE_GATT_HVX_NOTIFICATION:
+            end.hvn_pending += 1
+            end.send(WRITE_HEADER_LEN + len(value), _to_client, "on_handle_value", handle, hvx_type, value,
+                     on_sent=end.notification_sent)
+        else:
+            self.indication_pending = True
+            self.indication_handle = handle
+            end.send(WRITE_HEADER_LEN + len(value), _to_client, "on_handle_value", handle, hvx_type, value)
+        return c.NRF_SUCCESS, len(value)
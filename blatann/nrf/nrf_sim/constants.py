@@ -0,0 +1,482 @@
+"""
+Constants of the S132 v5 SoftDevice API and the pc-ble-driver RPC layer, mirroring the names and values exported by
+``pc_ble_driver_py.lib.nrf_ble_driver_sd_api_v5``
+"""
+
+"""
+nrf_error.h / sd_rpc errors
+"""
+
+NRF_ERROR_BASE_NUM = 0x0000
+NRF_ERROR_SDM_BASE_NUM = 0x1000
+NRF_ERROR_SOC_BASE_NUM = 0x2000
+NRF_ERROR_STK_BASE_NUM = 0x3000
+
+NRF_SUCCESS = NRF_ERROR_BASE_NUM + 0
+NRF_ERROR_SVC_HANDLER_MISSING = NRF_ERROR_BASE_NUM + 1
+NRF_ERROR_SOFTDEVICE_NOT_ENABLED = NRF_ERROR_BASE_NUM + 2
+NRF_ERROR_INTERNAL = NRF_ERROR_BASE_NUM + 3
+NRF_ERROR_NO_MEM = NRF_ERROR_BASE_NUM + 4
+NRF_ERROR_NOT_FOUND = NRF_ERROR_BASE_NUM + 5
+NRF_ERROR_NOT_SUPPORTED = NRF_ERROR_BASE_NUM + 6
+NRF_ERROR_INVALID_PARAM = NRF_ERROR_BASE_NUM + 7
+NRF_ERROR_INVALID_STATE = NRF_ERROR_BASE_NUM + 8
+NRF_ERROR_INVALID_LENGTH = NRF_ERROR_BASE_NUM + 9
+NRF_ERROR_INVALID_FLAGS = NRF_ERROR_BASE_NUM + 10
+NRF_ERROR_INVALID_DATA = NRF_ERROR_BASE_NUM + 11
+NRF_ERROR_DATA_SIZE = NRF_ERROR_BASE_NUM + 12
+NRF_ERROR_TIMEOUT = NRF_ERROR_BASE_NUM + 13
+NRF_ERROR_NULL = NRF_ERROR_BASE_NUM + 14
+NRF_ERROR_FORBIDDEN = NRF_ERROR_BASE_NUM + 15
+NRF_ERROR_INVALID_ADDR = NRF_ERROR_BASE_NUM + 16
+NRF_ERROR_BUSY = NRF_ERROR_BASE_NUM + 17
+NRF_ERROR_CONN_COUNT = NRF_ERROR_BASE_NUM + 18
+NRF_ERROR_RESOURCES = NRF_ERROR_BASE_NUM + 19
+
+NRF_ERROR_SDM_LFCLK_SOURCE_UNKNOWN = NRF_ERROR_SDM_BASE_NUM + 0
+NRF_ERROR_SDM_INCORRECT_INTERUUPT_CONFIGURATION = NRF_ERROR_SDM_BASE_NUM + 1
+NRF_ERROR_SDM_INCORRECT_CLENR0 = NRF_ERROR_SDM_BASE_NUM + 2
+
+NRF_ERROR_SOC_MUTEX_ALREADY_TAKEN = NRF_ERROR_SOC_BASE_NUM + 0
+NRF_ERROR_SOC_NVIC_INTERRUPT_NOT_AVAILABLE = NRF_ERROR_SOC_BASE_NUM + 1
+NRF_ERROR_SOC_NVIC_INTERRUPT_PRIORITY_NOT_ALLOWED = NRF_ERROR_SOC_BASE_NUM + 2
+NRF_ERROR_SOC_NVIC_SHOULD_NOT_RETURN = NRF_ERROR_SOC_BASE_NUM + 3
+NRF_ERROR_SOC_POWER_MODE_UNKNOWN = NRF_ERROR_SOC_BASE_NUM + 4
+NRF_ERROR_SOC_POWER_POF_THRESHOLD_UNKNOWN = NRF_ERROR_SOC_BASE_NUM + 5
+NRF_ERROR_SOC_POWER_OFF_SHOULD_NOT_RETURN = NRF_ERROR_SOC_BASE_NUM + 6
+NRF_ERROR_SOC_RAND_NOT_ENOUGH_VALUES = NRF_ERROR_SOC_BASE_NUM + 7
+NRF_ERROR_SOC_PPI_INVALID_CHANNEL = NRF_ERROR_SOC_BASE_NUM + 8
+NRF_ERROR_SOC_PPI_INVALID_GROUP = NRF_ERROR_SOC_BASE_NUM + 9
+
+NRF_ERROR_SD_RPC_BASE_NUM = 0x8000
+NRF_ERROR_SD_RPC_ENCODE = NRF_ERROR_SD_RPC_BASE_NUM + 1
+NRF_ERROR_SD_RPC_DECODE = NRF_ERROR_SD_RPC_BASE_NUM + 2
+NRF_ERROR_SD_RPC_SEND = NRF_ERROR_SD_RPC_BASE_NUM + 3
+NRF_ERROR_SD_RPC_INVALID_ARGUMENT = NRF_ERROR_SD_RPC_BASE_NUM + 4
+NRF_ERROR_SD_RPC_NO_RESPONSE = NRF_ERROR_SD_RPC_BASE_NUM + 5
+NRF_ERROR_SD_RPC_INVALID_STATE = NRF_ERROR_SD_RPC_BASE_NUM + 6
+NRF_ERROR_SD_RPC_SERIALIZATION_TRANSPORT = NRF_ERROR_SD_RPC_BASE_NUM + 20
+NRF_ERROR_SD_RPC_SERIALIZATION_TRANSPORT_INVALID_STATE = NRF_ERROR_SD_RPC_BASE_NUM + 21
+NRF_ERROR_SD_RPC_SERIALIZATION_TRANSPORT_NO_RESPONSE = NRF_ERROR_SD_RPC_BASE_NUM + 22
+NRF_ERROR_SD_RPC_SERIALIZATION_TRANSPORT_ALREADY_OPEN = NRF_ERROR_SD_RPC_BASE_NUM + 23
+NRF_ERROR_SD_RPC_SERIALIZATION_TRANSPORT_ALREADY_CLOSED = NRF_ERROR_SD_RPC_BASE_NUM + 24
+NRF_ERROR_SD_RPC_H5_TRANSPORT = NRF_ERROR_SD_RPC_BASE_NUM + 40
+NRF_ERROR_SD_RPC_H5_TRANSPORT_STATE = NRF_ERROR_SD_RPC_BASE_NUM + 41
+NRF_ERROR_SD_RPC_H5_TRANSPORT_NO_RESPONSE = NRF_ERROR_SD_RPC_BASE_NUM + 42
+NRF_ERROR_SD_RPC_H5_TRANSPORT_SLIP_PAYLOAD_SIZE = NRF_ERROR_SD_RPC_BASE_NUM + 43
+NRF_ERROR_SD_RPC_H5_TRANSPORT_SLIP_CALCULATED_PAYLOAD_SIZE = NRF_ERROR_SD_RPC_BASE_NUM + 44
+NRF_ERROR_SD_RPC_H5_TRANSPORT_SLIP_DECODING = NRF_ERROR_SD_RPC_BASE_NUM + 45
+NRF_ERROR_SD_RPC_H5_TRANSPORT_HEADER_CHECKSUM = NRF_ERROR_SD_RPC_BASE_NUM + 46
+NRF_ERROR_SD_RPC_H5_TRANSPORT_PACKET_CHECKSUM = NRF_ERROR_SD_RPC_BASE_NUM + 47
+NRF_ERROR_SD_RPC_H5_TRANSPORT_ALREADY_OPEN = NRF_ERROR_SD_RPC_BASE_NUM + 48
+NRF_ERROR_SD_RPC_H5_TRANSPORT_ALREADY_CLOSED = NRF_ERROR_SD_RPC_BASE_NUM + 49
+NRF_ERROR_SD_RPC_H5_TRANSPORT_INTERNAL_ERROR = NRF_ERROR_SD_RPC_BASE_NUM + 50
+NRF_ERROR_SD_RPC_SERIAL_PORT = NRF_ERROR_SD_RPC_BASE_NUM + 60
+NRF_ERROR_SD_RPC_SERIAL_PORT_STATE = NRF_ERROR_SD_RPC_BASE_NUM + 61
+NRF_ERROR_SD_RPC_SERIAL_PORT_ALREADY_OPEN = NRF_ERROR_SD_RPC_BASE_NUM + 62
+NRF_ERROR_SD_RPC_SERIAL_PORT_ALREADY_CLOSED = NRF_ERROR_SD_RPC_BASE_NUM + 63
+NRF_ERROR_SD_RPC_SERIAL_PORT_INTERNAL_ERROR = NRF_ERROR_SD_RPC_BASE_NUM + 64
+
+SD_RPC_FLOW_CONTROL_NONE = 0
+SD_RPC_FLOW_CONTROL_HARDWARE = 1
+SD_RPC_PARITY_NONE = 0
+SD_RPC_PARITY_EVEN = 1
+
+"""
+ble_hci.h
+"""
+
+BLE_HCI_STATUS_CODE_SUCCESS = 0x00
+BLE_HCI_STATUS_CODE_UNKNOWN_BTLE_COMMAND = 0x01
+BLE_HCI_STATUS_CODE_UNKNOWN_CONNECTION_IDENTIFIER = 0x02
+BLE_HCI_AUTHENTICATION_FAILURE = 0x05
+BLE_HCI_STATUS_CODE_PIN_OR_KEY_MISSING = 0x06
+BLE_HCI_MEMORY_CAPACITY_EXCEEDED = 0x07
+BLE_HCI_CONNECTION_TIMEOUT = 0x08
+BLE_HCI_STATUS_CODE_COMMAND_DISALLOWED = 0x0C
+BLE_HCI_STATUS_CODE_INVALID_BTLE_COMMAND_PARAMETERS = 0x12
+BLE_HCI_REMOTE_USER_TERMINATED_CONNECTION = 0x13
+BLE_HCI_REMOTE_DEV_TERMINATION_DUE_TO_LOW_RESOURCES = 0x14
+BLE_HCI_REMOTE_DEV_TERMINATION_DUE_TO_POWER_OFF = 0x15
+BLE_HCI_LOCAL_HOST_TERMINATED_CONNECTION = 0x16
+BLE_HCI_UNSUPPORTED_REMOTE_FEATURE = 0x1A
+BLE_HCI_STATUS_CODE_INVALID_LMP_PARAMETERS = 0x1E
+BLE_HCI_STATUS_CODE_UNSPECIFIED_ERROR = 0x1F
+BLE_HCI_STATUS_CODE_LMP_RESPONSE_TIMEOUT = 0x22
+BLE_HCI_STATUS_CODE_LMP_ERROR_TRANSACTION_COLLISION = 0x23
+BLE_HCI_STATUS_CODE_LMP_PDU_NOT_ALLOWED = 0x24
+BLE_HCI_INSTANT_PASSED = 0x28
+BLE_HCI_PAIRING_WITH_UNIT_KEY_UNSUPPORTED = 0x29
+BLE_HCI_DIFFERENT_TRANSACTION_COLLISION = 0x2A
+BLE_HCI_PARAMETER_OUT_OF_MANDATORY_RANGE = 0x30
+BLE_HCI_CONTROLLER_BUSY = 0x3A
+BLE_HCI_CONN_INTERVAL_UNACCEPTABLE = 0x3B
+BLE_HCI_DIRECTED_ADVERTISER_TIMEOUT = 0x3C
+BLE_HCI_CONN_TERMINATED_DUE_TO_MIC_FAILURE = 0x3D
+BLE_HCI_CONN_FAILED_TO_BE_ESTABLISHED = 0x3E
+
+"""
+ble.h / ble_types.h
+"""
+
+BLE_EVT_BASE = 0x01
+BLE_GAP_EVT_BASE = 0x10
+BLE_GATTC_EVT_BASE = 0x30
+BLE_GATTS_EVT_BASE = 0x50
+BLE_L2CAP_EVT_BASE = 0x70
+
+BLE_EVT_USER_MEM_REQUEST = BLE_EVT_BASE + 0
+BLE_EVT_USER_MEM_RELEASE = BLE_EVT_BASE + 1
+
+BLE_COMMON_OPT_BASE = 0x01
+BLE_GAP_OPT_BASE = 0x20
+BLE_COMMON_OPT_PA_LNA = BLE_COMMON_OPT_BASE + 0
+BLE_COMMON_OPT_CONN_EVT_EXT = BLE_COMMON_OPT_BASE + 1
+
+BLE_CONN_CFG_BASE = 0x20
+BLE_CONN_CFG_GAP = BLE_CONN_CFG_BASE + 0
+BLE_CONN_CFG_GATTC = BLE_CONN_CFG_BASE + 1
+BLE_CONN_CFG_GATTS = BLE_CONN_CFG_BASE + 2
+BLE_CONN_CFG_GATT = BLE_CONN_CFG_BASE + 3
+BLE_CONN_CFG_L2CAP = BLE_CONN_CFG_BASE + 4
+
+BLE_CFG_BASE = 0x01
+BLE_GAP_CFG_BASE = 0x40
+BLE_GATTS_CFG_BASE = 0xA0
+BLE_COMMON_CFG_VS_UUID = BLE_CFG_BASE + 0
+
+BLE_ERROR_NOT_ENABLED = NRF_ERROR_STK_BASE_NUM + 0x001
+BLE_ERROR_INVALID_CONN_HANDLE = NRF_ERROR_STK_BASE_NUM + 0x002
+BLE_ERROR_INVALID_ATTR_HANDLE = NRF_ERROR_STK_BASE_NUM + 0x003
+BLE_ERROR_INVALID_ADV_HANDLE = NRF_ERROR_STK_BASE_NUM + 0x004
+BLE_ERROR_INVALID_ROLE = NRF_ERROR_STK_BASE_NUM + 0x005
+BLE_ERROR_BLOCKED_BY_OTHER_LINKS = NRF_ERROR_STK_BASE_NUM + 0x006
+
+BLE_USER_MEM_TYPE_INVALID = 0x00
+BLE_USER_MEM_TYPE_GATTS_QUEUED_WRITES = 0x01
+
+BLE_CONN_CFG_TAG_DEFAULT = 0
+
+BLE_CONN_HANDLE_INVALID = 0xFFFF
+BLE_CONN_HANDLE_ALL = 0xFFFE
+
+BLE_UUID_TYPE_UNKNOWN = 0x00
+BLE_UUID_TYPE_BLE = 0x01
+BLE_UUID_TYPE_VENDOR_BEGIN = 0x02
+BLE_UUID_VS_COUNT_DEFAULT = 10
+
+"""
+ble_gap.h
+"""
+
+BLE_GAP_EVT_CONNECTED = BLE_GAP_EVT_BASE + 0x00
+BLE_GAP_EVT_DISCONNECTED = BLE_GAP_EVT_BASE + 0x01
+BLE_GAP_EVT_CONN_PARAM_UPDATE = BLE_GAP_EVT_BASE + 0x02
+BLE_GAP_EVT_SEC_PARAMS_REQUEST = BLE_GAP_EVT_BASE + 0x03
+BLE_GAP_EVT_SEC_INFO_REQUEST = BLE_GAP_EVT_BASE + 0x04
+BLE_GAP_EVT_PASSKEY_DISPLAY = BLE_GAP_EVT_BASE + 0x05
+BLE_GAP_EVT_KEY_PRESSED = BLE_GAP_EVT_BASE + 0x06
+BLE_GAP_EVT_AUTH_KEY_REQUEST = BLE_GAP_EVT_BASE + 0x07
+BLE_GAP_EVT_LESC_DHKEY_REQUEST = BLE_GAP_EVT_BASE + 0x08
+BLE_GAP_EVT_AUTH_STATUS = BLE_GAP_EVT_BASE + 0x09
+BLE_GAP_EVT_CONN_SEC_UPDATE = BLE_GAP_EVT_BASE + 0x0A
+BLE_GAP_EVT_TIMEOUT = BLE_GAP_EVT_BASE + 0x0B
+BLE_GAP_EVT_RSSI_CHANGED = BLE_GAP_EVT_BASE + 0x0C
+BLE_GAP_EVT_ADV_REPORT = BLE_GAP_EVT_BASE + 0x0D
+BLE_GAP_EVT_SEC_REQUEST = BLE_GAP_EVT_BASE + 0x0E
+BLE_GAP_EVT_CONN_PARAM_UPDATE_REQUEST = BLE_GAP_EVT_BASE + 0x0F
+BLE_GAP_EVT_SCAN_REQ_REPORT = BLE_GAP_EVT_BASE + 0x10
+BLE_GAP_EVT_PHY_UPDATE_REQUEST = BLE_GAP_EVT_BASE + 0x11
+BLE_GAP_EVT_PHY_UPDATE = BLE_GAP_EVT_BASE + 0x12
+BLE_GAP_EVT_DATA_LENGTH_UPDATE_REQUEST = BLE_GAP_EVT_BASE + 0x13
+BLE_GAP_EVT_DATA_LENGTH_UPDATE = BLE_GAP_EVT_BASE + 0x14
+
+NRF_GAP_ERR_BASE = NRF_ERROR_STK_BASE_NUM + 0x200
+BLE_ERROR_GAP_UUID_LIST_MISMATCH = NRF_GAP_ERR_BASE + 0x000
+BLE_ERROR_GAP_DISCOVERABLE_WITH_WHITELIST = NRF_GAP_ERR_BASE + 0x001
+BLE_ERROR_GAP_INVALID_BLE_ADDR = NRF_GAP_ERR_BASE + 0x002
+BLE_ERROR_GAP_WHITELIST_IN_USE = NRF_GAP_ERR_BASE + 0x003
+BLE_ERROR_GAP_DEVICE_IDENTITIES_IN_USE = NRF_GAP_ERR_BASE + 0x004
+BLE_ERROR_GAP_DEVICE_IDENTITIES_DUPLICATE = NRF_GAP_ERR_BASE + 0x005
+
+BLE_GAP_OPT_CH_MAP = BLE_GAP_OPT_BASE + 0
+BLE_GAP_OPT_LOCAL_CONN_LATENCY = BLE_GAP_OPT_BASE + 1
+BLE_GAP_OPT_PASSKEY = BLE_GAP_OPT_BASE + 2
+BLE_GAP_OPT_SCAN_REQ_REPORT = BLE_GAP_OPT_BASE + 3
+BLE_GAP_OPT_COMPAT_MODE_1 = BLE_GAP_OPT_BASE + 4
+BLE_GAP_OPT_AUTH_PAYLOAD_TIMEOUT = BLE_GAP_OPT_BASE + 5
+BLE_GAP_OPT_SLAVE_LATENCY_DISABLE = BLE_GAP_OPT_BASE + 6
+
+BLE_GAP_CFG_ROLE_COUNT = BLE_GAP_CFG_BASE + 0
+BLE_GAP_CFG_DEVICE_NAME = BLE_GAP_CFG_BASE + 1
+
+BLE_GAP_ADDR_LEN = 6
+BLE_GAP_ADDR_TYPE_PUBLIC = 0x00
+BLE_GAP_ADDR_TYPE_RANDOM_STATIC = 0x01
+BLE_GAP_ADDR_TYPE_RANDOM_PRIVATE_RESOLVABLE = 0x02
+BLE_GAP_ADDR_TYPE_RANDOM_PRIVATE_NON_RESOLVABLE = 0x03
+BLE_GAP_DEFAULT_PRIVATE_ADDR_CYCLE_INTERVAL_S = 900
+
+BLE_GAP_PRIVACY_MODE_OFF = 0x00
+BLE_GAP_PRIVACY_MODE_DEVICE_PRIVACY = 0x01
+
+BLE_GAP_ADV_TYPE_ADV_IND = 0x00
+BLE_GAP_ADV_TYPE_ADV_DIRECT_IND = 0x01
+BLE_GAP_ADV_TYPE_ADV_SCAN_IND = 0x02
+BLE_GAP_ADV_TYPE_ADV_NONCONN_IND = 0x03
+
+BLE_GAP_ADV_FP_ANY = 0x00
+BLE_GAP_ADV_FP_FILTER_SCANREQ = 0x01
+BLE_GAP_ADV_FP_FILTER_CONNREQ = 0x02
+BLE_GAP_ADV_FP_FILTER_BOTH = 0x03
+
+BLE_GAP_ADV_INTERVAL_MIN = 0x000020
+BLE_GAP_ADV_INTERVAL_MAX = 0x004000
+BLE_GAP_ADV_SET_DATA_SIZE_MAX = 31
+BLE_GAP_ADV_TIMEOUT_LIMITED_MAX = 180
+BLE_GAP_ADV_TIMEOUT_HIGH_DUTY_MAX = 1280
+
+BLE_GAP_AD_TYPE_FLAGS = 0x01
+BLE_GAP_AD_TYPE_16BIT_SERVICE_UUID_MORE_AVAILABLE = 0x02
+BLE_GAP_AD_TYPE_16BIT_SERVICE_UUID_COMPLETE = 0x03
+BLE_GAP_AD_TYPE_32BIT_SERVICE_UUID_MORE_AVAILABLE = 0x04
+BLE_GAP_AD_TYPE_32BIT_SERVICE_UUID_COMPLETE = 0x05
+BLE_GAP_AD_TYPE_128BIT_SERVICE_UUID_MORE_AVAILABLE = 0x06
+BLE_GAP_AD_TYPE_128BIT_SERVICE_UUID_COMPLETE = 0x07
+BLE_GAP_AD_TYPE_SHORT_LOCAL_NAME = 0x08
+BLE_GAP_AD_TYPE_COMPLETE_LOCAL_NAME = 0x09
+BLE_GAP_AD_TYPE_TX_POWER_LEVEL = 0x0A
+BLE_GAP_AD_TYPE_CLASS_OF_DEVICE = 0x0D
+BLE_GAP_AD_TYPE_SIMPLE_PAIRING_HASH_C = 0x0E
+BLE_GAP_AD_TYPE_SIMPLE_PAIRING_RANDOMIZER_R = 0x0F
+BLE_GAP_AD_TYPE_SECURITY_MANAGER_TK_VALUE = 0x10
+BLE_GAP_AD_TYPE_SECURITY_MANAGER_OOB_FLAGS = 0x11
+BLE_GAP_AD_TYPE_SLAVE_CONNECTION_INTERVAL_RANGE = 0x12
+BLE_GAP_AD_TYPE_SOLICITED_SERVICE_UUIDS_16BIT = 0x14
+BLE_GAP_AD_TYPE_SOLICITED_SERVICE_UUIDS_128BIT = 0x15
+BLE_GAP_AD_TYPE_SERVICE_DATA = 0x16
+BLE_GAP_AD_TYPE_PUBLIC_TARGET_ADDRESS = 0x17
+BLE_GAP_AD_TYPE_RANDOM_TARGET_ADDRESS = 0x18
+BLE_GAP_AD_TYPE_APPEARANCE = 0x19
+BLE_GAP_AD_TYPE_ADVERTISING_INTERVAL = 0x1A
+BLE_GAP_AD_TYPE_LE_BLUETOOTH_DEVICE_ADDRESS = 0x1B
+BLE_GAP_AD_TYPE_LE_ROLE = 0x1C
+BLE_GAP_AD_TYPE_SIMPLE_PAIRING_HASH_C256 = 0x1D
+BLE_GAP_AD_TYPE_SIMPLE_PAIRING_RANDOMIZER_R256 = 0x1E
+BLE_GAP_AD_TYPE_SERVICE_DATA_32BIT_UUID = 0x20
+BLE_GAP_AD_TYPE_SERVICE_DATA_128BIT_UUID = 0x21
+BLE_GAP_AD_TYPE_URI = 0x24
+BLE_GAP_AD_TYPE_3D_INFORMATION_DATA = 0x3D
+BLE_GAP_AD_TYPE_MANUFACTURER_SPECIFIC_DATA = 0xFF
+
+BLE_GAP_SCAN_INTERVAL_MIN = 0x0004
+BLE_GAP_SCAN_INTERVAL_MAX = 0xFFFF
+BLE_GAP_SCAN_WINDOW_MIN = 0x0004
+BLE_GAP_SCAN_WINDOW_MAX = 0xFFFF
+BLE_GAP_SCAN_TIMEOUT_MIN = 0x0001
+BLE_GAP_SCAN_TIMEOUT_MAX = 0xFFFF
+
+BLE_GAP_CP_MIN_CONN_INTVL_NONE = 0xFFFF
+BLE_GAP_CP_MIN_CONN_INTVL_MIN = 0x0006
+BLE_GAP_CP_MIN_CONN_INTVL_MAX = 0x0C80
+BLE_GAP_CP_MAX_CONN_INTVL_NONE = 0xFFFF
+BLE_GAP_CP_MAX_CONN_INTVL_MIN = 0x0006
+BLE_GAP_CP_MAX_CONN_INTVL_MAX = 0x0C80
+BLE_GAP_CP_SLAVE_LATENCY_MAX = 0x01F3
+BLE_GAP_CP_CONN_SUP_TIMEOUT_NONE = 0xFFFF
+BLE_GAP_CP_CONN_SUP_TIMEOUT_MIN = 0x000A
+BLE_GAP_CP_CONN_SUP_TIMEOUT_MAX = 0x0C80
+
+BLE_GAP_DEVNAME_DEFAULT = "nRF5x"
+BLE_GAP_DEVNAME_DEFAULT_LEN = 31
+BLE_GAP_DEVNAME_MAX_LEN = 248
+
+BLE_GAP_CONN_COUNT_DEFAULT = 1
+BLE_GAP_EVENT_LENGTH_MIN = 2
+BLE_GAP_EVENT_LENGTH_DEFAULT = 3
+BLE_GAP_ROLE_COUNT_PERIPH_DEFAULT = 1
+BLE_GAP_ROLE_COUNT_CENTRAL_DEFAULT = 3
+BLE_GAP_ROLE_COUNT_CENTRAL_SEC_DEFAULT = 1
+
+BLE_GAP_ROLE_INVALID = 0x0
+BLE_GAP_ROLE_PERIPH = 0x1
+BLE_GAP_ROLE_CENTRAL = 0x2
+
+BLE_GAP_TIMEOUT_SRC_ADVERTISING = 0x00
+BLE_GAP_TIMEOUT_SRC_SCAN = 0x01
+BLE_GAP_TIMEOUT_SRC_CONN = 0x02
+BLE_GAP_TIMEOUT_SRC_AUTH_PAYLOAD = 0x03
+
+BLE_GAP_PHY_AUTO = 0x00
+BLE_GAP_PHY_1MBPS = 0x01
+BLE_GAP_PHY_2MBPS = 0x02
+BLE_GAP_PHY_CODED = 0x04
+
+BLE_GAP_RSSI_THRESHOLD_INVALID = 0xFF
+
+BLE_GAP_AUTH_PAYLOAD_TIMEOUT_MAX = 48000
+BLE_GAP_AUTH_PAYLOAD_TIMEOUT_MIN = 1
+
+BLE_GAP_IO_CAPS_DISPLAY_ONLY = 0x00
+BLE_GAP_IO_CAPS_DISPLAY_YESNO = 0x01
+BLE_GAP_IO_CAPS_KEYBOARD_ONLY = 0x02
+BLE_GAP_IO_CAPS_NONE = 0x03
+BLE_GAP_IO_CAPS_KEYBOARD_DISPLAY = 0x04
+
+BLE_GAP_AUTH_KEY_TYPE_NONE = 0x00
+BLE_GAP_AUTH_KEY_TYPE_PASSKEY = 0x01
+BLE_GAP_AUTH_KEY_TYPE_OOB = 0x02
+
+BLE_GAP_PASSKEY_LEN = 6
+BLE_GAP_SEC_KEY_LEN = 16
+BLE_GAP_SEC_RAND_LEN = 8
+BLE_GAP_LESC_P256_PK_LEN = 64
+BLE_GAP_LESC_DHKEY_LEN = 32
+
+BLE_GAP_SEC_STATUS_SUCCESS = 0x00
+BLE_GAP_SEC_STATUS_TIMEOUT = 0x01
+BLE_GAP_SEC_STATUS_PDU_INVALID = 0x02
+BLE_GAP_SEC_STATUS_RFU_RANGE1_BEGIN = 0x03
+BLE_GAP_SEC_STATUS_RFU_RANGE1_END = 0x80
+BLE_GAP_SEC_STATUS_PASSKEY_ENTRY_FAILED = 0x81
+BLE_GAP_SEC_STATUS_OOB_NOT_AVAILABLE = 0x82
+BLE_GAP_SEC_STATUS_AUTH_REQ = 0x83
+BLE_GAP_SEC_STATUS_CONFIRM_VALUE = 0x84
+BLE_GAP_SEC_STATUS_PAIRING_NOT_SUPP = 0x85
+BLE_GAP_SEC_STATUS_ENC_KEY_SIZE = 0x86
+BLE_GAP_SEC_STATUS_SMP_CMD_UNSUPPORTED = 0x87
+BLE_GAP_SEC_STATUS_UNSPECIFIED = 0x88
+BLE_GAP_SEC_STATUS_REPEATED_ATTEMPTS = 0x89
+BLE_GAP_SEC_STATUS_INVALID_PARAMS = 0x8A
+BLE_GAP_SEC_STATUS_DHKEY_FAILURE = 0x8B
+BLE_GAP_SEC_STATUS_NUM_COMP_FAILURE = 0x8C
+BLE_GAP_SEC_STATUS_BR_EDR_IN_PROG = 0x8D
+BLE_GAP_SEC_STATUS_X_TRANS_KEY_DISALLOWED = 0x8E
+
+BLE_GAP_SEC_STATUS_SOURCE_LOCAL = 0x00
+BLE_GAP_SEC_STATUS_SOURCE_REMOTE = 0x01
+
+"""
+ble_gatt.h
+"""
+
+BLE_GATT_ATT_MTU_DEFAULT = 23
+BLE_GATT_HANDLE_INVALID = 0x0000
+BLE_GATT_HANDLE_START = 0x0001
+BLE_GATT_HANDLE_END = 0xFFFF
+
+BLE_GATT_TIMEOUT_SRC_PROTOCOL = 0x00
+
+BLE_GATT_OP_INVALID = 0x00
+BLE_GATT_OP_WRITE_REQ = 0x01
+BLE_GATT_OP_WRITE_CMD = 0x02
+BLE_GATT_OP_SIGN_WRITE_CMD = 0x03
+BLE_GATT_OP_PREP_WRITE_REQ = 0x04
+BLE_GATT_OP_EXEC_WRITE_REQ = 0x05
+
+BLE_GATT_EXEC_WRITE_FLAG_PREPARED_CANCEL = 0x00
+BLE_GATT_EXEC_WRITE_FLAG_PREPARED_WRITE = 0x01
+
+BLE_GATT_HVX_INVALID = 0x00
+BLE_GATT_HVX_NOTIFICATION = 0x01
+BLE_GATT_HVX_INDICATION = 0x02
+
+BLE_GATT_STATUS_SUCCESS = 0x0000
+BLE_GATT_STATUS_UNKNOWN = 0x0001
+BLE_GATT_STATUS_ATTERR_INVALID = 0x0100
+BLE_GATT_STATUS_ATTERR_INVALID_HANDLE = 0x0101
+BLE_GATT_STATUS_ATTERR_READ_NOT_PERMITTED = 0x0102
+BLE_GATT_STATUS_ATTERR_WRITE_NOT_PERMITTED = 0x0103
+BLE_GATT_STATUS_ATTERR_INVALID_PDU = 0x0104
+BLE_GATT_STATUS_ATTERR_INSUF_AUTHENTICATION = 0x0105
+BLE_GATT_STATUS_ATTERR_REQUEST_NOT_SUPPORTED = 0x0106
+BLE_GATT_STATUS_ATTERR_INVALID_OFFSET = 0x0107
+BLE_GATT_STATUS_ATTERR_INSUF_AUTHORIZATION = 0x0108
+BLE_GATT_STATUS_ATTERR_PREPARE_QUEUE_FULL = 0x0109
+BLE_GATT_STATUS_ATTERR_ATTRIBUTE_NOT_FOUND = 0x010A
+BLE_GATT_STATUS_ATTERR_ATTRIBUTE_NOT_LONG = 0x010B
+BLE_GATT_STATUS_ATTERR_INSUF_ENC_KEY_SIZE = 0x010C
+BLE_GATT_STATUS_ATTERR_INVALID_ATT_VAL_LENGTH = 0x010D
+BLE_GATT_STATUS_ATTERR_UNLIKELY_ERROR = 0x010E
+BLE_GATT_STATUS_ATTERR_INSUF_ENCRYPTION = 0x010F
+BLE_GATT_STATUS_ATTERR_UNSUPPORTED_GROUP_TYPE = 0x0110
+BLE_GATT_STATUS_ATTERR_INSUF_RESOURCES = 0x0111
+BLE_GATT_STATUS_ATTERR_RFU_RANGE1_BEGIN = 0x0112
+BLE_GATT_STATUS_ATTERR_RFU_RANGE1_END = 0x017F
+BLE_GATT_STATUS_ATTERR_APP_BEGIN = 0x0180
+BLE_GATT_STATUS_ATTERR_APP_END = 0x019F
+BLE_GATT_STATUS_ATTERR_RFU_RANGE2_BEGIN = 0x01A0
+BLE_GATT_STATUS_ATTERR_RFU_RANGE2_END = 0x01DF
+BLE_GATT_STATUS_ATTERR_RFU_RANGE3_BEGIN = 0x01E0
+BLE_GATT_STATUS_ATTERR_RFU_RANGE3_END = 0x01FC
+BLE_GATT_STATUS_ATTERR_CPS_CCCD_CONFIG_ERROR = 0x01FD
+BLE_GATT_STATUS_ATTERR_CPS_PROC_ALR_IN_PROG = 0x01FE
+BLE_GATT_STATUS_ATTERR_CPS_OUT_OF_RANGE = 0x01FF
+
+"""
+ble_gattc.h
+"""
+
+BLE_GATTC_EVT_PRIM_SRVC_DISC_RSP = BLE_GATTC_EVT_BASE + 0x00
+BLE_GATTC_EVT_REL_DISC_RSP = BLE_GATTC_EVT_BASE + 0x01
+BLE_GATTC_EVT_CHAR_DISC_RSP = BLE_GATTC_EVT_BASE + 0x02
+BLE_GATTC_EVT_DESC_DISC_RSP = BLE_GATTC_EVT_BASE + 0x03
+BLE_GATTC_EVT_ATTR_INFO_DISC_RSP = BLE_GATTC_EVT_BASE + 0x04
+BLE_GATTC_EVT_CHAR_VAL_BY_UUID_READ_RSP = BLE_GATTC_EVT_BASE + 0x05
+BLE_GATTC_EVT_READ_RSP = BLE_GATTC_EVT_BASE + 0x06
+BLE_GATTC_EVT_CHAR_VALS_READ_RSP = BLE_GATTC_EVT_BASE + 0x07
+BLE_GATTC_EVT_WRITE_RSP = BLE_GATTC_EVT_BASE + 0x08
+BLE_GATTC_EVT_HVX = BLE_GATTC_EVT_BASE + 0x09
+BLE_GATTC_EVT_EXCHANGE_MTU_RSP = BLE_GATTC_EVT_BASE + 0x0A
+BLE_GATTC_EVT_TIMEOUT = BLE_GATTC_EVT_BASE + 0x0B
+BLE_GATTC_EVT_WRITE_CMD_TX_COMPLETE = BLE_GATTC_EVT_BASE + 0x0C
+
+BLE_GATTC_ATTR_INFO_FORMAT_16BIT = 1
+BLE_GATTC_ATTR_INFO_FORMAT_128BIT = 2
+BLE_GATTC_WRITE_CMD_TX_QUEUE_SIZE_DEFAULT = 1
+
+"""
+ble_gatts.h
+"""
+
+BLE_GATTS_EVT_WRITE = BLE_GATTS_EVT_BASE + 0x00
+BLE_GATTS_EVT_RW_AUTHORIZE_REQUEST = BLE_GATTS_EVT_BASE + 0x01
+BLE_GATTS_EVT_SYS_ATTR_MISSING = BLE_GATTS_EVT_BASE + 0x02
+BLE_GATTS_EVT_HVC = BLE_GATTS_EVT_BASE + 0x03
+BLE_GATTS_EVT_SC_CONFIRM = BLE_GATTS_EVT_BASE + 0x04
+BLE_GATTS_EVT_EXCHANGE_MTU_REQUEST = BLE_GATTS_EVT_BASE + 0x05
+BLE_GATTS_EVT_TIMEOUT = BLE_GATTS_EVT_BASE + 0x06
+BLE_GATTS_EVT_HVN_TX_COMPLETE = BLE_GATTS_EVT_BASE + 0x07
+
+BLE_GATTS_CFG_SERVICE_CHANGED = BLE_GATTS_CFG_BASE + 0
+BLE_GATTS_CFG_ATTR_TAB_SIZE = BLE_GATTS_CFG_BASE + 1
+
+BLE_GATTS_SRVC_TYPE_INVALID = 0x00
+BLE_GATTS_SRVC_TYPE_PRIMARY = 0x01
+BLE_GATTS_SRVC_TYPE_SECONDARY = 0x02
+
+BLE_GATTS_ATTR_TAB_SIZE_MIN = 248
+BLE_GATTS_ATTR_TAB_SIZE_DEFAULT = 1408
+BLE_GATTS_FIX_ATTR_LEN_MAX = 510
+BLE_GATTS_VAR_ATTR_LEN_MAX = 512
+BLE_GATTS_SERVICE_CHANGED_DEFAULT = 1
+BLE_GATTS_HVN_TX_QUEUE_SIZE_DEFAULT = 1
+
+BLE_GATTS_VLOC_INVALID = 0x00
+BLE_GATTS_VLOC_STACK = 0x01
+BLE_GATTS_VLOC_USER = 0x02
+
+BLE_GATTS_AUTHORIZE_TYPE_INVALID = 0x00
+BLE_GATTS_AUTHORIZE_TYPE_READ = 0x01
+BLE_GATTS_AUTHORIZE_TYPE_WRITE = 0x02
+
+BLE_GATTS_OP_INVALID = 0x00
+BLE_GATTS_OP_WRITE_REQ = 0x01
+BLE_GATTS_OP_WRITE_CMD = 0x02
+BLE_GATTS_OP_SIGN_WRITE_CMD = 0x03
+BLE_GATTS_OP_PREP_WRITE_REQ = 0x04
+BLE_GATTS_OP_EXEC_WRITE_REQ_CANCEL = 0x05
+BLE_GATTS_OP_EXEC_WRITE_REQ_NOW = 0x06
+
+BLE_GATTS_SYS_ATTR_FLAG_SYS_SRVCS = 1 << 0
+BLE_GATTS_SYS_ATTR_FLAG_USR_SRVCS = 1 << 1
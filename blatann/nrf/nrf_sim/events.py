@@ -0,0 +1,61 @@
+"""
+Builders for the ``ble_evt_t`` records handed to the driver's event handler
+"""
+from blatann.nrf.nrf_sim import constants as c
+from blatann.nrf.nrf_sim.structs import _Record, uint8_array, ble_gap_addr_t, ble_gap_conn_params_t, ble_uuid_t
+
+
+def _event(evt_id, group, conn_handle, name, extra, params):
+    group_evt = _Record(conn_handle=conn_handle, params=_Record(**{name: _Record(**params)}), **extra)
+    return _Record(header=_Record(evt_id=evt_id), evt=_Record(**{group: group_evt}))
+
+
+def common_event(evt_id, conn_handle, name, **params):
+    return _event(evt_id, "common_evt", conn_handle, name, {}, params)
+
+
+def gap_event(evt_id, conn_handle, name, **params):
+    return _event(evt_id, "gap_evt", conn_handle, name, {}, params)
+
+
+def gattc_event(evt_id, conn_handle, name, gatt_status=c.BLE_GATT_STATUS_SUCCESS, error_handle=0, **params):
+    extra = {"gatt_status": gatt_status, "error_handle": error_handle}
+    return _event(evt_id, "gattc_evt", conn_handle, name, extra, params)
+
+
+def gatts_event(evt_id, conn_handle, name, **params):
+    return _event(evt_id, "gatts_evt", conn_handle, name, {}, params)
+
+
+def data_array(data):
+    """
+    Creates the (array, length) pair for the variable-length data member of an event
+    """
+    return uint8_array.from_bytes(data), len(data)
+
+
+def addr_struct(addr_type, addr):
+    """
+    :param addr_type: The address type
+    :param addr: The address bytes, MSB first
+    """
+    s = ble_gap_addr_t()
+    s.addr_type = addr_type
+    s.addr = uint8_array.from_bytes(bytes(reversed(addr)))
+    return s
+
+
+def conn_params_struct(conn_params):
+    """
+    :param conn_params: tuple of (min_interval, max_interval, slave_latency, sup_timeout) in SoftDevice units
+    """
+    s = ble_gap_conn_params_t()
+    s.min_conn_interval, s.max_conn_interval, s.slave_latency, s.conn_sup_timeout = conn_params
+    return s
+
+
+def uuid_struct(uuid, uuid_type):
+    s = ble_uuid_t()
+    s.uuid = uuid
+    s.type = uuid_type
+    return s
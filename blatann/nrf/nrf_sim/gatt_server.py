@@ -0,0 +1,337 @@
+"""
+Simulated GATT server attribute table of a single adapter
+"""
+import struct
+
+from blatann.nrf.nrf_sim import constants as c
+
+UUID_PRIMARY_SERVICE = 0x2800
+UUID_SECONDARY_SERVICE = 0x2801
+UUID_CHARACTERISTIC = 0x2803
+UUID_CHAR_USER_DESC = 0x2901
+UUID_CCCD = 0x2902
+UUID_SCCD = 0x2903
+UUID_CHAR_PRESENTATION_FORMAT = 0x2904
+UUID_GAP_SERVICE = 0x1800
+UUID_GATT_SERVICE = 0x1801
+UUID_DEVICE_NAME = 0x2A00
+UUID_APPEARANCE = 0x2A01
+UUID_PPCP = 0x2A04
+UUID_SERVICE_CHANGED = 0x2A05
+
+CCCD_NOTIFY = 0x01
+CCCD_INDICATE = 0x02
+
+_OPEN = (1, 1)
+_NO_ACCESS = (0, 0)
+
+
+class Attribute(object):
+    __slots__ = ("handle", "uuid", "uuid_type", "value", "max_len", "vlen", "read_perm", "write_perm",
+                 "rd_auth", "wr_auth", "per_connection", "props")
+
+    def __init__(self, handle, uuid, uuid_type=c.BLE_UUID_TYPE_BLE, value=b"", max_len=None, vlen=True,
+                 read_perm=_OPEN, write_perm=_NO_ACCESS, rd_auth=False, wr_auth=False, per_connection=False):
+        self.handle = handle
+        self.uuid = uuid
+        self.uuid_type = uuid_type
+        self.value = bytearray(value)
+        self.max_len = len(value) if max_len is None else max_len
+        self.vlen = vlen
+        self.read_perm = read_perm
+        self.write_perm = write_perm
+        self.rd_auth = rd_auth
+        self.wr_auth = wr_auth
+        self.per_connection = per_connection
+        self.props = None
+
+    @staticmethod
+    def from_md(attr_md):
+        """
+        :return: (read_perm, write_perm, vlen, rd_auth, wr_auth) from a ble_gatts_attr_md_t
+        """
+        if attr_md is None:
+            return _OPEN, _NO_ACCESS, 0, False, False
+        return ((attr_md.read_perm.sm, attr_md.read_perm.lv), (attr_md.write_perm.sm, attr_md.write_perm.lv),
+                attr_md.vlen, bool(attr_md.rd_auth), bool(attr_md.wr_auth))
+
+
+class Service(object):
+    __slots__ = ("start_handle", "end_handle", "uuid", "uuid_type", "primary")
+
+    def __init__(self, start_handle, uuid, uuid_type, primary):
+        self.start_handle = start_handle
+        self.end_handle = start_handle
+        self.uuid = uuid
+        self.uuid_type = uuid_type
+        self.primary = primary
+
+
+class Characteristic(object):
+    __slots__ = ("decl_handle", "value_handle", "cccd_handle", "props", "uuid", "uuid_type")
+
+    def __init__(self, decl_handle, value_handle, props, uuid, uuid_type):
+        self.decl_handle = decl_handle
+        self.value_handle = value_handle
+        self.cccd_handle = 0
+        self.props = props
+        self.uuid = uuid
+        self.uuid_type = uuid_type
+
+
+class GattServer(object):
+    """
+    The attribute table of an adapter. Handles are 1-based indexes into :attr:`attributes`.
+    Values of per-connection attributes (CCCDs) are stored per connection handle
+    """
+    def __init__(self, adapter):
+        self.adapter = adapter
+        self.attributes = []
+        self.services = []
+        self.characteristics = []
+        self._chars_by_value_handle = {}
+        self._connection_values = {}
+        self.attr_table_size = c.BLE_GATTS_ATTR_TAB_SIZE_DEFAULT
+        self.service_changed_handle = 0
+
+    def _add(self, uuid, uuid_type=c.BLE_UUID_TYPE_BLE, **kwargs):
+        attr = Attribute(len(self.attributes) + 1, uuid, uuid_type, **kwargs)
+        self.attributes.append(attr)
+        if self.services:
+            self.services[-1].end_handle = attr.handle
+        return attr
+
+    def get(self, handle):
+        if 0 < handle <= len(self.attributes):
+            return self.attributes[handle - 1]
+        return None
+
+    @property
+    def last_handle(self):
+        return len(self.attributes)
+
+    def uuid_bytes(self, uuid, uuid_type):
+        """
+        :return: the UUID as it appears in attribute values on the air, 2 bytes for SIG UUIDs otherwise 16
+        """
+        uuid128 = self.adapter.uuid_to_128(uuid, uuid_type)
+        if uuid128 is None:
+            return struct.pack("<H", uuid)
+        return uuid128
+
+    """
+    Table construction
+    """
+
+    def populate_builtin(self, service_changed, device_name, device_name_max_len, device_name_write_perm):
+        """
+        Creates the GAP and (optionally) GATT services that the SoftDevice always includes in the table
+        """
+        self.service_add(c.BLE_GATTS_SRVC_TYPE_PRIMARY, UUID_GAP_SERVICE, c.BLE_UUID_TYPE_BLE)
+        read = 0x02
+        self._builtin_char(UUID_DEVICE_NAME, read | (0x08 if device_name_write_perm != _NO_ACCESS else 0),
+                           device_name, device_name_max_len, True, device_name_write_perm)
+        self._builtin_char(UUID_APPEARANCE, read, b"\x00\x00", 2, False, _NO_ACCESS)
+        self._builtin_char(UUID_PPCP, read, b"\x00" * 8, 8, False, _NO_ACCESS)
+        if service_changed:
+            self.service_add(c.BLE_GATTS_SRVC_TYPE_PRIMARY, UUID_GATT_SERVICE, c.BLE_UUID_TYPE_BLE)
+            char = self._builtin_char(UUID_SERVICE_CHANGED, 0x20, b"\x00" * 4, 4, False, _NO_ACCESS,
+                                      read_perm=_NO_ACCESS)
+            cccd = self._add(UUID_CCCD, value=b"\x00\x00", max_len=2, vlen=False, write_perm=_OPEN,
+                             per_connection=True)
+            char.cccd_handle = cccd.handle
+            self.service_changed_handle = char.value_handle
+
+    def builtin_value_set(self, uuid, value, write_perm=None):
+        """
+        Updates the value of one of the GAP service characteristics which are set through the GAP APIs
+        """
+        for char in self.characteristics:
+            if char.uuid == uuid and char.uuid_type == c.BLE_UUID_TYPE_BLE:
+                attr = self.get(char.value_handle)
+                attr.value = bytearray(value)
+                if write_perm is not None:
+                    attr.write_perm = write_perm
+                return
+
+    def _builtin_char(self, uuid, props, value, max_len, vlen, write_perm, read_perm=_OPEN):
+        decl = self._add(UUID_CHARACTERISTIC)
+        value_attr = self._add(uuid, value=value, max_len=max_len, vlen=vlen, read_perm=read_perm,
+                               write_perm=write_perm)
+        value_attr.props = props
+        decl.value = bytearray(struct.pack("<BH", props, value_attr.handle) + struct.pack("<H", uuid))
+        char = Characteristic(decl.handle, value_attr.handle, props, uuid, c.BLE_UUID_TYPE_BLE)
+        self.characteristics.append(char)
+        self._chars_by_value_handle[value_attr.handle] = char
+        return char
+
+    def service_add(self, service_type, uuid, uuid_type):
+        if service_type not in (c.BLE_GATTS_SRVC_TYPE_PRIMARY, c.BLE_GATTS_SRVC_TYPE_SECONDARY):
+            return c.NRF_ERROR_INVALID_PARAM, 0
+        if uuid_type >= c.BLE_UUID_TYPE_VENDOR_BEGIN and self.adapter.uuid_to_128(uuid, uuid_type) is None:
+            return c.NRF_ERROR_NOT_FOUND, 0
+        if self.last_handle >= self._max_handles:
+            return c.NRF_ERROR_NO_MEM, 0
+        primary = service_type == c.BLE_GATTS_SRVC_TYPE_PRIMARY
+        decl_uuid = UUID_PRIMARY_SERVICE if primary else UUID_SECONDARY_SERVICE
+        decl = Attribute(len(self.attributes) + 1, decl_uuid, value=self.uuid_bytes(uuid, uuid_type))
+        self.attributes.append(decl)
+        self.services.append(Service(decl.handle, uuid, uuid_type, primary))
+        return c.NRF_SUCCESS, decl.handle
+
+    @property
+    def _max_handles(self):
+        # Loose approximation of the attribute table memory, small attributes take at least 8 bytes each
+        return min(max(self.attr_table_size // 8, 64), 0xFFFE)
+
+    def characteristic_add(self, service_handle, char_md, attr_char_value):
+        """
+        :return: (err_code, (value_handle, user_desc_handle, cccd_handle, sccd_handle))
+        """
+        if not self.services or self.services[-1].start_handle != service_handle:
+            return c.NRF_ERROR_INVALID_STATE, None
+        if self.last_handle + 5 >= self._max_handles:
+            return c.NRF_ERROR_NO_MEM, None
+        uuid = attr_char_value.p_uuid
+        if uuid is None or attr_char_value.p_attr_md is None:
+            return c.NRF_ERROR_INVALID_PARAM, None
+        if uuid.type >= c.BLE_UUID_TYPE_VENDOR_BEGIN and self.adapter.uuid_to_128(uuid.uuid, uuid.type) is None:
+            return c.NRF_ERROR_NOT_FOUND, None
+
+        props_struct = char_md.char_props
+        props = (props_struct.broadcast << 0 | props_struct.read << 1 | props_struct.write_wo_resp << 2 |
+                 props_struct.write << 3 | props_struct.notify << 4 | props_struct.indicate << 5 |
+                 props_struct.auth_signed_wr << 6)
+        ext_props = char_md.char_ext_props.reliable_wr | (char_md.char_ext_props.wr_aux << 1)
+        if ext_props:
+            props |= 0x80
+
+        decl = self._add(UUID_CHARACTERISTIC)
+        read_perm, write_perm, vlen, rd_auth, wr_auth = Attribute.from_md(attr_char_value.p_attr_md)
+        init_value = b""
+        if attr_char_value.p_value is not None and attr_char_value.init_len:
+            init_value = attr_char_value.p_value.to_bytes(attr_char_value.init_len)
+        max_len = attr_char_value.max_len
+        if not vlen:
+            init_value = init_value + b"\x00" * (max_len - len(init_value))
+        value_attr = self._add(uuid.uuid, uuid.type, value=init_value, max_len=max_len, vlen=vlen,
+                               read_perm=read_perm, write_perm=write_perm, rd_auth=rd_auth, wr_auth=wr_auth)
+        value_attr.props = props
+        decl.value = bytearray(struct.pack("<BH", props, value_attr.handle) + self.uuid_bytes(uuid.uuid, uuid.type))
+
+        char = Characteristic(decl.handle, value_attr.handle, props, uuid.uuid, uuid.type)
+        self.characteristics.append(char)
+        self._chars_by_value_handle[value_attr.handle] = char
+
+        user_desc_handle = cccd_handle = sccd_handle = 0
+        if ext_props:
+            self._add(0x2900, value=struct.pack("<H", ext_props), max_len=2, vlen=False)
+        if char_md.p_char_user_desc is not None or char_md.p_user_desc_md is not None:
+            desc_value = b""
+            if char_md.p_char_user_desc is not None:
+                desc_value = char_md.p_char_user_desc.to_bytes(char_md.char_user_desc_size)
+            read_perm, write_perm, vlen, rd_auth, wr_auth = Attribute.from_md(char_md.p_user_desc_md)
+            user_desc_handle = self._add(UUID_CHAR_USER_DESC, value=desc_value,
+                                         max_len=max(char_md.char_user_desc_max_size, len(desc_value)),
+                                         vlen=True, read_perm=read_perm, write_perm=write_perm).handle
+        if props & (CCCD_NOTIFY << 4 | CCCD_INDICATE << 4):
+            read_perm, write_perm, _, _, wr_auth = Attribute.from_md(char_md.p_cccd_md)
+            if char_md.p_cccd_md is None:
+                write_perm = _OPEN
+            cccd_handle = self._add(UUID_CCCD, value=b"\x00\x00", max_len=2, vlen=False, read_perm=_OPEN,
+                                    write_perm=write_perm, wr_auth=wr_auth, per_connection=True).handle
+            char.cccd_handle = cccd_handle
+        if props & 0x01:
+            read_perm, write_perm, _, _, _ = Attribute.from_md(char_md.p_sccd_md)
+            sccd_handle = self._add(UUID_SCCD, value=b"\x00\x00", max_len=2, vlen=False,
+                                    write_perm=write_perm).handle
+        if char_md.p_char_pf is not None:
+            pf = char_md.p_char_pf
+            self._add(UUID_CHAR_PRESENTATION_FORMAT,
+                      value=struct.pack("<BbHBH", pf.format, pf.exponent, pf.unit, pf.name_space, pf.desc))
+
+        return c.NRF_SUCCESS, (value_attr.handle, user_desc_handle, cccd_handle, sccd_handle)
+
+    def descriptor_add(self, char_handle, attr):
+        if not self.characteristics or self.characteristics[-1].value_handle != char_handle:
+            return c.NRF_ERROR_INVALID_STATE, 0
+        uuid = attr.p_uuid
+        if uuid is None or attr.p_attr_md is None:
+            return c.NRF_ERROR_INVALID_PARAM, 0
+        read_perm, write_perm, vlen, rd_auth, wr_auth = Attribute.from_md(attr.p_attr_md)
+        value = b""
+        if attr.p_value is not None and attr.init_len:
+            value = attr.p_value.to_bytes(attr.init_len)
+        desc = self._add(uuid.uuid, uuid.type, value=value, max_len=attr.max_len, vlen=vlen, read_perm=read_perm,
+                         write_perm=write_perm, rd_auth=rd_auth, wr_auth=wr_auth)
+        return c.NRF_SUCCESS, desc.handle
+
+    """
+    Value access
+    """
+
+    def characteristic_for_value(self, value_handle):
+        return self._chars_by_value_handle.get(value_handle)
+
+    def connection_values(self, conn_handle):
+        return self._connection_values.setdefault(conn_handle, {})
+
+    def on_disconnected(self, conn_handle):
+        self._connection_values.pop(conn_handle, None)
+
+    def read_value(self, attr, conn_handle):
+        if attr.per_connection:
+            return self.connection_values(conn_handle).get(attr.handle, bytes(attr.value))
+        return bytes(attr.value)
+
+    def write_value(self, attr, conn_handle, offset, data):
+        """
+        Writes data into the attribute at the offset
+
+        :return: The gatt status of the write
+        """
+        current = self.read_value(attr, conn_handle)
+        if offset > len(current):
+            return c.BLE_GATT_STATUS_ATTERR_INVALID_OFFSET
+        if offset + len(data) > attr.max_len:
+            return c.BLE_GATT_STATUS_ATTERR_INVALID_ATT_VAL_LENGTH
+        new_value = current[:offset] + bytes(data)
+        if not attr.vlen:
+            new_value += current[len(new_value):]
+        if attr.per_connection:
+            if conn_handle == c.BLE_CONN_HANDLE_INVALID:
+                attr.value = bytearray(new_value)
+            else:
+                self.connection_values(conn_handle)[attr.handle] = new_value
+        else:
+            attr.value = bytearray(new_value)
+        return c.BLE_GATT_STATUS_SUCCESS
+
+    def value_get(self, conn_handle, handle, offset, max_len):
+        """
+        :return: (err_code, full attribute length, bytes read)
+        """
+        attr = self.get(handle)
+        if attr is None:
+            return c.BLE_ERROR_INVALID_ATTR_HANDLE, 0, b""
+        value = self.read_value(attr, conn_handle)
+        if offset > len(value):
+            return c.NRF_ERROR_INVALID_PARAM, 0, b""
+        return c.NRF_SUCCESS, len(value), value[offset:offset + max_len]
+
+    def value_set(self, conn_handle, handle, offset, data):
+        attr = self.get(handle)
+        if attr is None:
+            return c.BLE_ERROR_INVALID_ATTR_HANDLE
+        status = self.write_value(attr, conn_handle, offset, data)
+        if status == c.BLE_GATT_STATUS_ATTERR_INVALID_OFFSET:
+            return c.NRF_ERROR_INVALID_PARAM
+        if status != c.BLE_GATT_STATUS_SUCCESS:
+            return c.NRF_ERROR_DATA_SIZE
+        return c.NRF_SUCCESS
+
+    def cccd_value(self, char, conn_handle):
+        if not char.cccd_handle:
+            return 0
+        value = self.read_value(self.get(char.cccd_handle), conn_handle)
+        return value[0] | (value[1] << 8)
@@ -0,0 +1,508 @@
+"""
+Simulated link layer: connection events, packet scheduling and the link-layer control procedures.
+
+A :class:`Link` joins two :class:`LinkEnd` objects, one per adapter. Every higher-level protocol (ATT, SMP, L2CAP
+signaling and LL control) is modeled as :class:`Packet` objects queued on the sending end. Packets only move during
+connection events, which are scheduled lazily on the connection interval's anchor points while there is traffic,
+so idle connections cost nothing. Each side may send up to ``packets_per_event`` link-layer packets per connection
+event; a PDU larger than the negotiated data length occupies multiple link-layer packets.
+"""
+import logging
+import math
+
+from blatann.nrf.nrf_sim import constants as c
+from blatann.nrf.nrf_sim import events
+from blatann.nrf.nrf_sim.radio import scheduler, parameters
+from blatann.nrf.nrf_sim.att import GattClient, GattServerSession
+from blatann.nrf.nrf_sim.smp import SecurityManager
+from blatann.nrf.nrf_sim.structs import _Record
+
+logger = logging.getLogger(__name__)
+
+L2CAP_HEADER_LEN = 4
+DATA_LENGTH_DEFAULT = 27
+DATA_LENGTH_MAX = 251
+CONN_PARAM_UPDATE_INSTANT_EVENTS = 6
+
+
+def _data_length_time_us(octets):
+    return (octets + 14) * 8
+
+
+class Packet(object):
+    __slots__ = ("length", "handler", "args", "on_sent")
+
+    def __init__(self, length, handler, args, on_sent=None):
+        self.length = length
+        self.handler = handler
+        self.args = args
+        self.on_sent = on_sent
+
+
+class LinkEnd(object):
+    """
+    One side of a connection, owned by an adapter and addressed by its connection handle
+    """
+    def __init__(self, link, adapter, conn_handle, role, peer_addr, conn_cfg):
+        self.link = link
+        self.adapter = adapter
+        self.conn_handle = conn_handle
+        self.role = role
+        self.peer_addr = peer_addr
+        self.peer = None  # type: LinkEnd
+        self.tx = []
+        self.connected = True
+
+        self.max_att_mtu = max(conn_cfg.att_mtu, c.BLE_GATT_ATT_MTU_DEFAULT)
+        self.att_mtu = c.BLE_GATT_ATT_MTU_DEFAULT
+        self.hvn_queue_size = conn_cfg.hvn_tx_queue_size
+        self.write_cmd_queue_size = conn_cfg.write_cmd_tx_queue_size
+        self.hvn_pending = 0
+        self.write_cmd_pending = 0
+        self._hvn_complete = 0
+        self._write_cmd_complete = 0
+
+        self.conn_param_procedure = False
+        self.data_length_procedure = False
+        self.phy_procedure = False
+        self.rssi_monitor = None
+
+        self.gattc = GattClient(self)
+        self.gatts = GattServerSession(self)
+        self.smp = SecurityManager(self)
+
+    @property
+    def is_central(self):
+        return self.role == c.BLE_GAP_ROLE_CENTRAL
+
+    def post(self, event):
+        self.adapter.post(event)
+
+    def send(self, length, handler, *args, **kwargs):
+        """
+        Queues a PDU to be transmitted to the peer. Once received, ``handler(peer_end, *args)`` is invoked
+
+        :param length: The length of the PDU payload, used to compute how many link-layer packets it occupies
+        :param on_sent: Optional callback invoked on the sending end once the PDU has been transmitted
+        :param priority: True to transmit ahead of any queued PDUs, used for link-layer control PDUs
+        """
+        if not self.connected:
+            return
+        packet = Packet(length, handler, args, kwargs.get("on_sent"))
+        if kwargs.get("priority"):
+            self.tx.insert(0, packet)
+        else:
+            self.tx.append(packet)
+        self.link.kick()
+
+    def notification_sent(self):
+        self.hvn_pending -= 1
+        self._hvn_complete += 1
+
+    def write_cmd_sent(self):
+        self.write_cmd_pending -= 1
+        self._write_cmd_complete += 1
+
+    def flush_tx_complete(self):
+        if self._hvn_complete:
+            self.post(events.gatts_event(c.BLE_GATTS_EVT_HVN_TX_COMPLETE, self.conn_handle, "hvn_tx_complete",
+                                         count=self._hvn_complete))
+            self._hvn_complete = 0
+        if self._write_cmd_complete:
+            self.post(events.gattc_event(c.BLE_GATTC_EVT_WRITE_CMD_TX_COMPLETE, self.conn_handle,
+                                         "write_cmd_tx_complete", count=self._write_cmd_complete))
+            self._write_cmd_complete = 0
+
+    """
+    RSSI
+    """
+
+    def rssi(self):
+        return max(-127, self.peer.adapter.tx_power - parameters.path_loss_db)
+
+    def rssi_start(self, threshold_dbm, skip_count):
+        self.rssi_monitor = _RssiMonitor(threshold_dbm, skip_count)
+        self.link.kick()
+
+    def rssi_stop(self):
+        self.rssi_monitor = None
+
+    def _update_rssi(self):
+        if self.rssi_monitor is None:
+            return False
+        rssi = self.rssi()
+        if self.rssi_monitor.sample(rssi):
+            self.post(events.gap_event(c.BLE_GAP_EVT_RSSI_CHANGED, self.conn_handle, "rssi_changed", rssi=rssi))
+        return self.rssi_monitor.pending
+
+    """
+    Connection parameter update procedure
+    """
+
+    def conn_param_update(self, conn_params):
+        """
+        :param conn_params: The new connection parameters, or None.
+                            For a central, None rejects a pending request from the peripheral.
+                            For a peripheral, None requests the preferred parameters set through ppcp_set
+        """
+        if self.is_central:
+            if conn_params is None:
+                if not self.link.conn_param_request_pending:
+                    return c.NRF_ERROR_INVALID_STATE
+                self.link.conn_param_request_pending = False
+                self.send(2, LinkEnd._on_conn_param_rejected)
+                return c.NRF_SUCCESS
+            if self.conn_param_procedure:
+                return c.NRF_ERROR_BUSY
+            self.conn_param_procedure = True
+            self.link.conn_param_request_pending = False
+            self.send(12, LinkEnd._on_conn_param_update_ind, conn_params)
+            return c.NRF_SUCCESS
+
+        if self.conn_param_procedure:
+            return c.NRF_ERROR_BUSY
+        if conn_params is None:
+            conn_params = self.adapter.ppcp
+        self.conn_param_procedure = True
+        self.send(12, LinkEnd._on_conn_param_request, conn_params)
+        return c.NRF_SUCCESS
+
+    def _on_conn_param_request(self, conn_params):
+        # Central received the peripheral's request
+        self.link.conn_param_request_pending = True
+        self.post(events.gap_event(c.BLE_GAP_EVT_CONN_PARAM_UPDATE_REQUEST, self.conn_handle,
+                                   "conn_param_update_request", conn_params=events.conn_params_struct(conn_params)))
+
+    def _on_conn_param_rejected(self):
+        # Peripheral's request was rejected, the procedure completes with the parameters that are in use
+        self.conn_param_procedure = False
+        self.post(self.link.conn_param_update_event(self))
+
+    def _on_conn_param_update_ind(self, conn_params):
+        # Peripheral received the update indication, switch over both sides at the instant
+        self.link.schedule_instant(self.link.apply_conn_params, conn_params)
+
+    """
+    Data length update procedure
+    """
+
+    def default_data_length(self):
+        return min(DATA_LENGTH_MAX, self.max_att_mtu + L2CAP_HEADER_LEN)
+
+    def data_length_update(self, params):
+        if self.data_length_procedure:
+            # Reply to a request from the peer
+            self.data_length_procedure = False
+            self.send(8, LinkEnd._on_data_length_rsp, self._proposed_data_length(params))
+            return c.NRF_SUCCESS
+        if self.peer.data_length_procedure or self.link.data_length_pending:
+            return c.NRF_ERROR_BUSY
+        self.link.data_length_pending = True
+        self.send(8, LinkEnd._on_data_length_req, self._proposed_data_length(params))
+        return c.NRF_SUCCESS
+
+    def _proposed_data_length(self, params):
+        if params is None:
+            octets = self.default_data_length()
+            return octets, octets
+        return (max(DATA_LENGTH_DEFAULT, min(DATA_LENGTH_MAX, params.max_tx_octets or DATA_LENGTH_MAX)),
+                max(DATA_LENGTH_DEFAULT, min(DATA_LENGTH_MAX, params.max_rx_octets or DATA_LENGTH_MAX)))
+
+    def _on_data_length_req(self, peer_proposal):
+        self.data_length_procedure = True
+        tx, rx = peer_proposal
+        params = _Record(max_tx_octets=tx, max_rx_octets=rx,
+                                max_tx_time_us=_data_length_time_us(tx), max_rx_time_us=_data_length_time_us(rx))
+        self.post(events.gap_event(c.BLE_GAP_EVT_DATA_LENGTH_UPDATE_REQUEST, self.conn_handle,
+                                   "data_length_update_request", peer_params=params))
+
+    def _on_data_length_rsp(self, peer_proposal):
+        # Initiator received the response, complete the procedure on both sides
+        self.link.data_length_pending = False
+        own_tx, own_rx = self._proposed_data_length(None)
+        peer_tx, peer_rx = peer_proposal
+        self.link.apply_data_length(self, min(own_tx, peer_rx), min(own_rx, peer_tx))
+
+    """
+    PHY update procedure
+    """
+
+    def phy_update(self, tx_phys, rx_phys):
+        if self.phy_procedure:
+            self.phy_procedure = False
+            self.send(3, LinkEnd._on_phy_rsp, (tx_phys, rx_phys))
+            return c.NRF_SUCCESS
+        if self.peer.phy_procedure or self.link.phy_pending:
+            return c.NRF_ERROR_BUSY
+        self.link.phy_pending = True
+        self.link.phy_request = (tx_phys, rx_phys)
+        self.send(3, LinkEnd._on_phy_req, (tx_phys, rx_phys))
+        return c.NRF_SUCCESS
+
+    def _on_phy_req(self, peer_phys):
+        self.phy_procedure = True
+        self.post(events.gap_event(c.BLE_GAP_EVT_PHY_UPDATE_REQUEST, self.conn_handle, "phy_update_request",
+                                   peer_preferred_phys=_Record(tx_phys=peer_phys[0], rx_phys=peer_phys[1])))
+
+    def _on_phy_rsp(self, peer_phys):
+        self.link.phy_pending = False
+        self.link.apply_phy(self.link.phy_request, peer_phys)
+
+    """
+    Disconnection
+    """
+
+    def disconnect(self, reason):
+        if self.link.terminating:
+            return c.NRF_ERROR_INVALID_STATE
+        self.link.terminating = True
+        self.send(2, LinkEnd._on_terminate_ind, reason, priority=True,
+                  on_sent=lambda: self.link.terminate({self: c.BLE_HCI_LOCAL_HOST_TERMINATED_CONNECTION,
+                                                       self.peer: reason}))
+        return c.NRF_SUCCESS
+
+    def _on_terminate_ind(self, reason):
+        pass
+
+
+class _RssiMonitor(object):
+    def __init__(self, threshold_dbm, skip_count):
+        self.threshold = None if threshold_dbm == c.BLE_GAP_RSSI_THRESHOLD_INVALID else threshold_dbm
+        self.skip_count = max(skip_count, 1)
+        self.reported = None
+        self.count = 0
+
+    @property
+    def pending(self):
+        return self.threshold is not None and (self.reported is None or self.count > 0)
+
+    def sample(self, rssi):
+        """
+        :return: True if the sample should be reported
+        """
+        if self.threshold is None:
+            return False
+        if self.reported is not None and abs(rssi - self.reported) < self.threshold:
+            self.count = 0
+            return False
+        self.count += 1
+        if self.reported is None or self.count >= self.skip_count:
+            self.reported = rssi
+            self.count = 0
+            return True
+        return False
+
+
+class Link(object):
+    """
+    A connection between a central and a peripheral adapter
+
+    :param conn_params: tuple of (min_interval, max_interval, slave_latency, sup_timeout) in SoftDevice units
+    """
+    def __init__(self, conn_params):
+        self.central = None  # type: LinkEnd
+        self.periph = None  # type: LinkEnd
+        self.conn_params = self._select_params(conn_params)
+        self.anchor = scheduler.now()
+        self.max_tx_octets = DATA_LENGTH_DEFAULT
+        self.phy = c.BLE_GAP_PHY_1MBPS
+        self.phy_request = (c.BLE_GAP_PHY_AUTO, c.BLE_GAP_PHY_AUTO)
+        self.conn_param_request_pending = False
+        self.data_length_pending = False
+        self.phy_pending = False
+        self.security_level = 1
+        self.pairing = None
+        self.terminating = False
+        self.closed = False
+        self._task = None
+        self._instants = []
+
+    @staticmethod
+    def _select_params(conn_params):
+        min_interval, max_interval, latency, timeout = conn_params
+        # The central uses the shortest interval within the accepted range
+        interval = min_interval or max_interval
+        return interval, interval, latency, timeout
+
+    def attach(self, central, periph):
+        self.central = central
+        self.periph = periph
+        central.peer = periph
+        periph.peer = central
+
+    @property
+    def interval(self):
+        if parameters.conn_interval_ms:
+            return parameters.conn_interval_ms / 1000.0
+        return self.conn_params[0] * 1.25 / 1000.0
+
+    @property
+    def supervision_timeout(self):
+        return self.conn_params[3] / 100.0
+
+    def conn_param_update_event(self, end):
+        return events.gap_event(c.BLE_GAP_EVT_CONN_PARAM_UPDATE, end.conn_handle, "conn_param_update",
+                                conn_params=events.conn_params_struct(self.conn_params))
+
+    def ends(self):
+        return self.central, self.periph
+
+    """
+    Connection event scheduling
+    """
+
+    def kick(self):
+        if self._task is not None or self.closed:
+            return
+        now = scheduler.now()
+        interval = self.interval
+        events_passed = max(0, math.ceil((now - self.anchor) / interval))
+        self._task = scheduler.call_at(self.anchor + events_passed * interval, self._connection_event)
+
+    def schedule_instant(self, func, *args):
+        self._instants.append([CONN_PARAM_UPDATE_INSTANT_EVENTS, func, args])
+        self.kick()
+
+    def _connection_event(self):
+        self._task = None
+        if self.closed:
+            return
+        self.anchor = scheduler.now()
+
+        instants, self._instants = self._instants, []
+        for instant in instants:
+            instant[0] -= 1
+            if instant[0] <= 0:
+                instant[1](*instant[2])
+            else:
+                self._instants.append(instant)
+        if self.closed:
+            return
+
+        latency = parameters.latency_ms / 1000.0
+        for end in self.ends():
+            self._transmit(end, latency)
+            if self.closed:
+                return
+
+        more = bool(self._instants)
+        for end in self.ends():
+            end.flush_tx_complete()
+            if end._update_rssi():
+                more = True
+            if end.tx:
+                more = True
+        if more:
+            self.kick()
+
+    def _transmit(self, end, latency):
+        budget = parameters.packets_per_event
+        sent = 0
+        queue = end.tx
+        while queue:
+            packet = queue[0]
+            cost = max(1, math.ceil((packet.length + L2CAP_HEADER_LEN) / self.max_tx_octets))
+            if sent and sent + cost > budget:
+                break
+            queue.pop(0)
+            sent += cost
+            if latency > 0:
+                scheduler.call_later(latency, self._deliver, end.peer, packet)
+            else:
+                self._deliver(end.peer, packet)
+            if packet.on_sent is not None:
+                packet.on_sent()
+            if self.closed:
+                return
+
+    def _deliver(self, receiver, packet):
+        if self.closed or not receiver.connected:
+            return
+        packet.handler(receiver, *packet.args)
+
+    """
+    Procedure completion
+    """
+
+    def apply_conn_params(self, conn_params):
+        self.conn_params = self._select_params(conn_params)
+        for end in self.ends():
+            end.conn_param_procedure = False
+            end.post(self.conn_param_update_event(end))
+
+    def apply_data_length(self, initiator, initiator_tx, initiator_rx):
+        self.max_tx_octets = min(initiator_tx, initiator_rx)
+        for end, (tx, rx) in ((initiator, (initiator_tx, initiator_rx)),
+                              (initiator.peer, (initiator_rx, initiator_tx))):
+            params = _Record(max_tx_octets=tx, max_rx_octets=rx,
+                                    max_tx_time_us=_data_length_time_us(tx),
+                                    max_rx_time_us=_data_length_time_us(rx))
+            end.post(events.gap_event(c.BLE_GAP_EVT_DATA_LENGTH_UPDATE, end.conn_handle, "data_length_update",
+                                      effective_params=params))
+
+    @staticmethod
+    def _select_phy(*preferences):
+        allowed = c.BLE_GAP_PHY_1MBPS | c.BLE_GAP_PHY_2MBPS | c.BLE_GAP_PHY_CODED
+        for pref in preferences:
+            if pref != c.BLE_GAP_PHY_AUTO:
+                allowed &= pref
+        for phy in (c.BLE_GAP_PHY_2MBPS, c.BLE_GAP_PHY_1MBPS, c.BLE_GAP_PHY_CODED):
+            if allowed & phy:
+                return phy
+        return c.BLE_GAP_PHY_1MBPS
+
+    def apply_phy(self, initiator_phys, responder_phys):
+        self.phy = self._select_phy(initiator_phys[0], initiator_phys[1], responder_phys[0], responder_phys[1])
+        for end in self.ends():
+            end.post(events.gap_event(c.BLE_GAP_EVT_PHY_UPDATE, end.conn_handle, "phy_update",
+                                      status=c.BLE_HCI_STATUS_CODE_SUCCESS, tx_phy=self.phy, rx_phy=self.phy))
+
+    """
+    Teardown
+    """
+
+    def terminate(self, reasons):
+        """
+        Closes the link and reports the disconnection on both ends
+
+        :param reasons: dict of link end to the disconnect reason reported to it
+        """
+        if self.closed:
+            return
+        self.closed = True
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for end in self.ends():
+            end.connected = False
+            end.tx = []
+            end.flush_tx_complete()
+            end.gattc.on_disconnected()
+            end.gatts.on_disconnected()
+            end.smp.on_disconnected()
+            end.adapter.on_disconnected(end, reasons.get(end, c.BLE_HCI_CONNECTION_TIMEOUT))
+
+    def drop(self, end):
+        """
+        Drops the link from one side without notifying the other (e.g. the adapter was reset or closed).
+        The peer detects the loss after the supervision timeout
+        """
+        if self.closed:
+            return
+        end.connected = False
+        end.adapter.on_disconnected(end, None)
+        peer = end.peer
+        self.closed = True
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        def supervision_timeout():
+            peer.connected = False
+            peer.tx = []
+            peer.gattc.on_disconnected()
+            peer.gatts.on_disconnected()
+            peer.smp.on_disconnected()
+            peer.adapter.on_disconnected(peer, c.BLE_HCI_CONNECTION_TIMEOUT)
+
+        scheduler.call_later(self.supervision_timeout, supervision_timeout)
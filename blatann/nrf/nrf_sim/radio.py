@@ -0,0 +1,140 @@
+"""
+Shared timing and scheduling for the simulated SoftDevices.
+
+Every simulated adapter in the process shares a single scheduler thread and a single re-entrant lock. API calls made
+by the driver and all scheduled radio activity (advertising, scanning, connection events, timeouts) run while holding
+:data:`lock`, so the simulated state machines never need finer grained locking. Events produced for an adapter are
+queued in an outbox and delivered to the adapter's event handler from the scheduler thread *outside* of the lock,
+mirroring how the serialization transport of a real connectivity board calls back into the driver.
+"""
+import collections
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+lock = threading.RLock()
+
+
+class SimulationParameters(object):
+    """
+    Tunable properties of the simulated radio environment. Changes take effect on the next scheduled radio activity.
+
+    :param conn_interval_ms: If set, overrides the connection interval negotiated by the connection parameters
+                             for all connections. Useful to speed up or slow down whole test runs
+    :param packets_per_event: The maximum number of link-layer packets each side may transmit per connection event
+    :param latency_ms: Additional delay between a packet being transmitted and being received by the peer
+    :param path_loss_db: The path loss between any two adapters, used to compute reported RSSI values
+    """
+    def __init__(self, conn_interval_ms=None, packets_per_event=6, latency_ms=0.0, path_loss_db=45):
+        self.conn_interval_ms = conn_interval_ms
+        self.packets_per_event = packets_per_event
+        self.latency_ms = latency_ms
+        self.path_loss_db = path_loss_db
+
+    def __repr__(self):
+        return "{}(conn_interval_ms={!r}, packets_per_event={!r}, latency_ms={!r}, path_loss_db={!r})".format(
+            self.__class__.__name__, self.conn_interval_ms, self.packets_per_event, self.latency_ms,
+            self.path_loss_db)
+
+
+parameters = SimulationParameters()
+
+
+def configure(**kwargs):
+    """
+    Updates the global simulation parameters, see :class:`SimulationParameters` for the accepted keywords
+    """
+    with lock:
+        for name, value in kwargs.items():
+            if not hasattr(parameters, name):
+                raise AttributeError("Unknown simulation parameter '{}'".format(name))
+            setattr(parameters, name, value)
+
+
+class Task(object):
+    __slots__ = ("when", "seq", "func", "args", "cancelled")
+
+    def __init__(self, when, seq, func, args):
+        self.when = when
+        self.seq = seq
+        self.func = func
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def __lt__(self, other):
+        return (self.when, self.seq) < (other.when, other.seq)
+
+
+class Scheduler(object):
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+        self._outbox = collections.deque()
+        self._cond = threading.Condition(lock)
+        self._thread = None
+
+    @staticmethod
+    def now():
+        return time.monotonic()
+
+    def call_at(self, when, func, *args):
+        task = Task(when, next(self._seq), func, args)
+        with self._cond:
+            heapq.heappush(self._heap, task)
+            self._ensure_running()
+            if self._heap[0] is task:
+                self._cond.notify()
+        return task
+
+    def call_later(self, delay, func, *args):
+        return self.call_at(self.now() + delay, func, *args)
+
+    def post(self, adapter, event):
+        """
+        Queues an event to be delivered to the adapter's event handler
+        """
+        with self._cond:
+            self._outbox.append((adapter, event))
+            self._ensure_running()
+            self._cond.notify()
+
+    def _ensure_running(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="nrf_sim_radio", daemon=True)
+            self._thread.start()
+
+    def _run_due_tasks(self):
+        now = self.now()
+        while self._heap and self._heap[0].when <= now:
+            task = heapq.heappop(self._heap)
+            if task.cancelled:
+                continue
+            try:
+                task.func(*task.args)
+            except Exception:
+                logger.exception("Unhandled exception in simulated radio task {}".format(task.func))
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    self._run_due_tasks()
+                    if self._outbox:
+                        break
+                    timeout = self._heap[0].when - self.now() if self._heap else None
+                    if timeout is None or timeout > 0:
+                        self._cond.wait(timeout)
+                deliveries = list(self._outbox)
+                self._outbox.clear()
+            for adapter, event in deliveries:
+                adapter.deliver(event)
+
+
+scheduler = Scheduler()
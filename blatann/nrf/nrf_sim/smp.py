@@ -0,0 +1,403 @@
+"""
+Simulated Security Manager: pairing, bonding key distribution and link encryption.
+
+The pairing state of a connection is kept in a single :class:`_Pairing` object shared by both link ends since the
+simulation has a global view; the SMP PDUs exchanged between the two sides still travel over the link so the
+events are delivered on connection events like with a real peer. No actual cryptography is performed except
+for the LESC Diffie-Hellman keys, which are computed by the application and compared by the simulation.
+"""
+import logging
+import os
+import random
+
+from blatann.nrf.nrf_sim import constants as c
+from blatann.nrf.nrf_sim import events
+from blatann.nrf.nrf_sim.structs import _Record, uint8_array
+
+logger = logging.getLogger(__name__)
+
+_JUST_WORKS = "just_works"
+_NUMERIC_COMPARISON = "numeric_comparison"
+_CENTRAL_DISPLAYS = "central_displays"
+_PERIPH_DISPLAYS = "periph_displays"
+_BOTH_INPUT = "both_input"
+
+_DO = c.BLE_GAP_IO_CAPS_DISPLAY_ONLY
+_DYN = c.BLE_GAP_IO_CAPS_DISPLAY_YESNO
+_KO = c.BLE_GAP_IO_CAPS_KEYBOARD_ONLY
+_NONE = c.BLE_GAP_IO_CAPS_NONE
+_KD = c.BLE_GAP_IO_CAPS_KEYBOARD_DISPLAY
+
+# Mapping of (initiator io caps, responder io caps) to the legacy pairing method, Core spec Vol 3 Part H 2.3.5.1
+_LEGACY_METHODS = {
+    (_DO, _KO): _CENTRAL_DISPLAYS, (_DO, _KD): _CENTRAL_DISPLAYS,
+    (_DYN, _KO): _CENTRAL_DISPLAYS, (_DYN, _KD): _CENTRAL_DISPLAYS,
+    (_KO, _DO): _PERIPH_DISPLAYS, (_KO, _DYN): _PERIPH_DISPLAYS, (_KO, _KO): _BOTH_INPUT,
+    (_KO, _KD): _PERIPH_DISPLAYS,
+    (_KD, _DO): _PERIPH_DISPLAYS, (_KD, _DYN): _PERIPH_DISPLAYS, (_KD, _KO): _CENTRAL_DISPLAYS,
+    (_KD, _KD): _PERIPH_DISPLAYS,
+}
+
+# LE Secure Connections use numeric comparison where both sides can display and confirm
+_LESC_METHODS = dict(_LEGACY_METHODS)
+_LESC_METHODS.update({
+    (_DYN, _DYN): _NUMERIC_COMPARISON, (_DYN, _KD): _NUMERIC_COMPARISON,
+    (_KD, _DYN): _NUMERIC_COMPARISON, (_KD, _KD): _NUMERIC_COMPARISON,
+})
+
+
+def _to_smp(end, name, *args):
+    getattr(end.smp, name)(*args)
+
+
+def _key_bytes(array, length):
+    if array is None:
+        return b"\x00" * length
+    return bytes(array[:length])
+
+
+def _select_method(central_params, periph_params, lesc):
+    if not (central_params.mitm or periph_params.mitm):
+        return _JUST_WORKS
+    methods = _LESC_METHODS if lesc else _LEGACY_METHODS
+    return methods.get((central_params.io_caps, periph_params.io_caps), _JUST_WORKS)
+
+
+def _kdist(own, peer):
+    return _Record(enc=own.enc & peer.enc, id=own.id & peer.id, sign=0, link=0)
+
+
+def _sec_levels(level):
+    return _Record(lv1=1, lv2=int(level >= 2), lv3=int(level >= 3), lv4=int(level >= 4))
+
+
+class _Pairing(object):
+    """
+    The state of a pairing procedure on a link
+    """
+    def __init__(self, central, periph, central_params):
+        self.central = central
+        self.periph = periph
+        self.params = {central: central_params, periph: None}
+        self.keysets = {central: None, periph: None}
+        self.lesc = False
+        self.method = _JUST_WORKS
+        self.passkey = None
+        self.awaiting = {}
+
+    def other(self, end):
+        return self.periph if end is self.central else self.central
+
+
+class SecurityManager(object):
+    """
+    The security manager of a link end
+    """
+    def __init__(self, end):
+        self.end = end
+        self.sec_request_pending = False
+        self._encryption_request = None
+
+    @property
+    def _link(self):
+        return self.end.link
+
+    @property
+    def _pairing(self):
+        """
+        :rtype: _Pairing
+        """
+        return getattr(self._link, "pairing", None)
+
+    def _post(self, evt_id, name, **params):
+        self.end.post(events.gap_event(evt_id, self.end.conn_handle, name, **params))
+
+    def _send(self, name, *args):
+        self.end.send(11, _to_smp, name, *args)
+
+    def on_disconnected(self):
+        self._link.pairing = None
+        self.sec_request_pending = False
+        self._encryption_request = None
+
+    """
+    Pairing feature exchange
+    """
+
+    def authenticate(self, sec_params):
+        if self._pairing is not None:
+            return c.NRF_ERROR_BUSY
+        if not self.end.is_central:
+            if sec_params is None:
+                return c.NRF_ERROR_INVALID_PARAM
+            self._send("on_security_request", sec_params.bond, sec_params.mitm, sec_params.lesc,
+                       sec_params.keypress)
+            return c.NRF_SUCCESS
+
+        if sec_params is None:
+            # A central replying with no parameters rejects the peripheral's security request
+            if not self.sec_request_pending:
+                return c.NRF_ERROR_INVALID_PARAM
+            self.sec_request_pending = False
+            self._send("on_pairing_failed", c.BLE_GAP_SEC_STATUS_PAIRING_NOT_SUPP)
+            return c.NRF_SUCCESS
+
+        self.sec_request_pending = False
+        self._link.pairing = _Pairing(self.end, self.end.peer, sec_params)
+        self._send("on_pairing_request", sec_params)
+        return c.NRF_SUCCESS
+
+    def on_security_request(self, bond, mitm, lesc, keypress):
+        self.sec_request_pending = True
+        self._post(c.BLE_GAP_EVT_SEC_REQUEST, "sec_request", bond=bond, mitm=mitm, lesc=lesc, keypress=keypress)
+
+    def on_pairing_request(self, central_params):
+        self._post(c.BLE_GAP_EVT_SEC_PARAMS_REQUEST, "sec_params_request", peer_params=central_params)
+
+    def on_pairing_response(self, periph_params):
+        self._post(c.BLE_GAP_EVT_SEC_PARAMS_REQUEST, "sec_params_request", peer_params=periph_params)
+
+    def sec_params_reply(self, status, sec_params, keyset):
+        pairing = self._pairing
+        if pairing is None:
+            return c.NRF_ERROR_INVALID_STATE
+        if status != c.BLE_GAP_SEC_STATUS_SUCCESS:
+            self._fail(status)
+            return c.NRF_SUCCESS
+
+        pairing.keysets[self.end] = keyset
+        if not self.end.is_central:
+            if sec_params is None:
+                return c.NRF_ERROR_INVALID_PARAM
+            pairing.params[self.end] = sec_params
+            self._send("on_pairing_response", sec_params)
+            return c.NRF_SUCCESS
+
+        central_params, periph_params = pairing.params[pairing.central], pairing.params[pairing.periph]
+        pairing.lesc = bool(central_params.lesc and periph_params.lesc)
+        pairing.method = _select_method(central_params, periph_params, pairing.lesc)
+        self._send("on_pairing_start")
+        return c.NRF_SUCCESS
+
+    def on_pairing_start(self):
+        # Runs on the peripheral once both sides have exchanged their features
+        pairing = self._pairing
+        if pairing.lesc:
+            pairing.awaiting = {pairing.central: "dhkey", pairing.periph: "dhkey"}
+            for end in (pairing.central, pairing.periph):
+                other_keyset = pairing.keysets[pairing.other(end)]
+                pk = other_keyset.keys_own.p_pk if other_keyset is not None else None
+                end.smp._post(c.BLE_GAP_EVT_LESC_DHKEY_REQUEST, "lesc_dhkey_request",
+                              p_pk_peer=_Record(pk=pk.pk if pk is not None else uint8_array(64)), oobd_req=0)
+        else:
+            self._start_authentication(pairing)
+
+    def on_pairing_failed(self, status):
+        self._link.pairing = None
+        self._post_auth_status(status, c.BLE_GAP_SEC_STATUS_SOURCE_REMOTE)
+
+    def _fail(self, status):
+        """
+        Fails the pairing procedure because of a local reply, the peer is notified over the link
+        """
+        self._link.pairing = None
+        self._post_auth_status(status, c.BLE_GAP_SEC_STATUS_SOURCE_LOCAL)
+        self._send("on_pairing_failed", status)
+
+    def _post_auth_status(self, status, error_src, bonded=0, level=0, kdist_own=None, kdist_peer=None):
+        no_keys = _Record(enc=0, id=0, sign=0, link=0)
+        levels = _sec_levels(level) if level else _Record(lv1=0, lv2=0, lv3=0, lv4=0)
+        self._post(c.BLE_GAP_EVT_AUTH_STATUS, "auth_status", auth_status=status, error_src=error_src,
+                   bonded=bonded, sm1_levels=levels, sm2_levels=_Record(lv1=0, lv2=0, lv3=0, lv4=0),
+                   kdist_own=kdist_own or no_keys, kdist_peer=kdist_peer or no_keys)
+
+    """
+    Authentication stage
+    """
+
+    def _start_authentication(self, pairing):
+        method = pairing.method
+        if method == _JUST_WORKS:
+            self._complete(pairing)
+            return
+        pairing.passkey = "{:06d}".format(random.randint(0, 999999)).encode("ascii")
+        displays = {_NUMERIC_COMPARISON: (pairing.central, pairing.periph), _CENTRAL_DISPLAYS: (pairing.central,),
+                    _PERIPH_DISPLAYS: (pairing.periph,), _BOTH_INPUT: ()}[method]
+        match_request = int(method == _NUMERIC_COMPARISON)
+        pairing.awaiting = {}
+        for end in (pairing.central, pairing.periph):
+            if end in displays:
+                if match_request:
+                    pairing.awaiting[end] = "confirm"
+                end.smp._post(c.BLE_GAP_EVT_PASSKEY_DISPLAY, "passkey_display",
+                              passkey=uint8_array.from_bytes(pairing.passkey), match_request=match_request)
+            else:
+                pairing.awaiting[end] = "passkey"
+                end.smp._post(c.BLE_GAP_EVT_AUTH_KEY_REQUEST, "auth_key_request",
+                              key_type=c.BLE_GAP_AUTH_KEY_TYPE_PASSKEY)
+
+    def auth_key_reply(self, key_type, key):
+        pairing = self._pairing
+        if pairing is None or pairing.awaiting.get(self.end) not in ("confirm", "passkey"):
+            return c.NRF_ERROR_INVALID_STATE
+        expected = pairing.awaiting.pop(self.end)
+        if expected == "confirm":
+            if key_type != c.BLE_GAP_AUTH_KEY_TYPE_PASSKEY:
+                self._fail(c.BLE_GAP_SEC_STATUS_NUM_COMP_FAILURE)
+                return c.NRF_SUCCESS
+        elif key_type != c.BLE_GAP_AUTH_KEY_TYPE_PASSKEY or key is None:
+            self._fail(c.BLE_GAP_SEC_STATUS_PASSKEY_ENTRY_FAILED)
+            return c.NRF_SUCCESS
+        elif pairing.method == _BOTH_INPUT:
+            # Both sides enter a passkey chosen by the user, the first one entered is the one to match
+            entered = _key_bytes(key, c.BLE_GAP_PASSKEY_LEN)
+            if pairing.awaiting:
+                pairing.passkey = entered
+            elif entered != pairing.passkey:
+                self._fail(c.BLE_GAP_SEC_STATUS_PASSKEY_ENTRY_FAILED)
+                return c.NRF_SUCCESS
+        elif _key_bytes(key, c.BLE_GAP_PASSKEY_LEN) != pairing.passkey:
+            self._fail(c.BLE_GAP_SEC_STATUS_PASSKEY_ENTRY_FAILED)
+            return c.NRF_SUCCESS
+
+        if not pairing.awaiting:
+            self._complete(pairing)
+        return c.NRF_SUCCESS
+
+    def lesc_dhkey_reply(self, dhkey):
+        pairing = self._pairing
+        if pairing is None or pairing.awaiting.get(self.end) != "dhkey":
+            return c.NRF_ERROR_INVALID_STATE
+        pairing.awaiting[self.end] = _key_bytes(dhkey.key, c.BLE_GAP_LESC_DHKEY_LEN)
+        keys = list(pairing.awaiting.values())
+        if "dhkey" in keys:
+            return c.NRF_SUCCESS
+        if keys[0] != keys[1]:
+            self._fail(c.BLE_GAP_SEC_STATUS_DHKEY_FAILURE)
+        else:
+            self._start_authentication(pairing)
+        return c.NRF_SUCCESS
+
+    """
+    Key distribution
+    """
+
+    def _complete(self, pairing):
+        central, periph = pairing.central, pairing.periph
+        central_params, periph_params = pairing.params[central], pairing.params[periph]
+        authenticated = pairing.method != _JUST_WORKS
+        if pairing.lesc:
+            level = 4 if authenticated else 2
+        else:
+            level = 3 if authenticated else 2
+        bonded = int(bool(central_params.bond and periph_params.bond))
+        # Feature exchange: the responder's reply determines the keys distributed in each direction
+        central_dist = _kdist(periph_params.kdist_peer, central_params.kdist_own)
+        periph_dist = _kdist(periph_params.kdist_own, central_params.kdist_peer)
+        if not bonded:
+            central_dist = periph_dist = _Record(enc=0, id=0, sign=0, link=0)
+
+        if bonded:
+            if pairing.lesc:
+                enc_key = (os.urandom(c.BLE_GAP_SEC_KEY_LEN), 0, b"\x00" * c.BLE_GAP_SEC_RAND_LEN)
+                for end in (central, periph):
+                    self._store_enc_key(pairing.keysets[end], "keys_own", enc_key, 1, authenticated)
+            else:
+                for end, dist in ((central, central_dist), (periph, periph_dist)):
+                    if dist.enc:
+                        enc_key = (os.urandom(c.BLE_GAP_SEC_KEY_LEN), random.randint(1, 0xFFFF),
+                                   os.urandom(c.BLE_GAP_SEC_RAND_LEN))
+                        self._store_enc_key(pairing.keysets[end], "keys_own", enc_key, 0, authenticated)
+                        self._store_enc_key(pairing.keysets[pairing.other(end)], "keys_peer", enc_key, 0,
+                                            authenticated)
+            for end, dist in ((central, central_dist), (periph, periph_dist)):
+                if dist.id:
+                    self._store_id_key(pairing.keysets[pairing.other(end)], end.adapter)
+            for end in (central, periph):
+                self._store_peer_pk(pairing.keysets[end], pairing.keysets[pairing.other(end)])
+
+        self._link.pairing = None
+        self._link.security_level = level
+        for end in (central, periph):
+            end.smp._post_conn_sec_update(1, level)
+        for end, own, peer in ((central, central_dist, periph_dist), (periph, periph_dist, central_dist)):
+            end.smp._post_auth_status(c.BLE_GAP_SEC_STATUS_SUCCESS, c.BLE_GAP_SEC_STATUS_SOURCE_LOCAL, bonded,
+                                      level, own, peer)
+
+    @staticmethod
+    def _store_enc_key(keyset, keys_name, enc_key, lesc, auth):
+        if keyset is None:
+            return
+        key = getattr(keyset, keys_name).p_enc_key
+        if key is None:
+            return
+        ltk, ediv, rand = enc_key
+        key.enc_info.ltk = uint8_array.from_bytes(ltk)
+        key.enc_info.ltk_len = len(ltk)
+        key.enc_info.lesc = lesc
+        key.enc_info.auth = int(auth)
+        key.master_id.ediv = ediv
+        key.master_id.rand = uint8_array.from_bytes(rand)
+
+    @staticmethod
+    def _store_id_key(keyset, distributing_adapter):
+        if keyset is None or keyset.keys_peer.p_id_key is None:
+            return
+        id_key = keyset.keys_peer.p_id_key
+        id_key.id_info.irk = uint8_array.from_bytes(distributing_adapter.irk)
+        id_key.id_addr_info = events.addr_struct(c.BLE_GAP_ADDR_TYPE_RANDOM_STATIC, distributing_adapter.identity_addr)
+
+    @staticmethod
+    def _store_peer_pk(keyset, peer_keyset):
+        if keyset is None or peer_keyset is None:
+            return
+        own_pk, peer_pk = peer_keyset.keys_own.p_pk, keyset.keys_peer.p_pk
+        if own_pk is not None and peer_pk is not None:
+            peer_pk.pk = uint8_array.from_bytes(_key_bytes(own_pk.pk, c.BLE_GAP_LESC_P256_PK_LEN))
+
+    def _post_conn_sec_update(self, sec_mode, level):
+        self._post(c.BLE_GAP_EVT_CONN_SEC_UPDATE, "conn_sec_update",
+                   conn_sec=_Record(sec_mode=_Record(sm=sec_mode, lv=level),
+                                    encr_key_size=c.BLE_GAP_SEC_KEY_LEN if sec_mode else 0))
+
+    """
+    Encryption using previously distributed keys
+    """
+
+    def encrypt(self, master_id, enc_info):
+        if not self.end.is_central:
+            return c.NRF_ERROR_INVALID_STATE
+        if self._pairing is not None or self._encryption_request is not None:
+            return c.NRF_ERROR_BUSY
+        ltk = _key_bytes(enc_info.ltk, c.BLE_GAP_SEC_KEY_LEN)
+        if enc_info.lesc and enc_info.auth:
+            level = 4
+        elif enc_info.auth:
+            level = 3
+        else:
+            level = 2
+        self._encryption_request = (ltk, level)
+        self._send("on_encryption_request", master_id, self.end.adapter.current_addr_struct())
+        return c.NRF_SUCCESS
+
+    def on_encryption_request(self, master_id, peer_addr):
+        self._post(c.BLE_GAP_EVT_SEC_INFO_REQUEST, "sec_info_request", peer_addr=peer_addr, master_id=master_id,
+                   enc_info=1, id_info=1, sign_info=0)
+
+    def sec_info_reply(self, enc_info, id_info, sign_info):
+        request = self.end.peer.smp._encryption_request
+        if self.end.is_central or request is None:
+            return c.NRF_ERROR_INVALID_STATE
+        self.end.peer.smp._encryption_request = None
+        ltk, level = request
+        if enc_info is None or _key_bytes(enc_info.ltk, c.BLE_GAP_SEC_KEY_LEN) != ltk:
+            self._send("on_encryption_result", 0, 1)
+            self._post_conn_sec_update(0, 1)
+            return c.NRF_SUCCESS
+        self._link.security_level = level
+        self._send("on_encryption_result", 1, level)
+        self._post_conn_sec_update(1, level)
+        return c.NRF_SUCCESS
+
+    def on_encryption_result(self, sec_mode, level):
+        self._post_conn_sec_update(sec_mode, level)
@@ -0,0 +1,381 @@
+"""
+Pure-python stand-ins for the SWIG-generated structs, carrays and pointer helpers of the driver module.
+
+Structs are zero-initialized like their C counterparts: integer fields read as 0, nested structs are created on first
+access and pointer fields (``p_*``) read as ``None`` until assigned. Arrays of primitive types are backed by ctypes
+buffers so ``int(array)`` yields a stable memory address, same as a SWIG pointer.
+"""
+import ctypes
+
+
+class _Struct(object):
+    """
+    Base class for simulated C structs. ``_fields_`` maps field names to their zero value: an int, a nested
+    struct type or an array factory
+    """
+    _fields_ = {}
+
+    def __getattr__(self, name):
+        fields = type(self)._fields_
+        if name in fields:
+            default = fields[name]
+            value = default() if callable(default) else default
+            object.__setattr__(self, name, value)
+            return value
+        if name.startswith("p_"):
+            return None
+        if name.startswith("__"):
+            raise AttributeError(name)
+        # Unknown scalar fields behave as zero-initialized memory
+        return 0
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__,
+                               ", ".join("{}={!r}".format(k, v) for k, v in sorted(self.__dict__.items())))
+
+
+class _Record(_Struct):
+    """
+    Loosely-typed struct used to build event unions, any keyword argument becomes a field
+    """
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+def _struct(name, **fields):
+    return type(name, (_Struct,), {"_fields_": fields})
+
+
+"""
+Arrays
+"""
+
+
+class _CArray(object):
+    _ctype = ctypes.c_uint8
+
+    def __init__(self, nelements):
+        self._buf = (self._ctype * nelements)()
+        self._len = nelements
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._len))]
+        # Reads past the end behave as a zero-initialized fixed-size C array
+        if index >= self._len:
+            return 0
+        return self._buf[index]
+
+    def __setitem__(self, index, value):
+        self._buf[index] = value
+
+    def __len__(self):
+        return self._len
+
+    def __int__(self):
+        return ctypes.addressof(self._buf)
+
+    def cast(self):
+        return self
+
+    @staticmethod
+    def frompointer(ptr):
+        return ptr
+
+    def to_bytes(self, length=None):
+        if length is None:
+            length = self._len
+        length = min(length, self._len)
+        return ctypes.string_at(ctypes.addressof(self._buf), length * ctypes.sizeof(self._ctype))
+
+    @classmethod
+    def from_bytes(cls, data):
+        data = bytes(data)
+        array = cls(len(data))
+        ctypes.memmove(array._buf, data, len(data))
+        return array
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, list(self._buf))
+
+
+class uint8_array(_CArray):
+    _ctype = ctypes.c_uint8
+
+
+class uint16_array(_CArray):
+    _ctype = ctypes.c_uint16
+
+    @classmethod
+    def from_bytes(cls, data):
+        raise NotImplementedError
+
+
+class char_array(object):
+    def __init__(self, nelements):
+        self._items = [b"\x00"] * nelements
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __setitem__(self, index, value):
+        self._items[index] = value
+
+    def __len__(self):
+        return len(self._items)
+
+    def cast(self):
+        return self
+
+    @staticmethod
+    def frompointer(ptr):
+        return ptr
+
+
+class _StructArray(object):
+    def __init__(self, nelements):
+        self._items = [None] * nelements
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __setitem__(self, index, value):
+        self._items[index] = value
+
+    def __len__(self):
+        return len(self._items)
+
+    def cast(self):
+        return self
+
+    @staticmethod
+    def frompointer(ptr):
+        return ptr
+
+    @classmethod
+    def from_list(cls, items):
+        array = cls(len(items))
+        array._items = list(items)
+        return array
+
+
+class ble_gattc_service_array(_StructArray):
+    pass
+
+
+class ble_gattc_include_array(_StructArray):
+    pass
+
+
+class ble_gattc_char_array(_StructArray):
+    pass
+
+
+class ble_gattc_desc_array(_StructArray):
+    pass
+
+
+class ble_gattc_attr_info16_array(_StructArray):
+    pass
+
+
+class ble_gattc_attr_info128_array(_StructArray):
+    pass
+
+
+class ble_gattc_attr_info_array(_StructArray):
+    pass
+
+
+class ble_gattc_handle_value_array(_StructArray):
+    pass
+
+
+class sd_rpc_serial_port_desc_array(_StructArray):
+    pass
+
+
+def _fixed(length):
+    return lambda: uint8_array(length)
+
+
+"""
+Pointer helpers
+"""
+
+
+class _Pointer(object):
+    def __init__(self, value=0):
+        self.value = value
+
+    def __repr__(self):
+        return "{}({!r})".format(type(self).__name__, self.value)
+
+
+def new_uint8():
+    return _Pointer()
+
+
+def new_uint16():
+    return _Pointer()
+
+
+def new_int8():
+    return _Pointer()
+
+
+def uint8_value(ptr):
+    return ptr.value
+
+
+def uint16_value(ptr):
+    return ptr.value
+
+
+def int8_value(ptr):
+    return ptr.value
+
+
+def uint8_assign(ptr, value):
+    ptr.value = value
+
+
+def uint16_assign(ptr, value):
+    ptr.value = value
+
+
+def int8_assign(ptr, value):
+    ptr.value = value
+
+
+"""
+ble.h / ble_types.h
+"""
+
+ble_uuid_t = _struct("ble_uuid_t", uuid=0, type=0)
+ble_uuid128_t = _struct("ble_uuid128_t", uuid128=_fixed(16))
+ble_user_mem_block_t = _struct("ble_user_mem_block_t", len=0)
+
+ble_pa_lna_cfg_t = _struct("ble_pa_lna_cfg_t", enable=0, active_high=0, gpio_pin=0)
+ble_common_opt_pa_lna_t = _struct("ble_common_opt_pa_lna_t", pa_cfg=ble_pa_lna_cfg_t, lna_cfg=ble_pa_lna_cfg_t,
+                                  ppi_ch_id_set=0, ppi_ch_id_clr=0, gpiote_ch_id=0)
+ble_common_opt_conn_evt_ext_t = _struct("ble_common_opt_conn_evt_ext_t", enable=0)
+ble_common_opt_t = _struct("ble_common_opt_t", pa_lna=ble_common_opt_pa_lna_t,
+                           conn_evt_ext=ble_common_opt_conn_evt_ext_t)
+
+"""
+ble_gap.h
+"""
+
+ble_gap_addr_t = _struct("ble_gap_addr_t", addr_id_peer=0, addr_type=0, addr=_fixed(6))
+ble_gap_adv_ch_mask_t = _struct("ble_gap_adv_ch_mask_t", ch_37_off=0, ch_38_off=0, ch_39_off=0)
+ble_gap_adv_params_t = _struct("ble_gap_adv_params_t", type=0, fp=0, interval=0, timeout=0,
+                               channel_mask=ble_gap_adv_ch_mask_t)
+ble_gap_scan_params_t = _struct("ble_gap_scan_params_t", active=0, use_whitelist=0, adv_dir_report=0,
+                                interval=0, window=0, timeout=0)
+ble_gap_conn_params_t = _struct("ble_gap_conn_params_t", min_conn_interval=0, max_conn_interval=0,
+                                slave_latency=0, conn_sup_timeout=0)
+ble_gap_conn_sec_mode_t = _struct("ble_gap_conn_sec_mode_t", sm=0, lv=0)
+ble_gap_conn_sec_t = _struct("ble_gap_conn_sec_t", sec_mode=ble_gap_conn_sec_mode_t, encr_key_size=0)
+ble_gap_data_length_params_t = _struct("ble_gap_data_length_params_t", max_tx_octets=0, max_rx_octets=0,
+                                       max_tx_time_us=0, max_rx_time_us=0)
+ble_gap_data_length_limitation_t = _struct("ble_gap_data_length_limitation_t", tx_payload_limited_octets=0,
+                                           rx_payload_limited_octets=0, tx_rx_time_limited_us=0)
+ble_gap_phys_t = _struct("ble_gap_phys_t", tx_phys=0, rx_phys=0)
+ble_gap_irk_t = _struct("ble_gap_irk_t", irk=_fixed(16))
+ble_gap_privacy_params_t = _struct("ble_gap_privacy_params_t", privacy_mode=0, private_addr_type=0,
+                                   private_addr_cycle_s=0)
+ble_gap_sec_kdist_t = _struct("ble_gap_sec_kdist_t", enc=0, id=0, sign=0, link=0)
+ble_gap_sec_params_t = _struct("ble_gap_sec_params_t", bond=0, mitm=0, lesc=0, keypress=0, io_caps=0, oob=0,
+                               min_key_size=0, max_key_size=0,
+                               kdist_own=ble_gap_sec_kdist_t, kdist_peer=ble_gap_sec_kdist_t)
+ble_gap_sec_levels_t = _struct("ble_gap_sec_levels_t", lv1=0, lv2=0, lv3=0, lv4=0)
+ble_gap_master_id_t = _struct("ble_gap_master_id_t", ediv=0, rand=_fixed(8))
+ble_gap_enc_info_t = _struct("ble_gap_enc_info_t", ltk=_fixed(16), lesc=0, auth=0, ltk_len=0)
+ble_gap_enc_key_t = _struct("ble_gap_enc_key_t", enc_info=ble_gap_enc_info_t, master_id=ble_gap_master_id_t)
+ble_gap_id_key_t = _struct("ble_gap_id_key_t", id_info=ble_gap_irk_t, id_addr_info=ble_gap_addr_t)
+ble_gap_sign_info_t = _struct("ble_gap_sign_info_t", csrk=_fixed(16))
+ble_gap_lesc_p256_pk_t = _struct("ble_gap_lesc_p256_pk_t", pk=_fixed(64))
+ble_gap_lesc_dhkey_t = _struct("ble_gap_lesc_dhkey_t", key=_fixed(32))
+ble_gap_lesc_oob_data_t = _struct("ble_gap_lesc_oob_data_t", addr=ble_gap_addr_t, r=_fixed(16), c=_fixed(16))
+ble_gap_sec_keys_t = _struct("ble_gap_sec_keys_t")
+ble_gap_sec_keyset_t = _struct("ble_gap_sec_keyset_t", keys_own=ble_gap_sec_keys_t, keys_peer=ble_gap_sec_keys_t)
+
+ble_gap_opt_ch_map_t = _struct("ble_gap_opt_ch_map_t", conn_handle=0, ch_map=_fixed(5))
+ble_gap_opt_local_conn_latency_t = _struct("ble_gap_opt_local_conn_latency_t", conn_handle=0, requested_latency=0)
+ble_gap_opt_slave_latency_disable_t = _struct("ble_gap_opt_slave_latency_disable_t", conn_handle=0, disable=0)
+ble_gap_opt_passkey_t = _struct("ble_gap_opt_passkey_t")
+ble_gap_opt_scan_req_report_t = _struct("ble_gap_opt_scan_req_report_t", enable=0)
+ble_gap_opt_compat_mode_1_t = _struct("ble_gap_opt_compat_mode_1_t", enable=0)
+ble_gap_opt_auth_payload_timeout_t = _struct("ble_gap_opt_auth_payload_timeout_t", conn_handle=0,
+                                             auth_payload_timeout=0)
+ble_gap_opt_t = _struct("ble_gap_opt_t", ch_map=ble_gap_opt_ch_map_t,
+                        local_conn_latency=ble_gap_opt_local_conn_latency_t,
+                        passkey=ble_gap_opt_passkey_t,
+                        scan_req_report=ble_gap_opt_scan_req_report_t,
+                        compat_mode_1=ble_gap_opt_compat_mode_1_t,
+                        auth_payload_timeout=ble_gap_opt_auth_payload_timeout_t,
+                        slave_latency_disable=ble_gap_opt_slave_latency_disable_t)
+
+ble_gap_cfg_role_count_t = _struct("ble_gap_cfg_role_count_t", periph_role_count=0, central_role_count=0,
+                                   central_sec_count=0)
+ble_gap_cfg_device_name_t = _struct("ble_gap_cfg_device_name_t", write_perm=ble_gap_conn_sec_mode_t, vloc=0,
+                                    current_len=0, max_len=0)
+ble_gap_cfg_t = _struct("ble_gap_cfg_t", role_count_cfg=ble_gap_cfg_role_count_t,
+                        device_name_cfg=ble_gap_cfg_device_name_t)
+ble_gap_conn_cfg_t = _struct("ble_gap_conn_cfg_t", conn_count=0, event_length=0)
+
+"""
+ble_gatt.h / ble_gattc.h / ble_gatts.h
+"""
+
+ble_gatt_char_props_t = _struct("ble_gatt_char_props_t", broadcast=0, read=0, write_wo_resp=0, write=0, notify=0,
+                                indicate=0, auth_signed_wr=0)
+ble_gatt_char_ext_props_t = _struct("ble_gatt_char_ext_props_t", reliable_wr=0, wr_aux=0)
+ble_gatt_enable_params_t = _struct("ble_gatt_enable_params_t", att_mtu=0)
+ble_gatt_conn_cfg_t = _struct("ble_gatt_conn_cfg_t", att_mtu=0)
+
+ble_gattc_handle_range_t = _struct("ble_gattc_handle_range_t", start_handle=0, end_handle=0)
+ble_gattc_service_t = _struct("ble_gattc_service_t", uuid=ble_uuid_t, handle_range=ble_gattc_handle_range_t)
+ble_gattc_char_t = _struct("ble_gattc_char_t", uuid=ble_uuid_t, char_props=ble_gatt_char_props_t, char_ext_props=0,
+                           handle_decl=0, handle_value=0)
+ble_gattc_desc_t = _struct("ble_gattc_desc_t", handle=0, uuid=ble_uuid_t)
+ble_gattc_attr_info16_t = _struct("ble_gattc_attr_info16_t", handle=0, uuid=ble_uuid_t)
+ble_gattc_attr_info128_t = _struct("ble_gattc_attr_info128_t", handle=0, uuid=ble_uuid128_t)
+ble_gattc_write_params_t = _struct("ble_gattc_write_params_t", write_op=0, flags=0, handle=0, offset=0, len=0)
+ble_gattc_conn_cfg_t = _struct("ble_gattc_conn_cfg_t", write_cmd_tx_queue_size=0)
+
+ble_gatts_attr_md_t = _struct("ble_gatts_attr_md_t", read_perm=ble_gap_conn_sec_mode_t,
+                              write_perm=ble_gap_conn_sec_mode_t, vlen=0, vloc=0, rd_auth=0, wr_auth=0)
+ble_gatts_attr_t = _struct("ble_gatts_attr_t", init_len=0, init_offs=0, max_len=0)
+ble_gatts_char_pf_t = _struct("ble_gatts_char_pf_t", format=0, exponent=0, unit=0, name_space=0, desc=0)
+ble_gatts_char_md_t = _struct("ble_gatts_char_md_t", char_props=ble_gatt_char_props_t,
+                              char_ext_props=ble_gatt_char_ext_props_t, char_user_desc_max_size=0,
+                              char_user_desc_size=0)
+ble_gatts_char_handles_t = _struct("ble_gatts_char_handles_t", value_handle=0, user_desc_handle=0, cccd_handle=0,
+                                   sccd_handle=0)
+ble_gatts_value_t = _struct("ble_gatts_value_t", len=0, offset=0)
+ble_gatts_hvx_params_t = _struct("ble_gatts_hvx_params_t", handle=0, type=0, offset=0)
+ble_gatts_authorize_params_t = _struct("ble_gatts_authorize_params_t", gatt_status=0, update=0, offset=0, len=0)
+ble_gatts_rw_authorize_reply_params_t = _struct("ble_gatts_rw_authorize_reply_params_t", type=0,
+                                                params=lambda: _Record())
+ble_gatts_enable_params_t = _struct("ble_gatts_enable_params_t", service_changed=0, attr_tab_size=0)
+ble_gatts_cfg_service_changed_t = _struct("ble_gatts_cfg_service_changed_t", service_changed=0)
+ble_gatts_cfg_attr_tab_size_t = _struct("ble_gatts_cfg_attr_tab_size_t", attr_tab_size=0)
+ble_gatts_cfg_t = _struct("ble_gatts_cfg_t", service_changed=ble_gatts_cfg_service_changed_t,
+                          attr_tab_size=ble_gatts_cfg_attr_tab_size_t)
+ble_gatts_conn_cfg_t = _struct("ble_gatts_conn_cfg_t", hvn_tx_queue_size=0)
+
+"""
+Configuration and options
+"""
+
+ble_common_cfg_vs_uuid_t = _struct("ble_common_cfg_vs_uuid_t", vs_uuid_count=0)
+ble_common_cfg_t = _struct("ble_common_cfg_t", vs_uuid_cfg=ble_common_cfg_vs_uuid_t)
+ble_conn_cfg_params_t = _struct("ble_conn_cfg_params_t", gap_conn_cfg=ble_gap_conn_cfg_t,
+                                gattc_conn_cfg=ble_gattc_conn_cfg_t, gatts_conn_cfg=ble_gatts_conn_cfg_t,
+                                gatt_conn_cfg=ble_gatt_conn_cfg_t)
+ble_conn_cfg_t = _struct("ble_conn_cfg_t", conn_cfg_tag=0, params=ble_conn_cfg_params_t)
+ble_cfg_t = _struct("ble_cfg_t", conn_cfg=ble_conn_cfg_t, common_cfg=ble_common_cfg_t, gap_cfg=ble_gap_cfg_t,
+                    gatts_cfg=ble_gatts_cfg_t)
+ble_opt_t = _struct("ble_opt_t", common_opt=ble_common_opt_t, gap_opt=ble_gap_opt_t)
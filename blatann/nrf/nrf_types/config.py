@@ -1,8 +1,6 @@
 from enum import Enum, IntEnum
 import logging
 
-from pc_ble_driver_py.lib import nrf_ble_driver_sd_api_v5
-
 from blatann.nrf import nrf_driver_types as util
 from blatann.nrf.nrf_dll_load import driver
 
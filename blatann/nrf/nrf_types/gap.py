@@ -2,7 +2,7 @@ from enum import Enum, IntEnum
 import logging
 
 from blatann.utils import repr_format
-from pc_ble_driver_py.exceptions import NordicSemiException
+from blatann.nrf.nrf_dll_load import NordicSemiException
 from blatann.nrf.nrf_dll_load import driver
 import blatann.nrf.nrf_driver_types as util
 from blatann.nrf.nrf_types.enums import *
@@ -290,11 +290,22 @@ class BLEAdvData(object):
         manufacturer_specific_data = driver.BLE_GAP_AD_TYPE_MANUFACTURER_SPECIFIC_DATA
 
     def __init__(self, **kwargs):
-        self.records = dict()
+        self._records = dict()
         for k in kwargs:
-            self.records[BLEAdvData.Types[k]] = kwargs[k]
+            self._records[BLEAdvData.Types[k]] = kwargs[k]
         self.raw_bytes = b""
 
+    @property
+    def records(self):
+        # Advertising data received from the driver is only parsed into its records on first access
+        if self._records is None:
+            self._records = self._parse_records(self.raw_bytes)
+        return self._records
+
+    @records.setter
+    def records(self, records):
+        self._records = records
+
     def to_list(self):
         data_list = []
         for k in self.records:
@@ -323,9 +334,15 @@ class BLEAdvData(object):
 
     @classmethod
     def from_c(cls, adv_report_evt):
-        ad_list = util.uint8_array_to_list(adv_report_evt.data, adv_report_evt.dlen)
         ble_adv_data = cls()
-        ble_adv_data.raw_bytes = bytes(ad_list)
+        ble_adv_data.raw_bytes = util.uint8_array_to_bytes(adv_report_evt.data, adv_report_evt.dlen)
+        ble_adv_data._records = None
+        return ble_adv_data
+
+    @staticmethod
+    def _parse_records(raw_bytes):
+        ad_list = list(raw_bytes)
+        records = dict()
         index = 0
         while index < len(ad_list):
             ad_len = ad_list[index]
@@ -337,16 +354,16 @@ class BLEAdvData(object):
                 ad_type = ad_list[index + 1]
                 offset = index + 2
                 key = BLEAdvData.Types(ad_type)
-                ble_adv_data.records[key] = ad_list[offset: offset + ad_len - 1]
+                records[key] = ad_list[offset: offset + ad_len - 1]
             except ValueError:
                 logger.error('Invalid advertising data type: 0x{:02X}'.format(ad_type))
                 pass
             except IndexError:
                 logger.error('Invalid advertising data: {}'.format(ad_list))
-                return ble_adv_data
+                return records
             index += (ad_len + 1)
 
-        return ble_adv_data
+        return records
 
     def __repr__(self):
         return str(self.records)
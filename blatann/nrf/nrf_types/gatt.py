@@ -165,11 +165,12 @@ class BLEGattcWriteParams(object):
         return cls(write_op=BLEGattWriteOperation(gattc_write_params.write_op),
                    flags=gattc_write_params.flags,
                    handle=gattc_write_params.handle,
-                   data=util.uint8_array_to_list(gattc_write_params.p_value,
-                                                 gattc_write_params.len))
+                   data=util.uint8_array_to_bytes(gattc_write_params.p_value,
+                                                  gattc_write_params.len),
+                   offset=gattc_write_params.offset)
 
     def to_c(self):
-        self.__data_array = util.list_to_uint8_array(self.data)
+        self.__data_array = util.bytes_to_uint8_array(self.data)
         write_params = driver.ble_gattc_write_params_t()
         write_params.p_value = self.__data_array.cast()
         write_params.flags = self.flags.value
@@ -441,7 +442,7 @@ class BLEGattsValue(object):
         self.offset = offset
 
     def to_c(self):
-        self.__data_array = util.list_to_uint8_array(self.value)
+        self.__data_array = util.bytes_to_uint8_array(self.value)
         params = driver.ble_gatts_value_t()
         params.offset = self.offset
         params.len = len(self.value)
@@ -451,7 +452,7 @@ class BLEGattsValue(object):
     @classmethod
     def from_c(cls, params):
         offset = params.offset
-        value = bytearray(util.uint8_array_to_list(params.p_value, params.len))
+        value = bytearray(util.uint8_array_to_bytes(params.p_value, params.len))
         return cls(value, offset)
 
     def __repr__(self):
@@ -472,7 +473,7 @@ class BLEGattsHvx(object):
 
         self._len_ptr = driver.new_uint16()
         if self.data:
-            self.__data_array = util.list_to_uint8_array(self.data)
+            self.__data_array = util.bytes_to_uint8_array(self.data)
             params.p_data = self.__data_array.cast()
             driver.uint16_assign(self._len_ptr, len(self.data))
         else:
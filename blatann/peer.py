@@ -4,7 +4,7 @@ import asyncio
 import logging
 import threading
 import enum
-from typing import Optional, Type, Tuple
+from typing import Iterable, Optional, Type, Tuple
 
 from blatann.event_type import EventSource, Event
 from blatann.gap import smp
@@ -13,6 +13,7 @@ from blatann.gatt import gattc, service_discovery, MTU_SIZE_DEFAULT, MTU_SIZE_MI
 from blatann.nrf import nrf_events
 from blatann.nrf.nrf_types.enums import BLE_CONN_HANDLE_INVALID
 from blatann.nrf.nrf_types import BLEGapDataLengthParams
+from blatann.uuid import Uuid
 from blatann.waitables.waitable import EmptyWaitable, Waitable
 from blatann.waitables.event_waitable import EventWaitable
 from blatann.event_args import *
@@ -322,7 +323,8 @@ class Peer(object):
     @property
     def on_database_discovery_complete(self) -> Event[Peripheral, DatabaseDiscoveryCompleteEventArgs]:
         """
-        Event that is triggered when database discovery has completed
+        Event that is triggered when database discovery has completed,
+        including when the database is rediscovered after a Service Changed indication (see :meth:`discover_services`)
         """
         return self._discoverer.on_discovery_complete
 
@@ -439,14 +441,36 @@ class Peer(object):
         self._ble_device.ble_driver.ble_gap_phy_update(self.conn_handle, phy, phy)
         return EventWaitable(self._on_phy_updated)
 
-    def discover_services(self) -> EventWaitable[Peer, DatabaseDiscoveryCompleteEventArgs]:
+    def discover_services(self, use_cache=False, uuids: Iterable[Uuid] = None,
+                          discover_descriptors=True) -> EventWaitable[Peer, DatabaseDiscoveryCompleteEventArgs]:
         """
         Starts the database discovery process of the peer. This will discover all services, characteristics, and
         descriptors on the peer's database.
 
+        If ``uuids`` is provided, only the services with those UUIDs (and their characteristics and descriptors)
+        are discovered, which is much faster on large databases when only a few services are used.
+
+        With ``use_cache``, the discovered database is stored alongside the peer's bonding data and restored without
+        discovering on later connections. If the peer has a Database Hash characteristic it is read on reconnect and
+        the database is rediscovered if the hash no longer matches.
+        When the peer sends a Service Changed indication the cache is invalidated and the database is rediscovered,
+        triggering :attr:`on_database_discovery_complete` again. Characteristics found before then are stale
+        and must be looked up again from :attr:`database`.
+
+        With ``discover_descriptors`` False, discovery completes once the characteristics are known,
+        which shortens the time until the first characteristic can be used.
+        Subscribing and unsubscribing discover the characteristic's descriptors automatically. Otherwise they are
+        only discovered through :meth:`~blatann.gatt.gattc.GattcCharacteristic.discover_descriptors`,
+        until then :meth:`~blatann.gatt.gattc.GattcCharacteristic.find_descriptor` and
+        :attr:`~blatann.gatt.gattc.GattcCharacteristic.attributes` raise an InvalidStateException.
+
+        :param use_cache: True to use the discovery cache for bonded peers.
+                          A database discovered with ``uuids`` or without descriptors is not stored in the cache
+        :param uuids: Optional UUIDs of the services to discover. If not provided, all services are discovered
+        :param discover_descriptors: False to discover the descriptors on demand instead of during discovery
         :return: a Waitable that will trigger when service discovery is complete
         """
-        self._discoverer.start()
+        self._discoverer.start(use_cache, uuids, discover_descriptors)
         return EventWaitable(self._discoverer.on_discovery_complete)
 
     def start_rssi_reporting(self, threshold_dbm: int = None, skip_count=1) -> EventWaitable[Peer, int]:
@@ -492,6 +516,8 @@ class Peer(object):
         self._disconnect_waitable = EventWaitable(self.on_disconnect)
         self.connection_state = PeerState.CONNECTED
         self._current_connection_params = ActiveConnectionParameters(connection_params)
+        # Route any handlers which were subscribed before the connection was established
+        self._route_driver_event_handlers()
 
         self._ble_device.ble_driver.event_subscribe(self._on_disconnect_event, nrf_events.GapEvtDisconnected)
         self.driver_event_subscribe(self._on_connection_param_update, nrf_events.GapEvtConnParamUpdate)
@@ -504,26 +530,26 @@ class Peer(object):
         self.driver_event_subscribe(self._rssi_changed, nrf_events.GapEvtRssiChanged)
         self._on_connect.notify(self)
 
-    def _check_driver_event_connection_handle_wrapper(self, func):
-        def wrapper(driver, event):
-            if self.connected and self.conn_handle == event.conn_handle:
-                func(driver, event)
-        return wrapper
-
-    def driver_event_subscribe(self, handler, *event_types):
+    def driver_event_subscribe(self, handler, *event_types, attr_handle=None):
         """
         Internal method that subscribes handlers to NRF Driver events directed at this peer.
         Handlers are automatically unsubscribed once the peer disconnects.
 
+        The subscription is routed by the driver using the peer's connection handle (and attribute handle, if provided)
+        so the handler is only invoked for events on this connection.
+        If the peer is not yet connected, the subscription is made once the connection is established.
+
         :meta private:
         :param handler: The handler to subscribe
         :param event_types: The NRF Driver event types to subscribe to
+        :param attr_handle: Optional attribute handle to further filter events on
         """
-        wrapped_handler = self._check_driver_event_connection_handle_wrapper(handler)
         with self._connection_handler_lock:
             if handler not in self._connection_based_driver_event_handlers:
-                self._connection_based_driver_event_handlers[handler] = wrapped_handler
-                self._ble_device.ble_driver.event_subscribe(wrapped_handler, *event_types)
+                self._connection_based_driver_event_handlers[handler] = (event_types, attr_handle)
+                if self.connected:
+                    self._ble_device.ble_driver.event_subscribe(handler, *event_types, conn_handle=self.conn_handle,
+                                                                attr_handle=attr_handle)
 
     def driver_event_unsubscribe(self, handler, *event_types):
         """
@@ -534,12 +560,22 @@ class Peer(object):
         :param event_types: The event types to unsubscribe from
         """
         with self._connection_handler_lock:
-            wrapped_handler = self._connection_based_driver_event_handlers.get(handler, None)
-            logger.debug("Unsubscribing {} ({})".format(handler, wrapped_handler))
-            if wrapped_handler:
-                self._ble_device.ble_driver.event_unsubscribe(wrapped_handler, *event_types)
+            subscription = self._connection_based_driver_event_handlers.get(handler, None)
+            logger.debug("Unsubscribing %s", handler)
+            if subscription:
+                subscribed_types, attr_handle = subscription
+                if self.connected:
+                    self._ble_device.ble_driver.event_unsubscribe(handler, *(event_types or subscribed_types),
+                                                                  conn_handle=self.conn_handle,
+                                                                  attr_handle=attr_handle)
                 del self._connection_based_driver_event_handlers[handler]
 
+    def _route_driver_event_handlers(self):
+        with self._connection_handler_lock:
+            for handler, (event_types, attr_handle) in self._connection_based_driver_event_handlers.items():
+                self._ble_device.ble_driver.event_subscribe(handler, *event_types, conn_handle=self.conn_handle,
+                                                            attr_handle=attr_handle)
+
     """
     Private Methods
     """
@@ -553,8 +589,9 @@ class Peer(object):
         self._on_disconnect.notify(self, DisconnectionEventArgs(event.reason))
 
         with self._connection_handler_lock:
-            for handler in self._connection_based_driver_event_handlers.values():
-                self._ble_device.ble_driver.event_unsubscribe_all(handler)
+            for handler, (event_types, attr_handle) in self._connection_based_driver_event_handlers.items():
+                self._ble_device.ble_driver.event_unsubscribe(handler, *event_types, conn_handle=event.conn_handle,
+                                                              attr_handle=attr_handle)
             self._connection_based_driver_event_handlers = {}
         self._ble_device.ble_driver.event_unsubscribe(self._on_disconnect_event)
         self._ble_device.ble_driver.event_unsubscribe(self._on_connection_param_update)
@@ -562,7 +599,7 @@ class Peer(object):
     def _on_connection_param_update(self, driver, event: nrf_events.GapEvtConnParamUpdate):
         if not self.connected:
             return
-        logger.debug("[{}] Conn params updated: {}".format(self.conn_handle, event.conn_params))
+        logger.debug("[%s] Conn params updated: %s", self.conn_handle, event.conn_params)
         self._current_connection_params = ActiveConnectionParameters(event.conn_params)
         self._on_conn_params_updated.notify(self, ConnectionParametersUpdatedEventArgs(self._current_connection_params))
 
@@ -580,8 +617,8 @@ class Peer(object):
     def _resolve_mtu_exchange(self, our_mtu, peer_mtu):
         previous_mtu_size = self._mtu_size
         self._mtu_size = max(min(our_mtu, peer_mtu), MTU_SIZE_MINIMUM)
-        logger.debug("[{}] MTU Exchange - Ours: {}, Peers: {}, Effective: {}".format(self.conn_handle,
-                                                                                     our_mtu, peer_mtu, self._mtu_size))
+        logger.debug("[%s] MTU Exchange - Ours: %s, Peers: %s, Effective: %s", self.conn_handle,
+                     our_mtu, peer_mtu, self._mtu_size)
         self._on_mtu_size_updated.notify(self, MtuSizeUpdatedEventArgs(previous_mtu_size, self._mtu_size))
 
         return previous_mtu_size, self._mtu_size
@@ -687,7 +724,7 @@ class Peripheral(Peer):
         if not self.connected:
             return
         conn_params = self._conn_param_update_request_handler(self, event.conn_params)
-        logger.debug("[{}] Conn params update request to: {}. Return: {}".format(self.conn_handle, event.conn_params, conn_params))
+        logger.debug("[%s] Conn params update request to: %s. Return: %s", self.conn_handle, event.conn_params, conn_params)
 
         self._ble_device.ble_driver.ble_gap_conn_param_update(self.conn_handle, conn_params)
 
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import logging
+import threading
+import weakref
+
+logger = logging.getLogger(__name__)
+
+
+class LoopDispatcher(object):
+    """
+    Delivers calls made from other threads (normally the driver's event thread) into an asyncio event loop in batches.
+
+    Calls are queued and the loop is woken up with a single ``call_soon_threadsafe()`` which runs every call
+    queued up until the loop gets to it, instead of scheduling each call (or a coroutine and future) separately.
+    Use :meth:`for_loop` to get the dispatcher shared by everything delivering into the same loop.
+    """
+    # Loop -> dispatcher. Dispatchers only hold a weak reference to their loop so the loop can be garbage collected
+    _dispatchers = weakref.WeakKeyDictionary()
+    _dispatchers_lock = threading.Lock()
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = weakref.ref(loop)
+        self._lock = threading.Lock()
+        self._pending = collections.deque()
+        self._drain_scheduled = False
+        self._call_count = 0
+        self._drain_count = 0
+
+    @classmethod
+    def for_loop(cls, loop: asyncio.AbstractEventLoop = None) -> LoopDispatcher:
+        """
+        Gets the dispatcher for the given event loop, creating it if needed
+
+        :param loop: The event loop, or None to use the running event loop
+        """
+        if loop is None:
+            loop = asyncio.get_running_loop()
+        dispatcher = cls._dispatchers.get(loop)
+        if dispatcher is None:
+            with cls._dispatchers_lock:
+                dispatcher = cls._dispatchers.get(loop)
+                if dispatcher is None:
+                    dispatcher = cls._dispatchers[loop] = LoopDispatcher(loop)
+        return dispatcher
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop()
+
+    @property
+    def call_count(self) -> int:
+        """
+        The number of calls that have been delivered into the loop
+        """
+        return self._call_count
+
+    @property
+    def drain_count(self) -> int:
+        """
+        The number of times the loop was woken up to run the queued calls
+        """
+        return self._drain_count
+
+    def call_soon(self, callback, *args):
+        """
+        Schedules the callback to be called with the given args from within the event loop.
+        Thread-safe, calls are run in the order they are scheduled
+
+        :param callback: The function to call
+        :param args: The arguments to call the function with
+        """
+        with self._lock:
+            self._pending.append((callback, args))
+            if self._drain_scheduled:
+                return
+            self._drain_scheduled = True
+
+        loop = self._loop()
+        try:
+            if loop is None:
+                raise RuntimeError("Event loop was garbage collected")
+            loop.call_soon_threadsafe(self._drain)
+        except RuntimeError as e:
+            # Loop is closed, nothing will run the calls
+            logger.warning("Unable to deliver calls into event loop: %s", e)
+            with self._lock:
+                self._pending.clear()
+                self._drain_scheduled = False
+
+    def set_future_result(self, future: asyncio.Future, result):
+        """
+        Sets the result of the future from within the event loop, if the future is not already done (e.g. cancelled)
+        """
+        self.call_soon(_set_future_result, future, result)
+
+    def _drain(self):
+        with self._lock:
+            pending = self._pending
+            self._pending = collections.deque()
+            self._drain_scheduled = False
+        self._drain_count += 1
+        self._call_count += len(pending)
+        for callback, args in pending:
+            try:
+                callback(*args)
+            except Exception:
+                logger.exception("Error occurred while running %r in the event loop", callback)
+
+
+def _set_future_result(future: asyncio.Future, result):
+    if not future.done():
+        future.set_result(result)
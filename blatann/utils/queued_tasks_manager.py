@@ -1,4 +1,5 @@
 import threading
+from collections import OrderedDict
 from typing import Generic, Optional, TypeVar
 import queue
 import logging
@@ -11,7 +12,16 @@ T = TypeVar("T")
 
 class QueuedTasksManagerBase(Generic[T]):
     """
-    Handles queuing of tasks that can only be done one at a time
+    Handles queuing of tasks that can only be done one at a time.
+
+    Tasks must have a unique ``id`` attribute. Tasks waiting to be processed are indexed by their ID
+    so a single task can be cancelled without searching the queue.
+
+    If created with multiple priority levels, tasks must also have a ``priority`` attribute,
+    from 0 (the highest priority) to ``priority_levels - 1``. Waiting tasks are kept in a queue per priority
+    and the highest priority task is processed first, tasks with the same priority are processed in the order they were added.
+    To keep a steady stream of higher priority tasks from starving the lower priorities, a waiting priority is processed
+    once ``starvation_limit`` tasks have been processed ahead of it
     """
     class TaskFailure:
         def __init__(self, reason=None, ignore_stack_trace=False, clear_all=False):
@@ -19,16 +29,36 @@ class QueuedTasksManagerBase(Generic[T]):
             self.clear_all = clear_all
             self.reason = reason
 
-    def __init__(self, max_processing_items_at_once=1):
-        self._input_queue = queue.Queue()
+    def __init__(self, max_processing_items_at_once=1, priority_levels=1, starvation_limit=8):
+        """
+        :param max_processing_items_at_once: The number of tasks which can be processed at the same time
+        :param priority_levels: The number of task priorities
+        :param starvation_limit: The number of tasks which can be processed ahead of a waiting
+                                 lower priority task before it is processed
+        """
+        if priority_levels < 1 or starvation_limit < 1:
+            raise ValueError("Invalid priority configuration")
+        # A queue per priority of task ID -> task, in the order the tasks were added
+        self._input_queues = [OrderedDict() for _ in range(priority_levels)]
+        # The number of tasks processed ahead of each priority's oldest waiting task
+        self._skipped_counts = [0] * priority_levels
+        self._starvation_limit = starvation_limit
         self._lock = threading.RLock()
         self._in_process_queue = queue.Queue(max_processing_items_at_once)
 
+    @property
+    def queued_count(self) -> int:
+        """
+        The number of tasks waiting to be processed
+        """
+        return sum(len(q) for q in self._input_queues)
+
     def _add_task(self, task: T):
         with self._lock:
             # Cannot process any more tasks currently, add to input queue
             if self._in_process_queue.full():
-                self._input_queue.put(task)
+                priority = task.priority if len(self._input_queues) > 1 else 0
+                self._input_queues[priority][task.id] = task
             else:
                 try:
                     # Handle the task. If it's not complete put it in the in process queue
@@ -49,7 +79,7 @@ class QueuedTasksManagerBase(Generic[T]):
             if self._in_process_queue.full():
                 return
             # Start processing tasks from the input queue
-            task = self._get_next(self._input_queue)
+            task = self._get_next_input()
             while task:
                 try:
                     task_complete = self._handle_task(task)
@@ -60,7 +90,7 @@ class QueuedTasksManagerBase(Generic[T]):
                             break
                 except Exception as e:
                     self._process_exception(task, e)
-                task = self._get_next(self._input_queue)
+                task = self._get_next_input()
 
     def _process_exception(self, task: T, e: Exception):
         action = self._handle_task_failure(task, e)
@@ -70,13 +100,49 @@ class QueuedTasksManagerBase(Generic[T]):
             self._clear_all(action.reason)
 
     def _get_next(self, q: queue.Queue) -> Optional[T]:
-        if not q:
-            q = self._input_queue
         try:
             return q.get_nowait()
         except queue.Empty:
             return None
 
+    def _get_next_input(self) -> Optional[T]:
+        selected = None
+        for priority, q in enumerate(self._input_queues):
+            if not q:
+                continue
+            if selected is None:
+                selected = priority
+            else:
+                # Lower priority task being passed over, process it instead if it has waited long enough
+                self._skipped_counts[priority] += 1
+                if self._skipped_counts[priority] >= self._starvation_limit and \
+                        self._skipped_counts[selected] < self._starvation_limit:
+                    selected = priority
+        if selected is None:
+            return None
+        self._skipped_counts[selected] = 0
+        return self._input_queues[selected].popitem(last=False)[1]
+
+    def _cancel_task(self, task_id, reason) -> bool:
+        """
+        Removes the task from the queue if it has not been started yet and notifies it that it was cleared
+
+        :param task_id: The ID of the task to cancel
+        :param reason: The reason the task was cancelled, passed to :meth:`_handle_task_cleared`
+        :return: True if the task was cancelled, False if it was already started or has completed
+        """
+        with self._lock:
+            for priority, q in enumerate(self._input_queues):
+                task = q.pop(task_id, None)
+                if task is not None:
+                    if not q:
+                        self._skipped_counts[priority] = 0
+                    break
+            else:
+                return False
+            self._handle_task_cleared(task, reason)
+        return True
+
     def _clear_all(self, reason):
         with self._lock:
             # Clear the process queue, then clear the input queue
@@ -85,15 +151,18 @@ class QueuedTasksManagerBase(Generic[T]):
                 self._handle_task_cleared(task, reason)
                 task = self._get_next(self._in_process_queue)
 
-            # Clear the input queue
-            task = self._get_next(self._input_queue)
-            while task:
-                self._handle_task_cleared(task, reason)
-                task = self._get_next(self._input_queue)
+            # Clear the input queues, highest priority first
+            for priority, q in enumerate(self._input_queues):
+                while q:
+                    self._handle_task_cleared(q.popitem(last=False)[1], reason)
+                self._skipped_counts[priority] = 0
 
     def clear_all(self):
         raise NotImplementedError()
 
+    def cancel(self, task_id) -> bool:
+        raise NotImplementedError()
+
     def _handle_task(self, task: T):
         raise NotImplementedError()
 
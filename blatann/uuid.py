@@ -14,8 +14,13 @@ class Uuid(object):
     def __init__(self, nrf_uuid=None, description=""):
         self.nrf_uuid = nrf_uuid
         self.description = description
+        # (bit length, integer value), set by the subclasses.
+        # UUIDs are compared and hashed using this instead of their string representations
+        self._key = None
 
     def __eq__(self, other):
+        if isinstance(other, Uuid):
+            return self._key == other._key
         return str(self) == str(other)
 
     def __repr__(self):
@@ -54,6 +59,7 @@ class Uuid128(Uuid):
         else:
             raise ValueError("UUID Must be of string or list type")
         self.nrf_uuid = None
+        self._key = (128, int.from_bytes(bytes(self.uuid), byteorder="big", signed=False))
 
     def _validate_uuid_str(self, uuid):
         r = re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$")
@@ -127,7 +133,7 @@ class Uuid128(Uuid):
         return self.uuid_str
 
     def __hash__(self):
-        return int.from_bytes(self.uuid, byteorder="big", signed=False)
+        return self._key[1]
 
 
 class Uuid16(Uuid):
@@ -147,6 +153,7 @@ class Uuid16(Uuid):
             raise ValueError("UUID Must be a valid 16-bit integer")
         super(Uuid16, self).__init__(_BLEUUID(uuid), description)
         self.uuid = uuid
+        self._key = (16, uuid)
 
     def __str__(self):
         return "{:x}".format(self.uuid)
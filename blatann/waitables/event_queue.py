@@ -1,29 +1,205 @@
 import asyncio
+import collections
+import enum
 import queue
-from typing import Generic, Tuple, Union, Optional
+import threading
+from typing import AsyncIterator, Generic, List, Tuple, Optional
 from blatann.event_type import Event, TSender, TEvent
+from blatann.utils.loop_dispatcher import LoopDispatcher
 
 
 _disconnect_sentinel = object()
+_empty_sentinel = object()
+
+
+class QueueOverflowPolicy(enum.Enum):
+    """
+    Determines what happens when an event is received and a bounded event queue is full
+    """
+    # Block the thread dispatching the event until the consumer makes room in the queue.
+    # Events are normally dispatched from the driver's event thread, which stalls every other event while blocked
+    block = 0
+    # Discard the oldest queued event to make room for the new event
+    drop_oldest = 1
+    # Discard the new event
+    drop_newest = 2
+    # Replace the most recently queued event with the new event. The consumer always receives the latest value,
+    # the values in between are discarded
+    coalesce = 3
+
+
+class EventBatch(List[Tuple[TSender, TEvent]]):
+    """
+    A list of the ``(sender, event_args)`` pairs consumed from an event queue at once
+    """
+    def joined_values(self) -> Tuple[bytes, List[int]]:
+        """
+        Joins the ``value`` of each event in the batch (e.g. the data of notifications or writes) into a single buffer
+
+        :return: The buffer, and the offsets of each value within the buffer followed by the buffer's length,
+                 so value ``i`` is ``buffer[offsets[i]:offsets[i + 1]]``
+        """
+        offsets = [0]
+        for _, event in self:
+            offsets.append(offsets[-1] + len(event.value))
+        return b"".join(event.value for _, event in self), offsets
+
+
+class _EventBuffer(object):
+    """
+    Thread-safe buffer of the events received by an event queue, applying the overflow policy when full
+    """
+    def __init__(self, max_size: int, overflow_policy: QueueOverflowPolicy):
+        if max_size < 0:
+            raise ValueError("Event queue size cannot be negative")
+        self.max_size = max_size
+        self.overflow_policy = overflow_policy
+        self.dropped_count = 0
+        self._items = collections.deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._closed = False
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, item) -> bool:
+        """
+        :return: True if the item was queued, False if it was dropped
+        """
+        with self._lock:
+            if self._closed:
+                return False
+            if self.max_size and len(self._items) >= self.max_size:
+                policy = self.overflow_policy
+                if policy == QueueOverflowPolicy.drop_newest:
+                    self.dropped_count += 1
+                    return False
+                elif policy == QueueOverflowPolicy.drop_oldest:
+                    self._items.popleft()
+                    self.dropped_count += 1
+                elif policy == QueueOverflowPolicy.coalesce:
+                    self._items[-1] = item
+                    self.dropped_count += 1
+                    return True
+                else:
+                    while len(self._items) >= self.max_size and not self._closed:
+                        self._not_full.wait()
+                    if self._closed:
+                        return False
+            self._items.append(item)
+            self._not_empty.notify()
+        return True
+
+    def close(self, final_item):
+        """
+        Queues the final item regardless of the queue's size. Any items put afterward are ignored
+        and any threads blocked waiting for room are released
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._items.append(final_item)
+            self._not_empty.notify()
+            self._not_full.notify_all()
+
+    def get(self, block=True, timeout=None):
+        """
+        :return: The next item, or _empty_sentinel if there were no items and block is False
+        :raises: queue.Empty if the timeout is reached
+        """
+        with self._lock:
+            if not self._items:
+                if not block:
+                    return _empty_sentinel
+                if not self._not_empty.wait_for(lambda: self._items, timeout):
+                    raise queue.Empty
+            item = self._items.popleft()
+            self._not_full.notify()
+        return item
+
+    def get_batch(self, max_items=None, block=True, timeout=None) -> list:
+        """
+        Removes up to max_items of the items queued. The final item is only returned by itself
+
+        :return: The items, empty if there were no items and block is False
+        :raises: queue.Empty if the timeout is reached
+        """
+        with self._lock:
+            if not self._items:
+                if not block:
+                    return []
+                if not self._not_empty.wait_for(lambda: self._items, timeout):
+                    raise queue.Empty
+            items = self._items
+            count = len(items) if max_items is None else min(max_items, len(items))
+            if self._closed:
+                # Return the items before the final item, the final item is returned once it's first in the queue
+                count = max(1, min(count, len(items) - 1))
+            batch = [items.popleft() for _ in range(count)]
+            self._not_full.notify_all()
+        return batch
 
 
 class EventQueue(Generic[TSender, TEvent]):
     """
     Iterable object which provides a stream of events dispatched on a provided ``Event`` object.
     The iterator does not exit unless a "disconnect event" is provided, typically when a peer disconnects.
+
+    By default the queue is unbounded. If the consumer may fall behind, provide a ``max_size`` and
+    the policy to apply when the queue is full so the memory used is bounded.
     """
     def __init__(
             self,
             event: Event[TSender, TEvent],
-            disconnect_event: Event = None
+            disconnect_event: Event = None,
+            max_size: int = 0,
+            overflow_policy: QueueOverflowPolicy = QueueOverflowPolicy.drop_oldest
     ):
+        """
+        :param event: The event to queue
+        :param disconnect_event: Optional event which ends the stream of events
+        :param max_size: The number of events which can be queued before the overflow policy is applied,
+                         or 0 for an unbounded queue
+        :param overflow_policy: What to do when an event is received and the queue is full
+        """
         self._event = event
-        self._queue = queue.Queue[Union[Tuple[TSender, TEvent], None]]()
+        self._buffer = _EventBuffer(max_size, overflow_policy)
         self._event.register(self._on_event, weak=True)
         self._disconnect_event = disconnect_event
         if disconnect_event:
             disconnect_event.register(self._on_disconnect, weak=True)
 
+    @property
+    def max_size(self) -> int:
+        """
+        The number of events which can be queued before the overflow policy is applied, 0 if unbounded
+        """
+        return self._buffer.max_size
+
+    @property
+    def overflow_policy(self) -> QueueOverflowPolicy:
+        """
+        The policy applied when an event is received and the queue is full
+        """
+        return self._buffer.overflow_policy
+
+    @property
+    def depth(self) -> int:
+        """
+        The number of events currently waiting to be consumed
+        """
+        return len(self._buffer)
+
+    @property
+    def dropped_count(self) -> int:
+        """
+        The number of events which were discarded because the queue was full
+        """
+        return self._buffer.dropped_count
+
     def __iter__(self):
         """Create the iterator object"""
         return self
@@ -43,52 +219,115 @@ class EventQueue(Generic[TSender, TEvent]):
         :param block: True to block the current thread until the next event is received
         :param timeout: Optional timeout to wait for the next object
         :return: The next item in the queue
-        :raises: queue.Empty if a timeout is provided and no event was received
+        :raises: queue.Empty if a timeout is provided and no event was received,
+                 or if not blocking and there are no events queued
         """
-        item = self._queue.get(block, timeout)
+        item = self._buffer.get(block, timeout)
+        if item is _empty_sentinel:
+            raise queue.Empty
         if item is _disconnect_sentinel:
-            self._event.deregister(self._on_event)
-            if self._disconnect_event:
-                self._disconnect_event.deregister(self._on_disconnect)
+            self._on_disconnect_consumed()
             item = None
         return item
 
-    def _get_next(self, block=True, timeout=None):
-        item = self._queue.get(block, timeout)
-        if item is _disconnect_sentinel:
-            # Disconnection occurred, clear the handlers from the events
-            self._event.deregister(self._on_event)
-            if self._disconnect_event:
-                self._disconnect_event.deregister(self._on_disconnect)
-            item = None
-        return item
+    def get_batch(self, max_items: int = None, block=True, timeout=None) -> Optional[EventBatch[TSender, TEvent]]:
+        """
+        Gets all of the items currently in the queue at once, waiting for at least one item to be queued.
+        If a disconnect event occurs, the items queued before it are returned, then ``None`` is returned and
+        no other events are returned afterward.
+
+        :param max_items: The maximum number of items to return, or None to return every item queued
+        :param block: True to block the current thread until an event is received
+        :param timeout: Optional timeout to wait for an event
+        :return: The batch of items, or None if the disconnect event occurred
+        :raises: queue.Empty if a timeout is provided and no event was received,
+                 or if not blocking and there are no events queued
+        """
+        items = self._buffer.get_batch(max_items, block, timeout)
+        if not items:
+            raise queue.Empty
+        if items[0] is _disconnect_sentinel:
+            self._on_disconnect_consumed()
+            return None
+        return EventBatch(items)
+
+    def _on_disconnect_consumed(self):
+        # Disconnection occurred, clear the handlers from the events
+        self._event.deregister(self._on_event)
+        if self._disconnect_event:
+            self._disconnect_event.deregister(self._on_disconnect)
 
     def _on_event(self, sender: TSender, event: TEvent):
-        self._queue.put((sender, event))
+        self._buffer.put((sender, event))
 
     def _on_disconnect(self, sender, event):
-        self._queue.put(_disconnect_sentinel)
+        self._buffer.close(_disconnect_sentinel)
 
 
 class AsyncEventQueue(Generic[TSender, TEvent]):
     """
     Asynchronous iterable object which provides a stream of events dispatched on a provided ``Event`` object.
     The iterator does not exit unless a "disconnect event" is provided, typically when a peer disconnects.
+
+    By default the queue is unbounded. If the consumer may fall behind, provide a ``max_size`` and
+    the policy to apply when the queue is full so the memory used is bounded.
     """
     def __init__(
             self,
             event: Event[TSender, TEvent],
             disconnect_event: Event = None,
-            event_loop: asyncio.AbstractEventLoop = None
+            event_loop: asyncio.AbstractEventLoop = None,
+            max_size: int = 0,
+            overflow_policy: QueueOverflowPolicy = QueueOverflowPolicy.drop_oldest
     ):
+        """
+        :param event: The event to queue
+        :param disconnect_event: Optional event which ends the stream of events
+        :param event_loop: Optional event loop the queue will be consumed on. Defaults to the running event loop,
+                           it must be provided if the queue is not created from within the event loop
+        :param max_size: The number of events which can be queued before the overflow policy is applied,
+                         or 0 for an unbounded queue
+        :param overflow_policy: What to do when an event is received and the queue is full
+        """
         self._event = event
-        self._queue = asyncio.Queue()
-        self._event_loop = event_loop or asyncio.get_event_loop()
+        self._buffer = _EventBuffer(max_size, overflow_policy)
+        self._event_loop = event_loop or asyncio.get_running_loop()
+        self._dispatcher = LoopDispatcher.for_loop(self._event_loop)
+        # Created lazily within the event loop
+        self._item_available = None
         self._event.register(self._on_event, weak=True)
         self._disconnect_event = disconnect_event
         if disconnect_event:
             disconnect_event.register(self._on_disconnect, weak=True)
 
+    @property
+    def max_size(self) -> int:
+        """
+        The number of events which can be queued before the overflow policy is applied, 0 if unbounded
+        """
+        return self._buffer.max_size
+
+    @property
+    def overflow_policy(self) -> QueueOverflowPolicy:
+        """
+        The policy applied when an event is received and the queue is full
+        """
+        return self._buffer.overflow_policy
+
+    @property
+    def depth(self) -> int:
+        """
+        The number of events currently waiting to be consumed
+        """
+        return len(self._buffer)
+
+    @property
+    def dropped_count(self) -> int:
+        """
+        The number of events which were discarded because the queue was full
+        """
+        return self._buffer.dropped_count
+
     def __aiter__(self):
         """Create the async iterator object"""
         return self
@@ -107,17 +346,76 @@ class AsyncEventQueue(Generic[TSender, TEvent]):
 
         :return: The next item in the queue, or None if the disconnect event occurred
         """
-        item = await self._queue.get()
+        item = self._buffer.get(block=False)
+        while item is _empty_sentinel:
+            await self._wait_for_item()
+            item = self._buffer.get(block=False)
+
         if item is _disconnect_sentinel:
-            # Disconnection occurred, clear the handlers from the events
-            self._event.deregister(self._on_event)
-            if self._disconnect_event:
-                self._disconnect_event.deregister(self._on_disconnect)
+            self._on_disconnect_consumed()
             item = None
         return item
 
+    async def get_batch(self, max_items: int = None) -> Optional[EventBatch[TSender, TEvent]]:
+        """
+        Asynchronously gets all of the items currently in the queue at once, waiting for at least one item to be queued.
+        If a disconnect event occurs, the items queued before it are returned, then ``None`` is returned and
+        no other events are returned afterward.
+
+        :param max_items: The maximum number of items to return, or None to return every item queued
+        :return: The batch of items, or None if the disconnect event occurred
+        """
+        items = self._buffer.get_batch(max_items, block=False)
+        while not items:
+            await self._wait_for_item()
+            items = self._buffer.get_batch(max_items, block=False)
+
+        if items[0] is _disconnect_sentinel:
+            self._on_disconnect_consumed()
+            return None
+        return EventBatch(items)
+
+    async def batches(self, max_items: int = None) -> AsyncIterator[EventBatch[TSender, TEvent]]:
+        """
+        Asynchronously iterates over batches of the items in the queue until the disconnect event occurs.
+        Each batch contains every item queued by the time the previous batch was processed.
+
+        Example:
+
+        .. code-block:: python
+
+            async for batch in characteristic.notification_queue_async().batches():
+                data, offsets = batch.joined_values()
+
+        :param max_items: The maximum number of items in each batch, or None for no limit
+        """
+        batch = await self.get_batch(max_items)
+        while batch is not None:
+            yield batch
+            batch = await self.get_batch(max_items)
+
+    async def _wait_for_item(self):
+        if self._item_available is None:
+            self._item_available = asyncio.Event()
+        # Items queued before the flag is cleared still wake the loop afterward, their wake up is scheduled
+        # into the loop and only runs once this coroutine yields
+        self._item_available.clear()
+        await self._item_available.wait()
+
+    def _on_disconnect_consumed(self):
+        # Disconnection occurred, clear the handlers from the events
+        self._event.deregister(self._on_event)
+        if self._disconnect_event:
+            self._disconnect_event.deregister(self._on_disconnect)
+
+    def _wake(self):
+        if self._item_available is not None:
+            self._item_available.set()
+
     def _on_event(self, sender: TSender, event: TEvent):
-        asyncio.run_coroutine_threadsafe(self._queue.put((sender, event)), self._event_loop)
+        if self._buffer.put((sender, event)):
+            self._dispatcher.call_soon(self._wake)
 
     def _on_disconnect(self, sender, event):
-        asyncio.run_coroutine_threadsafe(self._queue.put(_disconnect_sentinel), self._event_loop)
+        self._buffer.close(_disconnect_sentinel)
+        self._dispatcher.call_soon(self._wake)
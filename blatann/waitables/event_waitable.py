@@ -1,4 +1,6 @@
 import asyncio
+import threading
+import weakref
 from typing import Generic, Tuple, Callable
 from blatann.waitables.waitable import Waitable
 from blatann.event_type import Event, TSender, TEvent
@@ -8,6 +10,8 @@ class EventWaitable(Waitable[Tuple[TSender, TEvent]]):
     """
     Waitable implementation which waits on an :class:`~blatann.event_type.Event`.
     """
+    __slots__ = ("_event",)
+
     def __init__(self, event: Event[TSender, TEvent]):
         super().__init__(n_args=2)
         self._event = event
@@ -41,15 +45,86 @@ class EventWaitable(Waitable[Tuple[TSender, TEvent]]):
         return super().then(callback)
 
 
+class _IdWaitableRouter(object):
+    """
+    Routes the events of a single high-churn event to the IdBasedEventWaitables waiting on them, keyed by the event ID.
+
+    A single handler is registered on the event so completing an operation is a dictionary lookup,
+    regardless of how many operations are outstanding
+    """
+    # Event -> router. Routers don't reference their event so the event can be garbage collected along with its router
+    _routers = weakref.WeakKeyDictionary()
+    _routers_lock = threading.Lock()
+
+    def __init__(self):
+        self._waitables = {}
+
+    @classmethod
+    def for_event(cls, event: Event) -> "_IdWaitableRouter":
+        router = cls._routers.get(event)
+        if router is None:
+            with cls._routers_lock:
+                router = cls._routers.get(event)
+                if router is None:
+                    router = cls._routers[event] = _IdWaitableRouter()
+                    event.register(router._on_event)
+        return router
+
+    def add(self, waitable: "IdBasedEventWaitable"):
+        self._waitables[waitable.id] = waitable
+
+    def remove(self, waitable: "IdBasedEventWaitable"):
+        if self._waitables.get(waitable.id) is waitable:
+            del self._waitables[waitable.id]
+
+    def _on_event(self, sender, event_args):
+        waitable = self._waitables.pop(event_args.id, None)
+        if waitable is not None:
+            waitable._on_event(sender, event_args)
+
+
 class IdBasedEventWaitable(EventWaitable):
     """
     Extension of :class:`EventWaitable` for high-churn events which require IDs to ensure the correct operation is waited upon,
     such as characteristic read, write and notify operations
     """
-    def __init__(self, event, event_id):
+    __slots__ = ("id", "_router", "_cancel_func")
+
+    def __init__(self, event, event_id, cancel_func: Callable[[int], bool] = None):
+        """
+        :param event: The event which is triggered when the operation completes
+        :param event_id: The ID of the operation
+        :param cancel_func: Optional function which cancels the operation by ID if it has not been started yet
+        """
+        # Not registered on the event directly, the event's router notifies the waitable with the matching ID
+        Waitable.__init__(self, n_args=2)
         self.id = event_id
-        super().__init__(event)
+        self._event = event
+        self._cancel_func = cancel_func
+        self._router = _IdWaitableRouter.for_event(event)
+        self._router.add(self)
+
+    def cancel(self) -> bool:
+        """
+        Cancels the operation if it is still queued and has not been sent yet.
+        The waitable then completes with the operation's reason set to ``CANCELLED``.
+
+        Operations are also cancelled when waiting on them times out, or their deadline set with
+        :meth:`~blatann.waitables.waitable.Waitable.with_timeout` expires, so stale operations do not delay the ones behind them
+
+        :return: True if the operation was cancelled, False if it was already sent, has completed
+                 or the operation does not support being cancelled
+        """
+        if self._cancel_func is None:
+            return False
+        return self._cancel_func(self.id)
 
     def _on_event(self, sender, event_args):
         if event_args.id == self.id:
-            super()._on_event(sender, event_args)
+            self._notify(sender, event_args)
+
+    def _on_timeout(self):
+        self._router.remove(self)
+        # Nothing is waiting on the operation anymore, don't send it if it's still queued
+        if self._cancel_func is not None:
+            self._cancel_func(self.id)
@@ -3,6 +3,7 @@ import queue
 import threading
 from typing import Iterable
 from blatann.waitables.waitable import Waitable
+from blatann.utils.loop_dispatcher import LoopDispatcher
 from blatann.nrf.nrf_events import GapEvtTimeout, BLEGapTimeoutSrc, GapEvtAdvReport
 from blatann.gap.advertise_data import ScanReport, ScanReportCollection
 
@@ -19,7 +20,7 @@ class ScanFinishedWaitable(Waitable):
         self.scanner.on_scan_received.register(self._on_scan_report)
         self.ble_driver = ble_device.ble_driver
         self._scan_report_queue = queue.Queue()
-        self._event_loop: asyncio.AbstractEventLoop = None
+        self._dispatcher: LoopDispatcher = None
         self._lock = threading.Lock()
 
     @property
@@ -46,7 +47,7 @@ class ScanFinishedWaitable(Waitable):
         with self._lock:
             existing_queue = self._scan_report_queue
             self._scan_report_queue = asyncio.Queue()
-            self._event_loop = asyncio.get_event_loop()
+            self._dispatcher = LoopDispatcher.for_loop(asyncio.get_running_loop())
             while True:
                 try:
                     item = existing_queue.get_nowait()
@@ -71,8 +72,8 @@ class ScanFinishedWaitable(Waitable):
     def _add_item(self, scan_report):
         with self._lock:
             q = self._scan_report_queue
-            if self._event_loop:
-                asyncio.run_coroutine_threadsafe(q.put(scan_report), self._event_loop)
+            if self._dispatcher:
+                self._dispatcher.call_soon(q.put_nowait, scan_report)
             else:
                 q.put(scan_report)
 
@@ -0,0 +1,211 @@
+import logging
+import threading
+import time
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class TimerHandle(object):
+    """
+    A callback scheduled on a :class:`TimerWheel`
+    """
+    __slots__ = ("deadline_tick", "_callback", "_args", "_slot")
+
+    def __init__(self, deadline_tick: int, callback: Callable, args: tuple):
+        self.deadline_tick = deadline_tick
+        self._callback = callback
+        self._args = args
+        self._slot = None
+
+    @property
+    def active(self) -> bool:
+        """
+        True if the timer is still scheduled, False once it has fired or been cancelled
+        """
+        return self._slot is not None
+
+
+class TimerWheel(object):
+    """
+    Hierarchical timer wheel which runs many timers from a single thread.
+
+    Timers are kept in buckets by deadline instead of in a sorted structure, so scheduling and cancelling a timer
+    are O(1) regardless of how many timers are pending. The first level has a bucket for each tick,
+    each higher level has buckets spanning a full rotation of the level below and its timers are moved down
+    a level as their deadline gets closer. Timers fire on the tick of their deadline,
+    so their accuracy is the wheel's resolution.
+
+    The thread is started when the first timer is scheduled, and while there are no timers due soon it sleeps
+    until the next level is moved down instead of waking up every tick.
+
+    Use :meth:`default` to get the wheel shared by the waitables.
+    """
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, resolution=0.01, slots_per_level=64, levels=4, name="TimerWheel"):
+        """
+        :param resolution: The length of a tick, in seconds
+        :param slots_per_level: The number of buckets in each level of the wheel
+        :param levels: The number of levels. Timers further out than the wheel's span are moved down
+                       once they are within it
+        :param name: Name of the wheel's thread
+        """
+        if resolution <= 0 or slots_per_level < 2 or levels < 1:
+            raise ValueError("Invalid timer wheel configuration")
+        self._resolution = resolution
+        self._slots_per_level = slots_per_level
+        self._levels = [[set() for _ in range(slots_per_level)] for _ in range(levels)]
+        self._level_counts = [0] * levels
+        self._name = name
+        self._origin = time.monotonic()
+        self._current_tick = 0
+        self._wake_tick = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = None
+
+    @classmethod
+    def default(cls) -> "TimerWheel":
+        """
+        Gets the timer wheel shared by the waitables, creating it if needed
+        """
+        wheel = cls._default
+        if wheel is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cls._default = TimerWheel(name="Waitable_TimerWheel")
+                wheel = cls._default
+        return wheel
+
+    @property
+    def resolution(self) -> float:
+        """
+        The length of a tick, in seconds
+        """
+        return self._resolution
+
+    @property
+    def pending_count(self) -> int:
+        """
+        The number of timers which are scheduled and have not yet fired
+        """
+        return sum(self._level_counts)
+
+    def schedule(self, delay: float, callback: Callable, *args) -> TimerHandle:
+        """
+        Schedules the callback to be called with the given args once the delay has elapsed.
+        The callback is run on the wheel's thread, so it should return quickly
+
+        :param delay: The time to wait before calling the callback, in seconds
+        :param callback: The function to call
+        :param args: The arguments to call the function with
+        :return: The handle which can be used to cancel the timer
+        """
+        # Rounded up, a timer never fires early
+        deadline_tick = -int(-(time.monotonic() - self._origin + delay) // self._resolution)
+        handle = TimerHandle(deadline_tick, callback, args)
+        with self._lock:
+            if not self.pending_count:
+                # Nothing was pending so the wheel has not been kept up to date, skip the idle time
+                self._current_tick = max(self._current_tick, self._now_tick() - 1)
+            self._place(handle)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self._name)
+                self._thread.daemon = True
+                self._thread.start()
+            elif self._wake_tick is None or self._next_tick() < self._wake_tick:
+                self._wakeup.notify()
+        return handle
+
+    def cancel(self, handle: TimerHandle):
+        """
+        Cancels the timer if it has not fired yet
+        """
+        with self._lock:
+            slot = handle._slot
+            if slot is not None:
+                level, bucket = slot
+                self._levels[level][bucket].discard(handle)
+                self._level_counts[level] -= 1
+                handle._slot = None
+
+    def _now_tick(self):
+        return int((time.monotonic() - self._origin) // self._resolution)
+
+    def _place(self, handle: TimerHandle):
+        # Must be called with the lock held
+        delta = max(handle.deadline_tick - self._current_tick, 1)
+        span = self._slots_per_level
+        tick = max(handle.deadline_tick, self._current_tick + 1)
+        level = 0
+        while delta >= span and level < len(self._levels) - 1:
+            span *= self._slots_per_level
+            level += 1
+        if delta >= span:
+            # Further out than the whole wheel, moved down once the top level comes back around
+            tick = self._current_tick + span - 1
+        bucket = (tick // (span // self._slots_per_level)) % self._slots_per_level
+        self._levels[level][bucket].add(handle)
+        self._level_counts[level] += 1
+        handle._slot = (level, bucket)
+
+    def _next_tick(self):
+        """
+        Gets the next tick which needs processing, or None if there are no timers.
+        If nothing is due on the first level, skips ahead to when the next level is moved down
+        """
+        # Must be called with the lock held
+        if not self.pending_count:
+            return None
+        tick = self._current_tick + 1
+        if self._level_counts[0]:
+            return tick
+        return -(-tick // self._slots_per_level) * self._slots_per_level
+
+    def _advance(self, tick):
+        """
+        Moves the wheel forward to the tick, moving timers down levels and collecting the timers due on the tick
+        """
+        # Must be called with the lock held
+        self._current_tick = tick
+        # Move the timers down from the top level first, they may need to move down multiple levels
+        for level in range(len(self._levels) - 1, 0, -1):
+            level_span = self._slots_per_level ** level
+            if tick % level_span == 0:
+                bucket = self._levels[level][(tick // level_span) % self._slots_per_level]
+                handles = list(bucket)
+                bucket.clear()
+                self._level_counts[level] -= len(handles)
+                for handle in handles:
+                    self._place(handle)
+
+        bucket = self._levels[0][tick % self._slots_per_level]
+        expired = list(bucket)
+        bucket.clear()
+        self._level_counts[0] -= len(expired)
+        for handle in expired:
+            handle._slot = None
+        return expired
+
+    def _run(self):
+        while True:
+            with self._lock:
+                next_tick = self._next_tick()
+                while next_tick is None or next_tick > self._now_tick():
+                    self._wake_tick = next_tick
+                    if next_tick is None:
+                        self._wakeup.wait()
+                    else:
+                        delay = (next_tick * self._resolution) - (time.monotonic() - self._origin)
+                        self._wakeup.wait(max(delay, 0))
+                    next_tick = self._next_tick()
+                self._wake_tick = None
+                expired = self._advance(next_tick)
+
+            for handle in expired:
+                try:
+                    handle._callback(*handle._args)
+                except Exception:
+                    logger.exception("Error occurred in timer callback %r", handle._callback)
@@ -1,11 +1,21 @@
 from typing import Callable, Generic, TypeVar, Optional
 import asyncio
-import queue
+import threading
 from blatann.exceptions import TimeoutError
+from blatann.event_type import _submit_user_handler
+from blatann.utils.loop_dispatcher import LoopDispatcher
+from blatann.waitables.timer_wheel import TimerWheel
 
 
 T = TypeVar("T")
 
+# Guards the lazy creation of a waitable's completion event
+_completion_event_lock = threading.Lock()
+# Guards completing a waitable which has a deadline, the operation and the deadline race to complete it
+_expiry_lock = threading.Lock()
+# Stored as the results of a waitable whose deadline expired before the operation completed
+_timed_out = object()
+
 
 class Waitable(Generic[T]):
     """
@@ -13,15 +23,49 @@ class Waitable(Generic[T]):
     This is a similar concept to :class:`python:concurrent.futures.Future` where asynchronous
     operations can block the current thread, or register a handler to be called when it completes.
     """
+    # Waitables are created for every read, write and notification, keep them small and cheap to create.
+    # The event used to block in wait() is only created if wait() is called before the operation completes
+    __slots__ = ("_results", "_completion_event", "_callback", "_n_args", "_timer", "__weakref__")
+
     def __init__(self, n_args=1):
-        self._queue = queue.Queue()
+        self._results = None
+        self._completion_event = None
         self._callback = None
         self._n_args = n_args
+        self._timer = None
         if n_args < 1:
             raise ValueError()
 
-    def _handle_timeout(self, exception_on_timeout: bool):
-        self._on_timeout()
+    @property
+    def timed_out(self) -> bool:
+        """
+        **Read Only**
+
+        True if the deadline set with :meth:`with_timeout` expired before the operation completed
+        """
+        return self._results is _timed_out
+
+    def with_timeout(self, timeout: float):
+        """
+        Sets a deadline for the asynchronous operation, driven by the shared :class:`~blatann.waitables.timer_wheel.TimerWheel`
+        instead of a blocked thread or an asyncio timer per operation.
+
+        If the operation does not complete in time, the waitable's event handlers are deregistered,
+        anything blocked in :meth:`wait` is woken up to time out and the callback
+        (or the future from :meth:`as_future`) is completed with the timeout.
+        Results of the operation which arrive after the deadline are ignored.
+
+        :param timeout: How long the operation has to complete, in seconds
+        :return: This waitable object
+        """
+        if self._results is None:
+            timer = self._timer
+            if timer is not None:
+                TimerWheel.default().cancel(timer)
+            self._timer = TimerWheel.default().schedule(timeout, self._expire)
+        return self
+
+    def _timeout_result(self, exception_on_timeout: bool):
         if exception_on_timeout:
             raise TimeoutError("Timed out waiting for event to occur. "
                                "Waitable type: {}".format(self.__class__.__name__))
@@ -30,6 +74,10 @@ class Waitable(Generic[T]):
             return None
         return [None] * self._n_args
 
+    def _handle_timeout(self, exception_on_timeout: bool):
+        self._on_timeout()
+        return self._timeout_result(exception_on_timeout)
+
     def wait(self, timeout: float = None, exception_on_timeout=True) -> Optional[T]:
         """
         Waits for the asynchronous operation to complete
@@ -43,15 +91,19 @@ class Waitable(Generic[T]):
         :return: The result of the asynchronous operation
         :raises: TimeoutError
         """
-        try:
-            results = self._queue.get(timeout=timeout)
+        results = self._results
+        if results is None:
+            self._get_completion_event().wait(timeout)
+            results = self._results
+        if results is _timed_out:
+            # Handlers were already deregistered when the deadline expired
+            return self._timeout_result(exception_on_timeout)
+        if results is not None:
             if len(results) == 1:
                 return results[0]
             return results
-        except queue.Empty:
-            pass
 
-        # If we got here, the queue timed out. Return the value
+        # If we got here, the wait timed out. Return the value
         return self._handle_timeout(exception_on_timeout)
 
     async def as_async(
@@ -68,35 +120,55 @@ class Waitable(Generic[T]):
 
         :param timeout: How long to wait, or ``None`` to wait indefinitely
         :param exception_on_timeout: Flag to either throw an exception on timeout, or instead return ``None`` object(s)
-        :param loop: Optional asyncio event loop to use instead of the default one returned by ``asyncio.get_event_loop()``
+        :param loop: Optional asyncio event loop to use instead of the running one
         :return: The result of the asynchronous operation
         :raises: TimeoutError
         """
+        if timeout is not None:
+            self.with_timeout(timeout)
+        fut = self.as_future(loop or asyncio.get_running_loop())
+        try:
+            return await fut
+        except TimeoutError:
+            if exception_on_timeout:
+                raise
+        return self._timeout_result(False)
+
+    def as_future(self, loop: asyncio.AbstractEventLoop = None) -> asyncio.Future:
+        """
+        Gets an asyncio future which completes with the result of the asynchronous operation.
+        The result is delivered into the loop through the loop's :class:`~blatann.utils.loop_dispatcher.LoopDispatcher`,
+        so the completions of many operations are delivered together.
+
+        .. note:: This uses the waitable's callback, it cannot be combined with :meth:`then`
+
+        :param loop: Optional asyncio event loop to use instead of the default one returned by ``asyncio.get_event_loop()``
+        :return: The future. It is not cancelled if the operation does not complete,
+                 unless a deadline was set with :meth:`with_timeout` in which case it fails with a TimeoutError
+        """
         if loop is None:
             loop = asyncio.get_event_loop()
-
         fut = loop.create_future()
+        dispatcher = LoopDispatcher.for_loop(loop)
 
         def cb(*args):
-            if not fut.cancelled():
-                if len(args) == 0:
-                    args = None
-                elif len(args) == 1:
-                    args = args[0]
-                loop.call_soon_threadsafe(fut.set_result, args)
+            if self._results is _timed_out:
+                dispatcher.call_soon(_set_future_timeout, fut, self.__class__.__name__)
+                return
+            if len(args) == 0:
+                args = None
+            elif len(args) == 1:
+                args = args[0]
+            dispatcher.set_future_result(fut, args)
 
         self._callback = cb
-
-        if timeout is None:
-            return await fut  # Simply wait on the future
-
-        # Timeout given, wait for the specified period for the
-        try:
-            val = await asyncio.wait_for(fut, timeout)
-            return val
-        except asyncio.TimeoutError:
-            fut.cancel()
-        return self._handle_timeout(exception_on_timeout)
+        # The operation may have already completed before the callback was set
+        results = self._results
+        if results is _timed_out:
+            cb()
+        elif results is not None:
+            cb(*results)
+        return fut
 
     def then(self, callback: Callable[[T], None]):
         """
@@ -115,10 +187,57 @@ class Waitable(Generic[T]):
     def _on_timeout(self):
         pass
 
+    def _get_completion_event(self) -> threading.Event:
+        completion_event = self._completion_event
+        if completion_event is None:
+            with _completion_event_lock:
+                if self._completion_event is None:
+                    self._completion_event = threading.Event()
+                completion_event = self._completion_event
+            # The operation may have completed before the event existed for _notify() to set
+            if self._results is not None:
+                completion_event.set()
+        return completion_event
+
     def _notify(self, *results):
-        self._queue.put(results)
-        if self._callback:
-            self._callback(*results)
+        timer = self._timer
+        if timer is not None:
+            TimerWheel.default().cancel(timer)
+            with _expiry_lock:
+                if self._results is _timed_out:
+                    # Completed after the deadline, the timeout was already reported
+                    return
+                completed = self._results is None
+                if completed:
+                    self._results = results
+        else:
+            completed = self._results is None
+            if completed:
+                self._results = results
+        # Only the first result is kept, the operation completes once
+        if completed:
+            completion_event = self._completion_event
+            if completion_event is not None:
+                completion_event.set()
+        callback = self._callback
+        if callback and not _submit_user_handler(callback, callback, *results):
+            callback(*results)
+
+    def _expire(self):
+        # Called from the timer wheel's thread when the deadline passes
+        with _expiry_lock:
+            if self._results is not None:
+                return
+            self._results = _timed_out
+        self._on_timeout()
+        completion_event = self._completion_event
+        if completion_event is not None:
+            completion_event.set()
+        callback = self._callback
+        if callback:
+            results = [None] * self._n_args
+            if not _submit_user_handler(callback, callback, *results):
+                callback(*results)
 
 
 class GenericWaitable(Waitable[T]):
@@ -126,6 +245,8 @@ class GenericWaitable(Waitable[T]):
     Simple wrapper of a Waitable object which exposes a ``notify``
     method so external objects can signal/trigger the waitable's response
     """
+    __slots__ = ()
+
     def notify(self, *results):
         self._notify(*results)
 
@@ -135,9 +256,13 @@ class EmptyWaitable(Waitable[T]):
     Waitable class which will immediately return the args provided when waited on
     or when a callback function is registered
     """
+    __slots__ = ("_args",)
+
     def __init__(self, *args):
         super().__init__(len(args))
         self._args = args
+        # Already complete, allows as_future() and as_async() to resolve immediately
+        self._results = args
 
     def wait(self, timeout: float = None, exception_on_timeout=True) -> T:
         return self._args
@@ -146,3 +271,9 @@ class EmptyWaitable(Waitable[T]):
         if callback and callable(callback):
             callback(*self._args)
         return self
+
+
+def _set_future_timeout(future: asyncio.Future, waitable_type: str):
+    if not future.done():
+        future.set_exception(TimeoutError("Timed out waiting for event to occur. "
+                                          "Waitable type: {}".format(waitable_type)))
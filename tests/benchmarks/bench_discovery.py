@@ -0,0 +1,127 @@
+"""
+Counts the ATT round trips (request/response pairs) taken to discover a database with vendor-specific UUIDs.
+
+Two databases are discovered. The shared-base database has several services on a single vendor 128-bit base UUID,
+with characteristics on the same base, plus a service with a 16-bit UUID whose characteristics are on a second vendor base.
+The distinct-base database has several services which each have their own vendor base, with characteristics on
+the service's base, plus a service with a 16-bit UUID whose characteristics each have their own vendor base
+(limited by the number of vendor bases the devices can register).
+The central is reopened before each discovery so the bases are unknown to it and have to be resolved
+during discovery. Each run is done at the default ATT MTU and at a large MTU, where the discovery responses
+hold more entries, and with the descriptors discovered up front and on demand.
+Each run ends once the central is subscribed to the first subscribable characteristic,
+the time until the first notification can be received.
+
+Usage: python -m tests.benchmarks.bench_discovery [--dev1 COM1 --dev2 COM2] [--services 3] [--chars 10]
+"""
+import collections
+import time
+
+from blatann.gatt import MTU_SIZE_DEFAULT
+from blatann.gatt.gatts import GattsCharacteristicProperties
+from blatann.nrf import nrf_events
+from blatann.uuid import Uuid16, generate_random_uuid128
+
+from tests.benchmarks.common import arg_parser, open_device, connect, close_devices
+
+_RESPONSE_EVENTS = [
+    nrf_events.GattcEvtPrimaryServiceDiscoveryResponse,
+    nrf_events.GattcEvtCharacteristicDiscoveryResponse,
+    nrf_events.GattcEvtDescriptorDiscoveryResponse,
+    nrf_events.GattcEvtAttrInfoDiscoveryResponse,
+    nrf_events.GattcEvtReadResponse,
+]
+
+
+_MAX_VENDOR_BASES = 10
+
+
+def _add_shared_base_services(periph, n_services, n_chars):
+    props = GattsCharacteristicProperties(read=True, notify=True, max_length=20)
+    vendor_base = generate_random_uuid128()
+    for i in range(n_services):
+        service = periph.database.add_service(vendor_base.new_uuid_from_base(0x100 * (i + 1)))
+        for j in range(n_chars):
+            service.add_characteristic(vendor_base.new_uuid_from_base(0x100 * (i + 1) + j + 1), props)
+
+    char_base = generate_random_uuid128()
+    service = periph.database.add_service(Uuid16(0xFFF0))
+    for j in range(n_chars):
+        service.add_characteristic(char_base.new_uuid_from_base(j + 1), props)
+
+
+def _add_distinct_base_services(periph, n_services, n_chars):
+    props = GattsCharacteristicProperties(read=True, notify=True, max_length=20)
+    for i in range(n_services):
+        service_base = generate_random_uuid128()
+        service = periph.database.add_service(service_base.new_uuid_from_base(0x100))
+        for j in range(n_chars):
+            service.add_characteristic(service_base.new_uuid_from_base(0x100 + j + 1), props)
+
+    service = periph.database.add_service(Uuid16(0xFFF0))
+    for j in range(min(n_chars, _MAX_VENDOR_BASES - n_services - 1)):
+        service.add_characteristic(generate_random_uuid128().new_uuid_from_base(j + 1), props)
+
+
+_DATABASES = collections.OrderedDict([
+    ("shared", _add_shared_base_services),
+    ("distinct", _add_distinct_base_services),
+])
+
+
+def _run(periph, central, mtu, discover_descriptors):
+    periph.client.preferred_mtu_size = mtu
+    periph_conn, central_conn = connect(periph, central, discover_services=False)
+    if mtu != MTU_SIZE_DEFAULT:
+        central_conn.peer.exchange_mtu(mtu).wait(10)
+    counts = collections.Counter()
+
+    def on_response(driver, event):
+        counts[type(event).__name__] += 1
+
+    central.ble_driver.event_subscribe(on_response, *_RESPONSE_EVENTS)
+    try:
+        start = time.perf_counter()
+        central_conn.peer.discover_services(discover_descriptors=discover_descriptors).wait(60)
+        first_char = next(c for c in central_conn.peer.database.iter_characteristics() if c.subscribable)
+        first_char.subscribe().wait(10)
+        elapsed = time.perf_counter() - start
+    finally:
+        central.ble_driver.event_unsubscribe(on_response)
+        central_conn.peer.disconnect().wait(10)
+    return counts, elapsed
+
+
+def main():
+    parser = arg_parser(__doc__)
+    parser.add_argument("--services", type=int, default=3, help="Number of vendor-specific services in the database")
+    parser.add_argument("--chars", type=int, default=10, help="Number of characteristics in each service")
+    args = parser.parse_args()
+
+    periph = None
+    central = None
+    try:
+        for database, add_services in _DATABASES.items():
+            # Reopen the peripheral to start from an empty database
+            if periph:
+                close_devices(periph)
+            periph = open_device(args.dev1)
+            add_services(periph, args.services, args.chars)
+            for mtu in [MTU_SIZE_DEFAULT, periph.max_mtu_size]:
+                for discover_descriptors in [True, False]:
+                    # Reopen the central so none of the UUID bases are registered with it
+                    if central:
+                        close_devices(central)
+                    central = open_device(args.dev2)
+                    counts, elapsed = _run(periph, central, mtu, discover_descriptors)
+                    breakdown = ", ".join("{}: {}".format(name.replace("GattcEvt", ""), count)
+                                          for name, count in sorted(counts.items()))
+                    mode = "up front" if discover_descriptors else "on demand"
+                    print("{:<8} bases, MTU {:>3}, descriptors {:<9}: {:>4} round trips in {:>6.3f}s ({})".format(
+                        database, mtu, mode, sum(counts.values()), elapsed, breakdown))
+    finally:
+        close_devices(*[d for d in [periph, central] if d])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Measures how many calls per second go through NrfDriver.ble_gattc_write, with driver logging disabled and enabled.
+
+Write commands are issued to a write-without-response characteristic. When the connection's hardware queue is full
+the benchmark waits for the queue to drain, only the time spent inside ble_gattc_write is counted.
+
+Usage: python -m tests.benchmarks.bench_gattc_write [--dev1 COM1 --dev2 COM2] [--count 2000]
+"""
+import logging
+import threading
+import time
+
+from blatann.nrf import nrf_events, nrf_types
+from blatann.nrf.nrf_dll_load import NordicSemiException, driver
+
+from tests.benchmarks.common import arg_parser, open_device, connect, add_write_no_response_service, close_devices, report
+
+
+def _run(ble_driver, conn_handle, value_handle, count):
+    tx_complete = threading.Event()
+
+    def on_tx_complete(*args):
+        tx_complete.set()
+
+    ble_driver.event_subscribe(on_tx_complete, nrf_events.GattcEvtWriteCmdTxComplete)
+    write_params = nrf_types.BLEGattcWriteParams(nrf_types.BLEGattWriteOperation.write_cmd,
+                                                 nrf_types.BLEGattExecWriteFlag.unused,
+                                                 value_handle, b"\x00" * 20, 0)
+    elapsed = 0.0
+    completed = 0
+    try:
+        while completed < count:
+            tx_complete.clear()
+            start = time.perf_counter()
+            try:
+                ble_driver.ble_gattc_write(conn_handle, write_params)
+            except NordicSemiException as e:
+                if e.error_code != driver.NRF_ERROR_RESOURCES:
+                    raise
+                tx_complete.wait(1)
+                continue
+            elapsed += time.perf_counter() - start
+            completed += 1
+    finally:
+        ble_driver.event_unsubscribe(on_tx_complete)
+    return completed, elapsed
+
+
+def main():
+    parser = arg_parser(__doc__)
+    parser.add_argument("--count", type=int, default=2000, help="Number of writes to time for each run")
+    args = parser.parse_args()
+
+    periph = open_device(args.dev1)
+    central = open_device(args.dev2)
+    try:
+        char_uuid = add_write_no_response_service(periph)
+        _, central_conn = connect(periph, central)
+        characteristic = central_conn.db.find_characteristic(char_uuid)
+        value_handle = characteristic.value_attribute.handle
+        conn_handle = central_conn.peer.conn_handle
+        blatann_logger = logging.getLogger("blatann")
+
+        for name, level in [("logging disabled", logging.WARNING), ("logging enabled (DEBUG)", logging.DEBUG)]:
+            blatann_logger.setLevel(level)
+            count, elapsed = _run(central.ble_driver, conn_handle, value_handle, args.count)
+            report("ble_gattc_write, " + name, count, elapsed)
+    finally:
+        logging.getLogger("blatann").setLevel(logging.WARNING)
+        close_devices(periph, central)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Measures the cost of creating and completing Waitables, as done for every characteristic read, write and notification.
+
+The slot-based Waitable is compared with the previous implementation, which allocated a queue.Queue per waitable.
+No devices are needed.
+
+Usage: python -m tests.benchmarks.bench_waitable [--count 200000]
+"""
+import argparse
+import queue
+import time
+
+from blatann.event_type import EventSource
+from blatann.waitables.event_waitable import IdBasedEventWaitable
+from blatann.waitables.waitable import GenericWaitable
+
+from tests.benchmarks.common import report
+
+
+class _QueueWaitable(object):
+    """
+    The previous Waitable implementation, kept here as the baseline
+    """
+    def __init__(self, n_args=1):
+        self._queue = queue.Queue()
+        self._callback = None
+        self._n_args = n_args
+
+    def wait(self, timeout=None):
+        results = self._queue.get(timeout=timeout)
+        if len(results) == 1:
+            return results[0]
+        return results
+
+    def then(self, callback):
+        self._callback = callback
+        return self
+
+    def notify(self, *results):
+        self._queue.put(results)
+        if self._callback:
+            self._callback(*results)
+
+
+class _EventArgs(object):
+    def __init__(self, event_id):
+        self.id = event_id
+
+
+def _noop(*args):
+    pass
+
+
+def _time(waitable_type, count, use_then, use_wait):
+    start = time.perf_counter()
+    for i in range(count):
+        w = waitable_type()
+        if use_then:
+            w.then(_noop)
+        w.notify(i)
+        if use_wait:
+            w.wait(0)
+    return time.perf_counter() - start
+
+
+def _time_id_based(count):
+    event = EventSource("Bench")
+    start = time.perf_counter()
+    for i in range(count):
+        w = IdBasedEventWaitable(event, i)
+        w.then(_noop)
+        event.notify(None, _EventArgs(i))
+    return time.perf_counter() - start
+
+
+def _time_id_based_outstanding(count, outstanding):
+    event = EventSource("Bench")
+    start = time.perf_counter()
+    for batch_start in range(0, count, outstanding):
+        ids = range(batch_start, min(batch_start + outstanding, count))
+        for i in ids:
+            IdBasedEventWaitable(event, i).then(_noop)
+        for i in ids:
+            event.notify(None, _EventArgs(i))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=200000, help="Number of waitables to create for each run")
+    args = parser.parse_args()
+
+    for name, use_then, use_wait in [("create+complete", False, False),
+                                     ("create+then+complete", True, False),
+                                     ("create+complete+wait", False, True)]:
+        report("queue.Queue waitable, " + name, args.count, _time(_QueueWaitable, args.count, use_then, use_wait))
+        report("Waitable, " + name, args.count, _time(GenericWaitable, args.count, use_then, use_wait))
+    report("IdBasedEventWaitable, create+then+complete", args.count, _time_id_based(args.count))
+    report("IdBasedEventWaitable, 1000 outstanding", args.count, _time_id_based_outstanding(args.count, 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import os
+import time
+
+from blatann import BleDevice
+from blatann.gatt.gatts import GattsCharacteristicProperties
+from blatann.uuid import generate_random_uuid128
+
+from tests.integrated.helpers import PeriphConn, CentralConn, setup_connection
+
+BLATANN_DEV_ENVKEY_FORMAT = "BLATANN_DEV_{}"
+
+
+def arg_parser(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--dev1", default=os.environ.get(BLATANN_DEV_ENVKEY_FORMAT.format(1)),
+                        help="Comport of the peripheral device, defaults to $BLATANN_DEV_1")
+    parser.add_argument("--dev2", default=os.environ.get(BLATANN_DEV_ENVKEY_FORMAT.format(2)),
+                        help="Comport of the central device, defaults to $BLATANN_DEV_2")
+    return parser
+
+
+def open_device(comport):
+    if not comport:
+        raise EnvironmentError("Device comports must be provided with --dev1/--dev2 or the BLATANN_DEV_x variables")
+    dev = BleDevice(comport, bond_db_filename=":memory:")
+    dev.configure()
+    dev.open(True)
+    return dev
+
+
+def connect(periph: BleDevice, central: BleDevice, discover_services=True):
+    """
+    Connects the two devices and returns the connection objects for both sides
+    """
+    periph_conn = PeriphConn()
+    periph_conn.dev = periph
+    central_conn = CentralConn()
+    central_conn.dev = central
+    setup_connection(periph_conn, central_conn, discover_services=discover_services)
+    return periph_conn, central_conn
+
+
+def add_write_no_response_service(periph: BleDevice, max_length=20):
+    """
+    Adds a service with a single write-without-response characteristic to the peripheral's database
+
+    :return: The uuid of the characteristic added
+    """
+    char_uuid = generate_random_uuid128()
+    service = periph.database.add_service(generate_random_uuid128())
+    props = GattsCharacteristicProperties(read=False, write_no_response=True, max_length=max_length)
+    service.add_characteristic(char_uuid, props)
+    return char_uuid
+
+
+def close_devices(*devices):
+    for dev in devices:
+        dev.close()
+    # Give the boards time to reset before they get reopened
+    time.sleep(1)
+
+
+def report(name, count, elapsed):
+    rate = count / elapsed if elapsed else float("inf")
+    print("{:<40} {:>10} calls in {:>7.3f}s = {:>12,.0f} calls/s".format(name, count, elapsed, rate))
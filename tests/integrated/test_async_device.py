@@ -0,0 +1,98 @@
+import asyncio
+import unittest
+
+from blatann import AsyncBleDevice, BleDevice
+from blatann.gap import AdvertisingData, ScanParameters
+from blatann.gatt.gatts import GattsCharacteristicProperties
+from blatann.uuid import generate_random_uuid128
+
+from tests.integrated.base import BlatannTestCase
+from tests.integrated.helpers import rand_bytes
+
+
+class TestAsyncBleDevice(BlatannTestCase):
+    periph: BleDevice
+    central: BleDevice
+
+    service_uuid = generate_random_uuid128().new_uuid_from_base(0)
+    char_uuid = service_uuid.new_uuid_from_base(1)
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super(TestAsyncBleDevice, cls).setUpClass()
+        cls.periph = cls.dev1
+        cls.central = cls.dev2
+        svc = cls.periph.database.add_service(cls.service_uuid)
+        props = GattsCharacteristicProperties(read=True, write=True, notify=True, write_no_response=True,
+                                              max_length=20, variable_length=True)
+        cls.periph_char = svc.add_characteristic(cls.char_uuid, props, b"")
+        cls.periph.advertiser.set_advertise_data(AdvertisingData(flags=0x06, local_name="Blatann Async"))
+
+    def _run(self, coro):
+        return asyncio.run(asyncio.wait_for(coro, 30))
+
+    async def _connect(self, central: AsyncBleDevice):
+        self.periph.advertiser.start(timeout_sec=30)
+        peer = await central.connect(self.periph.address, timeout=10)
+        self.assertIsNotNone(peer)
+        return peer
+
+    def test_scan(self):
+        async def run():
+            central = AsyncBleDevice(self.central)
+            self.periph.advertiser.start(timeout_sec=5)
+            reports = []
+            async for report in central.scan_reports(ScanParameters(100, 100, 2)):
+                reports.append(report)
+            collection = await central.scan(ScanParameters(100, 100, 1))
+            self.periph.advertiser.stop()
+            return reports, collection
+
+        reports, collection = self._run(run())
+        self.assertTrue(any(r.peer_address == self.periph.address for r in reports))
+        self.assertTrue(any(r.peer_address == self.periph.address for r in collection.advertising_peers_found))
+
+    def test_connect_discover_read_write_notify(self):
+        async def run():
+            central = AsyncBleDevice(self.central)
+            peripheral = AsyncBleDevice(self.periph)
+            peer = await self._connect(central)
+            discovery = await central.discover_services(peer, timeout=10)
+            char = peer.database.find_characteristic(self.char_uuid)
+
+            value = rand_bytes(20)
+            write_result = await central.write(char, value, timeout=10)
+            self.periph_char.set_value(value)
+            read_result = await central.read(char, timeout=10)
+
+            # Issue a burst of writes concurrently, results should be delivered into the loop in batches
+            values = [rand_bytes(20) for _ in range(20)]
+            write_results = await asyncio.gather(*[central.write(char, v, with_response=False, timeout=10) for v in values])
+
+            await central.subscribe(char, timeout=10)
+            while not self.periph_char.client_subscribed:
+                await asyncio.sleep(0.01)
+            notifications = central.notifications(char)
+            notify_results = await asyncio.gather(*[peripheral.notify(self.periph_char, v, timeout=10) for v in values])
+            received = []
+            async for batch in notifications.batches():
+                received.extend(event_args.value for _, event_args in batch)
+                if len(received) >= len(values):
+                    break
+
+            disconnect = await central.disconnect(peer, timeout=10)
+            return value, discovery, write_result, read_result, write_results, notify_results, received, disconnect, central
+
+        value, discovery, write_result, read_result, write_results, notify_results, received, disconnect, central = self._run(run())
+        self.assertEqual(discovery.status.name, "success")
+        self.assertEqual(write_result.status.name, "success")
+        self.assertEqual(value, read_result.value)
+        self.assertTrue(all(r.status.name == "success" for r in write_results))
+        self.assertTrue(all(r.reason == r.Reason.SUCCESS for r in notify_results))
+        self.assertEqual(20, len(received))
+        self.assertIsNotNone(disconnect)
+        self.assertLessEqual(central.dispatcher.drain_count, central.dispatcher.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
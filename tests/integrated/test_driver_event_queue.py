@@ -0,0 +1,61 @@
+import types
+import unittest
+
+from blatann.nrf.nrf_dll_load import driver
+from blatann.nrf.nrf_event_queue import DriverEventQueue, OverflowPolicy
+
+
+def _event(evt_id, name):
+    return types.SimpleNamespace(header=types.SimpleNamespace(evt_id=evt_id), name=name)
+
+
+def _adv_report(name):
+    return _event(driver.BLE_GAP_EVT_ADV_REPORT, name)
+
+
+def _connected(name):
+    return _event(driver.BLE_GAP_EVT_CONNECTED, name)
+
+
+class TestDriverEventQueue(unittest.TestCase):
+    def _drain(self, event_queue):
+        return [e.name for _, e in event_queue.get_all(timeout=0)]
+
+    def test_events_drained_in_received_order(self):
+        event_queue = DriverEventQueue(max_size=10)
+        events = [_adv_report("adv1"), _connected("conn1"), _adv_report("adv2"), _connected("conn2")]
+        for i, e in enumerate(events):
+            self.assertTrue(event_queue.put(e, i))
+        self.assertEqual(4, event_queue.depth)
+
+        drained = event_queue.get_all(timeout=0)
+        self.assertEqual([(i, e) for i, e in enumerate(events)], drained)
+        self.assertEqual(0, event_queue.depth)
+        self.assertEqual([], event_queue.get_all(timeout=0))
+
+    def test_full_queue_drops_oldest_adv_report(self):
+        event_queue = DriverEventQueue(max_size=3)
+        for e in [_connected("conn1"), _adv_report("adv1"), _adv_report("adv2")]:
+            event_queue.put(e)
+
+        self.assertTrue(event_queue.put(_connected("conn2")))
+        self.assertTrue(event_queue.put(_adv_report("adv3")))
+        self.assertEqual(2, event_queue.dropped_count)
+        self.assertEqual(3, event_queue.high_water_mark)
+        self.assertEqual(["conn1", "conn2", "adv3"], self._drain(event_queue))
+
+    def test_full_queue_without_adv_reports(self):
+        event_queue = DriverEventQueue(max_size=2, overflow_policy=OverflowPolicy.drop_adv_reports)
+        event_queue.put(_connected("conn1"))
+        event_queue.put(_connected("conn2"))
+
+        # Advertising reports are dropped, other events are queued past the size
+        self.assertFalse(event_queue.put(_adv_report("adv1")))
+        self.assertTrue(event_queue.put(_connected("conn3")))
+        self.assertEqual(1, event_queue.dropped_count)
+        self.assertEqual(4, event_queue.received_count)
+        self.assertEqual(["conn1", "conn2", "conn3"], self._drain(event_queue))
+
+
+if __name__ == '__main__':
+    unittest.main()
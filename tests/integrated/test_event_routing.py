@@ -0,0 +1,203 @@
+import logging
+import queue
+import time
+import types
+import unittest
+from unittest import mock
+
+from blatann import BleDevice
+from blatann.bt_sig.uuids import CharacteristicUuid
+from blatann.nrf import nrf_events
+from blatann.nrf.nrf_driver import NrfDriverObserver
+
+from tests.integrated.base import BlatannTestCase
+from tests.integrated.helpers import PeriphConn, CentralConn, setup_connection
+
+
+class TestEventRouting(BlatannTestCase):
+    periph_conn = PeriphConn()
+    central_conn = CentralConn()
+    periph: BleDevice
+    central: BleDevice
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super(TestEventRouting, cls).setUpClass()
+        cls.periph = cls.dev1
+        cls.periph_conn.dev = cls.dev1
+        cls.central = cls.dev2
+        cls.central_conn.dev = cls.dev2
+
+    def setUp(self) -> None:
+        setup_connection(self.periph_conn, self.central_conn)
+        self.name_char = self.central_conn.db.find_characteristic(CharacteristicUuid.device_name)
+
+    def tearDown(self) -> None:
+        if self.central_conn.peer.connected:
+            self.central_conn.peer.disconnect().wait(10)
+        time.sleep(0.5)
+
+    def _read_name(self):
+        _, event_args = self.name_char.read().wait(10)
+        return event_args
+
+    def test_routed_by_connection_handle(self):
+        driver = self.central.ble_driver
+        conn_handle = self.central_conn.peer.conn_handle
+        other_conn_handle = conn_handle + 1
+        this_connection = queue.Queue()
+        other_connection = queue.Queue()
+
+        def on_this_connection(_, event):
+            this_connection.put(event.conn_handle)
+
+        def on_other_connection(_, event):
+            other_connection.put(event.conn_handle)
+
+        driver.event_subscribe(on_this_connection, nrf_events.GattcEvtReadResponse, conn_handle=conn_handle)
+        driver.event_subscribe(on_other_connection, nrf_events.GattcEvtReadResponse, conn_handle=other_conn_handle)
+        try:
+            self._read_name()
+        finally:
+            driver.event_unsubscribe(on_this_connection, nrf_events.GattcEvtReadResponse, conn_handle=conn_handle)
+            driver.event_unsubscribe(on_other_connection, nrf_events.GattcEvtReadResponse, conn_handle=other_conn_handle)
+
+        self.assertEqual(conn_handle, this_connection.get(timeout=1))
+        self.assertTrue(other_connection.empty())
+
+    def test_routed_by_attribute_handle(self):
+        driver = self.central.ble_driver
+        value_handle = self.name_char.value_attribute.handle
+        this_attribute = queue.Queue()
+        other_attribute = queue.Queue()
+
+        def on_this_attribute(_, event):
+            this_attribute.put(event.attr_handle)
+
+        def on_other_attribute(_, event):
+            other_attribute.put(event.attr_handle)
+
+        driver.event_subscribe(on_this_attribute, nrf_events.GattcEvtReadResponse, attr_handle=value_handle)
+        driver.event_subscribe(on_other_attribute, nrf_events.GattcEvtReadResponse, attr_handle=value_handle + 1)
+        try:
+            self._read_name()
+        finally:
+            driver.event_unsubscribe(on_this_attribute, nrf_events.GattcEvtReadResponse, attr_handle=value_handle)
+            driver.event_unsubscribe(on_other_attribute, nrf_events.GattcEvtReadResponse, attr_handle=value_handle + 1)
+
+        self.assertEqual(value_handle, this_attribute.get(timeout=1))
+        self.assertTrue(other_attribute.empty())
+
+    def test_handlers_called_in_subscription_order(self):
+        driver = self.central.ble_driver
+        conn_handle = self.central_conn.peer.conn_handle
+        value_handle = self.name_char.value_attribute.handle
+        order = queue.Queue()
+
+        def handler(name):
+            return lambda _, event: order.put(name)
+
+        subscriptions = [
+            (handler("routed"), dict(conn_handle=conn_handle)),
+            (handler("unrouted 1"), dict()),
+            (handler("routed by attribute"), dict(conn_handle=conn_handle, attr_handle=value_handle)),
+            (handler("unrouted 2"), dict()),
+        ]
+        for h, kwargs in subscriptions:
+            driver.event_subscribe(h, nrf_events.GattcEvtReadResponse, **kwargs)
+        try:
+            self._read_name()
+        finally:
+            for h, kwargs in subscriptions:
+                driver.event_unsubscribe(h, nrf_events.GattcEvtReadResponse, **kwargs)
+
+        self.assertEqual(["routed", "unrouted 1", "routed by attribute", "unrouted 2"],
+                         [order.get(timeout=1) for _ in subscriptions])
+
+    def test_peer_handlers_called_before_later_global_handlers(self):
+        # The peer subscribed to connection parameter updates when it connected, it should
+        # have already updated its parameters by the time a handler subscribed after connecting is called
+        driver = self.central.ble_driver
+        peer = self.central_conn.peer
+        seen_params = queue.Queue()
+
+        def on_conn_param_update(_, event):
+            seen_params.put((event.conn_params.min_conn_interval_ms, peer.active_connection_params.interval_ms))
+
+        interval_ms = 25 if peer.active_connection_params.interval_ms != 25 else 30
+        driver.event_subscribe(on_conn_param_update, nrf_events.GapEvtConnParamUpdate)
+        try:
+            peer.set_connection_parameters(interval_ms, interval_ms, 4000).wait(5)
+        finally:
+            driver.event_unsubscribe(on_conn_param_update, nrf_events.GapEvtConnParamUpdate)
+
+        event_interval_ms, peer_interval_ms = seen_params.get(timeout=1)
+        self.assertEqual(interval_ms, event_interval_ms)
+        self.assertEqual(event_interval_ms, peer_interval_ms)
+
+    def test_observer_changes_update_cached_dispatch(self):
+        driver = self.central.ble_driver
+        received = queue.Queue()
+
+        class ReadObserver(NrfDriverObserver):
+            def on_driver_event(self, nrf_driver, event):
+                received.put(event)
+
+            def observes_event(self, event_type):
+                return event_type is nrf_events.GattcEvtReadResponse
+
+        # Read once so the dispatch for the event type is cached before the observer is registered
+        self._read_name()
+        observer = ReadObserver()
+        driver.observer_register(observer)
+        try:
+            self._read_name()
+        finally:
+            driver.observer_unregister(observer)
+        self.assertIsInstance(received.get(timeout=1), nrf_events.GattcEvtReadResponse)
+        self.assertTrue(received.empty())
+
+        self._read_name()
+        self.assertTrue(received.empty())
+
+    def test_unobserved_event_not_decoded_without_debug_logging(self):
+        driver = self.central.ble_driver
+        device_logger = logging.getLogger("blatann.device")
+        # No handlers subscribe to attribute info discovery, only the event logger observes it when debug logging is on
+        event_cls = nrf_events.GattcEvtAttrInfoDiscoveryResponse
+        ble_event = types.SimpleNamespace(header=types.SimpleNamespace(evt_id=event_cls.evt_id))
+        previous_level = device_logger.level
+        with mock.patch.object(event_cls, "from_c") as from_c:
+            try:
+                device_logger.setLevel(logging.INFO)
+                driver._dispatch_event(ble_event, time.perf_counter())
+                from_c.assert_not_called()
+                # Changing the level is picked up without re-registering the observer
+                device_logger.setLevel(logging.DEBUG)
+                driver._dispatch_event(ble_event, time.perf_counter())
+                from_c.assert_called_once_with(ble_event)
+            finally:
+                device_logger.setLevel(previous_level)
+
+    def test_peer_routes_removed_on_disconnect(self):
+        peer = self.central_conn.peer
+        received = queue.Queue()
+
+        def on_read_response(_, event):
+            received.put(event.conn_handle)
+
+        peer.driver_event_subscribe(on_read_response, nrf_events.GattcEvtReadResponse)
+        self._read_name()
+        self.assertEqual(peer.conn_handle, received.get(timeout=1))
+
+        peer.disconnect().wait(10)
+        time.sleep(0.5)
+        # The new connection may reuse the connection handle, the old peer's subscription must not see its events
+        setup_connection(self.periph_conn, self.central_conn)
+        self.name_char = self.central_conn.db.find_characteristic(CharacteristicUuid.device_name)
+        self._read_name()
+        self.assertTrue(received.empty())
+
+
+if __name__ == '__main__':
+    unittest.main()
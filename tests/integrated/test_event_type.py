@@ -0,0 +1,93 @@
+import gc
+import unittest
+
+from blatann.event_type import EventSource
+
+
+class _Listener(object):
+    def __init__(self):
+        self.calls = []
+
+    def on_event(self, sender, event_args):
+        self.calls.append(event_args)
+
+
+class TestEventSource(unittest.TestCase):
+    def setUp(self) -> None:
+        self.event = EventSource("Test Event")
+
+    def test_weak_handler_garbage_collected(self):
+        listener = _Listener()
+        self.event.register(listener.on_event, weak=True)
+        self.event.notify(self, 1)
+        self.assertEqual([1], listener.calls)
+
+        del listener
+        gc.collect()
+        # The dead weakref is still registered until the next emit prunes it
+        self.assertTrue(self.event.has_handlers)
+        self.event.notify(self, 2)
+        self.assertFalse(self.event.has_handlers)
+
+    def test_weak_handler_pruned_without_affecting_others(self):
+        strong_calls = []
+        listener = _Listener()
+        self.event.register(listener.on_event, weak=True)
+        self.event.register(lambda sender, event_args: strong_calls.append(event_args))
+
+        del listener
+        gc.collect()
+        self.event.notify(self, 1)
+        self.event.notify(self, 2)
+        self.assertEqual([1, 2], strong_calls)
+        self.assertEqual(1, len(self.event._handlers[0]))
+
+    def test_weak_handler_deregister(self):
+        listener = _Listener()
+        self.event.register(listener.on_event, weak=True)
+        self.event.deregister(listener.on_event)
+        self.event.notify(self, 1)
+        self.assertEqual([], listener.calls)
+        self.assertFalse(self.event.has_handlers)
+
+    def test_register_during_emit_takes_effect_next_emit(self):
+        calls = []
+
+        def added_handler(sender, event_args):
+            calls.append(("added", event_args))
+
+        def registering_handler(sender, event_args):
+            calls.append(("registering", event_args))
+            self.event.register(added_handler)
+
+        self.event.register(registering_handler)
+        self.event.notify(self, 1)
+        self.assertEqual([("registering", 1)], calls)
+
+        self.event.notify(self, 2)
+        self.assertEqual([("registering", 1), ("registering", 2), ("added", 2)], calls)
+
+    def test_deregister_during_emit_takes_effect_next_emit(self):
+        calls = []
+
+        def second_handler(sender, event_args):
+            calls.append(("second", event_args))
+
+        def deregistering_handler(sender, event_args):
+            calls.append(("first", event_args))
+            self.event.deregister(deregistering_handler)
+            self.event.deregister(second_handler)
+
+        self.event.register(deregistering_handler)
+        self.event.register(second_handler)
+        # Handlers are snapshotted when the emit starts, so the second handler is still called this time
+        self.event.notify(self, 1)
+        self.assertEqual([("first", 1), ("second", 1)], calls)
+
+        self.event.notify(self, 2)
+        self.assertEqual([("first", 1), ("second", 1)], calls)
+        self.assertFalse(self.event.has_handlers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,14 @@
 import queue
+import threading
 import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
 from blatann import BleDevice
+from blatann.event_type import set_user_handler_executor
 from blatann.gap import AdvertisingData, ScanParameters
 from blatann.gap.gap_types import ConnectionParameters
+from blatann.nrf.nrf_dll_load import NordicSemiException
 from blatann.nrf.nrf_types import BLEGapAddrTypes
 from blatann.waitables import EventWaitable
 
@@ -215,3 +219,87 @@ class TestGap(BlatannTestCase):
 
     def test_advertising_private_nonresolvable_address(self):
         self._run_privacy_test(resolvable_address=False)
+
+    def test_metrics_track_driver_calls_and_events(self):
+        self.assertFalse(self.central.metrics_enabled)
+        self.central.ble_driver.metrics.reset()
+        self.central.metrics_enabled = True
+        try:
+            setup_connection(self.periph_conn, self.central_conn, discover_services=True)
+            with self.assertRaises(NordicSemiException):
+                self.central.ble_driver.ble_gap_disconnect(self.central_conn.peer.conn_handle + 1)
+        finally:
+            self.central.metrics_enabled = False
+
+        metrics = self.central.metrics
+        connect_metrics = metrics.api_calls["ble_gap_connect"]
+        self.assertEqual(1, connect_metrics.call_count)
+        self.assertEqual(0, connect_metrics.error_count)
+        self.assertGreater(connect_metrics.latency.max, 0)
+        self.assertEqual(1, metrics.api_calls["ble_gap_disconnect"].error_count)
+        self.assertEqual(1, metrics.event_counts["GapEvtConnected"])
+        self.assertGreater(metrics.event_counts["GattcEvtPrimaryServiceDiscoveryResponse"], 0)
+        self.assertGreaterEqual(metrics.event_queue_dwell.count, sum(metrics.event_counts.values()))
+        self.assertIn("blatann.device.BleDevice.on_driver_event", metrics.handlers)
+
+    def test_metrics_periodic_report(self):
+        reports = queue.Queue()
+        self.assertFalse(self.central.metrics_enabled)
+        with self.central.on_metrics_report.register(lambda device, metrics: reports.put(metrics)):
+            self.central.start_metrics_reporting(0.1)
+            try:
+                self.assertTrue(self.central.metrics_enabled)
+                first = reports.get(timeout=2)
+                second = reports.get(timeout=2)
+            finally:
+                self.central.stop_metrics_reporting()
+        self.assertGreater(second.timestamp, first.timestamp)
+        # Collection is turned back off since it wasn't enabled before reporting started
+        self.assertFalse(self.central.metrics_enabled)
+
+    def test_metrics_reporting_keeps_enabled_state(self):
+        self.central.metrics_enabled = True
+        try:
+            self.central.start_metrics_reporting(0.1)
+            # Restarting reporting doesn't lose the state from before the first start
+            self.central.start_metrics_reporting(0.2)
+            self.central.stop_metrics_reporting()
+            self.assertTrue(self.central.metrics_enabled)
+        finally:
+            self.central.stop_metrics_reporting()
+            self.central.metrics_enabled = False
+
+    def test_slow_handler_watchdog_logs_event_thread_stack(self):
+        def slow_connect_handler(peer, event_args):
+            time.sleep(0.3)
+
+        self.periph.slow_handler_threshold = 0.05
+        try:
+            with self.assertLogs("blatann.nrf.nrf_driver_watchdog", "WARNING") as logs:
+                with self.periph.client.on_connect.register(slow_connect_handler):
+                    setup_connection(self.periph_conn, self.central_conn, discover_services=False)
+        finally:
+            self.periph.slow_handler_threshold = None
+
+        stack_reports = [line for line in logs.output if "Event thread stack" in line]
+        self.assertEqual(1, len(stack_reports))
+        self.assertIn("GapEvtConnected", stack_reports[0])
+        self.assertIn("slow_connect_handler", stack_reports[0])
+        self.assertTrue(any("finished handling GapEvtConnected" in line for line in logs.output))
+
+    def test_user_handlers_offloaded_to_executor(self):
+        handler_threads = queue.Queue()
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="UserHandlers")
+        set_user_handler_executor(executor)
+        try:
+            with self.periph.client.on_connect.register(lambda *args: handler_threads.put(threading.current_thread().name)):
+                setup_connection(self.periph_conn, self.central_conn, discover_services=True)
+                self.central_conn.peer.disconnect().then(lambda *args: handler_threads.put(threading.current_thread().name))
+                on_connect_thread = handler_threads.get(timeout=5)
+                then_callback_thread = handler_threads.get(timeout=10)
+        finally:
+            set_user_handler_executor(None)
+            executor.shutdown()
+
+        self.assertTrue(on_connect_thread.startswith("UserHandlers"))
+        self.assertTrue(then_callback_thread.startswith("UserHandlers"))
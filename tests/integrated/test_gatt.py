@@ -1,12 +1,19 @@
 import queue
+import threading
 import unittest
 
 from blatann import BleDevice, gatt
+from blatann.exceptions import TimeoutError
 from blatann.bt_sig.uuids import DescriptorUuid, CharacteristicUuid
-from blatann.event_args import WriteEventArgs
-from blatann.gatt import PresentationFormat, SubscriptionState
+from blatann.event_args import WriteEventArgs, GattOperationCompleteReason
+from blatann.gatt import PresentationFormat, SubscriptionState, OperationPriority
 from blatann.gatt.gattc import GattcCharacteristic
 from blatann.gatt.gatts import GattsCharacteristicProperties, GattsCharacteristic, GattsUserDescriptionProperties
+from blatann.nrf import nrf_events
+from blatann.waitables.event_queue import QueueOverflowPolicy
+from blatann.waitables.event_waitable import EventWaitable
+from blatann.utils.queued_tasks_manager import QueuedTasksManagerBase
+from blatann.waitables.timer_wheel import TimerWheel
 from blatann.uuid import Uuid128, generate_random_uuid128
 
 from tests.integrated.base import BlatannTestCase, TestParams, long_running
@@ -126,6 +133,15 @@ class TestGatt(BlatannTestCase):
     def _get_received_value(self, timeout=10):
         return self.received_value_q.get(timeout=timeout)
 
+    def _subscribe_notify_char(self, handler=None):
+        # The subscription completes on the central before the peripheral processes it,
+        # wait for the peripheral to see the subscription so it can notify
+        states = queue.Queue()
+        with self.periph_conn.notify_char.on_subscription_change.register(lambda c, e: states.put(e.subscription_state)):
+            self.central_conn.notify_char.subscribe(handler).wait(10)
+            while states.get(timeout=10) != SubscriptionState.NOTIFY:
+                pass
+
     def test_0_property_discovery(self):
         # Verify all the characteristics were discovered
         self.assertIsNotNone(self.central_conn.write_char)
@@ -224,6 +240,22 @@ class TestGatt(BlatannTestCase):
             self.central_conn.write_no_resp_char.write_without_response(value).wait(10)
             self.assertEqual(value, self._get_received_value())
 
+    def test_write_without_response_nowait(self):
+        complete_ids = queue.Queue()
+
+        def on_write_complete(char, event_args):
+            complete_ids.put(event_args.id)
+
+        values = [rand_bytes(20) for _ in range(10)]
+        with self.periph_conn.write_no_resp_char.on_write.register(self._on_write), \
+                self.central_conn.write_no_resp_char.on_write_complete.register(on_write_complete):
+            write_ids = [self.central_conn.write_no_resp_char.write_without_response_nowait(v) for v in values]
+            received = [self._get_received_value() for _ in values]
+            completed = [complete_ids.get(timeout=10) for _ in values]
+
+        self.assertEqual(values, received)
+        self.assertEqual(write_ids, completed)
+
     def test_read(self):
         # Standard read. Set value before read
         value = rand_bytes(20)
@@ -252,6 +284,201 @@ class TestGatt(BlatannTestCase):
         # Verify the value set in the on_read handler matches the value read
         self.assertEqual(set_value[0], read_resp.value)
 
+    def test_operation_deadlines(self):
+        # Operations which complete before their deadline are not affected by it
+        waitables = [self.central_conn.read_char.read().with_timeout(10) for _ in range(5)]
+        for waitable in waitables:
+            _, read_resp = waitable.wait(10)
+            self.assertEqual(gatt.GattStatusCode.success, read_resp.status)
+            self.assertFalse(waitable.timed_out)
+
+        # Wait on an event which does not occur during the deadline
+        on_read = self.periph_conn.read_char.on_read
+        handler_count = len(on_read._handlers[0])
+        callback_args = queue.Queue()
+        waitable = EventWaitable(on_read).with_timeout(0.1).then(lambda *args: callback_args.put(args))
+        self.assertEqual(handler_count + 1, len(on_read._handlers[0]))
+
+        self.assertEqual((None, None), callback_args.get(timeout=10))
+        self.assertTrue(waitable.timed_out)
+        with self.assertRaises(TimeoutError):
+            waitable.wait()
+        # The waitable's handler was removed from the event on expiry, the event occurring afterwards is ignored
+        self.assertEqual(handler_count, len(on_read._handlers[0]))
+        self.central_conn.read_char.read().wait(10)
+        self.assertTrue(waitable.timed_out)
+        self.assertTrue(callback_args.empty())
+
+    def test_cancel_queued_operations(self):
+        release_read = threading.Event()
+        write_values = queue.Queue()
+        read_reasons = {}
+
+        with self.periph_conn.read_char.on_read.register(lambda c, e: release_read.wait(10)), \
+                self.periph_conn.write_char.on_write.register(lambda c, e: write_values.put(e.value)), \
+                self.central_conn.read_char.on_read_complete.register(lambda c, e: read_reasons.update({e.id: e.reason})):
+            # The first read is held up by the peripheral, the rest of the operations are queued behind it
+            reads = [self.central_conn.read_char.read() for _ in range(4)]
+            write = self.central_conn.write_char.write(b"cancelled")
+
+            self.assertFalse(reads[0].cancel())
+            self.assertTrue(reads[2].cancel())
+            self.assertTrue(write.cancel())
+            self.assertFalse(write.cancel())
+            # Timing out waiting for a queued operation cancels it
+            with self.assertRaises(TimeoutError):
+                reads[3].wait(0.01)
+            release_read.set()
+
+            for waitable in reads[:2]:
+                _, event_args = waitable.wait(10)
+                self.assertEqual(GattOperationCompleteReason.SUCCESS, event_args.reason)
+            self.assertEqual(GattOperationCompleteReason.CANCELLED, reads[2].wait(10)[1].reason)
+            self.assertEqual(GattOperationCompleteReason.CANCELLED, write.wait(10)[1].reason)
+            self.assertEqual(GattOperationCompleteReason.CANCELLED, read_reasons[reads[3].id])
+
+            # Only the write which was not cancelled is received
+            self.central_conn.write_char.write(b"sent").wait(10)
+            self.assertEqual(b"sent", write_values.get(timeout=10))
+            self.assertTrue(write_values.empty())
+
+    def test_operation_priorities(self):
+        release_read = threading.Event()
+        completed = queue.Queue()
+        write_values = queue.Queue()
+
+        def on_complete(name):
+            return lambda sender, event_args: completed.put(name)
+
+        with self.periph_conn.read_char.on_read.register(lambda c, e: release_read.wait(10)), \
+                self.periph_conn.large_char.on_write.register(lambda c, e: write_values.put(e.value)), \
+                self.periph_conn.write_char.on_write.register(lambda c, e: write_values.put(e.value)):
+            # The first read is held up by the peripheral, the rest of the operations are queued behind it
+            waitables = [self.central_conn.read_char.read().then(on_complete("first"))]
+            for i in range(2):
+                waitables.append(self.central_conn.large_char.write(rand_bytes(self.large_char_size), OperationPriority.BULK)
+                                 .then(on_complete("bulk")))
+            waitables.append(self.central_conn.read_char.read().then(on_complete("normal")))
+            waitables.append(self.central_conn.write_char.write(b"control", OperationPriority.CONTROL)
+                             .then(on_complete("control")))
+            release_read.set()
+            for waitable in waitables:
+                _, event_args = waitable.wait(10)
+                self.assertEqual(gatt.GattStatusCode.success, event_args.status)
+
+        self.assertEqual(["first", "control", "normal", "bulk", "bulk"], [completed.get(timeout=10) for _ in waitables])
+        self.assertEqual(b"control", write_values.get(timeout=10))
+
+    def test_priority_starvation(self):
+        processed = []
+
+        class _Task(object):
+            def __init__(self, task_id, priority):
+                self.id = task_id
+                self.priority = priority
+
+        class _Manager(QueuedTasksManagerBase):
+            def _handle_task(self, task):
+                processed.append(task.id)
+
+            def complete(self):
+                self._task_completed(self._pop_task_in_process())
+
+        manager = _Manager(priority_levels=3, starvation_limit=3)
+        manager._add_task(_Task("first", 0))
+        manager._add_task(_Task("bulk", 2))
+        manager._add_task(_Task("normal", 1))
+        for i in range(6):
+            manager._add_task(_Task(i, 0))
+        self.assertEqual(8, manager.queued_count)
+        while manager.queued_count:
+            manager.complete()
+
+        # Lower priority tasks are processed once 3 tasks have been processed ahead of them,
+        # the higher of the starved priorities first
+        self.assertEqual(["first", 0, 1, "normal", "bulk", 2, 3, 4, 5], processed)
+
+    def test_timer_wheel(self):
+        wheel = TimerWheel(resolution=0.005, slots_per_level=4, levels=3)
+        fired = queue.Queue()
+        # Spread the timers across all levels and beyond the span of the wheel
+        delays = [0.0, 0.01, 0.03, 0.1, 0.2, 0.35, 0.5]
+        handles = [wheel.schedule(delay, fired.put, delay) for delay in delays]
+        wheel.cancel(handles[2])
+        self.assertFalse(handles[2].active)
+        self.assertEqual(len(delays) - 1, wheel.pending_count)
+
+        expected = [d for d in delays if d != 0.03]
+        self.assertEqual(expected, [fired.get(timeout=5) for _ in expected])
+        self.assertEqual(0, wheel.pending_count)
+        self.assertTrue(fired.empty())
+
+    def test_read_many_write_many(self):
+        chars = [self.central_conn.read_char, self.central_conn.large_char, self.central_conn.all_char]
+        periph_chars = [self.periph_conn.read_char, self.periph_conn.large_char, self.periph_conn.all_char]
+        read_multiple_responses = queue.Queue()
+
+        def on_read_multiple(driver, event):
+            read_multiple_responses.put(event)
+
+        def read_and_verify(lengths, use_read_multiple=True):
+            values = [rand_bytes(n) for n in lengths]
+            for c, v in zip(periph_chars, values):
+                c.set_value(v)
+            _, event_args = self.central_conn.db.read_many(chars, use_read_multiple).wait(10)
+            self.assertTrue(event_args.all_succeeded)
+            self.assertEqual(values, [event_args.results[c.value_attribute.handle].value for c in chars])
+            self.assertEqual(values, [c.value for c in chars])
+
+        def read_multiple_lengths():
+            lengths = []
+            while not read_multiple_responses.empty():
+                event = read_multiple_responses.get()
+                self.assertEqual(gatt.GattStatusCode.success, event.status)
+                lengths.append(len(event.data))
+            return lengths
+
+        driver = self.central.ble_driver
+        driver.event_subscribe(on_read_multiple, nrf_events.GattcEvtCharValuesReadResponse)
+        try:
+            # No lengths are known to be fixed, every value is read individually
+            read_and_verify([4, 6, 5])
+            read_and_verify([4, 6, 5])
+            self.assertEqual([], read_multiple_lengths())
+
+            self.central_conn.read_char.value_attribute.fixed_length = 4
+            self.central_conn.all_char.value_attribute.fixed_length = 5
+            # The fixed-length values are read together, the variable-length one separately.
+            # Its length changing between reads doesn't affect the others
+            read_and_verify([4, 6, 5])
+            read_and_verify([4, 2, 5])
+            read_and_verify([4, 9, 5])
+            self.assertEqual([9, 9, 9], read_multiple_lengths())
+            # Not used unless requested
+            read_and_verify([4, 6, 5], use_read_multiple=False)
+            self.assertEqual([], read_multiple_lengths())
+            # A value which isn't the fixed length expected falls back to reading individually
+            read_and_verify([5, 6, 5])
+            self.assertEqual([10], read_multiple_lengths())
+            read_and_verify([3, 6, 5])
+            self.assertEqual([8], read_multiple_lengths())
+        finally:
+            driver.event_unsubscribe(on_read_multiple, nrf_events.GattcEvtCharValuesReadResponse)
+            self.central_conn.read_char.value_attribute.fixed_length = None
+            self.central_conn.all_char.value_attribute.fixed_length = None
+
+        # Nothing to read completes immediately
+        _, event_args = self.central_conn.db.read_many([]).wait(1)
+        self.assertEqual({}, event_args.results)
+
+        writes = {self.central_conn.write_char: rand_bytes(20), self.central_conn.large_char: rand_bytes(100)}
+        with self.periph_conn.write_char.on_write.register(self._on_write), \
+                self.periph_conn.large_char.on_write.register(self._on_write):
+            _, event_args = self.central_conn.db.write_many(writes.items()).wait(10)
+            self.assertTrue(event_args.all_succeeded)
+            received = {self._get_received_value() for _ in writes}
+        self.assertEqual(set(writes.values()), received)
+
     def test_long_reads_writes(self):
         # Writes larger than one MTU
         with self.periph_conn.large_char.on_write.register(self._on_write):
@@ -285,6 +512,120 @@ class TestGatt(BlatannTestCase):
         self.assertFalse(event_data.is_indication)
         self.central_conn.notify_char.unsubscribe().wait()
 
+    def test_notifications_reach_their_characteristic(self):
+        pairs = [(self.periph_conn.notify_char, self.central_conn.notify_char),
+                 (self.periph_conn.indicate_char, self.central_conn.indicate_char),
+                 (self.periph_conn.all_char, self.central_conn.all_char)]
+        received = {central_char.uuid: queue.Queue() for _, central_char in pairs}
+
+        def handler(char, event):
+            received[char.uuid].put(event.value)
+
+        for periph_char, central_char in pairs:
+            states = queue.Queue()
+            with periph_char.on_subscription_change.register(lambda c, e: states.put(e.subscription_state)):
+                central_char.subscribe(handler).wait(10)
+                while states.get(timeout=10) == SubscriptionState.NOT_SUBSCRIBED:
+                    pass
+
+        # Interleave the notifications so each characteristic's values arrive between the others'
+        sent = {central_char.uuid: [] for _, central_char in pairs}
+        for i in range(5):
+            for j, (periph_char, central_char) in enumerate(pairs):
+                value = bytes([j, i])
+                periph_char.notify(value).wait(10)
+                sent[central_char.uuid].append(value)
+
+        for uuid, values in sent.items():
+            self.assertEqual(values, [received[uuid].get(timeout=10) for _ in values])
+            self.assertTrue(received[uuid].empty())
+        for _, central_char in pairs:
+            central_char.unsubscribe().wait(10)
+
+    def test_notify_nowait_and_outstanding_waitables(self):
+        event_queue = queue.Queue()
+        complete_ids = queue.Queue()
+
+        def handler(char, event):
+            event_queue.put(event.value)
+
+        def on_notify_complete(char, event_args):
+            complete_ids.put(event_args.id)
+
+        self._subscribe_notify_char(handler)
+        values = [bytes([i] * 10) for i in range(20)]
+        with self.periph_conn.notify_char.on_notify_complete.register(on_notify_complete):
+            notification_ids = [self.periph_conn.notify_char.notify_nowait(v) for v in values[:10]]
+            waitables = [self.periph_conn.notify_char.notify(v) for v in values[10:]]
+            # Wait on the waitables in reverse order, each should complete with its own notification
+            for waitable in reversed(waitables):
+                _, result = waitable.wait(10)
+                self.assertEqual(waitable.id, result.id)
+                self.assertEqual(result.Reason.SUCCESS, result.reason)
+            completed = [complete_ids.get(timeout=10) for _ in values]
+
+        self.assertEqual(notification_ids + [w.id for w in waitables], completed)
+        self.assertEqual(values, [event_queue.get(timeout=10) for _ in values])
+        self.central_conn.notify_char.unsubscribe().wait()
+
+    def test_bounded_notification_queues(self):
+        received = queue.Queue()
+        char = self.central_conn.notify_char
+        self._subscribe_notify_char()
+        unbounded = char.notification_queue()
+        drop_oldest = char.notification_queue(3, QueueOverflowPolicy.drop_oldest)
+        drop_newest = char.notification_queue(3, QueueOverflowPolicy.drop_newest)
+        coalesce = char.notification_queue(1, QueueOverflowPolicy.coalesce)
+
+        values = [bytes([i] * 10) for i in range(10)]
+        # Registered after the queues, so every queue has processed a notification once it's received here
+        with char.on_notification_received.register(lambda c, e: received.put(e.value)):
+            for v in values:
+                self.periph_conn.notify_char.notify(v).wait(10)
+            self.assertEqual(values, [received.get(timeout=10) for _ in values])
+
+        def drain(q):
+            items = []
+            while True:
+                try:
+                    items.append(q.get(block=False)[1].value)
+                except queue.Empty:
+                    return items
+
+        self.assertEqual(0, unbounded.max_size)
+        self.assertEqual(len(values), unbounded.depth)
+        self.assertEqual(values, drain(unbounded))
+        self.assertEqual(0, unbounded.dropped_count)
+        self.assertEqual(values[-3:], drain(drop_oldest))
+        self.assertEqual(7, drop_oldest.dropped_count)
+        self.assertEqual(values[:3], drain(drop_newest))
+        self.assertEqual(7, drop_newest.dropped_count)
+        self.assertEqual(values[-1:], drain(coalesce))
+        self.assertEqual(9, coalesce.dropped_count)
+        char.unsubscribe().wait(10)
+
+    def test_notification_queue_batches(self):
+        received = queue.Queue()
+        char = self.central_conn.notify_char
+        self._subscribe_notify_char()
+        notification_queue = char.notification_queue()
+
+        values = [bytes([i] * (i + 1)) for i in range(10)]
+        with char.on_notification_received.register(lambda c, e: received.put(e.value)):
+            for v in values:
+                self.periph_conn.notify_char.notify(v).wait(10)
+            self.assertEqual(values, [received.get(timeout=10) for _ in values])
+
+        batch = notification_queue.get_batch(4)
+        self.assertEqual(values[:4], [event_args.value for _, event_args in batch])
+        batch = notification_queue.get_batch()
+        buffer, offsets = batch.joined_values()
+        self.assertEqual(b"".join(values[4:]), buffer)
+        self.assertEqual(values[4:], [buffer[offsets[i]:offsets[i + 1]] for i in range(len(batch))])
+        with self.assertRaises(queue.Empty):
+            notification_queue.get_batch(block=False)
+        char.unsubscribe().wait(10)
+
     def test_indication(self):
         event_queue = queue.Queue()
         data_to_send = bytes(list(range(10)))
@@ -88,6 +88,21 @@ class TestScanner(BlatannTestCase):
         for p in adv_packets:
             self.assertEqual(self.default_adv_data_bytes, p.raw_bytes)
 
+    def test_event_queue_counters_track_scan_reports(self):
+        event_queue = self.dev2.ble_driver.event_queue
+        received_before = event_queue.received_count
+        event_queue.reset_high_water_mark()
+
+        self.dev1.advertiser.start(self.adv_interval_ms, self.scan_params.timeout_s+2)
+        results = self.dev2.scanner.start_scan(self.scan_params).wait(10)
+
+        all_packets, _, _ = self._get_packets_for_adv(results)
+        self.assertGreater(len(all_packets), 0)
+        self.assertGreaterEqual(event_queue.received_count - received_before, len(all_packets))
+        self.assertGreaterEqual(event_queue.high_water_mark, 1)
+        self.assertLessEqual(event_queue.high_water_mark, event_queue.max_size)
+        self.assertEqual(0, event_queue.dropped_count)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,287 @@
+import threading
+import time
+import unittest
+
+from blatann import BleDevice, gatt
+from blatann.exceptions import InvalidStateException
+from blatann.bt_sig.uuids import CharacteristicUuid, DescriptorUuid, ServiceUuid
+from blatann.gap import SecurityParameters, SecurityStatus
+from blatann.gap.advertise_data import AdvertisingData
+from blatann.gatt.gatts import GattsCharacteristicProperties, GattsCharacteristic
+from blatann.peer import Client, Peripheral
+from blatann.uuid import Uuid16, Uuid128, generate_random_uuid128
+
+from tests.integrated.base import BlatannTestCase
+
+
+class TestServiceDiscovery(BlatannTestCase):
+    periph_dev: BleDevice
+    central_dev: BleDevice
+    peer_cen: Client
+    peer_per: Peripheral
+    hash_char: GattsCharacteristic
+    notify_char: GattsCharacteristic
+
+    service_uuid = generate_random_uuid128().new_uuid_from_base(0)
+    read_char_uuid = service_uuid.new_uuid_from_base(1)
+    read_char_value = b"cached"
+
+    service_2_uuid = generate_random_uuid128().new_uuid_from_base(0)
+    notify_char_uuid = service_2_uuid.new_uuid_from_base(1)
+
+    # 16-bit service with characteristics on two different vendor bases
+    service_3_uuid = Uuid16(0xFFF0)
+    base_a = generate_random_uuid128()
+    base_b = generate_random_uuid128()
+    service_3_char_uuids = [base_a.new_uuid_from_base(1), base_a.new_uuid_from_base(2),
+                            base_b.new_uuid_from_base(1), base_a.new_uuid_from_base(3), base_b.new_uuid_from_base(2)]
+
+    dev1_config = {"service_changed": True}
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super(TestServiceDiscovery, cls).setUpClass()
+        cls.periph_dev = cls.dev1
+        cls.central_dev = cls.dev2
+        cls.peer_cen = cls.periph_dev.client
+        cls.periph_dev.advertiser.set_advertise_data(AdvertisingData(flags=0x06, local_name="BlatannTest"))
+        cls.periph_dev.advertiser.set_default_advertise_params(100, 0)
+
+        svc = cls.periph_dev.database.add_service(cls.service_uuid)
+        svc.add_characteristic(cls.read_char_uuid, GattsCharacteristicProperties(read=True, max_length=20),
+                               cls.read_char_value)
+        cls.hash_char = svc.add_characteristic(CharacteristicUuid.database_hash,
+                                               GattsCharacteristicProperties(read=True, max_length=16), b"\x01" * 16)
+        svc = cls.periph_dev.database.add_service(cls.service_2_uuid)
+        cls.notify_char = svc.add_characteristic(cls.notify_char_uuid,
+                                                 GattsCharacteristicProperties(notify=True, max_length=20))
+        svc = cls.periph_dev.database.add_service(cls.service_3_uuid)
+        for uuid in cls.service_3_char_uuids:
+            svc.add_characteristic(uuid, GattsCharacteristicProperties(read=True, max_length=20))
+        cls.peer_cen.preferred_mtu_size = cls.periph_dev.max_mtu_size
+
+    def setUp(self) -> None:
+        self.periph_dev.clear_bonding_data()
+        self.central_dev.clear_bonding_data()
+        self.hash_char.set_value(b"\x01" * 16)
+        self.peer_per = None
+        self._connect()
+
+    def tearDown(self) -> None:
+        self._disconnect()
+        time.sleep(0.5)
+
+    def _connect(self):
+        event = threading.Event()
+        self.periph_dev.advertiser.start()
+        with self.peer_cen.on_connect.register(lambda *args: event.set()):
+            self.peer_per = self.central_dev.connect(self.periph_dev.address).wait(5)
+            self.assertTrue(event.wait(5))
+
+    def _disconnect(self):
+        event = threading.Event()
+        if self.peer_per:
+            with self.peer_cen.on_disconnect.register(lambda *args: event.set()):
+                self.peer_per.disconnect().wait(5)
+                event.wait(15)
+            self.peer_per = None
+
+    def _reconnect(self, bonded=True):
+        time.sleep(0.5)
+        self._disconnect()
+        self._connect()
+        self.assertEqual(bonded, self.peer_per.is_previously_bonded)
+
+    def _bond(self):
+        self.peer_per.security.security_params = SecurityParameters(bond=True)
+        self.peer_cen.security.security_params = SecurityParameters(bond=True)
+        _, result = self.peer_per.security.pair().wait(10)
+        self.assertEqual(SecurityStatus.success, result.status)
+
+    def _discover(self, expect_from_cache):
+        _, event_args = self.peer_per.discover_services(use_cache=True).wait(10)
+        self.assertEqual(expect_from_cache, event_args.from_cache)
+        char = self.peer_per.database.find_characteristic(self.read_char_uuid)
+        self.assertIsNotNone(char)
+        _, read_result = char.read().wait(10)
+        self.assertEqual(self.read_char_value, read_result.value)
+        return [c.value_attribute.handle for c in self.peer_per.database.iter_characteristics()]
+
+    def _cache_entry(self):
+        return next(iter(self.central_dev.bond_db)).gatt_cache
+
+    def _wait_for_cache(self, present, timeout=5):
+        end_time = time.time() + timeout
+        while (self._cache_entry() is not None) != present and time.time() < end_time:
+            time.sleep(0.1)
+        self.assertEqual(present, self._cache_entry() is not None)
+
+    def _discover_and_bond(self):
+        discovered_handles = self._discover(expect_from_cache=False)
+        self._bond()
+        # Discovered before bonding, the database is cached once the peer disconnects
+        self._reconnect()
+        self.assertIsNotNone(self._cache_entry())
+        self.assertEqual(b"\x01" * 16, self._cache_entry().database_hash)
+        return discovered_handles
+
+    def test_bonded_reconnect_restores_from_cache(self):
+        discovered_handles = self._discover_and_bond()
+        restored_handles = self._discover(expect_from_cache=True)
+        self.assertEqual(discovered_handles, restored_handles)
+
+    def test_unbonded_peer_not_cached(self):
+        self._discover(expect_from_cache=False)
+        self._disconnect()
+        self.assertEqual(0, len(list(self.central_dev.bond_db)))
+
+    def test_database_hash_mismatch_rediscovers(self):
+        self._discover_and_bond()
+        self.hash_char.set_value(b"\x02" * 16)
+
+        self._discover(expect_from_cache=False)
+        # Rediscovering replaces the database instead of adding to it
+        self.assertEqual(1, len([s for s in self.peer_per.database.services if s.uuid == self.service_uuid]))
+        self._wait_for_cache(True)
+        self.assertEqual(b"\x02" * 16, self._cache_entry().database_hash)
+
+    def test_service_changed_rediscovers(self):
+        discovered_handles = self._discover_and_bond()
+        self._discover(expect_from_cache=True)
+        stale_char = self.peer_per.database.find_characteristic(self.read_char_uuid)
+        # Give the subscription to the service changed characteristic time to reach the peripheral
+        time.sleep(0.5)
+
+        rediscovered = []
+        cache_entries = []
+
+        def on_rediscovered(peer, event_args):
+            # The cache is invalidated before rediscovering, the new database isn't stored until after this
+            cache_entries.append(self._cache_entry())
+            rediscovered.append(event_args)
+
+        with self.peer_per.on_database_discovery_complete.register(on_rediscovered):
+            self.periph_dev.ble_driver.ble_gatts_service_changed(self.peer_cen.conn_handle, 0x0001, 0xFFFF)
+            end_time = time.time() + 10
+            while not rediscovered and time.time() < end_time:
+                time.sleep(0.1)
+
+        self.assertEqual(1, len(rediscovered))
+        self.assertEqual(gatt.GattStatusCode.success, rediscovered[0].status)
+        self.assertFalse(rediscovered[0].from_cache)
+        self.assertEqual([None], cache_entries)
+        # The database was replaced, the old characteristic objects are stale
+        self.assertIsNot(stale_char, self.peer_per.database.find_characteristic(self.read_char_uuid))
+        self.assertEqual(discovered_handles, [c.value_attribute.handle
+                                              for c in self.peer_per.database.iter_characteristics()])
+        # The rediscovered database is cached again
+        self._wait_for_cache(True)
+
+    def test_discover_services_by_uuid(self):
+        _, event_args = self.peer_per.discover_services(uuids=[self.service_uuid]).wait(10)
+        self.assertEqual(gatt.GattStatusCode.success, event_args.status)
+        db = self.peer_per.database
+        self.assertEqual([self.service_uuid], [s.uuid for s in db.services])
+        self.assertIsNotNone(db.find_characteristic(CharacteristicUuid.database_hash))
+        self.assertIsNone(db.find_characteristic(self.notify_char_uuid))
+        _, read_result = db.find_characteristic(self.read_char_uuid).read().wait(10)
+        self.assertEqual(self.read_char_value, read_result.value)
+
+    def test_discover_multiple_services_by_uuid(self):
+        uuids = [self.service_2_uuid, ServiceUuid.generic_access]
+        self.peer_per.discover_services(uuids=uuids).wait(10)
+        db = self.peer_per.database
+        # Services are in database order, not the order they were searched for
+        self.assertEqual([ServiceUuid.generic_access, self.service_2_uuid], [s.uuid for s in db.services])
+        self.assertIsNotNone(db.find_characteristic(CharacteristicUuid.device_name))
+        # Descriptors of the discovered services are discovered
+        notify_char = db.find_characteristic(self.notify_char_uuid)
+        self.assertIsNotNone(notify_char.find_descriptor(DescriptorUuid.cccd))
+        notify_char.subscribe().wait(10)
+
+    def test_discover_services_by_uuid_not_found(self):
+        _, event_args = self.peer_per.discover_services(uuids=[generate_random_uuid128()]).wait(10)
+        self.assertEqual(gatt.GattStatusCode.success, event_args.status)
+        self.assertEqual([], self.peer_per.database.services)
+
+    def test_vendor_uuids_resolved(self):
+        # With a large MTU the characteristic discovery responses contain several unknown UUIDs
+        self.peer_per.exchange_mtu(self.central_dev.max_mtu_size).wait(10)
+        self.peer_per.discover_services().wait(10)
+        service = self.peer_per.database.find_service(self.service_3_uuid)
+        self.assertEqual(self.service_3_char_uuids, [c.uuid for c in service.characteristics])
+        self.assertEqual(self.service_2_uuid, self.peer_per.database.services[-2].uuid)
+
+    def test_find_by_uuid_and_handle(self):
+        self.peer_per.discover_services().wait(10)
+        db = self.peer_per.database
+        service = db.find_service(self.service_uuid)
+        self.assertIs(db.services[[s.uuid for s in db.services].index(self.service_uuid)], service)
+        # Equal UUIDs created separately find the same objects
+        char = db.find_characteristic(Uuid128(str(self.read_char_uuid)))
+        self.assertIs(service.find_characteristic(self.read_char_uuid), char)
+        self.assertIs(char, db.find_characteristic_by_handle(char.value_attribute.handle))
+        self.assertIsNone(db.find_characteristic(Uuid16(self.read_char_uuid.uuid16)))
+        self.assertIsNone(db.find_characteristic_by_handle(0xFFFF))
+        service_3 = db.find_service(self.service_3_uuid)
+        self.assertIs(service_3.characteristics[-1], db.find_characteristic(self.service_3_char_uuids[-1]))
+        notify_char = db.find_characteristic(self.notify_char_uuid)
+        self.assertEqual(DescriptorUuid.cccd, notify_char.find_descriptor(Uuid16(0x2902)).uuid)
+        # UUIDs given as strings are still found
+        self.assertIs(service, db.find_service(str(self.service_uuid)))
+        self.assertIs(char, db.find_characteristic(str(self.read_char_uuid)))
+        self.assertIs(char, service.find_characteristic(str(self.read_char_uuid)))
+        self.assertIs(db.find_characteristic(CharacteristicUuid.device_name), db.find_characteristic("2a00"))
+        self.assertEqual(DescriptorUuid.cccd, notify_char.find_descriptor("2902").uuid)
+        self.assertIsNone(db.find_characteristic("ffff"))
+
+    def test_discover_without_descriptors_subscribe(self):
+        _, event_args = self.peer_per.discover_services(discover_descriptors=False).wait(10)
+        self.assertEqual(gatt.GattStatusCode.success, event_args.status)
+        db = self.peer_per.database
+        # No handles between the value and the next characteristic, nothing to discover
+        self.assertTrue(db.find_characteristic(self.read_char_uuid).descriptors_discovered)
+        notify_char = db.find_characteristic(self.notify_char_uuid)
+        self.assertFalse(notify_char.descriptors_discovered)
+
+        notifications = []
+        _, sub_result = notify_char.subscribe(lambda c, e: notifications.append(e.value)).wait(10)
+        self.assertEqual(gatt.GattStatusCode.success, sub_result.status)
+        self.assertTrue(notify_char.descriptors_discovered)
+        self.assertTrue(notify_char.subscribed)
+
+        self.notify_char.notify(b"lazy").wait(10)
+        end_time = time.time() + 5
+        while not notifications and time.time() < end_time:
+            time.sleep(0.1)
+        self.assertEqual([b"lazy"], notifications)
+
+    def test_discover_without_descriptors_find_descriptor(self):
+        self.peer_per.discover_services().wait(10)
+        expected = {c.uuid: [(a.uuid, a.handle) for a in c.attributes]
+                    for c in self.peer_per.database.iter_characteristics()}
+        self._reconnect(bonded=False)
+
+        self.peer_per.discover_services(discover_descriptors=False).wait(10)
+        db = self.peer_per.database
+        notify_char = db.find_characteristic(self.notify_char_uuid)
+        # The descriptors have to be discovered before they can be searched
+        self.assertFalse(notify_char.descriptors_discovered)
+        with self.assertRaises(InvalidStateException):
+            notify_char.find_descriptor(DescriptorUuid.cccd)
+        with self.assertRaises(InvalidStateException):
+            list(notify_char.attributes)
+        _, event_args = notify_char.discover_descriptors().wait(10)
+        self.assertEqual(gatt.GattStatusCode.success, event_args.status)
+        self.assertTrue(notify_char.descriptors_discovered)
+        self.assertIsNotNone(notify_char.find_descriptor(DescriptorUuid.cccd))
+        # Discovering the rest on demand gives the same attributes as discovering them up front
+        for c in db.iter_characteristics():
+            _, event_args = c.discover_descriptors().wait(10)
+            self.assertEqual(gatt.GattStatusCode.success, event_args.status)
+        actual = {c.uuid: [(a.uuid, a.handle) for a in c.attributes] for c in db.iter_characteristics()}
+        self.assertEqual(expected, actual)
+
+
+if __name__ == '__main__':
+    unittest.main()